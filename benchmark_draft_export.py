@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Draft Proxy Export Throughput
+
+Renders a synthetic 1080p karaoke project (video background, a line every
+five seconds) with the master profile and each draft profile, and reports
+the export speed as a multiple of realtime. The draft profile is run twice:
+the second run is a re-export that reuses the rasters cached by the first.
+
+Frames are rendered and discarded unless --encode is given and FFmpeg is on
+PATH. Exits with status 1 if the draft profile is slower than --target
+times realtime.
+
+Usage:
+    python benchmark_draft_export.py [--duration S] [--fps F] [--backend mock|software|opengl]
+                                     [--encode] [--target X]
+"""
+
+import sys
+import os
+import time
+import shutil
+import argparse
+import tempfile
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from core.export_profiles import get_export_profile, MASTER_PROFILE, DRAFT_PROFILE, DRAFT_QUARTER_PROFILE
+from core.opengl_context import create_headless_context
+from core.frame_capture_system import FrameCaptureSettings, stream_video_frames, get_shared_background_cache
+from core.enhanced_ffmpeg_integration import EnhancedFFmpegProcessor, EnhancedExportSettings
+from core.models import Project, AudioFile, VideoFile, SubtitleFile, SubtitleLine
+
+
+SOURCE_WIDTH = 1920
+SOURCE_HEIGHT = 1080
+
+RUNS = [
+    (MASTER_PROFILE, MASTER_PROFILE),
+    (DRAFT_PROFILE, DRAFT_PROFILE),
+    (DRAFT_PROFILE, "draft (re-export)"),
+    (DRAFT_QUARTER_PROFILE, DRAFT_QUARTER_PROFILE),
+]
+
+
+def make_project(duration, fps):
+    """Synthetic 1080p song: a four-second karaoke line every five seconds over a video"""
+    lines = [SubtitleLine(start, start + 4.0, f"Line {i} la la la")
+             for i, start in enumerate(range(0, int(duration) - 4, 5))]
+    return Project(
+        id="benchmark",
+        name="Draft Export Benchmark",
+        audio_file=AudioFile(path="", duration=duration),
+        video_file=VideoFile(path="benchmark_source.mp4", duration=duration, frame_rate=fps,
+                             resolution={"width": SOURCE_WIDTH, "height": SOURCE_HEIGHT}),
+        subtitle_file=SubtitleFile(path="benchmark.ass", lines=lines)
+    )
+
+
+def export(project, profile, backend, fps, output_path, encode):
+    """Export with a profile; returns (frames, seconds, width, height, output fps)"""
+    width, height = profile.output_size(SOURCE_WIDTH, SOURCE_HEIGHT)
+    output_fps = profile.output_fps(fps)
+    capture_settings = profile.configure_capture(
+        FrameCaptureSettings(width=width, height=height, fps=output_fps, deduplicate_frames=True))
+    total_frames = capture_settings.timebase.frame_count(project.audio_file.duration)
+
+    start = time.perf_counter()
+    context = create_headless_context(backend, width, height)
+    frames = stream_video_frames(project, capture_settings, context)
+    try:
+        if encode:
+            settings = profile.configure_encoder(EnhancedExportSettings(
+                output_path=output_path, width=width, height=height, fps=output_fps, timestamped_input=True))
+            processor = EnhancedFFmpegProcessor()
+            if not processor.encode_frames(settings, frames, total_frames,
+                                           buffer_size=capture_settings.buffer_size):
+                raise RuntimeError(processor.error_message or "FFmpeg encoding failed")
+        else:
+            for _ in frames:
+                pass
+    finally:
+        frames.close()
+        context.cleanup()
+
+    return total_frames, time.perf_counter() - start, width, height, output_fps
+
+
+def main():
+    """Parse arguments and measure each profile"""
+    parser = argparse.ArgumentParser(description="Benchmark draft proxy export throughput")
+    parser.add_argument("--duration", type=float, default=60.0, help="Song length in seconds")
+    parser.add_argument("--fps", type=float, default=30.0, help="Source frame rate")
+    parser.add_argument("--backend", choices=["mock", "software", "opengl"], default="mock")
+    parser.add_argument("--encode", action="store_true", help="Encode with FFmpeg")
+    parser.add_argument("--target", type=float, default=10.0,
+                        help="Minimum draft speed as a multiple of realtime (default: 10)")
+    args = parser.parse_args()
+
+    if args.encode and not shutil.which("ffmpeg"):
+        print("--encode requires ffmpeg on PATH")
+        return 1
+
+    project = make_project(args.duration, args.fps)
+    get_shared_background_cache().clear()
+    print(f"Draft export benchmark: {args.duration:.0f}s of {SOURCE_WIDTH}x{SOURCE_HEIGHT} "
+          f"{args.fps:g}fps, backend={args.backend}, encode={args.encode}, {os.cpu_count()} CPUs")
+    print(f"{'profile':>18} {'size':>10} {'fps':>6} {'frames':>7} {'seconds':>8} {'realtime':>9}")
+
+    draft_speed = None
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for index, (profile_name, label) in enumerate(RUNS):
+            profile = get_export_profile(profile_name)
+            output_path = os.path.join(temp_dir, f"export_{index}.mp4")
+            try:
+                frames, seconds, width, height, output_fps = export(project, profile, args.backend, args.fps,
+                                                                    output_path, args.encode)
+            except RuntimeError as e:
+                print(f"{label:>18} failed: {e}")
+                return 1
+            speed = args.duration / max(seconds, 1e-9)
+            if profile_name == DRAFT_PROFILE and label == DRAFT_PROFILE:
+                draft_speed = speed
+            print(f"{label:>18} {f'{width}x{height}':>10} {output_fps:>6.3g} {frames:>7} "
+                  f"{seconds:>8.2f} {speed:>8.1f}x")
+
+    if draft_speed is None or draft_speed < args.target:
+        print(f"Draft export below {args.target:g}x realtime")
+        return 1
+    print(f"Draft export at {draft_speed:.1f}x realtime (target {args.target:g}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
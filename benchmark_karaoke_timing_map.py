@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Karaoke Timing Map Build Time
+
+Compares pipeline start-up cost of the previous timing map build (every frame
+timestamp tested against every subtitle line) with the frame-indexed
+KaraokeTimingMap. The previous approach is O(lines x frames), so for large
+inputs it is timed on a subset of lines and extrapolated linearly.
+
+Usage:
+    python benchmark_karaoke_timing_map.py [--lines N] [--duration SECONDS] [--fps FPS]
+"""
+
+import sys
+import os
+import time
+import argparse
+from types import SimpleNamespace
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from core.timebase import Timebase
+from core.karaoke_timing_map import KaraokeTimingMap
+
+
+def create_lines(count, duration):
+    """Evenly spaced, back-to-back subtitle lines with karaoke timing"""
+    line_duration = duration / count
+    return [
+        SimpleNamespace(start_time=i * line_duration,
+                        end_time=(i + 1) * line_duration,
+                        karaoke_timing=object())
+        for i in range(count)
+    ]
+
+
+def build_by_frame_scan(lines, frame_timestamps):
+    """The previous build: a float-keyed dict filled by scanning all frames per line"""
+    timing_map = {}
+    for line in lines:
+        for timestamp in frame_timestamps:
+            if line.start_time <= timestamp <= line.end_time:
+                timing_map[timestamp] = line.karaoke_timing
+    return timing_map
+
+
+def main():
+    """Parse arguments and time both builds"""
+    parser = argparse.ArgumentParser(description="Benchmark karaoke timing map construction")
+    parser.add_argument("--lines", type=int, default=5000)
+    parser.add_argument("--duration", type=float, default=9000.0,
+                        help="Song duration in seconds (9000 s at 30 fps = 270,000 frames)")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--scan-lines", type=int, default=20,
+                        help="Lines used to time the frame scan before extrapolating")
+    args = parser.parse_args()
+
+    timebase = Timebase.from_fps(args.fps)
+    frame_times = timebase.frame_times(timebase.frame_count(args.duration))
+    lines = create_lines(args.lines, args.duration)
+
+    print(f"Karaoke timing map build: {len(lines)} lines, {len(frame_times)} frames at {timebase} fps")
+
+    # Previous approach
+    scan_lines = lines[:min(args.scan_lines, len(lines))]
+    frame_list = frame_times.tolist()
+    start = time.perf_counter()
+    build_by_frame_scan(scan_lines, frame_list)
+    scan_time = (time.perf_counter() - start) * len(lines) / len(scan_lines)
+    estimated = " (extrapolated)" if len(scan_lines) < len(lines) else ""
+    print(f"  {'frame scan (lines x frames):':<33}{scan_time:10.3f} s{estimated}")
+
+    # Frame-indexed map
+    start = time.perf_counter()
+    timing_map = KaraokeTimingMap(timebase)
+    timing_map.build(lines, frame_times, timebase)
+    map_time = time.perf_counter() - start
+    print(f"  {'frame-indexed KaraokeTimingMap:':<33}{map_time:10.3f} s ({len(timing_map)} frames mapped)")
+
+    if map_time > 0:
+        print(f"  speedup: {scan_time / map_time:,.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
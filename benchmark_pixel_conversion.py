@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Stripe-Parallel Pixel Conversion
+
+Measures how pixel format conversion scales from 1 to N worker threads at
+1080p and 4K. Each conversion is timed over several frames and reported as
+frames per second together with the speedup over a single worker.
+
+Usage:
+    python benchmark_pixel_conversion.py [--max-workers N] [--frames N]
+"""
+
+import sys
+import os
+import time
+import argparse
+import numpy as np
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from core.pixel_conversion import StripeConversionExecutor, default_worker_count
+
+
+RESOLUTIONS = {
+    "1080p": (1920, 1080),
+    "4K": (3840, 2160),
+}
+
+CONVERSIONS = ["rgba_to_bgra", "rgba_to_bgr", "premultiply_alpha", "rgba_to_yuv420p"]
+
+
+def worker_counts(max_workers):
+    """Powers of two up to max_workers, always including max_workers"""
+    counts = []
+    count = 1
+    while count < max_workers:
+        counts.append(count)
+        count *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def time_conversion(executor, conversion, frame, frames):
+    """Return frames per second for one conversion"""
+    convert = getattr(executor, conversion)
+    convert(frame)  # Warm up the thread pool and allocator
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        convert(frame)
+    elapsed = time.perf_counter() - start
+    return frames / elapsed if elapsed > 0 else 0.0
+
+
+def run_benchmark(max_workers, frames):
+    """Run the scaling benchmark and print a table per resolution"""
+    rng = np.random.default_rng(0)
+    counts = worker_counts(max_workers)
+
+    print(f"Stripe-parallel pixel conversion benchmark ({os.cpu_count()} CPUs, {frames} frames per run)")
+
+    for name, (width, height) in RESOLUTIONS.items():
+        frame = rng.integers(0, 256, size=(height, width, 4), dtype=np.uint8)
+
+        print(f"\n{name} ({width}x{height})")
+        print(f"{'conversion':<20}" + "".join(f"{f'{count} thr':>16}" for count in counts))
+        print("-" * (20 + 16 * len(counts)))
+
+        for conversion in CONVERSIONS:
+            row = f"{conversion:<20}"
+            baseline = None
+
+            for count in counts:
+                executor = StripeConversionExecutor(workers=count)
+                try:
+                    fps = time_conversion(executor, conversion, frame, frames)
+                finally:
+                    executor.shutdown()
+
+                baseline = baseline or fps
+                speedup = fps / baseline if baseline > 0 else 0.0
+                row += f"{fps:>8.1f} ({speedup:.1f}x)"
+
+            print(row)
+
+
+def main():
+    """Parse arguments and run the benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark stripe-parallel pixel conversion")
+    parser.add_argument("--max-workers", type=int, default=default_worker_count(),
+                        help="Largest worker count to measure")
+    parser.add_argument("--frames", type=int, default=20,
+                        help="Frames converted per measurement")
+    args = parser.parse_args()
+
+    run_benchmark(max(1, args.max_workers), max(1, args.frames))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Single-Process vs Shared-Memory Writer Process
+
+Measures end-to-end frames per second for the two encoder topologies:
+
+- thread:  frames are converted and written to the encoder pipe by a thread in
+           the render process (EnhancedFFmpegProcessor default)
+- process: frames are copied into a shared-memory ring and converted and
+           written by a separate writer process (multiprocess_writer=True)
+
+Rendering is simulated with Python-level work that holds the GIL, which is
+the contention the writer process avoids. FFmpeg encodes to the null muxer
+when available; otherwise a Python sink drains the pipe.
+
+Usage:
+    python benchmark_process_writer.py [--frames N] [--width W] [--height H] [--render-ms MS]
+"""
+
+import sys
+import os
+import time
+import shutil
+import argparse
+import threading
+import subprocess
+import queue
+import numpy as np
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from core.shared_frame_ring import SharedMemoryFrameWriter, LAYOUT_BGRA
+from core.pixel_conversion import StripeConversionExecutor
+
+
+def encoder_command(width, height):
+    """FFmpeg null encode when available, otherwise a Python pipe sink"""
+    if shutil.which("ffmpeg"):
+        return ["ffmpeg", "-hide_banner", "-loglevel", "error",
+                "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{width}x{height}", "-r", "30",
+                "-i", "pipe:0", "-f", "null", "-"]
+
+    script = (
+        "import sys\n"
+        "read = sys.stdin.buffer.read\n"
+        "while read(1 << 20):\n"
+        "    pass\n"
+    )
+    return [sys.executable, "-c", script]
+
+
+def render_frame(frame, frame_number, render_ms):
+    """Simulate rendering: GIL-holding Python work plus a pixel fill"""
+    deadline = time.perf_counter() + render_ms / 1000.0
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(i * i for i in range(200))
+    frame[:, :, 0] = frame_number % 256
+    frame[:, :, 3] = 255
+    return frame
+
+
+def run_thread_mode(frames, width, height, render_ms):
+    """Render on the main thread; convert and write on a thread in this process"""
+    encoder = subprocess.Popen(encoder_command(width, height), stdin=subprocess.PIPE,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    converter = StripeConversionExecutor()
+    frame_queue = queue.Queue(maxsize=4)
+
+    def writer():
+        while True:
+            frame = frame_queue.get()
+            if frame is None:
+                break
+            encoder.stdin.write(converter.rgba_to_bgra(frame).tobytes())
+        encoder.stdin.close()
+
+    writer_thread = threading.Thread(target=writer, daemon=True)
+    start = time.perf_counter()
+    writer_thread.start()
+
+    for frame_number in range(frames):
+        frame = render_frame(np.empty((height, width, 4), dtype=np.uint8), frame_number, render_ms)
+        frame_queue.put(frame)
+
+    frame_queue.put(None)
+    writer_thread.join()
+    encoder.wait()
+    elapsed = time.perf_counter() - start
+    converter.shutdown()
+    return frames / elapsed
+
+
+def run_process_mode(frames, width, height, render_ms):
+    """Render here; convert and write in the writer process via the shared ring"""
+    writer = SharedMemoryFrameWriter(encoder_command(width, height), width, height, slots=4)
+    if not writer.start():
+        raise RuntimeError(writer.error)
+
+    # Exclude process start-up from the measurement
+    time.sleep(0.5)
+    frame = np.empty((height, width, 4), dtype=np.uint8)
+    start = time.perf_counter()
+
+    for frame_number in range(frames):
+        render_frame(frame, frame_number, render_ms)
+        if not writer.write_frame(frame, frame_number, frame_number / 30.0, LAYOUT_BGRA):
+            raise RuntimeError(writer.error)
+
+    writer.finish_input()
+    writer.wait()
+    elapsed = time.perf_counter() - start
+    writer.close()
+    return frames / elapsed
+
+
+def main():
+    """Parse arguments and run both topologies"""
+    parser = argparse.ArgumentParser(description="Benchmark the shared-memory writer process")
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--render-ms", type=float, default=10.0,
+                        help="Simulated GIL-bound render time per frame")
+    args = parser.parse_args()
+
+    print(f"Writer topology benchmark: {args.frames} frames at {args.width}x{args.height}, "
+          f"{args.render_ms:.1f} ms simulated render, {os.cpu_count()} CPUs")
+    print(f"Encoder: {'ffmpeg (null muxer)' if shutil.which('ffmpeg') else 'python pipe sink'}")
+
+    thread_fps = run_thread_mode(args.frames, args.width, args.height, args.render_ms)
+    print(f"  single process (writer thread): {thread_fps:7.1f} fps")
+
+    process_fps = run_process_mode(args.frames, args.width, args.height, args.render_ms)
+    print(f"  writer process (shared memory): {process_fps:7.1f} fps")
+
+    print(f"  speedup: {process_fps / thread_fps:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
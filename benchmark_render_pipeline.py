@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: End-to-End Render Pipeline
+
+Renders synthetic karaoke projects of varying length, line density and
+effect stack through CompleteRenderingPipeline on a headless backend, and
+reports fps, time per frame in each pipeline stage and peak memory. Frames
+go to FFmpeg's null muxer (--sink ffmpeg) or to a process that discards them
+(--sink null); --sink auto uses FFmpeg when it is on PATH.
+
+Results are compared with a stored baseline; the benchmark exits with
+status 1 if a scenario's fps dropped, or its peak memory grew, by more than
+--threshold (and --memory-threshold). --update-baseline stores this run as
+the new baseline.
+
+Usage:
+    python benchmark_render_pipeline.py [--scenarios typical,dense] [--backend mock|software|opengl]
+                                        [--sink auto|ffmpeg|null] [--repeat N]
+                                        [--baseline PATH] [--update-baseline]
+                                        [--threshold 0.10] [--memory-threshold 0.10] [--json FILE]
+"""
+
+import sys
+import os
+import json
+import argparse
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from core.render_benchmark import (
+    SCENARIOS, SINKS, SINK_AUTO, DEFAULT_BASELINE_PATH, DEFAULT_REGRESSION_THRESHOLD,
+    get_scenario, run_scenario, load_baseline, save_baseline, compare_to_baseline
+)
+
+# Stages shown in the table, in pipeline order
+TABLE_STAGES = ["subtitle_raster", "effects", "background", "readback", "convert", "pipe_write"]
+
+
+def best_of(scenario, args):
+    """Run a scenario --repeat times and keep the fastest successful run"""
+    best = None
+    for _ in range(args.repeat):
+        result = run_scenario(scenario, args.backend, args.sink, args.seed)
+        if result.error:
+            return result
+        if best is None or result.fps > best.fps:
+            best = result
+    return best
+
+
+def main():
+    """Parse arguments, run the scenarios and compare them with the baseline"""
+    parser = argparse.ArgumentParser(description="Benchmark the end-to-end render pipeline")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated scenarios (default: {','.join(SCENARIOS)})")
+    parser.add_argument("--backend", choices=["mock", "software", "opengl"], default="mock")
+    parser.add_argument("--sink", choices=SINKS, default=SINK_AUTO)
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic lyrics")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scenario; the fastest is kept")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="Baseline file")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help="Relative fps drop counted as a regression (default: 0.10)")
+    parser.add_argument("--memory-threshold", type=float, default=None,
+                        help="Relative peak memory growth counted as a regression (default: --threshold)")
+    parser.add_argument("--json", help="Write the results to a JSON file")
+    args = parser.parse_args()
+
+    try:
+        scenarios = [get_scenario(name.strip()) for name in args.scenarios.split(",") if name.strip()]
+    except ValueError as e:
+        print(e)
+        return 2
+
+    print(f"Render pipeline benchmark: backend={args.backend}, sink={args.sink}, seed={args.seed}, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'scenario':>10} {'size':>10} {'frames':>7} {'fps':>8} {'peak MB':>8}  "
+          + " ".join(f"{stage[:10]:>10}" for stage in TABLE_STAGES) + "  (ms/frame)")
+
+    results = []
+    failed = False
+    for scenario in scenarios:
+        try:
+            result = best_of(scenario, args)
+        except RuntimeError as e:
+            print(f"{scenario.name:>10} failed: {e}")
+            failed = True
+            continue
+        results.append(result)
+        if result.error:
+            print(f"{scenario.name:>10} failed: {result.error}")
+            failed = True
+            continue
+        print(f"{scenario.name:>10} {f'{scenario.width}x{scenario.height}':>10} {result.frames:>7} "
+              f"{result.fps:>8.1f} {result.peak_rss_mb:>8.1f}  "
+              + " ".join(f"{result.stage_ms.get(stage, 0.0):>10.3f}" for stage in TABLE_STAGES))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"results": [result.to_dict() for result in results],
+                       "scenarios": [scenario.to_dict() for scenario in scenarios]}, f, indent=2)
+
+    baseline = load_baseline(args.baseline)
+    regressions = []
+    if baseline is None:
+        print(f"No baseline at {args.baseline}")
+    else:
+        regressions = compare_to_baseline(results, baseline, args.threshold, args.memory_threshold)
+        for regression in regressions:
+            print(f"Regression: {regression.describe()}")
+        if not regressions:
+            print(f"No regressions against {args.baseline} (threshold {args.threshold:.0%})")
+
+    if args.update_baseline and not failed:
+        save_baseline(args.baseline, results, baseline)
+        print(f"Baseline updated: {args.baseline}")
+
+    return 1 if failed or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+"""
+Process-Wide Cache Registry and Memory Governor
+
+Decoded backgrounds, libass textures, rendered subtitle textures and the
+shader index are cached by separate classes, each with its own entry or
+byte limit. Every cache registers with the CacheRegistry returned by
+get_cache_registry(), which reports the bytes and entries of all of them
+through one get_stats() call.
+
+A registered cache provides:
+
+- ``total_bytes``: bytes currently held,
+- ``entry_count``: number of entries,
+- ``evict_bytes(nbytes)``: drop least recently used entries until at least
+  nbytes are freed (or nothing evictable is left); returns the bytes freed,
+- ``get_stats()``: cache-specific statistics (optional).
+
+Caches holding OpenGL textures must destroy them on their rendering thread;
+when asked to evict from another thread they record the request, return 0
+and evict on their next put().
+
+Caches call notify_growth() after storing an entry (outside their own
+lock). The registry's MemoryGovernor then enforces a single byte budget for
+all caches: when the total exceeds it, entries are evicted from the
+lowest-priority caches first, the largest first within a priority. When the
+system runs low on available memory (other exports, other processes), the
+governor shrinks the caches below the budget as well. Registrations are weak,
+so a cache that is garbage collected drops out of the registry.
+"""
+
+import time
+import logging
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+try:
+    from .metrics import get_metrics_registry, CACHE_BYTES, CACHE_GOVERNOR_EVICTED_BYTES_TOTAL
+except ImportError:
+    from metrics import get_metrics_registry, CACHE_BYTES, CACHE_GOVERNOR_EVICTED_BYTES_TOTAL
+
+
+logger = logging.getLogger(__name__)
+
+# Eviction priority: lower priorities are evicted first
+CACHE_PRIORITY_LOW = 10  # Cheap to rebuild (rasterized subtitle textures)
+CACHE_PRIORITY_NORMAL = 50  # Decoded media frames
+CACHE_PRIORITY_HIGH = 90  # Expensive to rebuild (compiled shader index)
+
+DEFAULT_BUDGET_MB = 1024
+
+# System memory pressure: available memory below this fraction of the total
+PRESSURE_AVAILABLE_FRACTION = 0.10
+# Under pressure, caches are shrunk to this fraction of their current size
+PRESSURE_SHRINK_FACTOR = 0.5
+# Seconds between memory pressure checks triggered by cache growth
+PRESSURE_CHECK_INTERVAL = 1.0
+
+
+@dataclass
+class _Registration:
+    """A registered cache, held weakly"""
+    name: str
+    priority: int
+    ref: "weakref.ReferenceType"
+
+
+class MemoryGovernor:
+    """Enforces one byte budget over all registered caches"""
+
+    def __init__(self, registry: "CacheRegistry", budget_bytes: int = DEFAULT_BUDGET_MB * 1024 * 1024,
+                 pressure_fraction: float = PRESSURE_AVAILABLE_FRACTION,
+                 pressure_check_interval: float = PRESSURE_CHECK_INTERVAL):
+        self.registry = registry
+        self.budget_bytes = budget_bytes
+        self.pressure_fraction = pressure_fraction
+        self.pressure_check_interval = pressure_check_interval
+
+        self._lock = threading.RLock()
+        self._known_bytes = 0  # Total at the last enforce plus growth reported since
+        self._last_pressure_check = 0.0
+        self._monitor_thread: Optional[threading.Thread] = None
+        self._monitor_stop = threading.Event()
+
+        # Statistics
+        self.enforce_count = 0
+        self.evicted_bytes = 0
+        self.peak_bytes = 0
+        self.pressure_events = 0
+        self.evicted_counter = get_metrics_registry().counter(CACHE_GOVERNOR_EVICTED_BYTES_TOTAL)
+        self.bytes_gauge = get_metrics_registry().gauge(CACHE_BYTES)
+
+    def configure(self, config_manager):
+        """Take the budget from the ``cache_budget_mb`` performance setting"""
+        budget_mb = config_manager.get_performance_setting("cache_budget_mb", DEFAULT_BUDGET_MB)
+        self.set_budget(int(float(budget_mb) * 1024 * 1024))
+
+    def set_budget(self, budget_bytes: int):
+        """Change the budget (0 = unlimited) and enforce it"""
+        with self._lock:
+            self.budget_bytes = max(0, int(budget_bytes))
+        self.enforce()
+
+    def memory_pressure(self) -> bool:
+        """Whether available system memory is below the pressure threshold"""
+        if not PSUTIL_AVAILABLE:
+            return False
+        try:
+            memory = psutil.virtual_memory()
+        except (psutil.Error, OSError):
+            return False
+        return memory.available < memory.total * self.pressure_fraction
+
+    def on_growth(self, nbytes: int):
+        """Account for a new cache entry; enforce when the budget may be exceeded"""
+        with self._lock:
+            self._known_bytes += nbytes
+            self.peak_bytes = max(self.peak_bytes, self._known_bytes)
+            over_budget = self.budget_bytes and self._known_bytes > self.budget_bytes
+            now = time.monotonic()
+            check_pressure = now - self._last_pressure_check >= self.pressure_check_interval
+            if check_pressure:
+                self._last_pressure_check = now
+        if over_budget or check_pressure:
+            self.enforce(check_pressure=check_pressure)
+
+    def enforce(self, check_pressure: bool = True) -> int:
+        """Evict across caches until the total is within the target; returns bytes freed"""
+        with self._lock:
+            caches = self.registry.live_caches()
+            sizes = {id(cache): self.registry.cache_bytes(cache) for _, _, cache in caches}
+            total = sum(sizes.values())
+            self.peak_bytes = max(self.peak_bytes, total)
+
+            target = self.budget_bytes or total
+            if check_pressure and total and self.memory_pressure():
+                self.pressure_events += 1
+                target = min(target, int(total * PRESSURE_SHRINK_FACTOR))
+
+            freed = 0
+            if total > target:
+                self.enforce_count += 1
+                # Lowest priority first; within a priority, the largest cache first
+                caches.sort(key=lambda item: (item[1], -sizes[id(item[2])]))
+                for name, _, cache in caches:
+                    if total - freed <= target:
+                        break
+                    try:
+                        freed += cache.evict_bytes(total - freed - target)
+                    except Exception as e:
+                        logger.warning(f"Evicting from cache '{name}' failed: {e}")
+                if freed:
+                    self.evicted_bytes += freed
+                    self.evicted_counter.inc(freed)
+                    logger.debug(f"Cache governor freed {freed} bytes (total {total}, target {target})")
+
+            self._known_bytes = total - freed
+            self.bytes_gauge.set(self._known_bytes)
+            return freed
+
+    def start(self, interval: float = 5.0):
+        """Enforce the budget and watch for memory pressure on a background thread"""
+        if self._monitor_thread and self._monitor_thread.is_alive():
+            return
+        self._monitor_stop.clear()
+
+        def monitor():
+            while not self._monitor_stop.wait(interval):
+                self.enforce()
+
+        self._monitor_thread = threading.Thread(target=monitor, name="cache-governor", daemon=True)
+        self._monitor_thread.start()
+
+    def stop(self):
+        """Stop the background thread"""
+        self._monitor_stop.set()
+        if self._monitor_thread:
+            self._monitor_thread.join(timeout=5.0)
+            self._monitor_thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get governor statistics"""
+        with self._lock:
+            return {
+                'budget_bytes': self.budget_bytes,
+                'peak_bytes': self.peak_bytes,
+                'enforce_count': self.enforce_count,
+                'evicted_bytes': self.evicted_bytes,
+                'pressure_events': self.pressure_events
+            }
+
+
+class CacheRegistry:
+    """Registry of the process's caches with a shared memory governor"""
+
+    def __init__(self, budget_bytes: int = DEFAULT_BUDGET_MB * 1024 * 1024):
+        self._registrations: Dict[int, _Registration] = {}
+        self._lock = threading.Lock()
+        self.governor = MemoryGovernor(self, budget_bytes)
+
+    def register(self, cache, name: str, priority: int = CACHE_PRIORITY_NORMAL):
+        """Register a cache under a name; returns the cache"""
+        key = id(cache)
+
+        def forget(_ref, key=key):
+            with self._lock:
+                registration = self._registrations.get(key)
+                if registration is not None and registration.ref is _ref:
+                    del self._registrations[key]
+
+        with self._lock:
+            self._registrations[key] = _Registration(name, priority, weakref.ref(cache, forget))
+        return cache
+
+    def unregister(self, cache):
+        """Remove a cache from the registry"""
+        with self._lock:
+            self._registrations.pop(id(cache), None)
+
+    def live_caches(self) -> List[tuple]:
+        """(name, priority, cache) of every registered cache still alive"""
+        with self._lock:
+            registrations = list(self._registrations.values())
+        caches = []
+        for registration in registrations:
+            cache = registration.ref()
+            if cache is not None:
+                caches.append((registration.name, registration.priority, cache))
+        return caches
+
+    @staticmethod
+    def cache_bytes(cache) -> int:
+        """Bytes held by a cache, 0 if it cannot report them"""
+        try:
+            return int(cache.total_bytes)
+        except Exception:
+            return 0
+
+    def total_bytes(self) -> int:
+        """Bytes held by all registered caches"""
+        return sum(self.cache_bytes(cache) for _, _, cache in self.live_caches())
+
+    def notify_growth(self, nbytes: int):
+        """Called by caches after storing an entry of nbytes (not while holding their lock)"""
+        self.governor.on_growth(nbytes)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Bytes, entries and statistics of every registered cache and the governor"""
+        caches = []
+        for name, priority, cache in self.live_caches():
+            entry = {
+                'name': name,
+                'priority': priority,
+                'bytes': self.cache_bytes(cache),
+                'entries': getattr(cache, 'entry_count', 0)
+            }
+            if hasattr(cache, 'get_stats'):
+                try:
+                    entry['stats'] = cache.get_stats()
+                except Exception as e:
+                    entry['stats'] = {'error': str(e)}
+            caches.append(entry)
+
+        caches.sort(key=lambda entry: (entry['name'], -entry['bytes']))
+        return {
+            'total_bytes': sum(entry['bytes'] for entry in caches),
+            'total_entries': sum(entry['entries'] for entry in caches),
+            'caches': caches,
+            'governor': self.governor.get_stats()
+        }
+
+    def summary(self) -> Dict[str, int]:
+        """Bytes per cache name, summed over instances"""
+        totals: Dict[str, int] = {}
+        for name, _, cache in self.live_caches():
+            totals[name] = totals.get(name, 0) + self.cache_bytes(cache)
+        return totals
+
+
+# Process-wide registry used by the rendering components
+_default_registry = CacheRegistry()
+
+
+def get_cache_registry() -> CacheRegistry:
+    """Get the shared cache registry"""
+    return _default_registry
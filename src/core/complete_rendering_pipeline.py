@@ -37,6 +37,21 @@ try:
     from .libass_opengl_integration import LibassOpenGLIntegration, TextureCache
     from .models import Project, SubtitleLine, SubtitleStyle, KaraokeTimingInfo
     from .preview_synchronizer import PreviewSynchronizer, SyncState
+    from .timebase import Timebase
+    from .karaoke_timing_map import KaraokeTimingMap
+    from .staged_pipeline import StagedFramePipeline, FrameStageDefinition
+    from .telemetry import (
+        TelemetryBus, TelemetrySnapshot, QtSignalSubscriber, LoggingSubscriber, MetricsSubscriber
+    )
+    from .render_trace import get_render_tracer
+    from .resource_sampler import ResourceSampler, ResourceReport
+    from .cache_registry import get_cache_registry
+    from .hardware_profile import STATIC_DEFAULTS
+    from .export_profiles import MASTER_PROFILE, DRAFT_PROFILE, get_export_profile
+    from .metrics import (
+        get_metrics_registry, SUBTITLE_RASTER_SECONDS, EFFECTS_RENDER_SECONDS,
+        FRAMES_RENDERED_TOTAL, FRAMES_DROPPED_TOTAL
+    )
 except ImportError:
     # For testing without full imports
     import sys
@@ -47,6 +62,71 @@ except ImportError:
     from frame_capture_system import FrameCaptureSystem, FrameCaptureSettings, CapturedFrame
     from enhanced_ffmpeg_integration import EnhancedFFmpegProcessor, EnhancedExportSettings
     from models import Project, SubtitleLine, SubtitleStyle, KaraokeTimingInfo
+    from timebase import Timebase
+    from karaoke_timing_map import KaraokeTimingMap
+    from staged_pipeline import StagedFramePipeline, FrameStageDefinition
+    from telemetry import (
+        TelemetryBus, TelemetrySnapshot, QtSignalSubscriber, LoggingSubscriber, MetricsSubscriber
+    )
+    from render_trace import get_render_tracer
+    from resource_sampler import ResourceSampler, ResourceReport
+    from cache_registry import get_cache_registry
+    from hardware_profile import STATIC_DEFAULTS
+    from export_profiles import MASTER_PROFILE, DRAFT_PROFILE, get_export_profile
+    from metrics import (
+        get_metrics_registry, SUBTITLE_RASTER_SECONDS, EFFECTS_RENDER_SECONDS,
+        FRAMES_RENDERED_TOTAL, FRAMES_DROPPED_TOTAL
+    )
+
+
+# An in/out time range in seconds, or several of them
+TimeRange = Tuple[float, float]
+
+
+def snap_range_to_lines(start: float, end: float, lines: List[SubtitleLine]) -> TimeRange:
+    """Widen a time range to the bounds of any subtitle line it cuts through"""
+    changed = True
+    while changed:
+        changed = False
+        for line in lines:
+            if line.start_time < start < line.end_time:
+                start = line.start_time
+                changed = True
+            if line.start_time < end < line.end_time:
+                end = line.end_time
+                changed = True
+    return start, end
+
+
+def normalize_time_ranges(time_range: Union[TimeRange, List[TimeRange]], duration: float,
+                          lines: Optional[List[SubtitleLine]] = None) -> List[TimeRange]:
+    """
+    Validate, clamp, optionally snap and merge render ranges.
+    
+    Accepts one (start, end) pair or a list of them. Ranges are snapped to the
+    enclosing subtitle lines when lines are given, then sorted and merged
+    where they overlap.
+    """
+    if len(time_range) == 2 and all(isinstance(value, (int, float)) for value in time_range):
+        time_range = [time_range]
+    
+    ranges = []
+    for start, end in time_range:
+        if end <= start:
+            raise ValueError(f"Invalid render range {start}-{end}: end must be after start")
+        if lines:
+            start, end = snap_range_to_lines(start, end, lines)
+        start, end = max(0.0, float(start)), min(duration, float(end))
+        if end > start:
+            ranges.append((start, end))
+    
+    merged: List[TimeRange] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
 
 
 class PipelineStage(Enum):
@@ -75,27 +155,67 @@ class PipelineConfig:
     fps: float = 30.0
     duration: float = 0.0
     
+    # Headless rendering backend ("mock", "software", "opengl"); None = Qt context chosen by availability
+    backend: Optional[str] = None
+    
     # Quality settings
     quality_preset: str = "high"
     enable_effects: bool = True
     enable_antialiasing: bool = True
     
+    # Export profile (see export_profiles); draft profiles scale effects and reuse rasters
+    export_profile: str = MASTER_PROFILE
+    effect_quality: float = 1.0  # Scale of effect sample radii
+    reuse_cached_rasters: bool = False  # Keep decoded backgrounds and textures across exports
+    
     # Performance settings
     use_threading: bool = True
     max_threads: int = 4
-    buffer_size: int = 10
+    buffer_size: Optional[int] = None  # None = frame_buffer_size performance setting
+    
+    # Staged rendering (raster -> composite -> convert -> write)
+    staged_rendering: bool = True
+    raster_workers: int = 1
+    convert_workers: int = 2
+    stage_queue_size: int = 4
+    
+    # Metrics export (port 0 / no file = disabled)
+    metrics_port: int = 0
+    metrics_file: Optional[str] = None
+    metrics_export_interval: float = 5.0
+    
+    # Chrome trace-event timeline of the export (no file = tracing disabled)
+    trace_file: Optional[str] = None
+    
+    # Resource sampling during exports (interval 0 = disabled)
+    resource_sample_interval: float = 0.0
+    tracemalloc_interval: float = 0.0  # Seconds between allocation diffs (0 = off)
+    soak_test: bool = False  # Flag memory and queue series that keep growing
     
     # Synchronization
     sync_mode: SynchronizationMode = SynchronizationMode.AUDIO_MASTER
     audio_offset: float = 0.0
     
     # Memory management
-    max_texture_cache_size: int = 100
+    max_texture_cache_size: Optional[int] = None  # None = texture_cache_entries performance setting
     enable_memory_optimization: bool = True
     
     # Debug settings
     enable_debug_output: bool = False
     save_intermediate_frames: bool = False
+    
+    def apply_performance_settings(self, config_manager=None) -> "PipelineConfig":
+        """Fill unset queue and cache sizes from the performance settings, in place"""
+        def setting(key):
+            if config_manager is None:
+                return STATIC_DEFAULTS[key]
+            return int(config_manager.get_performance_setting(key, STATIC_DEFAULTS[key]))
+        
+        if self.buffer_size is None:
+            self.buffer_size = setting("frame_buffer_size")
+        if self.max_texture_cache_size is None:
+            self.max_texture_cache_size = setting("texture_cache_entries")
+        return self
 
 
 @dataclass
@@ -143,15 +263,23 @@ class CompleteRenderingPipeline(QObject):
     # Real-time preview signals
     preview_frame_ready = pyqtSignal(QImage, float)  # Frame, timestamp
     
-    def __init__(self, config: Optional[PipelineConfig] = None):
+    def __init__(self, config: Optional[PipelineConfig] = None, config_manager: Optional[Any] = None,
+                 ffmpeg_processor: Optional[EnhancedFFmpegProcessor] = None):
         super().__init__()
         
-        self.config = config or PipelineConfig()
+        # config_manager (a ConfigManager, or hardware_profile.TunedSettings)
+        # sizes frame queues and caches for the machine; ffmpeg_processor
+        # replaces the encoder (e.g. a null sink for benchmarks)
+        self.config_manager = config_manager
+        self._encoder = ffmpeg_processor
+        self.config = (config or PipelineConfig()).apply_performance_settings(config_manager)
         self.state = PipelineState()
         
         # Core components
         self.opengl_context: Optional[OpenGLContext] = None
         self.libass_integration: Optional[LibassIntegration] = None
+        # A libass renderer is not thread-safe; raster workers take turns
+        self._libass_lock = threading.Lock()
         self.effects_pipeline: Optional[EffectsRenderingPipeline] = None
         self.frame_capture_system: Optional[FrameCaptureSystem] = None
         self.ffmpeg_processor: Optional[EnhancedFFmpegProcessor] = None
@@ -164,18 +292,47 @@ class CompleteRenderingPipeline(QObject):
         # Threading and synchronization
         self.render_thread: Optional[threading.Thread] = None
         self.frame_queue: Optional[queue.Queue] = None
+        self.staged_pipeline: Optional[StagedFramePipeline] = None
         self.should_stop = threading.Event()
         self.pause_event = threading.Event()
         
         # Current project and timing
         self.current_project: Optional[Project] = None
-        self.frame_timestamps: List[float] = []
-        self.karaoke_timing_map: Dict[float, KaraokeTimingInfo] = {}
+        self.timebase = Timebase.from_fps(self.config.fps)
+        self.frame_timestamps: np.ndarray = np.empty(0)
+        self.karaoke_timing_map = KaraokeTimingMap(self.timebase)
+        
+        # Clip rendering: timeline frame indices to render (None = every frame)
+        self.render_ranges: List[TimeRange] = []
+        self.render_frames: Optional[np.ndarray] = None
+        self.audio_ranges: List[Tuple[float, float]] = []
         
         # Performance tracking
         self.render_times: List[float] = []
         self.memory_snapshots: List[float] = []
         self.start_time = 0.0
+        self.metrics = get_metrics_registry()
+        self.tracer = get_render_tracer()
+        self.resource_sampler: Optional[ResourceSampler] = None
+        self.resource_report: Optional[ResourceReport] = None
+        self.last_metrics_export = 0.0
+        self.serving_metrics = False
+        
+        # Per-frame state goes to the telemetry bus; frame_rendered signals,
+        # log lines and registry counters follow its rate-limited snapshots
+        self.telemetry = TelemetryBus()
+        self._rendered_counter = self.telemetry.counter("frames_rendered_total")
+        self._dropped_counter = self.telemetry.counter("frames_dropped_total")
+        self._frame_index_gauge = self.telemetry.gauge("frame_index")
+        self._timestamp_gauge = self.telemetry.gauge("timestamp")
+        self._render_time_gauge = self.telemetry.gauge("render_time")
+        self.telemetry.subscribe(MetricsSubscriber(self.metrics, {
+            "frames_rendered_total": FRAMES_RENDERED_TOTAL,
+            "frames_dropped_total": FRAMES_DROPPED_TOTAL
+        }))
+        self.telemetry.subscribe(LoggingSubscriber(logger, self._format_render_progress, logging.DEBUG))
+        if PYQT_AVAILABLE:
+            self.telemetry.subscribe(QtSignalSubscriber(self.frame_rendered, self._render_summary))
         
         # Resource management
         self.allocated_resources: List[Any] = []
@@ -233,18 +390,23 @@ class CompleteRenderingPipeline(QObject):
     def _initialize_opengl_context(self) -> bool:
         """Initialize OpenGL context for rendering"""
         try:
-            from .opengl_context import create_offscreen_context, ContextBackend
+            from .opengl_context import create_offscreen_context, create_headless_context, ContextBackend
             
-            # Choose backend based on availability
-            backend = None
-            if not PYQT_AVAILABLE:
-                backend = ContextBackend.MOCK
-            
-            self.opengl_context = create_offscreen_context(
-                self.config.width,
-                self.config.height,
-                backend
-            )
+            if self.config.backend:
+                self.opengl_context = create_headless_context(
+                    self.config.backend, self.config.width, self.config.height
+                )
+            else:
+                # Choose backend based on availability
+                backend = None
+                if not PYQT_AVAILABLE:
+                    backend = ContextBackend.MOCK
+                
+                self.opengl_context = create_offscreen_context(
+                    self.config.width,
+                    self.config.height,
+                    backend
+                )
             
             if not self.opengl_context:
                 return False
@@ -292,9 +454,10 @@ class CompleteRenderingPipeline(QObject):
                     logger.warning(f"Failed to load subtitle file: {e}")
             
             # Initialize texture cache
+            # Reused rasters stay cached until evicted by size instead of expiring
             self.texture_cache = TextureCache(
                 max_size=self.config.max_texture_cache_size,
-                timeout=30.0
+                timeout=float('inf') if self.config.reuse_cached_rasters else 30.0
             )
             
             self.allocated_resources.append(self.libass_integration)
@@ -311,9 +474,11 @@ class CompleteRenderingPipeline(QObject):
             if not self.opengl_context:
                 return False
             
+            # Draft profiles shrink outline and glow radii (fewer shader samples)
             self.effects_pipeline = EffectsRenderingPipeline(
                 self.opengl_context,
-                mock_mode=not PYQT_AVAILABLE
+                mock_mode=not PYQT_AVAILABLE,
+                effect_quality=self.config.effect_quality
             )
             
             # Add default karaoke effects if enabled
@@ -334,13 +499,15 @@ class CompleteRenderingPipeline(QObject):
             if not self.opengl_context:
                 return False
             
-            self.frame_capture_system = FrameCaptureSystem(self.opengl_context)
+            self.frame_capture_system = FrameCaptureSystem(self.opengl_context, self.config_manager)
             
             # Configure capture settings
             capture_settings = FrameCaptureSettings(
                 width=self.config.width,
                 height=self.config.height,
                 fps=self.config.fps,
+                effect_quality=self.config.effect_quality,
+                reuse_cached_rasters=self.config.reuse_cached_rasters,
                 use_threading=self.config.use_threading,
                 buffer_size=self.config.buffer_size
             )
@@ -363,7 +530,7 @@ class CompleteRenderingPipeline(QObject):
     def _initialize_ffmpeg_processor(self) -> bool:
         """Initialize FFmpeg processor for video encoding"""
         try:
-            self.ffmpeg_processor = EnhancedFFmpegProcessor()
+            self.ffmpeg_processor = self._encoder or EnhancedFFmpegProcessor(self.config_manager)
             
             # Check FFmpeg capabilities
             capabilities = self.ffmpeg_processor.get_capabilities()
@@ -474,43 +641,110 @@ class CompleteRenderingPipeline(QObject):
         
         self.config.duration = duration
         
-        # Generate timestamps
-        frame_duration = 1.0 / self.config.fps
-        current_time = 0.0
-        
-        while current_time < duration:
-            self.frame_timestamps.append(current_time)
-            current_time += frame_duration
+        # Generate timestamps from frame indices on an exact rational timebase
+        self.timebase = Timebase.from_fps(self.config.fps)
+        self.frame_timestamps = self.timebase.frame_times(self.timebase.frame_count(duration))
         
         self.state.total_frames = len(self.frame_timestamps)
         logger.debug(f"Generated {len(self.frame_timestamps)} frame timestamps for {duration:.2f}s")
     
     def _build_karaoke_timing_map(self):
-        """Build mapping of timestamps to karaoke timing information"""
+        """Build mapping of frame indices to karaoke timing information"""
         if not self.current_project or not self.current_project.subtitle_file:
             return
         
-        self.karaoke_timing_map.clear()
-        
-        for subtitle_line in self.current_project.subtitle_file.lines:
-            if hasattr(subtitle_line, 'karaoke_timing') and subtitle_line.karaoke_timing:
-                # Map timing info to relevant timestamps
-                start_time = subtitle_line.start_time
-                end_time = subtitle_line.end_time
-                
-                for timestamp in self.frame_timestamps:
-                    if start_time <= timestamp <= end_time:
-                        self.karaoke_timing_map[timestamp] = subtitle_line.karaoke_timing
+        self.karaoke_timing_map.build(
+            self.current_project.subtitle_file.lines, self.frame_timestamps, self.timebase
+        )
         
         logger.debug(f"Built karaoke timing map with {len(self.karaoke_timing_map)} entries")
     
-    def start_rendering(self, output_path: str, preview_mode: bool = False) -> bool:
-        """Start the complete rendering pipeline"""
+    def set_render_ranges(self, time_range: Optional[Union[TimeRange, List[TimeRange]]] = None,
+                          snap_to_lines: bool = False) -> List[TimeRange]:
+        """
+        Restrict rendering to time ranges of the timeline (None renders everything).
+        
+        Frames keep their timeline indices and timestamps, so a clip renders
+        exactly the frames of a full render and hits the same background,
+        texture and karaoke timing caches. The audio is trimmed to the first
+        and past-the-last frame times of each range to stay in sync.
+        """
+        self.render_ranges = []
+        self.render_frames = None
+        self.audio_ranges = []
+        
+        if time_range is None:
+            self.state.total_frames = len(self.frame_timestamps)
+            return []
+        
+        lines = None
+        if snap_to_lines and self.current_project and self.current_project.subtitle_file:
+            lines = self.current_project.subtitle_file.lines
+        duration = self.timebase.frame_time(len(self.frame_timestamps))
+        ranges = normalize_time_ranges(time_range, duration, lines)
+        
+        frame_ranges = []
+        for start, end in ranges:
+            first = self.timebase.frame_count(start)
+            last = min(len(self.frame_timestamps), self.timebase.frame_count(end))
+            if first >= last:
+                continue
+            if frame_ranges and first <= frame_ranges[-1][1]:
+                frame_ranges[-1] = (frame_ranges[-1][0], last)
+            else:
+                frame_ranges.append((first, last))
+        
+        if not frame_ranges:
+            raise ValueError("Render range contains no frames")
+        
+        self.render_ranges = ranges
+        self.render_frames = np.concatenate([np.arange(first, last, dtype=np.int64)
+                                             for first, last in frame_ranges])
+        self.audio_ranges = [(self.timebase.frame_time(first),
+                              self.timebase.frame_time(last) - self.timebase.frame_time(first))
+                             for first, last in frame_ranges]
+        self.state.total_frames = len(self.render_frames)
+        
+        logger.info(f"Rendering {len(self.render_frames)} of {len(self.frame_timestamps)} frames "
+                    f"in {len(frame_ranges)} range(s)")
+        return ranges
+    
+    def _render_frame_count(self) -> int:
+        """Number of frames in the current render"""
+        if self.render_frames is None:
+            return len(self.frame_timestamps)
+        return len(self.render_frames)
+    
+    def _frame_index_at(self, position: int) -> int:
+        """Timeline frame index of the frame at a position in the current render"""
+        if self.render_frames is None:
+            return position
+        return int(self.render_frames[position])
+    
+    def _render_position(self, frame_index: int) -> int:
+        """Position of a timeline frame within the current render"""
+        if self.render_frames is None:
+            return frame_index
+        return int(np.searchsorted(self.render_frames, frame_index))
+    
+    def start_rendering(self, output_path: str, preview_mode: bool = False,
+                        time_range: Optional[Union[TimeRange, List[TimeRange]]] = None,
+                        snap_to_lines: bool = False) -> bool:
+        """
+        Start the complete rendering pipeline.
+        
+        time_range limits the export to an (in, out) range in seconds or a
+        list of ranges, joined in timeline order; snap_to_lines widens each
+        range to the subtitle lines it would otherwise cut.
+        """
         if self.state.is_running:
             logger.warning("Pipeline is already running")
             return False
         
         try:
+            if not preview_mode:
+                self.set_render_ranges(time_range, snap_to_lines)
+            
             self.state.is_running = True
             self.state.current_frame = 0
             self.state.frames_rendered = 0
@@ -519,6 +753,11 @@ class CompleteRenderingPipeline(QObject):
             self.should_stop.clear()
             self.pause_event.set()  # Start unpaused
             
+            if self.config.metrics_port:
+                port = self.metrics.start_http_server(self.config.metrics_port)
+                self.serving_metrics = True
+                logger.info(f"Metrics available at http://127.0.0.1:{port}/metrics")
+            
             # Emit started signal
             self.pipeline_started.emit()
             
@@ -561,13 +800,16 @@ class CompleteRenderingPipeline(QObject):
                 output_path=output_path,
                 width=self.config.width,
                 height=self.config.height,
-                fps=self.config.fps
+                fps=self.config.fps,
+                audio_ranges=list(self.audio_ranges)
             )
+            get_export_profile(self.config.export_profile).configure_encoder(export_settings)
             
             # Start rendering thread
             self.render_thread = threading.Thread(
                 target=self._render_worker,
                 args=(export_settings,),
+                name="render-worker",
                 daemon=True
             )
             self.render_thread.start()
@@ -581,13 +823,27 @@ class CompleteRenderingPipeline(QObject):
     
     def _render_worker(self, export_settings: EnhancedExportSettings):
         """Main rendering worker thread"""
+        if self.config.trace_file:
+            self.tracer.clear()
+            self.tracer.enable()
+        self._start_resource_sampler()
+        
         try:
             self.state.current_stage = PipelineStage.SUBTITLE_PROCESSING
             self.stage_changed.emit(self.state.current_stage.value)
             
             # Create frame generator
-            def frame_generator():
-                return self._generate_next_frame()
+            if self._use_staged_rendering():
+                self.staged_pipeline = self._create_staged_pipeline()
+                if self.resource_sampler:
+                    self.staged_pipeline.register_resources(self.resource_sampler)
+                self.staged_pipeline.start(self._iter_pending_timestamps())
+                
+                def frame_generator():
+                    return self._next_staged_frame()
+            else:
+                def frame_generator():
+                    return self._generate_next_frame()
             
             # Start FFmpeg encoding
             if self.ffmpeg_processor:
@@ -613,14 +869,34 @@ class CompleteRenderingPipeline(QObject):
                 if self.should_stop.is_set():
                     break
                 
+                if self.staged_pipeline and self.staged_pipeline.error:
+                    break
+                
+                # The encoder exits once the last frame has been written
+                if self.ffmpeg_processor and not self.ffmpeg_processor.is_encoding:
+                    break
+                
                 # Update progress
                 if self.state.total_frames > 0:
                     progress = (self.state.current_frame / self.state.total_frames) * 100
                     self.progress_updated.emit(progress)
                 
+                if time.time() - self.last_metrics_export >= self.config.metrics_export_interval:
+                    self._export_metrics_file()
+                
                 time.sleep(0.1)  # Small delay to prevent busy waiting
             
-            logger.info("Rendering worker completed")
+            if self.staged_pipeline and self.staged_pipeline.error:
+                raise Exception(self.staged_pipeline.error)
+            
+            if (self.ffmpeg_processor and not self.should_stop.is_set()
+                    and self.ffmpeg_processor.return_code not in (None, 0)):
+                # The processor has already reported the failure through encoding_failed
+                self.state.error_message = (self.ffmpeg_processor.error_message or
+                                            f"FFmpeg exited with code {self.ffmpeg_processor.return_code}")
+                logger.error(f"Rendering worker failed: {self.state.error_message}")
+            else:
+                logger.info("Rendering worker completed")
             
         except Exception as e:
             error_msg = f"Rendering worker failed: {e}"
@@ -629,15 +905,194 @@ class CompleteRenderingPipeline(QObject):
             self.pipeline_failed.emit(error_msg)
         
         finally:
+            if self.staged_pipeline:
+                self.staged_pipeline.cancel()
+                self.staged_pipeline.join(timeout=5.0)
+            self.telemetry.publish()
+            self._export_metrics_file()
+            self._write_trace_file()
+            self._stop_resource_sampler()
             self.state.is_running = False
     
+    def _export_metrics_file(self):
+        """Write the metrics registry to the configured file"""
+        self.last_metrics_export = time.time()
+        if not self.config.metrics_file:
+            return
+        
+        try:
+            self.metrics.write_file(self.config.metrics_file)
+        except OSError as e:
+            logger.warning(f"Failed to write metrics file: {e}")
+    
+    def _start_resource_sampler(self):
+        """Start sampling memory, CPU, queues and caches if configured"""
+        self.resource_report = None
+        if self.config.resource_sample_interval <= 0:
+            return
+        
+        self.resource_sampler = ResourceSampler(self.config.resource_sample_interval,
+                                                self.config.tracemalloc_interval,
+                                                soak=self.config.soak_test)
+        if self.frame_capture_system:
+            self.frame_capture_system.register_resources(self.resource_sampler)
+        if self.ffmpeg_processor:
+            self.ffmpeg_processor.register_resources(self.resource_sampler)
+        if self.texture_cache:
+            texture_cache = self.texture_cache
+            self.resource_sampler.add_cache("subtitle_textures", lambda: texture_cache.total_bytes)
+        self.resource_sampler.start()
+    
+    def _stop_resource_sampler(self):
+        """Stop sampling and keep the report for get_performance_stats()"""
+        if not self.resource_sampler:
+            return
+        self.resource_report = self.resource_sampler.stop()
+        self.resource_sampler = None
+        logger.info(f"Export resources: {self.resource_report.format()}")
+    
+    def _write_trace_file(self):
+        """Stop tracing and write the recorded timeline to the configured file"""
+        if not self.config.trace_file:
+            return
+        
+        # The encoder's threads may still be writing their last spans
+        if self.ffmpeg_processor:
+            self.ffmpeg_processor.wait_for_completion(timeout=5.0)
+        self.tracer.disable()
+        try:
+            events = self.tracer.write(self.config.trace_file)
+            logger.info(f"Render trace with {events} events written to {self.config.trace_file}")
+        except OSError as e:
+            logger.warning(f"Failed to write render trace: {e}")
+    
+    def _render_summary(self, snapshot: TelemetrySnapshot) -> Dict[str, Any]:
+        """Payload of the frame_rendered signal: the latest frame and the render rate"""
+        return {
+            'frame_index': int(snapshot.gauges["frame_index"]),
+            'timestamp': snapshot.gauges["timestamp"],
+            'render_time': snapshot.gauges["render_time"],
+            'frames_rendered': self.state.frames_rendered,
+            'frames_dropped': self.state.frames_dropped,
+            'progress_percent': self.state.get_progress_percent(),
+            'fps': snapshot.rates["frames_rendered_total"]
+        }
+    
+    def _format_render_progress(self, snapshot: TelemetrySnapshot) -> str:
+        return (f"Rendered {self.state.frames_rendered}/{self.state.total_frames} frames "
+                f"({self.state.get_progress_percent():.1f}%) - "
+                f"{snapshot.rates['frames_rendered_total']:.1f} fps")
+    
+    def _report_rendered_frame(self, frame_index: int, frame: CapturedFrame, render_time: float):
+        """Record a frame handed to the encoder"""
+        self.state.frames_rendered += 1
+        self.state.current_time = frame.timestamp
+        self._rendered_counter.add()
+        self._frame_index_gauge.set(frame_index)
+        self._timestamp_gauge.set(frame.timestamp)
+        self._render_time_gauge.set(render_time)
+        self.telemetry.publish_if_due()
+    
+    def _use_staged_rendering(self) -> bool:
+        """Whether frames are produced by the staged pipeline instead of on the writer thread"""
+        return self.config.use_threading and self.config.staged_rendering and \
+            self.frame_capture_system is not None
+    
+    def _create_staged_pipeline(self) -> StagedFramePipeline:
+        """
+        Build the raster -> composite -> convert stage graph.
+        
+        Compositing drives the OpenGL context and always runs on one thread,
+        which also uploads the subtitle textures; subtitle rasterization is
+        CPU-only and, like pixel conversion, uses the configured worker
+        counts. The encoder's writer thread consumes frames in order.
+        """
+        stages = [
+            FrameStageDefinition("raster", self._raster_stage, self.config.raster_workers),
+            FrameStageDefinition("composite", self._composite_stage, 1),
+            FrameStageDefinition("convert", self._convert_stage, self.config.convert_workers)
+        ]
+        return StagedFramePipeline(stages, queue_size=self.config.stage_queue_size)
+    
+    def _iter_pending_timestamps(self):
+        """Yield (frame_index, timestamp) for the frames still to render, honouring pause"""
+        for position in range(self.state.current_frame, self._render_frame_count()):
+            frame_index = self._frame_index_at(position)
+            while not self.pause_event.wait(0.1):
+                if self.should_stop.is_set():
+                    return
+            if self.should_stop.is_set():
+                return
+            yield frame_index, float(self.frame_timestamps[frame_index])
+    
+    def _raster_stage(self, frame_index: int, timestamp: float) -> Tuple[float, Optional[np.ndarray]]:
+        """Raster stage: rasterize the frame's subtitles to an RGBA bitmap (CPU only, no OpenGL calls)"""
+        subtitle_raster = None
+        if self.libass_integration and self.current_project:
+            trace_start = self.tracer.begin()
+            with self.metrics.time(SUBTITLE_RASTER_SECONDS):
+                subtitle_raster = self._rasterize_subtitles(timestamp)
+            self.tracer.end("subtitle_raster", trace_start, frame_index)
+        return timestamp, subtitle_raster
+    
+    def _composite_stage(self, frame_index: int,
+                         rastered: Tuple[float, Optional[np.ndarray]]) -> Optional[Tuple[float, np.ndarray, float]]:
+        """Composite stage: upload the subtitle texture, apply effects and read back the framebuffer (OpenGL thread)"""
+        timestamp, subtitle_raster = rastered
+        
+        if self.state.current_stage != PipelineStage.FRAME_CAPTURE:
+            self.state.current_stage = PipelineStage.FRAME_CAPTURE
+            self.stage_changed.emit(self.state.current_stage.value)
+        
+        render_start = time.time()
+        subtitle_texture = self._upload_subtitle_texture(subtitle_raster)
+        try:
+            self._apply_frame_effects(timestamp, frame_index, subtitle_texture)
+            raw_frame = self.frame_capture_system.rendering_engine.capture_raw_frame(timestamp)
+        finally:
+            if subtitle_texture is not None:
+                subtitle_texture.destroy()
+        if raw_frame is None:
+            return None
+        
+        pixel_data, _ = raw_frame
+        return timestamp, pixel_data, time.time() - render_start
+    
+    def _convert_stage(self, frame_index: int, composited: Tuple[float, np.ndarray, float]) -> Optional[CapturedFrame]:
+        """Convert stage: convert pixels to the capture format"""
+        timestamp, pixel_data, render_time = composited
+        return self.frame_capture_system.rendering_engine.convert_raw_frame(pixel_data, timestamp, render_time)
+    
+    def _next_staged_frame(self) -> Optional[CapturedFrame]:
+        """Hand the next in-order frame from the staged pipeline to the encoder"""
+        result = self.staged_pipeline.next_item()
+        
+        newly_dropped = self.staged_pipeline.frames_dropped - self.state.frames_dropped
+        if newly_dropped > 0:
+            self._dropped_counter.add(newly_dropped)
+        self.state.frames_dropped = self.staged_pipeline.frames_dropped
+        if result is None:
+            if self.staged_pipeline.error:
+                logger.error(self.staged_pipeline.error)
+                self.state.error_message = self.staged_pipeline.error
+            self.telemetry.publish()
+            return None
+        
+        frame_index, frame = result
+        self.state.current_frame = self._render_position(frame_index) + 1
+        self._record_render_time(frame.render_time)
+        self._report_rendered_frame(frame_index, frame, frame.render_time)
+        return frame
+    
     def _generate_next_frame(self) -> Optional[CapturedFrame]:
         """Generate the next frame in the sequence"""
-        if self.state.current_frame >= len(self.frame_timestamps):
+        if self.state.current_frame >= self._render_frame_count():
+            self.telemetry.publish()
             return None
         
         try:
-            timestamp = self.frame_timestamps[self.state.current_frame]
+            frame_index = self._frame_index_at(self.state.current_frame)
+            timestamp = self.frame_timestamps[frame_index]
             
             # Update pipeline stage
             if self.state.current_stage != PipelineStage.FRAME_CAPTURE:
@@ -645,98 +1100,136 @@ class CompleteRenderingPipeline(QObject):
                 self.stage_changed.emit(self.state.current_stage.value)
             
             # Render frame at timestamp
-            frame = self._render_frame_at_timestamp(timestamp)
+            frame = self._render_frame_at_timestamp(timestamp, frame_index)
             
             if frame:
                 self.state.current_frame += 1
-                self.state.frames_rendered += 1
-                self.state.current_time = timestamp
-                
-                # Emit frame rendered signal
-                self.frame_rendered.emit(frame.to_dict())
+                render_time = self.render_times[-1] if self.render_times else 0.0
+                self._report_rendered_frame(frame_index, frame, render_time)
             else:
                 self.state.frames_dropped += 1
+                self._dropped_counter.add()
             
             return frame
             
         except Exception as e:
             logger.error(f"Frame generation failed at frame {self.state.current_frame}: {e}")
             self.state.frames_dropped += 1
+            self._dropped_counter.add()
             return None
     
-    def _render_frame_at_timestamp(self, timestamp: float) -> Optional[CapturedFrame]:
+    def _render_frame_at_timestamp(self, timestamp: float,
+                                   frame_index: Optional[int] = None) -> Optional[CapturedFrame]:
         """Render a single frame at the specified timestamp"""
         render_start = time.time()
         
+        if frame_index is None:
+            frame_index = self.timebase.frame_at(timestamp)
+        
         try:
-            # Update effects pipeline timing
-            if self.effects_pipeline:
-                self.effects_pipeline.update_animation_time(timestamp)
-                
-                # Set karaoke timing if available
-                if timestamp in self.karaoke_timing_map:
-                    karaoke_timing = self.karaoke_timing_map[timestamp]
-                    self.effects_pipeline.set_karaoke_timing(karaoke_timing)
-            
             # Render subtitle textures using libass
             subtitle_texture = None
             if self.libass_integration and self.current_project:
-                subtitle_texture = self._render_subtitle_texture(timestamp)
+                trace_start = self.tracer.begin()
+                with self.metrics.time(SUBTITLE_RASTER_SECONDS):
+                    subtitle_texture = self._render_subtitle_texture(timestamp)
+                self.tracer.end("subtitle_raster", trace_start, frame_index)
             
-            # Render effects
-            if self.effects_pipeline:
-                success = self.effects_pipeline.render_frame(timestamp, subtitle_texture)
-                if not success:
-                    logger.warning(f"Effects rendering failed at {timestamp}s")
-            
-            # Capture frame
-            if self.frame_capture_system:
-                frame = self.frame_capture_system.rendering_engine.render_frame_at_timestamp(timestamp)
-                
-                if frame:
-                    # Update performance metrics
-                    render_time = time.time() - render_start
-                    self.render_times.append(render_time)
-                    
-                    # Keep only recent render times
-                    if len(self.render_times) > 100:
-                        self.render_times = self.render_times[-100:]
-                    
-                    self.state.average_render_time = sum(self.render_times) / len(self.render_times)
+            try:
+                self._apply_frame_effects(timestamp, frame_index, subtitle_texture)
                 
-                return frame
+                # Capture frame
+                frame = None
+                if self.frame_capture_system:
+                    frame = self.frame_capture_system.rendering_engine.render_frame_at_timestamp(timestamp)
+            finally:
+                if subtitle_texture is not None:
+                    subtitle_texture.destroy()
             
-            return None
+            if frame:
+                # Update performance metrics
+                self._record_render_time(time.time() - render_start)
+            
+            return frame
             
         except Exception as e:
             logger.error(f"Frame rendering failed at {timestamp}s: {e}")
             return None
     
-    def _render_subtitle_texture(self, timestamp: float) -> Optional[Any]:
-        """Render subtitle texture for the given timestamp"""
+    def _apply_frame_effects(self, timestamp: float, frame_index: int, subtitle_texture: Optional[Any]):
+        """Update effect timing for a frame and render its effects"""
+        if not self.effects_pipeline:
+            return
+        
+        self.effects_pipeline.update_animation_time(timestamp)
+        
+        # Set karaoke timing if available
+        karaoke_timing = self.karaoke_timing_map.get(frame_index)
+        if karaoke_timing is not None:
+            self.effects_pipeline.set_karaoke_timing(karaoke_timing)
+        
+        # Render effects
+        trace_start = self.tracer.begin()
+        with self.metrics.time(EFFECTS_RENDER_SECONDS):
+            success = self.effects_pipeline.render_frame(timestamp, subtitle_texture)
+        self.tracer.end("effects", trace_start, frame_index)
+        if not success:
+            logger.warning(f"Effects rendering failed at {timestamp}s")
+    
+    def _record_render_time(self, render_time: float):
+        """Track recent frame render times"""
+        self.render_times.append(render_time)
+        
+        # Keep only recent render times
+        if len(self.render_times) > 100:
+            self.render_times = self.render_times[-100:]
+        
+        self.state.average_render_time = sum(self.render_times) / len(self.render_times)
+    
+    def _rasterize_subtitles(self, timestamp: float) -> Optional[np.ndarray]:
+        """
+        Rasterize the subtitles visible at timestamp with libass.
+        
+        Returns an RGBA bitmap, or None when nothing is visible. Makes no
+        OpenGL calls, so it may run on a raster worker thread.
+        """
         try:
             if not self.libass_integration or not self.current_project:
                 return None
             
             # Get visible subtitles at timestamp
-            visible_subtitles = []
-            if self.current_project.subtitle_file:
-                for subtitle in self.current_project.subtitle_file.lines:
-                    if subtitle.start_time <= timestamp <= subtitle.end_time:
-                        visible_subtitles.append(subtitle)
+            if not self.current_project.subtitle_file or not any(
+                    subtitle.start_time <= timestamp <= subtitle.end_time
+                    for subtitle in self.current_project.subtitle_file.lines):
+                return None
             
-            if not visible_subtitles:
+            with self._libass_lock:
+                libass_images = self.libass_integration.render_subtitle_frame(timestamp)
+            if not libass_images:
                 return None
             
-            # Render using libass
-            # This would be implemented with actual libass rendering
-            # For now, return a placeholder
-            return None
+            # Single image, as in the libass texture streamer
+            image = libass_images[0]
+            return np.frombuffer(image.to_rgba_bytes(), dtype=np.uint8).reshape((image.height, image.width, 4))
             
         except Exception as e:
-            logger.error(f"Subtitle texture rendering failed: {e}")
+            logger.error(f"Subtitle rasterization failed: {e}")
+            return None
+    
+    def _upload_subtitle_texture(self, subtitle_raster: Optional[np.ndarray]) -> Optional[Any]:
+        """Upload a subtitle bitmap as a texture; must run on the thread that owns the OpenGL context"""
+        if subtitle_raster is None or not self.opengl_context:
+            return None
+        try:
+            return self.opengl_context.create_texture_from_data(subtitle_raster)
+        except Exception as e:
+            logger.error(f"Subtitle texture upload failed: {e}")
             return None
     
+    def _render_subtitle_texture(self, timestamp: float) -> Optional[Any]:
+        """Render subtitle texture for the given timestamp (OpenGL thread)"""
+        return self._upload_subtitle_texture(self._rasterize_subtitles(timestamp))
+    
     def pause_rendering(self):
         """Pause the rendering pipeline"""
         if self.state.is_running and not self.state.is_paused:
@@ -775,6 +1268,10 @@ class CompleteRenderingPipeline(QObject):
         if self.preview_synchronizer:
             self.preview_synchronizer.stop()
         
+        # Stop producing frames before the encoder is cancelled
+        if self.staged_pipeline:
+            self.staged_pipeline.cancel()
+        
         # Stop FFmpeg processor
         if self.ffmpeg_processor and hasattr(self.ffmpeg_processor, 'cancel_encoding'):
             self.ffmpeg_processor.cancel_encoding()
@@ -788,6 +1285,22 @@ class CompleteRenderingPipeline(QObject):
         
         logger.info("Pipeline stopped")
     
+    def wait_for_completion(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the render started by start_rendering() has finished.
+        
+        Returns True if every frame was rendered and encoded; otherwise
+        ``state.error_message`` describes the failure. Intended for callers
+        without a Qt event loop.
+        """
+        if self.render_thread:
+            self.render_thread.join(timeout)
+            if self.render_thread.is_alive():
+                return False
+        if self.ffmpeg_processor and not self.ffmpeg_processor.wait_for_completion(timeout):
+            return False
+        return self.state.error_message is None and not self.should_stop.is_set()
+    
     def seek_to_time(self, timestamp: float):
         """Seek to a specific timestamp in preview mode"""
         if self.preview_synchronizer:
@@ -799,6 +1312,9 @@ class CompleteRenderingPipeline(QObject):
     
     def get_performance_stats(self) -> Dict[str, Any]:
         """Get comprehensive performance statistics"""
+        # Bring the registry counters up to date with the telemetry bus
+        self.telemetry.publish()
+        
         stats = {
             'pipeline_state': {
                 'stage': self.state.current_stage.value,
@@ -807,7 +1323,8 @@ class CompleteRenderingPipeline(QObject):
                 'frames_dropped': self.state.frames_dropped,
                 'average_render_time': self.state.average_render_time,
                 'is_running': self.state.is_running,
-                'is_paused': self.state.is_paused
+                'is_paused': self.state.is_paused,
+                'render_ranges': list(self.render_ranges)
             }
         }
         
@@ -817,6 +1334,15 @@ class CompleteRenderingPipeline(QObject):
         
         if self.frame_capture_system:
             stats['frame_capture'] = self.frame_capture_system.rendering_engine.get_performance_stats()
+            stats['background_cache'] = self.frame_capture_system.rendering_engine.background_cache.get_stats()
+        
+        if self.staged_pipeline:
+            stats['staged_pipeline'] = self.staged_pipeline.get_stats()
+        
+        stats['metrics'] = self.metrics.snapshot()
+        
+        if self.resource_report:
+            stats['resources'] = self.resource_report.summary()
         
         if self.texture_cache:
             stats['texture_cache'] = {
@@ -826,6 +1352,9 @@ class CompleteRenderingPipeline(QObject):
                 'miss_count': self.texture_cache.miss_count
             }
         
+        # Every cache in the process and the memory governor
+        stats['caches'] = get_cache_registry().get_stats()
+        
         return stats
     
     def cleanup(self):
@@ -846,6 +1375,10 @@ class CompleteRenderingPipeline(QObject):
             except Exception as e:
                 logger.warning(f"Error cleaning up resource: {e}")
         
+        if self.serving_metrics:
+            self.metrics.stop_http_server()
+            self.serving_metrics = False
+        
         # Execute cleanup callbacks
         for callback in self.cleanup_callbacks:
             try:
@@ -856,7 +1389,11 @@ class CompleteRenderingPipeline(QObject):
         # Clear collections
         self.allocated_resources.clear()
         self.cleanup_callbacks.clear()
-        self.frame_timestamps.clear()
+        self.staged_pipeline = None
+        self.frame_timestamps = np.empty(0)
+        self.render_ranges = []
+        self.render_frames = None
+        self.audio_ranges = []
         self.karaoke_timing_map.clear()
         self.render_times.clear()
         self.memory_snapshots.clear()
@@ -890,7 +1427,8 @@ def create_preview_pipeline(width: int = 1920, height: int = 1080) -> CompleteRe
     return CompleteRenderingPipeline(config)
 
 
-def create_export_pipeline(width: int = 1920, height: int = 1080, fps: float = 30.0) -> CompleteRenderingPipeline:
+def create_export_pipeline(width: int = 1920, height: int = 1080, fps: float = 30.0,
+                           config_manager: Optional[Any] = None) -> CompleteRenderingPipeline:
     """Create a pipeline optimized for high-quality export"""
     config = PipelineConfig(
         width=width,
@@ -901,11 +1439,27 @@ def create_export_pipeline(width: int = 1920, height: int = 1080, fps: float = 3
         enable_antialiasing=True,
         use_threading=True,
         max_threads=4,
-        buffer_size=10,
         enable_memory_optimization=True
     )
     
-    return CompleteRenderingPipeline(config)
+    return CompleteRenderingPipeline(config, config_manager)
+
+
+def create_draft_pipeline(width: int = 1920, height: int = 1080, fps: float = 30.0,
+                          profile: str = DRAFT_PROFILE,
+                          config_manager: Optional[Any] = None) -> CompleteRenderingPipeline:
+    """Create a pipeline for a fast draft proxy export of a width x height project"""
+    config = PipelineConfig(
+        width=width,
+        height=height,
+        fps=fps,
+        use_threading=True,
+        max_threads=4,
+        enable_memory_optimization=True
+    )
+    get_export_profile(profile).configure_pipeline(config)
+    
+    return CompleteRenderingPipeline(config, config_manager)
 
 
 if __name__ == "__main__":
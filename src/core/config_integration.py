@@ -9,6 +9,7 @@ from typing import Dict, Any, Optional
 from pathlib import Path
 
 from src.core.config_manager import ConfigManager
+from src.core.hardware_profile import auto_tune
 from src.core.settings_manager import SettingsManager
 from src.core.models import ExportSettings, EffectsConfig, ProjectConfig
 
@@ -31,6 +32,12 @@ class ConfigIntegration:
         
         # Sync settings on initialization
         self._sync_settings_to_config()
+        
+        # Size queues and caches for this machine
+        try:
+            auto_tune(self.config_manager)
+        except Exception as e:
+            print(f"Warning: Could not tune performance settings: {e}")
     
     def _sync_settings_to_config(self):
         """Sync existing QSettings to ConfigManager."""
@@ -177,6 +184,10 @@ class ConfigIntegration:
         """Set performance setting."""
         self.config_manager.set_performance_setting(key, value)
     
+    def set_host_performance_setting(self, key: str, value: Any, host: Optional[str] = None):
+        """Set performance setting for one host only."""
+        self.config_manager.set_host_performance_setting(key, value, host)
+    
     def get_effects_preset(self, category: str, name: str) -> Optional[Dict[str, Any]]:
         """Get effects preset."""
         return self.config_manager.get_effects_preset(category, name)
@@ -18,6 +18,7 @@ from enum import Enum
 import logging
 from copy import deepcopy
 
+from src.core.hardware_profile import current_host
 from src.core.models import (
     ProjectConfig, EffectsConfig, ExportSettings, 
     AudioFile, SubtitleFile, VideoFile, ImageFile
@@ -211,7 +212,8 @@ class ConfigManager:
                     "max_texture_size": 4096,
                     "enable_gpu_acceleration": True,
                     "max_memory_usage_mb": 2048,
-                    "enable_shader_cache": True
+                    "enable_shader_cache": True,
+                    "conversion_threads": 0
                 }
             }
             
@@ -352,7 +354,8 @@ class ConfigManager:
                 "max_texture_size": 4096,
                 "enable_gpu_acceleration": True,
                 "max_memory_usage_mb": 2048,
-                "enable_shader_cache": True
+                "enable_shader_cache": True,
+                "conversion_threads": 0
             }
         
         # Update preferences with new options
@@ -713,8 +716,28 @@ class ConfigManager:
         self._save_user_config(self.user_config)
     
     def get_performance_setting(self, key: str, default: Any = None) -> Any:
-        """Get a performance setting."""
-        return self.user_config.get("performance", {}).get(key, default)
+        """
+        Get a performance setting.
+        
+        An override for this host takes precedence over a value set for all
+        hosts, which takes precedence over the value derived from this
+        host's hardware by auto-tuning.
+        """
+        performance = self.user_config.get("performance", {})
+        host = current_host()
+        overrides = performance.get("host_overrides", {}).get(host, {})
+        if key in overrides:
+            return overrides[key]
+        if key in performance:
+            return performance[key]
+        return performance.get("hardware", {}).get(host, {}).get("derived", {}).get(key, default)
+    
+    def set_host_performance_setting(self, key: str, value: Any, host: Optional[str] = None):
+        """Override a performance setting on one host only (default: this host)."""
+        performance = self.user_config.setdefault("performance", {})
+        overrides = performance.setdefault("host_overrides", {})
+        overrides.setdefault(host or current_host(), {})[key] = value
+        self._save_user_config(self.user_config)
     
     def set_performance_setting(self, key: str, value: Any):
         """Set a performance setting."""
@@ -0,0 +1,359 @@
+"""
+Cost-Aware Render Scheduling
+
+Render cost per frame varies widely: frames with several animated karaoke
+lines and effect layers take many times longer than an instrumental gap,
+and a collapsed run of identical frames (see frame_plan) costs one render
+plus cheap pipe writes. Splitting an export into equal-length parts
+therefore leaves workers idle while one finishes a dense chorus.
+
+FrameCostModel predicts per-frame cost from the frame plan, subtitle density
+and effect layers, using stage timings measured by the metrics registry.
+cost_balanced_cuts places work unit boundaries at equal predicted cost, and
+WorkStealingQueue deals contiguous units to workers and lets an idle worker
+take the last unit of the worker with the most predicted work left. After an
+export, CostPredictionReport compares predicted and measured unit times, and
+the model refitted to them is stored per backend so the next export in a new
+process starts from the calibrated coefficients.
+"""
+
+import os
+import json
+import threading
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Optional, List, Dict, Any, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from .models import Project
+    from .frame_plan import FramePlan, PlannedFrame, _karaoke_state, _UNIQUE
+    from .metrics import (
+        get_metrics_registry, MetricsRegistry, SUBTITLE_RASTER_SECONDS, EFFECTS_RENDER_SECONDS,
+        FRAMEBUFFER_READBACK_SECONDS, PIXEL_CONVERSION_SECONDS, PIPE_WRITE_SECONDS
+    )
+except ImportError:
+    from models import Project
+    from frame_plan import FramePlan, PlannedFrame, _karaoke_state, _UNIQUE
+    from metrics import (
+        get_metrics_registry, MetricsRegistry, SUBTITLE_RASTER_SECONDS, EFFECTS_RENDER_SECONDS,
+        FRAMEBUFFER_READBACK_SECONDS, PIXEL_CONVERSION_SECONDS, PIPE_WRITE_SECONDS
+    )
+
+
+# Relative cost of one effect layer on one line (multi-pass effects cost more)
+EFFECT_COST_WEIGHTS = {
+    "glow": 3.0,
+    "shadow": 2.0,
+    "outline": 1.5,
+    "wave": 1.5,
+    "bounce": 1.0,
+    "fade": 0.5,
+    "color_transition": 0.5,
+    "typewriter": 0.5,
+}
+
+# Extra line cost while a word is being filled
+ANIMATED_KARAOKE_WEIGHT = 0.5
+
+# Calibrated models by backend, next to the export estimate history
+DEFAULT_CALIBRATION_PATH = os.path.join(".kiro", "config", "render_cost_model.json")
+CALIBRATION_VERSION = 1
+
+
+@dataclass
+class FrameCostModel:
+    """Predicted seconds per frame, built from per-stage timings"""
+    frame_seconds: float = 0.004  # Clear, background, readback and conversion of a rendered frame
+    line_seconds: float = 0.002  # Rasterizing one visible subtitle line
+    effect_seconds: float = 0.003  # One effect layer of weight 1.0 on one line
+    repeat_seconds: float = 0.0005  # Writing a frame to the encoder
+    unit_overhead_seconds: float = 0.0  # Fixed cost per work unit (worker context setup)
+    effect_weights: Dict[str, float] = field(default_factory=lambda: dict(EFFECT_COST_WEIGHTS))
+
+    @classmethod
+    def from_metrics(cls, registry: Optional[MetricsRegistry] = None, calibration_key: Optional[str] = None,
+                     calibration_path: Optional[str] = DEFAULT_CALIBRATION_PATH) -> "FrameCostModel":
+        """
+        Model using mean stage timings recorded so far; defaults for stages never measured.
+
+        With a calibration_key, a model stored under that key by an earlier
+        export (see save_calibration) is returned instead, since it was fitted
+        to measured work unit times.
+        """
+        if calibration_key and calibration_path:
+            calibrated = cls.load_calibration(calibration_path, calibration_key)
+            if calibrated is not None:
+                return calibrated
+
+        registry = registry or get_metrics_registry()
+        model = cls()
+
+        def mean(name: str) -> Optional[float]:
+            histogram = registry.histograms.get(name)
+            return histogram.mean if histogram and histogram.count else None
+
+        readback = mean(FRAMEBUFFER_READBACK_SECONDS)
+        conversion = mean(PIXEL_CONVERSION_SECONDS)
+        if readback is not None or conversion is not None:
+            model.frame_seconds = (readback or 0.0) + (conversion or 0.0)
+        model.line_seconds = mean(SUBTITLE_RASTER_SECONDS) or model.line_seconds
+        model.effect_seconds = mean(EFFECTS_RENDER_SECONDS) or model.effect_seconds
+        model.repeat_seconds = mean(PIPE_WRITE_SECONDS) or model.repeat_seconds
+        return model
+
+    def render_seconds(self, project: Project, frame: PlannedFrame) -> float:
+        """Predicted time to render one planned frame once"""
+        lines = project.subtitle_file.lines if project.subtitle_file else []
+        effect_weight = sum(self.effect_weights.get(effect.type, 1.0)
+                            for effect in project.effects if effect.enabled)
+
+        seconds = self.frame_seconds
+        for line_index in frame.visible_lines:
+            line_cost = self.line_seconds + effect_weight * self.effect_seconds
+            if _karaoke_state(lines[line_index], frame.timestamp) == _UNIQUE:
+                line_cost += ANIMATED_KARAOKE_WEIGHT * self.line_seconds
+            seconds += line_cost
+        return seconds
+
+    def frame_costs(self, project: Project, plan: FramePlan, deduplicate: bool = True) -> np.ndarray:
+        """Predicted seconds for every output frame in the plan's range"""
+        costs = np.full(plan.total_frames, self.repeat_seconds, dtype=np.float64)
+        for frame in plan.frames:
+            offset = frame.frame_number - plan.start_frame
+            render = self.render_seconds(project, frame)
+            if deduplicate:
+                costs[offset] += render
+            else:
+                costs[offset:offset + frame.repeat] += render
+        return costs
+
+    def unit_seconds(self, costs: np.ndarray, start: int, end: int) -> float:
+        """Predicted time of a work unit covering output frames [start, end)"""
+        return float(costs[start:end].sum()) + self.unit_overhead_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "frame_seconds": self.frame_seconds,
+            "line_seconds": self.line_seconds,
+            "effect_seconds": self.effect_seconds,
+            "repeat_seconds": self.repeat_seconds,
+            "unit_overhead_seconds": self.unit_overhead_seconds,
+            "effect_weights": dict(self.effect_weights)
+        }
+
+    @classmethod
+    def load_calibration(cls, path: str, key: str) -> Optional["FrameCostModel"]:
+        """Model stored under key, or None if there is none (or the file is unreadable)"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != CALIBRATION_VERSION:
+                return None
+            values = data["models"][key]
+            return cls(frame_seconds=float(values["frame_seconds"]),
+                       line_seconds=float(values["line_seconds"]),
+                       effect_seconds=float(values["effect_seconds"]),
+                       repeat_seconds=float(values["repeat_seconds"]),
+                       unit_overhead_seconds=float(values["unit_overhead_seconds"]),
+                       effect_weights={str(name): float(weight)
+                                       for name, weight in values["effect_weights"].items()})
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    def save_calibration(self, path: str, key: str):
+        """Store this model under key, keeping the models of other keys; raises OSError"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            models = data["models"] if data.get("version") == CALIBRATION_VERSION else {}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            models = {}
+        models[key] = self.to_dict()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": CALIBRATION_VERSION, "models": models}, f, indent=2)
+        os.replace(temp_path, path)
+
+    def calibrated(self, report: "CostPredictionReport") -> "FrameCostModel":
+        """
+        Model fitted to measured unit times: measured = scale * predicted + overhead.
+
+        With fewer than two distinct units only the scale is adjusted.
+        """
+        predicted = np.array([unit["predicted"] - self.unit_overhead_seconds for unit in report.units])
+        measured = np.array([unit["measured"] for unit in report.units])
+        if len(predicted) == 0 or predicted.sum() <= 0:
+            return replace(self)
+
+        if len(predicted) >= 2 and np.ptp(predicted) > 0:
+            scale, overhead = np.polyfit(predicted, measured, 1)
+        else:
+            scale, overhead = measured.sum() / predicted.sum(), 0.0
+        if scale <= 0:
+            scale, overhead = measured.sum() / predicted.sum(), 0.0
+
+        return replace(self,
+                       frame_seconds=self.frame_seconds * scale,
+                       line_seconds=self.line_seconds * scale,
+                       effect_seconds=self.effect_seconds * scale,
+                       repeat_seconds=self.repeat_seconds * scale,
+                       unit_overhead_seconds=max(0.0, float(overhead)),
+                       effect_weights=dict(self.effect_weights))
+
+
+def cost_balanced_cuts(costs: np.ndarray, unit_count: int) -> List[int]:
+    """
+    Ideal cut frames splitting the costs into unit_count parts of equal sum.
+
+    Returns unit_count - 1 interior cuts (suitable as targets for
+    parallel_render.plan_segment_boundaries).
+    """
+    if unit_count <= 1 or len(costs) == 0:
+        return []
+    cumulative = np.cumsum(costs)
+    targets = cumulative[-1] * np.arange(1, unit_count) / unit_count
+    # A cut after frame i puts frames [0, i] in the earlier unit
+    return [int(cut) for cut in np.searchsorted(cumulative, targets, side='left') + 1]
+
+
+class WorkStealingQueue:
+    """
+    Work units dealt to workers as contiguous runs of about equal cost.
+
+    A worker takes units from the front of its own run; once that is empty it
+    steals from the back of the run with the most predicted work left, which
+    is the unit its owner would have reached last. Thread-safe.
+    """
+
+    def __init__(self, units: Sequence[Tuple[Any, float]], workers: int):
+        self.workers = max(1, workers)
+        self.queues: List[deque] = [deque() for _ in range(self.workers)]
+        self.steals = 0
+        self.taken_by: Dict[Any, int] = {}
+        self._lock = threading.Lock()
+
+        total = sum(cost for _, cost in units)
+        share = total / self.workers if total > 0 else 0.0
+        worker = 0
+        assigned = 0.0
+        for unit, cost in units:
+            # Move on once this worker's share is more than half used up by the next unit
+            if worker < self.workers - 1 and self.queues[worker] and assigned + cost / 2 > share * (worker + 1):
+                worker += 1
+            self.queues[worker].append((unit, cost))
+            assigned += cost
+
+    def remaining_cost(self, worker: int) -> float:
+        with self._lock:
+            return sum(cost for _, cost in self.queues[worker])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(queue) for queue in self.queues)
+
+    def next_unit(self, worker: int) -> Optional[Any]:
+        """Next unit for a worker, stolen from another if its own run is done"""
+        with self._lock:
+            own = self.queues[worker % self.workers]
+            if own:
+                unit, _ = own.popleft()
+            else:
+                victim = max(self.queues, key=lambda queue: sum(cost for _, cost in queue))
+                if not victim:
+                    return None
+                unit, _ = victim.pop()
+                self.steals += 1
+            self.taken_by[unit] = worker
+            return unit
+
+
+@dataclass
+class CostPredictionReport:
+    """Predicted against measured work unit times for one export"""
+    units: List[Dict[str, Any]] = field(default_factory=list)
+    steals: int = 0
+
+    def add(self, unit: Any, predicted: float, measured: float, worker: Optional[Any] = None,
+            frames: int = 0):
+        self.units.append({"unit": unit, "predicted": predicted, "measured": measured,
+                           "worker": worker, "frames": frames})
+
+    @property
+    def total_predicted(self) -> float:
+        return sum(unit["predicted"] for unit in self.units)
+
+    @property
+    def total_measured(self) -> float:
+        return sum(unit["measured"] for unit in self.units)
+
+    @property
+    def scale(self) -> float:
+        """Measured over predicted time; the factor the model was off by overall"""
+        return self.total_measured / self.total_predicted if self.total_predicted > 0 else 0.0
+
+    @property
+    def mean_absolute_percent_error(self) -> float:
+        """Mean error of the unit predictions relative to the measured times"""
+        errors = [abs(unit["predicted"] - unit["measured"]) / unit["measured"]
+                  for unit in self.units if unit["measured"] > 0]
+        return 100.0 * sum(errors) / len(errors) if errors else 0.0
+
+    @property
+    def relative_error_spread(self) -> float:
+        """
+        Spread of measured/predicted ratios (max over min).
+
+        Balancing only needs relative costs to be right, so a model that is
+        uniformly off by a constant factor still has a spread of 1.0.
+        """
+        ratios = [unit["measured"] / unit["predicted"] for unit in self.units
+                  if unit["predicted"] > 0 and unit["measured"] > 0]
+        return max(ratios) / min(ratios) if ratios else 1.0
+
+    def worker_seconds(self) -> Dict[Any, float]:
+        """Measured busy time per worker"""
+        busy: Dict[Any, float] = {}
+        for unit in self.units:
+            if unit["worker"] is not None:
+                busy[unit["worker"]] = busy.get(unit["worker"], 0.0) + unit["measured"]
+        return busy
+
+    @property
+    def imbalance(self) -> float:
+        """Busiest worker's time over the mean worker time (1.0 is perfect)"""
+        busy = list(self.worker_seconds().values())
+        mean = sum(busy) / len(busy) if busy else 0.0
+        return max(busy) / mean if mean > 0 else 1.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "units": list(self.units),
+            "steals": self.steals,
+            "total_predicted": self.total_predicted,
+            "total_measured": self.total_measured,
+            "scale": self.scale,
+            "mean_absolute_percent_error": self.mean_absolute_percent_error,
+            "relative_error_spread": self.relative_error_spread,
+            "imbalance": self.imbalance
+        }
+
+    def format(self) -> str:
+        """Human-readable table of the prediction error"""
+        lines = [f"{'Unit':>6} {'Frames':>8} {'Worker':>7} {'Predicted':>10} {'Measured':>10} {'Error':>8}"]
+        for unit in sorted(self.units, key=lambda unit: str(unit["unit"])):
+            error = ((unit["predicted"] - unit["measured"]) / unit["measured"] * 100.0
+                     if unit["measured"] > 0 else 0.0)
+            worker = "-" if unit["worker"] is None else str(unit["worker"])
+            lines.append(f"{unit['unit']!s:>6} {unit['frames']:>8} {worker:>7} "
+                         f"{unit['predicted']:>9.3f}s {unit['measured']:>9.3f}s {error:>+7.1f}%")
+        lines.append(f"Mean absolute error {self.mean_absolute_percent_error:.1f}%, "
+                     f"measured/predicted {self.scale:.2f}x, "
+                     f"ratio spread {self.relative_error_spread:.2f}, "
+                     f"worker imbalance {self.imbalance:.2f}, {self.steals} steal(s)")
+        return "\n".join(lines)
@@ -0,0 +1,667 @@
+"""
+Multi-Host Render Distribution
+
+A RenderCoordinator spreads the time segments of one export over worker
+agents on other machines. Workers connect to the coordinator over plain TCP
+and exchange newline-delimited JSON messages; a message with a ``size``
+field is followed by that many raw bytes (an asset or an encoded segment).
+
+    worker       -> hello {worker, version, token, assets: [cached hashes]}
+    coordinator  -> package {project, settings, assets} | error {error}
+    worker       -> need_assets {hashes}
+    coordinator  -> asset {hash, size} + bytes           (once per missing asset)
+    worker       -> ready
+    coordinator  -> segment {index, start_frame, end_frame} | done
+    worker       -> result {index, frames, seconds, error, size} + bytes
+    ...          (segment/result repeat until the coordinator sends done)
+
+The render package describes the project by the content hashes of its media
+and subtitle files, so an asset used twice is sent once and workers keep
+assets cached between exports. Segments are planned, encoded and joined as
+in parallel_render, and completed segments are recorded in the export
+checkpoint. A segment whose worker disconnects, times out or reports an
+error goes back to the queue for another worker.
+
+The protocol has no encryption. Coordinators listen on localhost unless they
+are given a shared token, which workers must present in their hello;
+workers only accept asset names that are a content hash and a short
+extension, so a coordinator cannot make them write outside their cache.
+"""
+
+import os
+import re
+import sys
+import hmac
+import json
+import time
+import shutil
+import socket
+import hashlib
+import tempfile
+import argparse
+import threading
+import subprocess
+from collections import deque
+from dataclasses import dataclass, field, fields, replace
+from enum import Enum
+from typing import Optional, List, Dict, Any, Callable, Tuple, BinaryIO
+
+try:
+    from .models import Project, AudioFile, VideoFile, ImageFile
+    from .timebase import Timebase
+    from .opengl_context import HEADLESS_BACKENDS
+    from .subtitle_parser import parse_ass_file
+    from .frame_capture_system import _project_duration
+    from .enhanced_ffmpeg_integration import EnhancedExportSettings
+    from .export_checkpoint import ExportCheckpoint, project_fingerprint, settings_hash, _stable_value
+    from .parallel_render import SegmentRenderTask, render_segment, plan_segment_boundaries
+    from .frame_plan import compile_frame_plan
+    from .cost_scheduler import FrameCostModel, CostPredictionReport, cost_balanced_cuts
+except ImportError:
+    from models import Project, AudioFile, VideoFile, ImageFile
+    from timebase import Timebase
+    from opengl_context import HEADLESS_BACKENDS
+    from subtitle_parser import parse_ass_file
+    from frame_capture_system import _project_duration
+    from enhanced_ffmpeg_integration import EnhancedExportSettings
+    from export_checkpoint import ExportCheckpoint, project_fingerprint, settings_hash, _stable_value
+    from parallel_render import SegmentRenderTask, render_segment, plan_segment_boundaries
+    from frame_plan import compile_frame_plan
+    from cost_scheduler import FrameCostModel, CostPredictionReport, cost_balanced_cuts
+
+
+PROTOCOL_VERSION = 2
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8766
+CHUNK_SIZE = 1024 * 1024
+
+# Seconds a worker may take to render and return one segment
+DEFAULT_SEGMENT_TIMEOUT = 600.0
+
+# Environment variable holding the shared token of coordinator and workers
+TOKEN_ENVIRONMENT_VARIABLE = "KARAOKE_RENDER_TOKEN"
+
+# Asset cache file names: SHA-256 hex digest plus an optional short extension
+_DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+_EXTENSION_PATTERN = re.compile(r"^\.[A-Za-z0-9]{1,8}$")
+
+# Project media shipped as assets
+_MEDIA_FIELDS = ("subtitle_file", "audio_file", "image_file", "video_file")
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def validate_asset_name(digest: str, extension: str = ""):
+    """Raise ValueError unless digest is a SHA-256 hex digest and extension is empty or short"""
+    if not isinstance(digest, str) or not _DIGEST_PATTERN.match(digest):
+        raise ValueError(f"Invalid asset hash: {str(digest)[:80]!r}")
+    if extension and (not isinstance(extension, str) or not _EXTENSION_PATTERN.match(extension)):
+        raise ValueError(f"Invalid asset extension: {str(extension)[:80]!r}")
+
+
+def is_loopback_host(host: str) -> bool:
+    """True for hosts only reachable from this machine"""
+    return host in ("localhost", "::1") or host.startswith("127.")
+
+
+class MessageChannel:
+    """Newline-delimited JSON messages with optional raw payloads over a socket"""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.reader: BinaryIO = sock.makefile('rb')
+
+    def send(self, message: Dict[str, Any], payload_path: Optional[str] = None):
+        """Send a message, followed by the contents of payload_path if given"""
+        if payload_path:
+            message = dict(message, size=os.path.getsize(payload_path))
+        self.sock.sendall(json.dumps(message).encode('utf-8') + b"\n")
+        if payload_path:
+            with open(payload_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    self.sock.sendall(chunk)
+
+    def receive(self) -> Dict[str, Any]:
+        """Read the next message; raises ConnectionError when the peer has gone"""
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed")
+        message = json.loads(line)
+        if not isinstance(message, dict) or 'type' not in message:
+            raise ConnectionError(f"Malformed message: {line[:80]!r}")
+        return message
+
+    def receive_payload(self, size: int, path: str):
+        """Write the next size bytes to path"""
+        remaining = size
+        with open(path, 'wb') as f:
+            while remaining:
+                chunk = self.reader.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise ConnectionError("Connection closed during transfer")
+                f.write(chunk)
+                remaining -= len(chunk)
+
+    def close(self):
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def _settings_from_dict(data: Dict[str, Any]) -> EnhancedExportSettings:
+    """Rebuild export settings from their JSON form"""
+    values = {}
+    for settings_field in fields(EnhancedExportSettings):
+        if settings_field.name not in data:
+            continue
+        value = data[settings_field.name]
+        if isinstance(settings_field.type, type) and issubclass(settings_field.type, Enum):
+            value = settings_field.type(value)
+        values[settings_field.name] = value
+    return EnhancedExportSettings(**values)
+
+
+def build_render_package(project: Project, settings: EnhancedExportSettings,
+                         gop_frames: int) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Describe a project by asset hashes.
+
+    Returns (package, assets) where assets maps content hash to local path.
+    The subtitle file is shipped as-is and parsed again on the worker.
+    """
+    if not project.subtitle_file or not project.subtitle_file.path or \
+            not os.path.isfile(project.subtitle_file.path):
+        raise ValueError("Distributed rendering needs the project's subtitle file on disk")
+
+    assets: Dict[str, str] = {}
+    media: Dict[str, Any] = {}
+    for attribute in _MEDIA_FIELDS:
+        media_file = getattr(project, attribute)
+        path = getattr(media_file, 'path', None) if media_file else None
+        if not path or not os.path.isfile(path):
+            media[attribute] = None
+            continue
+        digest = file_digest(path)
+        assets[digest] = path
+        media[attribute] = {"asset": digest, "extension": os.path.splitext(path)[1]}
+
+    if media.get("video_file"):
+        media["video_file"]["frame_rate"] = project.video_file.frame_rate
+        media["video_file"]["duration"] = project.video_file.duration
+
+    package = {
+        "version": PROTOCOL_VERSION,
+        "project": {"id": project.id, "name": project.name,
+                    "duration": _project_duration(project), "media": media},
+        "settings": _stable_value(settings),
+        "gop_frames": gop_frames
+    }
+    return package, assets
+
+
+def project_from_package(package: Dict[str, Any], assets: Dict[str, str]) -> Project:
+    """Rebuild a project on a worker; assets maps content hash to a local file"""
+    info = package["project"]
+    media = info["media"]
+
+    def local(attribute: str) -> Optional[str]:
+        entry = media.get(attribute)
+        return assets[entry["asset"]] if entry else None
+
+    subtitle_file, errors, _ = parse_ass_file(local("subtitle_file"))
+    if errors:
+        raise ValueError(f"Subtitle file has {len(errors)} error(s): {errors[0]}")
+
+    video_file = None
+    if media.get("video_file"):
+        video_file = VideoFile(path=local("video_file"), duration=media["video_file"]["duration"],
+                               frame_rate=media["video_file"]["frame_rate"])
+    image_file = ImageFile(path=local("image_file")) if media.get("image_file") else None
+
+    return Project(
+        id=info["id"],
+        name=info["name"],
+        video_file=video_file,
+        image_file=image_file,
+        audio_file=AudioFile(path=local("audio_file") or "", duration=info["duration"]),
+        subtitle_file=subtitle_file
+    )
+
+
+@dataclass
+class DistributedRenderResult:
+    """Outcome of a distributed export"""
+    success: bool
+    output_path: Optional[str]
+    total_frames: int
+    elapsed: float
+    segments: List[Dict[str, Any]] = field(default_factory=list)
+    reassigned_segments: int = 0
+    error: Optional[str] = None
+    prediction: Optional[CostPredictionReport] = None
+
+
+class RenderCoordinator:
+    """
+    Hands out the segments of one export to connected worker agents.
+
+    Workers may join at any time while render() runs. Segments hold about
+    equal predicted render cost and are handed out most expensive first.
+    Each segment is tried up to max_attempts times before the export fails.
+    Listening on anything but a loopback address requires a shared token.
+    """
+
+    def __init__(self, project: Project, settings: EnhancedExportSettings,
+                 host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, segment_count: int = 8,
+                 gop_seconds: float = 2.0, max_attempts: int = 3,
+                 segment_timeout: float = DEFAULT_SEGMENT_TIMEOUT,
+                 cost_model: Optional[FrameCostModel] = None, token: Optional[str] = None):
+        if not token and not is_loopback_host(host):
+            raise ValueError(f"Listening on {host} needs a shared token "
+                             f"(--token or {TOKEN_ENVIRONMENT_VARIABLE})")
+        if segment_timeout is None or segment_timeout <= 0:
+            raise ValueError("The segment timeout must be a positive number of seconds")
+        self.project = project
+        self.settings = settings
+        self.host = host
+        self.port = port
+        self.segment_count = max(1, segment_count)
+        self.gop_frames = max(1, int(round(gop_seconds * settings.fps)))
+        self.max_attempts = max(1, max_attempts)
+        self.segment_timeout = segment_timeout
+        self.token = token
+        self.cost_model = cost_model or FrameCostModel.from_metrics()
+        self.predicted: Dict[int, float] = {}
+
+        self.package, self.assets = build_render_package(project, settings, self.gop_frames)
+        self.checkpoint: Optional[ExportCheckpoint] = None
+        self.server: Optional[socket.socket] = None
+
+        # Scheduling state, guarded by the condition's lock
+        self.condition = threading.Condition()
+        self.pending: deque = deque()
+        self.in_flight: Dict[int, str] = {}
+        self.attempts: Dict[int, int] = {}
+        self.results: Dict[int, Dict[str, Any]] = {}
+        self.reassigned = 0
+        self.error: Optional[str] = None
+        self.finished = False
+
+    def listen(self) -> int:
+        """Plan the segments and open the listening socket; returns the bound port"""
+        if self.checkpoint is None:
+            self._plan()
+        self.server = socket.create_server((self.host, self.port))
+        self.port = self.server.getsockname()[1]
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        print(f"Render coordinator listening on {self.host}:{self.port}")
+        return self.port
+
+    def _plan(self):
+        lines = self.project.subtitle_file.lines if self.project.subtitle_file else []
+        total_frames = Timebase.from_fps(self.settings.fps).frame_count(_project_duration(self.project))
+        costs = self.cost_model.frame_costs(self.project, compile_frame_plan(self.project, self.settings.fps))
+        boundaries = plan_segment_boundaries(total_frames, self.settings.fps, self.segment_count,
+                                             lines, self.gop_frames,
+                                             targets=cost_balanced_cuts(costs, self.segment_count))
+        self.checkpoint = ExportCheckpoint.load_or_create(
+            self.settings.output_path, project_fingerprint(self.project), settings_hash(self.settings),
+            total_frames, 0, self.settings.container_format.value, boundaries=boundaries
+        )
+        self.predicted = {segment.index: self.cost_model.unit_seconds(costs, segment.start_frame,
+                                                                      segment.end_frame)
+                          for segment in self.checkpoint.segments}
+
+        # Most expensive first keeps the tail of the export short
+        pending = sorted(self.checkpoint.pending_segments(),
+                         key=lambda segment: self.predicted[segment.index], reverse=True)
+        with self.condition:
+            self.pending.extend(segment.index for segment in pending)
+
+    def render(self, progress_callback: Optional[Callable[[int, int], None]] = None,
+               timeout: Optional[float] = None) -> DistributedRenderResult:
+        """
+        Distribute all pending segments, wait for them and join the output.
+
+        progress_callback(frames_done, total_frames) is called from this
+        thread whenever a segment arrives.
+        """
+        start_time = time.time()
+        if self.server is None:
+            self.listen()
+
+        deadline = start_time + timeout if timeout is not None else None
+        reported = -1
+        with self.condition:
+            while self.error is None and (self.pending or self.in_flight):
+                completed = self.checkpoint.completed_frames
+                if progress_callback and completed != reported:
+                    reported = completed
+                    progress_callback(completed, self.checkpoint.total_frames)
+                remaining = deadline - time.time() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    self.error = "Timed out waiting for workers"
+                    break
+                self.condition.wait(remaining)
+            self.finished = True
+            self.condition.notify_all()
+            error = self.error
+
+        if error is None and progress_callback:
+            progress_callback(self.checkpoint.total_frames, self.checkpoint.total_frames)
+
+        if error is None:
+            error = self._concatenate_segments()
+
+        report = CostPredictionReport()
+        for index in sorted(self.results):
+            result = self.results[index]
+            report.add(index, self.predicted[index], result.get('seconds', 0.0), result['worker'],
+                       result.get('frames', 0))
+        if report.units:
+            print(f"Render cost prediction:\n{report.format()}")
+
+        self.close()
+        return DistributedRenderResult(
+            success=error is None,
+            output_path=None if error else self.settings.output_path,
+            total_frames=self.checkpoint.total_frames,
+            elapsed=time.time() - start_time,
+            segments=[self.results[index] for index in sorted(self.results)],
+            reassigned_segments=self.reassigned,
+            error=error,
+            prediction=report
+        )
+
+    def close(self):
+        if self.server:
+            try:
+                self.server.close()
+            except OSError:
+                pass
+            self.server = None
+
+    # Connection handling
+
+    def _accept_loop(self):
+        server = self.server
+        while True:
+            try:
+                sock, address = server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve_worker, args=(sock, address), daemon=True).start()
+
+    def _next_segment(self, worker: str) -> Optional[int]:
+        """Block until a segment is available; None when the export is over"""
+        with self.condition:
+            while True:
+                if self.finished or self.error is not None:
+                    return None
+                if self.pending:
+                    index = self.pending.popleft()
+                    self.in_flight[index] = worker
+                    self.attempts[index] = self.attempts.get(index, 0) + 1
+                    return index
+                if not self.in_flight:
+                    return None
+                # Another worker may still fail and hand its segment back
+                self.condition.wait()
+
+    def _release_segment(self, index: int, reason: str):
+        """Put a segment back in the queue after a failed attempt"""
+        with self.condition:
+            worker = self.in_flight.pop(index, None)
+            if self.attempts.get(index, 0) >= self.max_attempts:
+                self.error = f"Segment {index} failed {self.attempts[index]} times: {reason}"
+            else:
+                print(f"Reassigning segment {index} (worker {worker}: {reason})")
+                self.pending.appendleft(index)
+                self.reassigned += 1
+            self.condition.notify_all()
+
+    def _serve_worker(self, sock: socket.socket, address):
+        channel = MessageChannel(sock)
+        worker = f"{address[0]}:{address[1]}"
+        index = None
+        try:
+            # Handshake and segment results share one timeout
+            sock.settimeout(self.segment_timeout)
+            hello = channel.receive()
+            rejection = self._check_hello(hello)
+            if rejection:
+                print(f"Rejected worker {worker}: {rejection}")
+                channel.send({"type": "error", "error": rejection})
+                return
+            worker = hello.get('worker') or worker
+            channel.send({"type": "package", "package": self.package})
+
+            request = channel.receive()
+            for digest in request.get('hashes', []):
+                if digest in self.assets:
+                    channel.send({"type": "asset", "hash": digest}, self.assets[digest])
+            if channel.receive().get('type') != "ready":
+                raise ConnectionError("Worker did not become ready")
+
+            while True:
+                index = self._next_segment(worker)
+                if index is None:
+                    channel.send({"type": "done"})
+                    return
+
+                segment = self.checkpoint.segments[index]
+                channel.send({"type": "segment", "index": index,
+                              "start_frame": segment.start_frame, "end_frame": segment.end_frame})
+                result = channel.receive()
+                if result.get('type') != "result" or result.get('index') != index:
+                    raise ConnectionError(f"Unexpected reply: {result.get('type')}")
+
+                if result.get('error') or not result.get('size'):
+                    channel.receive_payload(result.get('size', 0), os.devnull)
+                    self._release_segment(index, result.get('error') or "empty segment")
+                    index = None
+                    continue
+
+                partial = f"{self.checkpoint.segment_path(segment)}.part"
+                channel.receive_payload(result['size'], partial)
+                os.replace(partial, self.checkpoint.segment_path(segment))
+
+                with self.condition:
+                    self.checkpoint.mark_completed(segment)
+                    self.in_flight.pop(index, None)
+                    self.results[index] = dict(result, worker=worker)
+                    self.condition.notify_all()
+                index = None
+
+        except (OSError, ValueError, ConnectionError) as e:
+            if index is not None:
+                self._release_segment(index, str(e) or type(e).__name__)
+        finally:
+            channel.close()
+
+    def _check_hello(self, hello: Dict[str, Any]) -> Optional[str]:
+        """Reason to reject a worker's hello, or None to accept it"""
+        if hello.get('type') != "hello":
+            return f"expected hello, got {hello.get('type')}"
+        if hello.get('version') != PROTOCOL_VERSION:
+            return f"protocol version {hello.get('version')} does not match {PROTOCOL_VERSION}"
+        if self.token and not hmac.compare_digest(str(hello.get('token') or "").encode('utf-8'),
+                                                  self.token.encode('utf-8')):
+            return "invalid token"
+        return None
+
+    def _concatenate_segments(self) -> Optional[str]:
+        """Join the collected segments and mux the audio once"""
+        audio_path = None
+        if self.project.audio_file and self.project.audio_file.path and \
+                os.path.exists(self.project.audio_file.path):
+            audio_path = self.project.audio_file.path
+
+        audio_options = ["-c:a", self.settings.audio_codec.value, "-b:a", f"{self.settings.audio_bitrate}k",
+                         "-ar", str(self.settings.audio_sample_rate), "-ac", str(self.settings.audio_channels)]
+        container = self.settings.container_format.value
+        container_options = ["-movflags", "+faststart", "-f", "mp4"] if container == "mp4" else ["-f", container]
+
+        cmd = self.checkpoint.build_concat_command(audio_path, audio_options, container_options)
+        try:
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except OSError as e:
+            return f"Failed to start FFmpeg for concatenation: {e}"
+        if result.returncode != 0:
+            stderr = result.stderr.decode('utf-8', errors='replace').strip().splitlines()
+            return f"Segment concatenation failed: {stderr[-1] if stderr else result.returncode}"
+
+        self.checkpoint.discard()
+        return None
+
+
+class RenderWorkerAgent:
+    """
+    Worker side of the protocol: fetches the package and missing assets,
+    then renders and returns segments until the coordinator is done.
+
+    segment_renderer renders one SegmentRenderTask to its settings.output_path
+    and returns a render_segment() style summary.
+    """
+
+    def __init__(self, host: str, port: int = DEFAULT_PORT, cache_dir: Optional[str] = None,
+                 backend: str = "opengl", name: Optional[str] = None,
+                 segment_renderer: Callable[[SegmentRenderTask], Dict[str, Any]] = render_segment,
+                 token: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "karaoke_render_assets")
+        self.backend = backend
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.segment_renderer = segment_renderer
+        self.token = token
+        self.segments_rendered = 0
+
+    def asset_path(self, digest: str, extension: str = "") -> str:
+        """Cache path of an asset; raises ValueError for names that are not a hash and extension"""
+        validate_asset_name(digest, extension)
+        return os.path.join(self.cache_dir, f"{digest}{extension or ''}")
+
+    def _cached_assets(self) -> Dict[str, str]:
+        """Map of content hash to cached file"""
+        if not os.path.isdir(self.cache_dir):
+            return {}
+        return {os.path.splitext(name)[0]: os.path.join(self.cache_dir, name)
+                for name in os.listdir(self.cache_dir) if not name.endswith(".part")}
+
+    def run(self) -> int:
+        """Serve one export; returns the number of segments rendered"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        sock = socket.create_connection((self.host, self.port))
+        channel = MessageChannel(sock)
+        work_dir = tempfile.mkdtemp(prefix="karaoke_segment_")
+
+        try:
+            cached = self._cached_assets()
+            channel.send({"type": "hello", "worker": self.name, "version": PROTOCOL_VERSION,
+                          "token": self.token, "assets": sorted(cached)})
+            reply = channel.receive()
+            if reply['type'] == "error":
+                raise ConnectionError(f"Coordinator rejected this worker: {reply.get('error')}")
+            package = reply['package']
+            if package.get("version") != PROTOCOL_VERSION:
+                raise ConnectionError(f"Coordinator speaks protocol version {package.get('version')}, "
+                                      f"this worker {PROTOCOL_VERSION}")
+
+            extensions = {entry["asset"]: entry["extension"]
+                          for entry in package["project"]["media"].values() if entry}
+            for digest, extension in extensions.items():
+                validate_asset_name(digest, extension)
+            missing = sorted(digest for digest in extensions if digest not in cached)
+            channel.send({"type": "need_assets", "hashes": missing})
+            for _ in missing:
+                self._receive_asset(channel, extensions)
+
+            project = project_from_package(package, self._cached_assets())
+            settings = _settings_from_dict(package["settings"])
+            channel.send({"type": "ready"})
+
+            while True:
+                message = channel.receive()
+                if message['type'] != "segment":
+                    break
+                self._render(channel, message, project, settings, package["gop_frames"], work_dir)
+        finally:
+            channel.close()
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        return self.segments_rendered
+
+    def _receive_asset(self, channel: MessageChannel, extensions: Dict[str, str]):
+        """Receive one asset into the cache, verifying its hash"""
+        message = channel.receive()
+        digest = message.get('hash')
+        if message['type'] != "asset" or digest not in extensions:
+            raise ConnectionError(f"Coordinator sent an asset that was not requested: {str(digest)[:80]!r}")
+        partial = self.asset_path(digest, ".part")
+        channel.receive_payload(message['size'], partial)
+        if file_digest(partial) != digest:
+            os.remove(partial)
+            raise ConnectionError(f"Asset {digest} arrived corrupted")
+        os.replace(partial, self.asset_path(digest, extensions.get(digest, "")))
+
+    def _render(self, channel: MessageChannel, message: Dict[str, Any], project: Project,
+                settings: EnhancedExportSettings, gop_frames: int, work_dir: str):
+        index = message['index']
+        output_path = os.path.join(work_dir, f"segment_{index:05d}.{settings.container_format.value}")
+        segment_settings = replace(settings, output_path=output_path, gop_size=gop_frames, closed_gop=True)
+
+        task = SegmentRenderTask(index, message['start_frame'], message['end_frame'], project,
+                                 segment_settings, self.backend)
+        try:
+            result = self.segment_renderer(task)
+        except Exception as e:
+            result = {"index": index, "frames": 0, "seconds": 0.0, "error": str(e)}
+
+        reply = {"type": "result", "index": index, "frames": result.get("frames", 0),
+                 "seconds": result.get("seconds", 0.0), "error": result.get("error")}
+        if not reply["error"] and os.path.exists(output_path):
+            channel.send(reply, output_path)
+            self.segments_rendered += 1
+        else:
+            channel.send(dict(reply, size=0, error=reply["error"] or "No segment output"))
+
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+
+def main(argv=None) -> int:
+    """Run a worker agent that serves one coordinator until it is done"""
+    parser = argparse.ArgumentParser(prog="karaoke-render-worker",
+                                     description="Render segments for a remote render coordinator")
+    parser.add_argument("coordinator", help="Coordinator address, HOST[:PORT]")
+    parser.add_argument("--backend", choices=HEADLESS_BACKENDS, default="opengl")
+    parser.add_argument("--cache-dir", help="Asset cache directory")
+    parser.add_argument("--name", help="Worker name reported to the coordinator")
+    parser.add_argument("--token", default=os.environ.get(TOKEN_ENVIRONMENT_VARIABLE),
+                        help=f"Shared token of the coordinator (default: ${TOKEN_ENVIRONMENT_VARIABLE})")
+    args = parser.parse_args(argv)
+
+    host, _, port = args.coordinator.partition(":")
+    agent = RenderWorkerAgent(host, int(port or DEFAULT_PORT), args.cache_dir, args.backend, args.name,
+                              token=args.token)
+    try:
+        count = agent.run()
+    except (OSError, ConnectionError, ValueError) as e:
+        print(f"Worker failed: {e}", file=sys.stderr)
+        return 1
+    print(f"Rendered {count} segment(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
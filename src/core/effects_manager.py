@@ -17,6 +17,29 @@ except ImportError:
     from models import Effect
 
 
+# Effect parameters measured in pixels, scaled by effect quality
+_PIXEL_EFFECT_PARAMETERS = ("radius", "width", "blur_radius")
+_MIN_EFFECT_PIXELS = 0.5
+
+
+def scale_effect_parameters(parameters: Dict[str, Any], quality: float) -> Dict[str, Any]:
+    """
+    Copy of effect parameters with pixel radii and widths scaled by quality.
+
+    Outline, glow and shadow shaders sample a neighbourhood whose size follows
+    these parameters, so halving them roughly quarters the samples per pixel.
+    """
+    if quality >= 1.0:
+        return dict(parameters)
+
+    scaled = dict(parameters)
+    for key in _PIXEL_EFFECT_PARAMETERS:
+        value = scaled.get(key)
+        if isinstance(value, (int, float)) and value > 0:
+            scaled[key] = max(_MIN_EFFECT_PIXELS, value * quality)
+    return scaled
+
+
 class EffectType(Enum):
     """Types of available text effects."""
     GLOW = "glow"
@@ -56,10 +79,13 @@ class EffectsManager:
     real-time preview capabilities.
     """
     
-    def __init__(self):
+    def __init__(self, effect_quality: float = 1.0):
         self.effect_layers: List[EffectLayer] = []
         self.effect_presets: Dict[str, EffectPreset] = {}
         self.shader_cache: Dict[str, str] = {}
+        # Scale of pixel radii in the rendered uniforms (draft exports use < 1.0);
+        # effect parameters keep their authored values
+        self.effect_quality = effect_quality
         self._initialize_default_effects()
         self._initialize_presets()
     
@@ -583,6 +609,8 @@ class EffectsManager:
         for layer in effect_layers:
             effect = layer.effect
             params = effect.parameters
+            if self.effect_quality < 1.0:
+                params = scale_effect_parameters(params, self.effect_quality)
             
             if effect.type == 'glow':
                 uniforms.update({
@@ -137,12 +137,12 @@ class EffectsRenderingPipeline:
     manages effect layering and composition, and provides real-time parameter adjustment.
     """
     
-    def __init__(self, opengl_context: OpenGLContext, mock_mode: bool = False):
+    def __init__(self, opengl_context: OpenGLContext, mock_mode: bool = False, effect_quality: float = 1.0):
         self.opengl_context = opengl_context
         self.mock_mode = mock_mode
         
         # Core components
-        self.effects_manager = EffectsManager()
+        self.effects_manager = EffectsManager(effect_quality=effect_quality)
         self.shader_system = VisualEffectsShaderSystem(mock_mode=mock_mode)
         
         # Pipeline state
@@ -13,9 +13,10 @@ import queue
 import time
 import re
 import json
+import logging
 import tempfile
 import shutil
-from typing import Optional, Dict, List, Any, Callable, Tuple, Union
+from typing import Optional, Dict, List, Any, Callable, Tuple, Union, Iterable
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
@@ -31,11 +32,32 @@ except ImportError:
 import numpy as np
 
 try:
-    from .frame_capture_system import CapturedFrame, PixelFormat
+    from .frame_capture_system import CapturedFrame, PixelFormat, FrameStream
+    from .timebase import Timebase
+    from .shared_frame_ring import SharedMemoryFrameWriter, LAYOUT_RGBA, LAYOUT_BGRA
+    from .timestamped_frames import TimestampedFrameStream, frame_writes
+    from .metrics import get_metrics_registry, PIPE_WRITE_SECONDS, FFMPEG_SPEED_RATIO, FRAMES_ENCODED_TOTAL
+    from .telemetry import (
+        TelemetryBus, TelemetrySnapshot, QtSignalSubscriber, LoggingSubscriber, MetricsSubscriber
+    )
+    from .render_trace import get_render_tracer
+    from .hardware_profile import STATIC_DEFAULTS
 except ImportError:
     import sys
     sys.path.append(os.path.dirname(__file__))
-    from frame_capture_system import CapturedFrame, PixelFormat
+    from frame_capture_system import CapturedFrame, PixelFormat, FrameStream
+    from timebase import Timebase
+    from shared_frame_ring import SharedMemoryFrameWriter, LAYOUT_RGBA, LAYOUT_BGRA
+    from timestamped_frames import TimestampedFrameStream, frame_writes
+    from metrics import get_metrics_registry, PIPE_WRITE_SECONDS, FFMPEG_SPEED_RATIO, FRAMES_ENCODED_TOTAL
+    from telemetry import (
+        TelemetryBus, TelemetrySnapshot, QtSignalSubscriber, LoggingSubscriber, MetricsSubscriber
+    )
+    from render_trace import get_render_tracer
+    from hardware_profile import STATIC_DEFAULTS
+
+
+logger = logging.getLogger(__name__)
 
 
 class FFmpegPreset(Enum):
@@ -109,6 +131,7 @@ class EnhancedExportSettings:
     audio_bitrate: int = 128  # kbps
     audio_sample_rate: int = 44100
     audio_channels: int = 2
+    audio_ranges: List[Tuple[float, float]] = field(default_factory=list)  # (start, duration) parts to use, joined in order; empty = whole file
     
     # Container and format
     container_format: ContainerFormat = ContainerFormat.MP4
@@ -123,11 +146,18 @@ class EnhancedExportSettings:
     # Performance settings
     threads: Optional[int] = None  # Number of encoding threads
     thread_type: str = "frame"  # "frame" or "slice"
+    multiprocess_writer: bool = False  # Write frames to FFmpeg from a separate process
+    timestamped_input: bool = False  # Send repeated frames once with timestamps; FFmpeg repeats them
+    writer_ring_slots: int = 4  # Shared-memory frame slots between render and writer process
     
     # Quality settings
     tune: Optional[str] = None  # e.g., "film", "animation", "grain"
     profile: Optional[str] = None  # e.g., "baseline", "main", "high"
     level: Optional[str] = None  # e.g., "3.1", "4.0", "4.1"
+    
+    # Keyframe placement
+    gop_size: Optional[int] = None  # Fixed keyframe interval in frames
+    closed_gop: bool = False  # GOPs never reference frames outside themselves
 
 
 @dataclass
@@ -163,7 +193,7 @@ class EnhancedFFmpegProcessor(QObject):
     # Status signals
     status_changed = pyqtSignal(str)  # Status message
     
-    def __init__(self):
+    def __init__(self, config_manager: Optional[Any] = None):
         super().__init__()
         
         # FFmpeg process management
@@ -175,12 +205,19 @@ class EnhancedFFmpegProcessor(QObject):
         self.frame_writer_thread: Optional[threading.Thread] = None
         self.progress_monitor_thread: Optional[threading.Thread] = None
         
+        # Separate encoder-writer process (multiprocess_writer mode)
+        self.process_writer: Optional[SharedMemoryFrameWriter] = None
+        
         # State management
         self.is_encoding = False
         self.should_cancel = False
         self.start_time = 0.0
         self.total_frames = 0
         self.current_frame = 0
+        self.bytes_written = 0  # Raw frame bytes handed to FFmpeg or the writer process
+        self.frame_stream: Optional[FrameStream] = None  # Input queue of encode_frames()
+        self.return_code: Optional[int] = None
+        self.error_message: Optional[str] = None
         
         # Settings and capabilities
         self.export_settings: Optional[EnhancedExportSettings] = None
@@ -188,14 +225,55 @@ class EnhancedFFmpegProcessor(QObject):
         
         # Progress tracking
         self.progress_info = FFmpegProgress()
+        self.metrics = get_metrics_registry()
+        self.tracer = get_render_tracer()
+        self._speed_ratio = 0.0
+        
+        # Written frames and FFmpeg progress go to the telemetry bus; signals,
+        # log lines and registry counters follow its rate-limited snapshots
+        self.telemetry = TelemetryBus()
+        self._encoded_counter = self.telemetry.counter("frames_encoded_total")
+        self._written_gauge = self.telemetry.gauge("frames_written")
+        self.telemetry.subscribe(MetricsSubscriber(self.metrics, {"frames_encoded_total": FRAMES_ENCODED_TOTAL}))
+        self.telemetry.subscribe(LoggingSubscriber(logger, self._format_stream_progress))
+        if PYQT_AVAILABLE:
+            self.telemetry.subscribe(QtSignalSubscriber(self.progress_updated, self._progress_dict))
         
         # Frame streaming optimization
-        self.frame_buffer_size = 10  # Number of frames to buffer
-        self.streaming_chunk_size = 1024 * 1024  # 1MB chunks
+        self.frame_buffer_size = STATIC_DEFAULTS["frame_buffer_size"]  # Number of frames to buffer
+        self.streaming_chunk_size = STATIC_DEFAULTS["streaming_chunk_mb"] * 1024 * 1024  # 1MB chunks
+        if config_manager is not None:
+            # Sized for this machine when the performance settings were tuned to its hardware
+            self.frame_buffer_size = int(config_manager.get_performance_setting(
+                "frame_buffer_size", self.frame_buffer_size))
+            self.streaming_chunk_size = int(float(config_manager.get_performance_setting(
+                "streaming_chunk_mb", STATIC_DEFAULTS["streaming_chunk_mb"])) * 1024 * 1024)
         
         # Check FFmpeg capabilities on initialization
         self._detect_capabilities()
     
+    def _progress_dict(self, snapshot: TelemetrySnapshot) -> Dict[str, Any]:
+        """Payload of the progress_updated signal"""
+        return {
+            'frame': self.progress_info.frame,
+            'fps': self.progress_info.fps,
+            'bitrate': self.progress_info.bitrate,
+            'total_size': self.progress_info.total_size,
+            'out_time': self.progress_info.out_time,
+            'speed': self.progress_info.speed,
+            'progress_percent': self.progress_info.progress_percent,
+            'estimated_remaining': self.progress_info.estimated_remaining,
+            'elapsed_time': self.progress_info.elapsed_time,
+            'frames_written': int(snapshot.gauges["frames_written"])
+        }
+    
+    def _format_stream_progress(self, snapshot: TelemetrySnapshot) -> Optional[str]:
+        written = int(snapshot.gauges["frames_written"])
+        if not self.total_frames or not written:
+            return None
+        return (f"Streamed frame {written}/{self.total_frames} ({written / self.total_frames * 100:.1f}%) - "
+                f"{snapshot.rates['frames_encoded_total']:.1f} fps")
+    
     def _detect_capabilities(self) -> FFmpegCapabilities:
         """Detect FFmpeg installation and capabilities"""
         capabilities = FFmpegCapabilities()
@@ -537,19 +615,38 @@ class EnhancedFFmpegProcessor(QObject):
             elif settings.hardware_acceleration == "vaapi":
                 cmd.extend(["-hwaccel", "vaapi"])
         
-        # Input: raw video from stdin
-        cmd.extend([
-            "-f", "rawvideo",
-            "-pix_fmt", "rgba",
-            "-s", f"{settings.width}x{settings.height}",
-            "-r", str(settings.fps),
-            "-i", "pipe:0"
-        ])
-        
-        # Input: audio file (if provided)
-        if input_audio and os.path.exists(input_audio):
+        # Input: raw video from stdin (NTSC rates passed as exact fractions), or
+        # timestamped frames that the fps filter repeats up to the next frame
+        timebase = Timebase.from_fps(settings.fps)
+        input_rate = str(settings.fps) if timebase.denominator == 1 else timebase.ffmpeg_rate
+        video_filters = list(settings.custom_filters)
+        if settings.timestamped_input:
+            cmd.extend(["-f", "matroska", "-i", "pipe:0"])
+            video_filters.insert(0, self._timestamped_stream(settings).fps_filter())
+        else:
+            cmd.extend([
+                "-f", "rawvideo",
+                "-pix_fmt", "rgba",
+                "-s", f"{settings.width}x{settings.height}",
+                "-r", input_rate,
+                "-i", "pipe:0"
+            ])
+        
+        # Input: audio file (if provided), trimmed to the rendered time ranges
+        has_audio = bool(input_audio and os.path.exists(input_audio))
+        if has_audio and settings.audio_ranges:
+            for start, duration in settings.audio_ranges:
+                cmd.extend(["-ss", f"{start:.6f}", "-t", f"{duration:.6f}", "-i", input_audio])
+        elif has_audio:
             cmd.extend(["-i", input_audio])
         
+        # Several audio parts are joined into one track alongside the video
+        if has_audio and len(settings.audio_ranges) > 1:
+            parts = len(settings.audio_ranges)
+            streams = "".join(f"[{index}:a]" for index in range(1, parts + 1))
+            cmd.extend(["-filter_complex", f"{streams}concat=n={parts}:v=0:a=1[audio]",
+                        "-map", "0:v", "-map", "[audio]"])
+        
         # Video encoding options
         cmd.extend(["-c:v", settings.video_codec.value])
         
@@ -579,11 +676,18 @@ class EnhancedFFmpegProcessor(QObject):
         if settings.level:
             cmd.extend(["-level", settings.level])
         
+        # Keyframe placement (fixed intervals keep independently encoded parts aligned)
+        if settings.gop_size:
+            cmd.extend(["-g", str(settings.gop_size), "-keyint_min", str(settings.gop_size),
+                        "-sc_threshold", "0"])
+        if settings.closed_gop:
+            cmd.extend(["-flags", "+cgop"])
+        
         # Pixel format
         cmd.extend(["-pix_fmt", settings.pixel_format])
         
         # Audio encoding (if audio input is provided)
-        if input_audio and os.path.exists(input_audio):
+        if has_audio:
             cmd.extend([
                 "-c:a", settings.audio_codec.value,
                 "-b:a", f"{settings.audio_bitrate}k",
@@ -595,8 +699,8 @@ class EnhancedFFmpegProcessor(QObject):
             cmd.extend(["-an"])
         
         # Custom filters
-        if settings.custom_filters:
-            filter_string = ",".join(settings.custom_filters)
+        if video_filters:
+            filter_string = ",".join(video_filters)
             cmd.extend(["-vf", filter_string])
         
         # Metadata
@@ -614,6 +718,10 @@ class EnhancedFFmpegProcessor(QObject):
         
         return cmd
     
+    @staticmethod
+    def _timestamped_stream(settings: EnhancedExportSettings) -> TimestampedFrameStream:
+        return TimestampedFrameStream(settings.width, settings.height, settings.fps)
+    
     def start_encoding(self, settings: EnhancedExportSettings, 
                       frame_source: Callable[[], Optional[CapturedFrame]],
                       total_frames: int,
@@ -621,26 +729,34 @@ class EnhancedFFmpegProcessor(QObject):
         """Start FFmpeg encoding process with frame streaming"""
         
         if self.is_encoding:
-            print("Encoding already in progress")
+            logger.warning("Encoding already in progress")
             return False
         
         # Validate settings
         validation_errors = self.validate_settings(settings)
         if validation_errors:
             error_msg = "Settings validation failed:\n" + "\n".join(validation_errors)
+            self.error_message = error_msg
             self.encoding_failed.emit(error_msg)
             return False
         
         self.export_settings = settings
         self.total_frames = total_frames
         self.current_frame = 0
+        self.bytes_written = 0
+        self._written_gauge.set(0)
         self.should_cancel = False
+        self.return_code = None
+        self.error_message = None
         self.start_time = time.time()
         
         try:
             # Build FFmpeg command
             cmd = self.build_ffmpeg_command(settings, input_audio)
-            print(f"FFmpeg command: {' '.join(cmd)}")
+            logger.info(f"FFmpeg command: {' '.join(cmd)}")
+            
+            if settings.multiprocess_writer:
+                return self._start_process_writer(settings, cmd, frame_source)
             
             # Start FFmpeg process
             self.ffmpeg_process = subprocess.Popen(
@@ -658,12 +774,14 @@ class EnhancedFFmpegProcessor(QObject):
             self.frame_writer_thread = threading.Thread(
                 target=self._frame_writer_worker,
                 args=(frame_source,),
+                name="ffmpeg-frame-writer",
                 daemon=True
             )
             
             # Start progress monitor thread
             self.progress_monitor_thread = threading.Thread(
                 target=self._progress_monitor_worker,
+                name="ffmpeg-progress-monitor",
                 daemon=True
             )
             
@@ -677,12 +795,13 @@ class EnhancedFFmpegProcessor(QObject):
             if PYQT_AVAILABLE:
                 self.encoding_started.emit()
             
-            print("FFmpeg encoding started")
+            logger.info("FFmpeg encoding started")
             return True
             
         except Exception as e:
             error_msg = f"Failed to start FFmpeg encoding: {e}"
-            print(error_msg)
+            self.error_message = error_msg
+            logger.error(error_msg)
             if PYQT_AVAILABLE:
                 self.encoding_failed.emit(error_msg)
             return False
@@ -696,65 +815,94 @@ class EnhancedFFmpegProcessor(QObject):
             write_buffer = bytearray()
             buffer_flush_threshold = self.streaming_chunk_size
             
+            stream = None
+            if self.export_settings and self.export_settings.timestamped_input:
+                stream = self._timestamped_stream(self.export_settings)
+                write_buffer.extend(stream.header())
+            
             while not self.should_cancel and frame_count < self.total_frames:
                 try:
                     # Get next frame
+                    trace_start = self.tracer.begin()
                     frame = frame_source()
                     
                     if frame is None:
-                        print(f"No more frames available at frame {frame_count}")
+                        logger.info(f"No more frames available at frame {frame_count}")
                         break
+                    self.tracer.end("frame_wait", trace_start, frame.frame_number)
                     
                     # Convert frame data to the format expected by FFmpeg
+                    trace_start = self.tracer.begin()
                     frame_data = self._prepare_frame_for_ffmpeg(frame)
+                    self.tracer.end("prepare", trace_start, frame.frame_number)
                     
                     if frame_data is not None:
-                        # Add frame data to buffer for optimized streaming
-                        write_buffer.extend(frame_data)
-                        frame_count += 1
-                        self.current_frame = frame_count
                         consecutive_failures = 0  # Reset failure counter
                         
-                        # Flush buffer when it reaches threshold or on last frame
-                        if len(write_buffer) >= buffer_flush_threshold or frame_count >= self.total_frames:
-                            try:
-                                self.ffmpeg_process.stdin.write(write_buffer)
-                                self.ffmpeg_process.stdin.flush()
-                                write_buffer.clear()
-                                
-                            except BrokenPipeError:
-                                print("FFmpeg process closed stdin pipe")
-                                break
-                            except OSError as e:
-                                if e.errno == 32:  # Broken pipe
-                                    print("FFmpeg process terminated unexpectedly")
+                        # The raw video pipe has no per-frame durations, so a planned frame
+                        # is written once per output frame it covers; a timestamped stream
+                        # sends it once and FFmpeg repeats it
+                        repeat = min(max(1, getattr(frame, 'repeat', 1)), self.total_frames - frame_count)
+                        if stream is not None:
+                            writes = frame_writes(frame_count, repeat, self.total_frames)
+                        else:
+                            writes = [(frame_count + copy, 1) for copy in range(repeat)]
+                        pipe_closed = False
+                        for index, covered in writes:
+                            # Add frame data to buffer for optimized streaming
+                            if stream is not None:
+                                write_buffer.extend(stream.block_header(index))
+                            write_buffer.extend(frame_data)
+                            frame_count += covered
+                            self.current_frame = frame_count
+                            self._encoded_counter.add(covered)
+                            self._written_gauge.set(frame_count)
+                            
+                            # Flush buffer when it reaches threshold or on last frame
+                            if len(write_buffer) >= buffer_flush_threshold or frame_count >= self.total_frames:
+                                try:
+                                    trace_start = self.tracer.begin()
+                                    with self.metrics.time(PIPE_WRITE_SECONDS):
+                                        self.ffmpeg_process.stdin.write(write_buffer)
+                                        self.ffmpeg_process.stdin.flush()
+                                    self.tracer.end("pipe_write", trace_start, frame.frame_number)
+                                    self.bytes_written += len(write_buffer)
+                                    write_buffer.clear()
+                                    
+                                except BrokenPipeError:
+                                    logger.info("FFmpeg process closed stdin pipe")
+                                    pipe_closed = True
                                     break
-                                else:
-                                    raise
+                                except OSError as e:
+                                    if e.errno == 32:  # Broken pipe
+                                        logger.error("FFmpeg process terminated unexpectedly")
+                                        pipe_closed = True
+                                        break
+                                    else:
+                                        raise
                         
-                        # Update progress less frequently for better performance
-                        if frame_count % 30 == 0:  # Update every 30 frames
-                            progress_percent = (frame_count / self.total_frames) * 100
-                            print(f"Streamed frame {frame_count}/{self.total_frames} ({progress_percent:.1f}%)")
+                        self.telemetry.publish_if_due()
+                        if pipe_closed:
+                            break
                         
                     else:
                         consecutive_failures += 1
-                        print(f"Failed to prepare frame {frame_count} for FFmpeg (failure {consecutive_failures})")
+                        logger.error(f"Failed to prepare frame {frame_count} for FFmpeg (failure {consecutive_failures})")
                         
                         if consecutive_failures >= max_consecutive_failures:
                             error_msg = f"Too many consecutive frame preparation failures ({consecutive_failures})"
-                            print(error_msg)
+                            logger.error(error_msg)
                             if PYQT_AVAILABLE:
                                 self.encoding_failed.emit(error_msg)
                             break
                 
                 except Exception as e:
                     consecutive_failures += 1
-                    print(f"Error processing frame {frame_count}: {e}")
+                    logger.error(f"Error processing frame {frame_count}: {e}")
                     
                     if consecutive_failures >= max_consecutive_failures:
                         error_msg = f"Too many consecutive frame processing errors: {e}"
-                        print(error_msg)
+                        logger.error(error_msg)
                         if PYQT_AVAILABLE:
                             self.encoding_failed.emit(error_msg)
                         break
@@ -764,21 +912,22 @@ class EnhancedFFmpegProcessor(QObject):
                 try:
                     self.ffmpeg_process.stdin.write(write_buffer)
                     self.ffmpeg_process.stdin.flush()
+                    self.bytes_written += len(write_buffer)
                 except Exception as e:
-                    print(f"Error flushing final buffer: {e}")
+                    logger.error(f"Error flushing final buffer: {e}")
             
             # Close stdin to signal end of input
             if self.ffmpeg_process and self.ffmpeg_process.stdin:
                 try:
                     self.ffmpeg_process.stdin.close()
                 except Exception as e:
-                    print(f"Error closing FFmpeg stdin: {e}")
+                    logger.error(f"Error closing FFmpeg stdin: {e}")
             
-            print(f"Frame writer completed: {frame_count} frames written")
+            logger.info(f"Frame writer completed: {frame_count} frames written")
             
         except Exception as e:
             error_msg = f"Frame writer thread error: {e}"
-            print(error_msg)
+            logger.error(error_msg)
             if PYQT_AVAILABLE:
                 self.encoding_failed.emit(f"Frame writing failed: {e}")
     
@@ -791,7 +940,7 @@ class EnhancedFFmpegProcessor(QObject):
                 frame_data = frame.data
             else:
                 # Convert to RGBA if needed
-                print(f"Warning: Frame format {frame.pixel_format} may need conversion")
+                logger.warning(f"Frame format {frame.pixel_format} may need conversion")
                 frame_data = frame.data
             
             # Ensure data is contiguous and in the right shape
@@ -805,7 +954,7 @@ class EnhancedFFmpegProcessor(QObject):
             return frame_bytes
             
         except Exception as e:
-            print(f"Error preparing frame for FFmpeg: {e}")
+            logger.error(f"Error preparing frame for FFmpeg: {e}")
             return None
     
     def _progress_monitor_worker(self):
@@ -814,76 +963,262 @@ class EnhancedFFmpegProcessor(QObject):
             if not self.ffmpeg_process or not self.ffmpeg_process.stderr:
                 return
             
-            stderr_buffer = ""
-            error_lines = []
-            warning_lines = []
+            lines = (line.decode('utf-8', errors='replace')
+                     for line in iter(self.ffmpeg_process.stderr.readline, b''))
+            self._monitor_ffmpeg_output(lines, self.ffmpeg_process.wait)
             
-            # Read progress from FFmpeg stderr
-            for line in iter(self.ffmpeg_process.stderr.readline, b''):
-                if self.should_cancel:
+        except Exception as e:
+            error_msg = f"Progress monitor thread error: {e}"
+            self.error_message = error_msg
+            logger.error(error_msg)
+            if PYQT_AVAILABLE:
+                self.encoding_failed.emit(f"Progress monitoring failed: {e}")
+        
+        finally:
+            self.is_encoding = False
+    
+    def encode_frames(self, settings: EnhancedExportSettings, frames: Iterable[CapturedFrame],
+                      total_frames: int, input_audio: Optional[str] = None,
+                      progress_callback: Optional[Callable[[int], None]] = None,
+                      buffer_size: Optional[int] = None) -> bool:
+        """
+        Encode frames produced on the calling thread and wait for FFmpeg.
+        
+        Frames are pulled from ``frames`` here (e.g. where the OpenGL context is
+        current) and passed to the writer thread through a bounded FrameStream.
+        progress_callback receives the number of frames handed over so far.
+        Returns True if every frame was encoded; otherwise ``error_message``
+        describes the failure. buffer_size defaults to frame_buffer_size.
+        """
+        stream = FrameStream(max_frames=buffer_size or self.frame_buffer_size)
+        self.frame_stream = stream
+        if not self.start_encoding(settings, stream.next_frame, total_frames, input_audio):
+            return False
+        
+        # If FFmpeg exits early, stop blocking on a stream nobody reads any more
+        def cancel_stream_when_encoder_stops():
+            self.wait_for_completion()
+            stream.cancel()
+        
+        threading.Thread(target=cancel_stream_when_encoder_stops, daemon=True).start()
+        
+        frames_sent = 0
+        try:
+            for frame in frames:
+                if not stream.put(frame):
                     break
+                frames_sent += getattr(frame, 'repeat', 1)
+                if progress_callback:
+                    progress_callback(frames_sent)
+        except BaseException:
+            stream.cancel()
+            self.cancel_encoding()
+            raise
+        
+        stream.close()
+        if not self.wait_for_completion():
+            return False
+        if frames_sent < total_frames:
+            self.error_message = f"Only {frames_sent} of {total_frames} frames were rendered"
+            return False
+        return True
+    
+    def wait_for_completion(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the encode started by start_encoding() has finished.
+        
+        Returns True if FFmpeg exited successfully; otherwise ``error_message``
+        describes the failure. Intended for callers without a Qt event loop.
+        """
+        if self.progress_monitor_thread:
+            self.progress_monitor_thread.join(timeout)
+            if self.progress_monitor_thread.is_alive():
+                return False
+        return self.return_code == 0 and not self.should_cancel
+    
+    def _monitor_ffmpeg_output(self, lines: Iterable[str], wait_for_exit: Callable[[], int]):
+        """Parse FFmpeg stderr lines, then report how the encode finished"""
+        stderr_buffer = ""
+        error_lines = []
+        warning_lines = []
+        
+        # Read progress from FFmpeg stderr
+        for line in lines:
+            if self.should_cancel:
+                break
+            
+            try:
+                line_str = line.strip()
                 
-                try:
-                    line_str = line.decode('utf-8', errors='replace').strip()
+                if line_str:
+                    # Collect stderr output for error analysis
+                    stderr_buffer += line_str + "\n"
                     
-                    if line_str:
-                        # Collect stderr output for error analysis
-                        stderr_buffer += line_str + "\n"
-                        
-                        # Categorize different types of output
-                        if line_str.startswith('frame=') or '=' in line_str:
-                            # Progress information
-                            self._parse_progress_line(line_str)
-                        elif any(keyword in line_str.lower() for keyword in ['error', 'failed', 'cannot', 'invalid']):
-                            # Error messages
-                            error_lines.append(line_str)
-                            print(f"FFmpeg Error: {line_str}")
-                        elif any(keyword in line_str.lower() for keyword in ['warning', 'deprecated']):
-                            # Warning messages
-                            warning_lines.append(line_str)
-                            print(f"FFmpeg Warning: {line_str}")
-                        elif 'configuration:' in line_str.lower():
-                            # Configuration info (usually at start)
-                            continue
-                        elif line_str.startswith('Input #') or line_str.startswith('Output #'):
-                            # Stream information
-                            print(f"FFmpeg Info: {line_str}")
-                        elif 'Stream mapping:' in line_str:
-                            # Stream mapping info
-                            print(f"FFmpeg Info: {line_str}")
-                        
-                except UnicodeDecodeError:
-                    # Skip lines that can't be decoded
-                    continue
-                except Exception as e:
-                    print(f"Error parsing progress line: {e}")
-            
-            # Wait for process to complete
-            if self.ffmpeg_process:
-                return_code = self.ffmpeg_process.wait()
+                    # Categorize different types of output
+                    if line_str.startswith('frame=') or '=' in line_str:
+                        # Progress information
+                        self._parse_progress_line(line_str)
+                    elif any(keyword in line_str.lower() for keyword in ['error', 'failed', 'cannot', 'invalid']):
+                        # Error messages
+                        error_lines.append(line_str)
+                        logger.error(f"FFmpeg Error: {line_str}")
+                    elif any(keyword in line_str.lower() for keyword in ['warning', 'deprecated']):
+                        # Warning messages
+                        warning_lines.append(line_str)
+                        logger.warning(f"FFmpeg warning: {line_str}")
+                    elif 'configuration:' in line_str.lower():
+                        # Configuration info (usually at start)
+                        continue
+                    elif line_str.startswith('Input #') or line_str.startswith('Output #'):
+                        # Stream information
+                        logger.info(f"FFmpeg Info: {line_str}")
+                    elif 'Stream mapping:' in line_str:
+                        # Stream mapping info
+                        logger.info(f"FFmpeg Info: {line_str}")
+                    
+            except Exception as e:
+                logger.error(f"Error parsing progress line: {e}")
+        
+        # Wait for process to complete
+        trace_start = self.tracer.begin()
+        return_code = wait_for_exit()
+        self.tracer.end("ffmpeg_exit", trace_start)
+        self.return_code = return_code
+        self.telemetry.publish()
+        
+        if return_code == 0 and not self.should_cancel:
+            logger.info("FFmpeg encoding completed successfully")
+            if warning_lines:
+                logger.warning(f"Encoding completed with {len(warning_lines)} warnings")
+            if PYQT_AVAILABLE:
+                self.encoding_completed.emit(self.export_settings.output_path)
+        elif self.should_cancel:
+            logger.info("FFmpeg encoding was cancelled")
+        else:
+            # Analyze error output for better error reporting
+            error_msg = self._analyze_ffmpeg_errors(return_code, error_lines, stderr_buffer)
+            self.error_message = error_msg
+            logger.error(error_msg)
+            if PYQT_AVAILABLE:
+                self.encoding_failed.emit(error_msg)
+    
+    def _start_process_writer(self, settings: EnhancedExportSettings, cmd: List[str],
+                              frame_source: Callable[[], Optional[CapturedFrame]]) -> bool:
+        """Start encoding with frames handed to a writer process through shared memory"""
+        stream = self._timestamped_stream(settings) if settings.timestamped_input else None
+        self.process_writer = SharedMemoryFrameWriter(
+            cmd, settings.width, settings.height, slots=settings.writer_ring_slots,
+            stream_spec=stream.spec() if stream else None
+        )
+        if not self.process_writer.start():
+            error_msg = self.process_writer.error or "Failed to start frame writer process"
+            if PYQT_AVAILABLE:
+                self.encoding_failed.emit(error_msg)
+            self.process_writer = None
+            return False
+        
+        # Frames are copied into the ring on a thread so frame_source keeps its caller contract
+        self.frame_writer_thread = threading.Thread(
+            target=self._ring_feeder_worker,
+            args=(frame_source,),
+            name="ffmpeg-ring-feeder",
+            daemon=True
+        )
+        self.progress_monitor_thread = threading.Thread(
+            target=self._process_writer_monitor_worker,
+            name="ffmpeg-progress-monitor",
+            daemon=True
+        )
+        
+        self.is_encoding = True
+        self.frame_writer_thread.start()
+        self.progress_monitor_thread.start()
+        
+        if PYQT_AVAILABLE:
+            self.encoding_started.emit()
+        
+        logger.info("FFmpeg encoding started (separate writer process)")
+        return True
+    
+    def _ring_feeder_worker(self, frame_source: Callable[[], Optional[CapturedFrame]]):
+        """Worker thread copying frames from frame_source into the shared-memory ring"""
+        writer = self.process_writer
+        frame_count = 0
+        
+        try:
+            while not self.should_cancel and frame_count < self.total_frames:
+                trace_start = self.tracer.begin()
+                frame = frame_source()
+                
+                if frame is None:
+                    logger.info(f"No more frames available at frame {frame_count}")
+                    break
+                self.tracer.end("frame_wait", trace_start, frame.frame_number)
+                
+                if frame.pixel_format == PixelFormat.BGRA8:
+                    layout = LAYOUT_BGRA
+                elif frame.pixel_format == PixelFormat.RGBA8:
+                    layout = LAYOUT_RGBA
+                else:
+                    logger.warning(f"Frame format {frame.pixel_format} may need conversion")
+                    layout = LAYOUT_RGBA
                 
-                if return_code == 0 and not self.should_cancel:
-                    print("FFmpeg encoding completed successfully")
-                    if warning_lines:
-                        print(f"Encoding completed with {len(warning_lines)} warnings")
-                    if PYQT_AVAILABLE:
-                        self.encoding_completed.emit(self.export_settings.output_path)
-                elif self.should_cancel:
-                    print("FFmpeg encoding was cancelled")
+                # Planned frames covering several output frames go into the ring once per
+                # output frame, or once at their output frame index for a timestamped stream
+                repeat = min(max(1, getattr(frame, 'repeat', 1)), self.total_frames - frame_count)
+                if writer.stream_spec:
+                    writes = frame_writes(frame_count, repeat, self.total_frames)
                 else:
-                    # Analyze error output for better error reporting
-                    error_msg = self._analyze_ffmpeg_errors(return_code, error_lines, stderr_buffer)
-                    print(error_msg)
-                    if PYQT_AVAILABLE:
-                        self.encoding_failed.emit(error_msg)
+                    writes = [(frame.frame_number + copy, 1) for copy in range(repeat)]
+                written = True
+                for frame_number, covered in writes:
+                    trace_start = self.tracer.begin()
+                    with self.metrics.time(PIPE_WRITE_SECONDS):
+                        written = writer.write_frame(frame.data, frame_number, frame.timestamp, layout)
+                    self.tracer.end("ring_write", trace_start, frame_number)
+                    if not written:
+                        break
+                    
+                    frame_count += covered
+                    self.current_frame = frame_count
+                    self.bytes_written += frame.data.nbytes
+                    self._encoded_counter.add(covered)
+                    self._written_gauge.set(frame_count)
+                
+                self.telemetry.publish_if_due()
+                if not written:
+                    logger.error(f"Frame writer process stopped: {writer.error}")
+                    break
+            
+            logger.info(f"Frame feeder completed: {frame_count} frames written to shared memory")
+            
+        except Exception as e:
+            error_msg = f"Frame feeder thread error: {e}"
+            logger.error(error_msg)
+            if PYQT_AVAILABLE:
+                self.encoding_failed.emit(f"Frame writing failed: {e}")
+        
+        finally:
+            # Signal end of input so FFmpeg can finish the file
+            writer.finish_input()
+    
+    def _process_writer_monitor_worker(self):
+        """Worker thread relaying FFmpeg output from the writer process"""
+        writer = self.process_writer
+        try:
+            self._monitor_ffmpeg_output(writer.iter_output_lines(), writer.wait)
             
         except Exception as e:
             error_msg = f"Progress monitor thread error: {e}"
-            print(error_msg)
+            self.error_message = error_msg
+            logger.error(error_msg)
             if PYQT_AVAILABLE:
                 self.encoding_failed.emit(f"Progress monitoring failed: {e}")
         
         finally:
+            if self.frame_writer_thread and self.frame_writer_thread.is_alive():
+                self.frame_writer_thread.join(timeout=5)
+            writer.close()
             self.is_encoding = False
     
     def _analyze_ffmpeg_errors(self, return_code: int, error_lines: List[str], stderr_output: str) -> str:
@@ -955,6 +1290,9 @@ class EnhancedFFmpegProcessor(QObject):
                     self.progress_info.drop_frames = int(value)
                 elif key == 'speed':
                     self.progress_info.speed = value
+                    if value.endswith('x'):
+                        self._speed_ratio = float(value[:-1])
+                        self.metrics.histogram(FFMPEG_SPEED_RATIO, resolution=0.001).record(self._speed_ratio)
                 elif key == 'progress':
                     self.progress_info.progress = value
                 
@@ -970,32 +1308,33 @@ class EnhancedFFmpegProcessor(QObject):
                     if self.progress_info.fps > 0:
                         self.progress_info.estimated_remaining = frames_remaining / self.progress_info.fps
                 
-                # Emit progress update
-                if PYQT_AVAILABLE:
-                    progress_dict = {
-                        'frame': self.progress_info.frame,
-                        'fps': self.progress_info.fps,
-                        'bitrate': self.progress_info.bitrate,
-                        'total_size': self.progress_info.total_size,
-                        'out_time': self.progress_info.out_time,
-                        'speed': self.progress_info.speed,
-                        'progress_percent': self.progress_info.progress_percent,
-                        'estimated_remaining': self.progress_info.estimated_remaining,
-                        'elapsed_time': self.progress_info.elapsed_time
-                    }
-                    self.progress_updated.emit(progress_dict)
+                # A progress block from FFmpeg ends with its progress= line
+                if key == 'progress':
+                    self.tracer.counter("ffmpeg", {"fps": self.progress_info.fps,
+                                                   "speed": self._speed_ratio})
+                    self.telemetry.publish_if_due()
         
         except Exception as e:
-            print(f"Error parsing progress line '{line}': {e}")
+            logger.error(f"Error parsing progress line '{line}': {e}")
+    
+    def register_resources(self, sampler):
+        """Report FFmpeg input throughput and the encoder's frame queue to a ResourceSampler"""
+        sampler.add_throughput("ffmpeg_input", lambda: self.bytes_written)
+        sampler.add_queue("encoder_input",
+                          lambda: self.frame_stream.queue.qsize() if self.frame_stream else 0)
     
     def cancel_encoding(self):
         """Cancel ongoing encoding process"""
         if not self.is_encoding:
             return
         
-        print("Cancelling FFmpeg encoding...")
+        logger.info("Cancelling FFmpeg encoding...")
         self.should_cancel = True
         
+        # Stop the writer process (it terminates its own FFmpeg process)
+        if self.process_writer:
+            self.process_writer.cancel()
+        
         # Terminate FFmpeg process
         if self.ffmpeg_process:
             try:
@@ -1005,15 +1344,15 @@ class EnhancedFFmpegProcessor(QObject):
                 try:
                     self.ffmpeg_process.wait(timeout=5)
                 except subprocess.TimeoutExpired:
-                    print("FFmpeg did not terminate gracefully, killing...")
+                    logger.warning("FFmpeg did not terminate gracefully, killing...")
                     self.ffmpeg_process.kill()
                     try:
                         self.ffmpeg_process.wait(timeout=2)
                     except subprocess.TimeoutExpired:
-                        print("FFmpeg process could not be killed")
+                        logger.error("FFmpeg process could not be killed")
                 
             except Exception as e:
-                print(f"Error terminating FFmpeg process: {e}")
+                logger.error(f"Error terminating FFmpeg process: {e}")
         
         # Wait for threads to finish
         if self.frame_writer_thread and self.frame_writer_thread.is_alive():
@@ -1023,7 +1362,7 @@ class EnhancedFFmpegProcessor(QObject):
             self.progress_monitor_thread.join(timeout=5)
         
         self.is_encoding = False
-        print("FFmpeg encoding cancelled")
+        logger.info("FFmpeg encoding cancelled")
     
     def get_progress_info(self) -> FFmpegProgress:
         """Get current progress information"""
@@ -1042,8 +1381,12 @@ class EnhancedFFmpegProcessor(QObject):
             except queue.Empty:
                 pass
         
+        if self.process_writer:
+            self.process_writer.close()
+        
         # Reset state
         self.ffmpeg_process = None
+        self.process_writer = None
         self.frame_queue = None
         self.frame_writer_thread = None
         self.progress_monitor_thread = None
@@ -1214,10 +1557,18 @@ class BatchFFmpegProcessor(QObject):
     # Overall progress
     overall_progress = pyqtSignal(dict)  # overall progress info
     
-    def __init__(self, max_concurrent_jobs: int = 1):
+    def __init__(self, max_concurrent_jobs: Optional[int] = None, config_manager: Optional[Any] = None):
         super().__init__()
         
+        # Without an explicit limit, run as many jobs as the performance
+        # settings allow (tuned to the machine's cores, memory and temp space)
+        if max_concurrent_jobs is None:
+            max_concurrent_jobs = STATIC_DEFAULTS["max_concurrent_jobs"]
+            if config_manager is not None:
+                max_concurrent_jobs = int(config_manager.get_performance_setting(
+                    "max_concurrent_jobs", max_concurrent_jobs))
         self.max_concurrent_jobs = max_concurrent_jobs
+        self.config_manager = config_manager
         self.jobs: List[BatchExportJob] = []
         self.active_processors: Dict[str, EnhancedFFmpegProcessor] = {}
         self.is_processing = False
@@ -1307,7 +1658,7 @@ class BatchFFmpegProcessor(QObject):
         print(f"Starting job {job.job_id}")
         
         # Create processor for this job
-        processor = EnhancedFFmpegProcessor()
+        processor = EnhancedFFmpegProcessor(self.config_manager)
         
         # Connect signals
         processor.encoding_started.connect(lambda: self._on_job_started(job.job_id))
@@ -1525,9 +1876,10 @@ class BatchFFmpegProcessor(QObject):
         print(f"Cleared completed jobs, {len(self.jobs)} jobs remaining")
 
 
-def create_batch_processor(max_concurrent_jobs: int = 1) -> BatchFFmpegProcessor:
+def create_batch_processor(max_concurrent_jobs: Optional[int] = None,
+                           config_manager: Optional[Any] = None) -> BatchFFmpegProcessor:
     """Create a batch FFmpeg processor"""
-    return BatchFFmpegProcessor(max_concurrent_jobs)
+    return BatchFFmpegProcessor(max_concurrent_jobs, config_manager)
 
 
 if __name__ == "__main__":
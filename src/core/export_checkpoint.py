@@ -0,0 +1,245 @@
+"""
+Export Checkpointing
+
+Long exports are encoded as a series of independent, closed-GOP video
+segments next to the output file. A manifest records the segment frame
+ranges together with a fingerprint of the project and a hash of the export
+settings, and is rewritten atomically each time a segment completes. A retry
+or a restart after a crash reuses every completed segment whose inputs are
+unchanged, renders only the rest, and joins the segments with FFmpeg's concat
+demuxer without re-encoding the video.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+from dataclasses import dataclass, asdict, fields, is_dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Optional, List, Dict, Any
+
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Project fields that do not change the rendered output
+_UNRENDERED_PROJECT_FIELDS = ("id", "name", "created_at", "modified_at", "export_settings")
+
+
+def _file_identity(path: str) -> str:
+    """Identify a media file by path, size and modification time"""
+    try:
+        stat = os.stat(path)
+        return f"{path}:{stat.st_size}:{stat.st_mtime_ns}"
+    except OSError:
+        return path
+
+
+def _stable_value(value: Any) -> Any:
+    """Convert dataclasses, enums and datetimes into JSON-stable values"""
+    if is_dataclass(value):
+        return {f.name: _stable_value(getattr(value, f.name)) for f in fields(value)}
+    if isinstance(value, dict):
+        return {str(k): _stable_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_stable_value(v) for v in value]
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return _stable_value(value.value)
+    return value
+
+
+def project_fingerprint(project: Any) -> str:
+    """
+    Hash of everything in a project that affects rendered frames.
+
+    Media files contribute their size and modification time, so replacing a
+    file with different content at the same path invalidates the checkpoint.
+    """
+    data = {f.name: _stable_value(getattr(project, f.name))
+            for f in fields(project) if f.name not in _UNRENDERED_PROJECT_FIELDS}
+
+    media = []
+    for attribute in ("video_file", "image_file", "audio_file", "subtitle_file"):
+        media_file = getattr(project, attribute, None)
+        if media_file is not None and getattr(media_file, 'path', None):
+            media.append(_file_identity(media_file.path))
+    data['media'] = media
+
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def settings_hash(settings: Any, exclude: tuple = ("output_path", "cleanup_temp")) -> str:
+    """Hash of the export settings that affect encoded segments"""
+    data = {key: value for key, value in _stable_value(settings).items() if key not in exclude}
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+@dataclass
+class ExportSegment:
+    """A contiguous frame range encoded into its own file"""
+    index: int
+    start_frame: int
+    end_frame: int  # Exclusive
+    filename: str
+    completed: bool = False
+
+    @property
+    def frame_count(self) -> int:
+        return self.end_frame - self.start_frame
+
+
+class ExportCheckpoint:
+    """
+    Segment manifest for one output file.
+
+    Segments and the manifest live in ``<output_path>.segments/``.
+    """
+
+    def __init__(self, output_path: str, fingerprint: str, settings_digest: str,
+                 total_frames: int, segments: List[ExportSegment]):
+        self.output_path = output_path
+        self.segment_dir = f"{output_path}.segments"
+        self.fingerprint = fingerprint
+        self.settings_digest = settings_digest
+        self.total_frames = total_frames
+        self.segments = segments
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.segment_dir, MANIFEST_NAME)
+
+    @classmethod
+    def plan_segments(cls, total_frames: int, segment_frames: int, extension: str) -> List[ExportSegment]:
+        """Split [0, total_frames) into segments of at most segment_frames frames"""
+        segment_frames = max(1, segment_frames)
+        return [
+            ExportSegment(index=index, start_frame=start,
+                          end_frame=min(start + segment_frames, total_frames),
+                          filename=f"segment_{index:05d}.{extension}")
+            for index, start in enumerate(range(0, total_frames, segment_frames))
+        ]
+
+    @classmethod
+    def plan_from_boundaries(cls, boundaries: List[int], extension: str) -> List[ExportSegment]:
+        """Segments between consecutive frame boundaries, e.g. [0, 240, 600, 900]"""
+        return [
+            ExportSegment(index=index, start_frame=start, end_frame=end,
+                          filename=f"segment_{index:05d}.{extension}")
+            for index, (start, end) in enumerate(zip(boundaries, boundaries[1:]))
+        ]
+
+    @classmethod
+    def load_or_create(cls, output_path: str, fingerprint: str, settings_digest: str,
+                       total_frames: int, segment_frames: int, extension: str = "mp4",
+                       boundaries: Optional[List[int]] = None) -> "ExportCheckpoint":
+        """
+        Resume from an existing manifest when it matches, otherwise start fresh.
+
+        A manifest for a different project, different settings or a different
+        frame count is discarded together with its segments. Completed segments
+        whose file has gone missing are rendered again. New plans use fixed
+        segment_frames sized segments unless explicit boundaries are given.
+        """
+        checkpoint = cls.load(output_path)
+        if checkpoint and checkpoint.fingerprint == fingerprint and \
+                checkpoint.settings_digest == settings_digest and \
+                checkpoint.total_frames == total_frames:
+            for segment in checkpoint.segments:
+                path = checkpoint.segment_path(segment)
+                if segment.completed and (not os.path.exists(path) or os.path.getsize(path) == 0):
+                    segment.completed = False
+            return checkpoint
+
+        if checkpoint:
+            print("Export checkpoint does not match the current project or settings, starting over")
+            checkpoint.discard()
+
+        if boundaries:
+            segments = cls.plan_from_boundaries(boundaries, extension)
+        else:
+            segments = cls.plan_segments(total_frames, segment_frames, extension)
+        checkpoint = cls(output_path, fingerprint, settings_digest, total_frames, segments)
+        checkpoint.save()
+        return checkpoint
+
+    @classmethod
+    def load(cls, output_path: str) -> Optional["ExportCheckpoint"]:
+        """Read the manifest for an output path, if any"""
+        manifest_path = os.path.join(f"{output_path}.segments", MANIFEST_NAME)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != MANIFEST_VERSION:
+                return None
+            return cls(output_path, data['fingerprint'], data['settings_hash'], data['total_frames'],
+                       [ExportSegment(**segment) for segment in data['segments']])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self):
+        """Write the manifest atomically"""
+        os.makedirs(self.segment_dir, exist_ok=True)
+        data = {
+            'version': MANIFEST_VERSION,
+            'fingerprint': self.fingerprint,
+            'settings_hash': self.settings_digest,
+            'total_frames': self.total_frames,
+            'segments': [asdict(segment) for segment in self.segments]
+        }
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.manifest_path)
+
+    def segment_path(self, segment: ExportSegment) -> str:
+        return os.path.join(self.segment_dir, segment.filename)
+
+    def pending_segments(self) -> List[ExportSegment]:
+        """Segments that still need to be rendered, in order"""
+        return [segment for segment in self.segments if not segment.completed]
+
+    @property
+    def completed_frames(self) -> int:
+        return sum(segment.frame_count for segment in self.segments if segment.completed)
+
+    def mark_completed(self, segment: ExportSegment):
+        """Record a finished segment in the manifest"""
+        segment.completed = True
+        self.save()
+
+    def write_concat_list(self) -> str:
+        """Write the concat demuxer input list and return its path"""
+        list_path = os.path.join(self.segment_dir, "concat.txt")
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for segment in self.segments:
+                escaped = self.segment_path(segment).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        return list_path
+
+    def build_concat_command(self, audio_path: Optional[str] = None,
+                             audio_options: Optional[List[str]] = None,
+                             container_options: Optional[List[str]] = None) -> List[str]:
+        """
+        FFmpeg command joining the segments into the output file.
+
+        Video is stream-copied; audio, when given, is encoded once over the
+        whole duration so there are no gaps at segment boundaries.
+        """
+        cmd = ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", self.write_concat_list()]
+        if audio_path:
+            cmd.extend(["-i", audio_path, "-map", "0:v:0", "-map", "1:a:0"])
+            cmd.extend(audio_options or ["-c:a", "aac"])
+            cmd.append("-shortest")
+        cmd.extend(["-c:v", "copy"])
+        cmd.extend(container_options or [])
+        cmd.append(self.output_path)
+        return cmd
+
+    def discard(self):
+        """Delete the manifest and all segments"""
+        shutil.rmtree(self.segment_dir, ignore_errors=True)
@@ -0,0 +1,511 @@
+"""
+Preflight Export Estimation
+
+Before a long export starts, PreflightEstimator renders and encodes a small
+stratified sample of the timeline through the real capture and encoder path
+and extrapolates the total render time, the frame rate the encoder will see
+and the output file size, each with a 90% confidence interval.
+
+The timeline is split into strata with the frame plan and the cost model of
+cost_scheduler: gaps with no subtitles, frames with ordinary lines, and
+heavy frames (several or animating lines, effect layers) predicted to cost
+more than the median. Clips of consecutive frames are spread evenly through
+each stratum, more of them where a stratum holds more predicted work, and
+every clip is timed (and encoded on its own, which measures its size).
+Stratum totals are the measured per-frame rates times the stratum's frame
+count, so a short sample of each kind of section stands in for all of it.
+
+Short clips start with a keyframe and run with cold caches, so raw
+estimates lean high. After an export, record() stores the actual time and
+size in an EstimateHistory; later estimates with the same backend and
+encoder preset are scaled by the median actual/estimated ratio, and the
+spread of those ratios widens the bounds.
+"""
+
+import os
+import json
+import time
+import shutil
+import tempfile
+from dataclasses import dataclass, field, replace
+from typing import Optional, List, Dict, Any, Tuple
+
+import numpy as np
+
+try:
+    from .models import Project
+    from .timebase import Timebase
+    from .opengl_context import create_headless_context
+    from .frame_capture_system import FrameCaptureSystem, FrameCaptureSettings, _project_duration
+    from .enhanced_ffmpeg_integration import EnhancedFFmpegProcessor, EnhancedExportSettings
+    from .frame_plan import compile_frame_plan
+    from .cost_scheduler import FrameCostModel
+except ImportError:
+    from models import Project
+    from timebase import Timebase
+    from opengl_context import create_headless_context
+    from frame_capture_system import FrameCaptureSystem, FrameCaptureSettings, _project_duration
+    from enhanced_ffmpeg_integration import EnhancedFFmpegProcessor, EnhancedExportSettings
+    from frame_plan import compile_frame_plan
+    from cost_scheduler import FrameCostModel
+
+
+DEFAULT_HISTORY_PATH = os.path.join(".kiro", "config", "export_estimates.json")
+
+STRATUM_GAP = "gap"
+STRATUM_LINES = "lines"
+STRATUM_HEAVY = "heavy"
+STRATA = (STRATUM_GAP, STRATUM_LINES, STRATUM_HEAVY)
+
+# Assumed spread of per-clip rates in a stratum sampled by a single clip
+SINGLE_CLIP_RELATIVE_ERROR = 0.25
+
+# History entries needed before estimates are calibrated, and how many recent ones are used
+MIN_HISTORY_ENTRIES = 3
+HISTORY_WINDOW = 20
+MAX_HISTORY_ENTRIES = 200
+
+# One-sided 95% quantiles of Student's t (two-sided 90% interval) by degrees of freedom
+_T_QUANTILES = {1: 6.314, 2: 2.920, 3: 2.353, 4: 2.132, 5: 2.015, 6: 1.943, 7: 1.895,
+                8: 1.860, 9: 1.833, 10: 1.812, 15: 1.753, 20: 1.725, 30: 1.697}
+
+
+def _t_quantile(degrees_of_freedom: int) -> float:
+    for df in sorted(_T_QUANTILES, reverse=True):
+        if degrees_of_freedom >= df:
+            return _T_QUANTILES[df] if degrees_of_freedom <= 30 else 1.645
+    return _T_QUANTILES[1]
+
+
+@dataclass
+class SampleClip:
+    """Output frames [start_frame, end_frame) rendered as one sample of a stratum"""
+    stratum: str
+    start_frame: int
+    end_frame: int
+    seconds: float = 0.0  # Render plus encode, excluding encoder startup
+    render_seconds: float = 0.0
+    output_bytes: Optional[int] = None
+
+    @property
+    def frames(self) -> int:
+        return self.end_frame - self.start_frame
+
+
+@dataclass
+class EstimateCalibration:
+    """Actual over estimated ratios learned from earlier exports"""
+    time_ratio: float = 1.0
+    size_ratio: float = 1.0
+    time_range: Tuple[float, float] = (1.0, 1.0)
+    size_range: Tuple[float, float] = (1.0, 1.0)
+    entries: int = 0
+
+
+@dataclass
+class ExportEstimate:
+    """Extrapolated time and size of an export, with 90% confidence bounds"""
+    total_frames: int
+    sampled_frames: int
+    seconds: float
+    seconds_low: float
+    seconds_high: float
+    output_bytes: Optional[int] = None
+    output_bytes_low: Optional[int] = None
+    output_bytes_high: Optional[int] = None
+    render_seconds: float = 0.0  # Rendering alone, without waiting for the encoder
+    encoded: bool = True
+    raw_seconds: float = 0.0  # Before calibration; what the history compares against
+    raw_output_bytes: Optional[int] = None
+    history_key: str = ""
+    calibration: EstimateCalibration = field(default_factory=EstimateCalibration)
+    strata: List[Dict[str, Any]] = field(default_factory=list)
+    preflight_seconds: float = 0.0
+
+    @property
+    def encoder_fps(self) -> float:
+        """Output frames per second the encoder is expected to receive over the export"""
+        return self.total_frames / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def render_fps(self) -> float:
+        return self.total_frames / self.render_seconds if self.render_seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'total_frames': self.total_frames,
+            'sampled_frames': self.sampled_frames,
+            'seconds': self.seconds,
+            'seconds_low': self.seconds_low,
+            'seconds_high': self.seconds_high,
+            'encoder_fps': self.encoder_fps,
+            'render_fps': self.render_fps,
+            'output_bytes': self.output_bytes,
+            'output_bytes_low': self.output_bytes_low,
+            'output_bytes_high': self.output_bytes_high,
+            'encoded': self.encoded,
+            'calibrated_from': self.calibration.entries,
+            'strata': [dict(stratum) for stratum in self.strata],
+            'preflight_seconds': self.preflight_seconds
+        }
+
+    def format(self) -> str:
+        """Human-readable summary"""
+        lines = [f"Estimated export time {self.seconds:.1f}s "
+                 f"({self.seconds_low:.1f}-{self.seconds_high:.1f}s), "
+                 f"{self.encoder_fps:.1f} fps over {self.total_frames} frames"]
+        if self.output_bytes is not None:
+            mb = 1024 * 1024
+            lines.append(f"Estimated output size {self.output_bytes / mb:.1f} MB "
+                         f"({self.output_bytes_low / mb:.1f}-{self.output_bytes_high / mb:.1f} MB)")
+        for stratum in self.strata:
+            lines.append(f"  {stratum['name']:>6}: {stratum['frames']:>7} frames, "
+                         f"{stratum['clips']} clip(s), {stratum['seconds_per_frame'] * 1000:.2f} ms/frame")
+        if self.calibration.entries:
+            lines.append(f"Calibrated from {self.calibration.entries} earlier export(s)")
+        return "\n".join(lines)
+
+
+class EstimateHistory:
+    """
+    Estimated against actual export results, stored as a JSON list.
+
+    Entries are grouped by a key naming what the ratio depends on (backend,
+    codec, preset); groups with too few entries fall back to all entries.
+    """
+
+    def __init__(self, path: str = DEFAULT_HISTORY_PATH):
+        self.path = path
+        self.entries: List[Dict[str, Any]] = []
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            self.entries = entries if isinstance(entries, list) else []
+        except (OSError, ValueError):
+            self.entries = []
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries[-MAX_HISTORY_ENTRIES:], f, indent=2)
+        os.replace(temp_path, self.path)
+
+    def record(self, estimate: ExportEstimate, actual_seconds: float,
+               actual_bytes: Optional[int] = None):
+        """Store the outcome of an export that was estimated beforehand"""
+        entry = {
+            'key': estimate.history_key,
+            'time': time.time(),
+            'frames': estimate.total_frames,
+            'estimated_seconds': estimate.raw_seconds,
+            'actual_seconds': actual_seconds,
+            'estimated_bytes': estimate.raw_output_bytes,
+            'actual_bytes': actual_bytes
+        }
+        self.entries.append(entry)
+        del self.entries[:-MAX_HISTORY_ENTRIES]
+        try:
+            self.save()
+        except OSError as e:
+            print(f"Failed to save export estimate history: {e}")
+
+    def calibration(self, key: str) -> EstimateCalibration:
+        """Median and 10th-90th percentile range of the recent actual/estimated ratios"""
+        matching = [entry for entry in self.entries if entry.get('key') == key]
+        if len(matching) < MIN_HISTORY_ENTRIES:
+            matching = self.entries
+        matching = matching[-HISTORY_WINDOW:]
+
+        def ratios(estimated: str, actual: str) -> List[float]:
+            return [entry[actual] / entry[estimated] for entry in matching
+                    if entry.get(estimated) and entry.get(actual)]
+
+        calibration = EstimateCalibration()
+        time_ratios = ratios('estimated_seconds', 'actual_seconds')
+        if len(time_ratios) >= MIN_HISTORY_ENTRIES:
+            calibration.entries = len(time_ratios)
+            calibration.time_ratio = float(np.median(time_ratios))
+            calibration.time_range = tuple(float(q) for q in np.percentile(time_ratios, [10, 90]))
+        size_ratios = ratios('estimated_bytes', 'actual_bytes')
+        if len(size_ratios) >= MIN_HISTORY_ENTRIES:
+            calibration.size_ratio = float(np.median(size_ratios))
+            calibration.size_range = tuple(float(q) for q in np.percentile(size_ratios, [10, 90]))
+        return calibration
+
+
+def _stratified_total(clips: List[SampleClip], stratum_frames: Dict[str, int],
+                      value) -> Tuple[float, float]:
+    """
+    Extrapolated total of a per-clip quantity and its standard error.
+
+    Each stratum contributes its frame count times the frame-weighted mean
+    rate of its clips; its variance comes from the spread of the per-clip
+    rates (or the pooled relative spread when it has a single clip).
+    """
+    totals: Dict[str, float] = {}
+    variances: Dict[str, Optional[float]] = {}
+    relative_spreads: List[float] = []
+    for name, frames in stratum_frames.items():
+        own = [clip for clip in clips if clip.stratum == name and clip.frames > 0]
+        if not own or frames == 0:
+            continue
+        rates = np.array([value(clip) / clip.frames for clip in own])
+        mean = sum(value(clip) for clip in own) / sum(clip.frames for clip in own)
+        totals[name] = frames * mean
+        if len(own) >= 2:
+            variances[name] = frames ** 2 * float(rates.var(ddof=1)) / len(own)
+            if mean > 0:
+                relative_spreads.append(float(rates.std(ddof=1)) / mean)
+        else:
+            variances[name] = None
+
+    spread = max(relative_spreads) if relative_spreads else SINGLE_CLIP_RELATIVE_ERROR
+    variance = sum(v if v is not None else (totals[name] * spread) ** 2
+                   for name, v in variances.items())
+    return sum(totals.values()), variance ** 0.5
+
+
+class PreflightEstimator:
+    """
+    Estimates an export by rendering and encoding a stratified sample of it.
+
+    sample_seconds is the timeline length rendered in total, split into
+    clips of clip_seconds. With encode=False (or when the encoder cannot be
+    started) only rendering is timed and the size comes from the bitrate.
+    """
+
+    def __init__(self, project: Project, settings: EnhancedExportSettings, backend: str = "opengl",
+                 deduplicate: bool = True, encode: bool = True, sample_seconds: float = 10.0,
+                 clip_seconds: float = 1.0, cost_model: Optional[FrameCostModel] = None,
+                 history: Optional[EstimateHistory] = None):
+        self.project = project
+        self.settings = settings
+        self.backend = backend
+        self.deduplicate = deduplicate
+        self.encode = encode
+        self.sample_seconds = sample_seconds
+        self.clip_seconds = clip_seconds
+        self.cost_model = cost_model or FrameCostModel.from_metrics()
+        self.history = history
+        self.timebase = Timebase.from_fps(settings.fps)
+        self._plan = None
+
+    @property
+    def total_frames(self) -> int:
+        return self.timebase.frame_count(_project_duration(self.project))
+
+    def history_key(self, encoded: bool) -> str:
+        """Group of history entries whose ratios apply to this estimate"""
+        codec = getattr(self.settings.video_codec, 'value', self.settings.video_codec)
+        preset = getattr(self.settings.preset, 'value', self.settings.preset)
+        mode = "encode" if encoded else "render"
+        return f"{self.backend}/{codec}/{preset}/{mode}"
+
+    def _frame_strata(self) -> np.ndarray:
+        """Stratum index (into STRATA) of every output frame"""
+        if self._plan is None:
+            self._plan = compile_frame_plan(self.project, self.settings.fps)
+        strata = np.zeros(self._plan.total_frames, dtype=np.int8)
+        costs = np.zeros(self._plan.total_frames, dtype=np.float64)
+        for frame in self._plan.frames:
+            if frame.visible_lines:
+                costs[frame.frame_number:frame.frame_number + frame.repeat] = \
+                    self.cost_model.render_seconds(self.project, frame)
+
+        busy = costs > 0
+        if busy.any():
+            threshold = float(np.median(costs[busy]))
+            strata[busy] = STRATA.index(STRATUM_LINES)
+            strata[costs > threshold] = STRATA.index(STRATUM_HEAVY)
+        return strata
+
+    def plan_samples(self) -> Tuple[List[SampleClip], Dict[str, int]]:
+        """
+        Sample clips and the output frame count of each stratum.
+
+        Clips go to strata in proportion to their predicted share of the
+        work, at least one per non-empty stratum and two where a stratum is
+        long enough, evenly spaced through the stratum's frames and kept
+        inside the run of frames they start in.
+        """
+        strata = self._frame_strata()
+        frame_counts = {name: int((strata == index).sum()) for index, name in enumerate(STRATA)}
+        clip_frames = max(1, int(round(self.clip_seconds * self.timebase.fps)))
+        budget = max(1, int(round(self.sample_seconds / max(self.clip_seconds, 1e-6))))
+
+        # Rough work share per stratum: gaps are cheap, heavy frames expensive
+        weights = {STRATUM_GAP: 0.5, STRATUM_LINES: 1.0, STRATUM_HEAVY: 2.0}
+        work = {name: frame_counts[name] * weights[name] for name in STRATA}
+        total_work = sum(work.values())
+
+        clips: List[SampleClip] = []
+        for index, name in enumerate(STRATA):
+            frames = np.flatnonzero(strata == index)
+            if len(frames) == 0:
+                continue
+            count = int(round(budget * work[name] / total_work)) if total_work > 0 else 1
+            minimum = 2 if len(frames) >= 2 * clip_frames else 1
+            count = max(minimum, min(count, max(1, len(frames) // clip_frames)))
+
+            for k in range(count):
+                position = int((k + 0.5) * len(frames) / count)
+                start = int(frames[min(position, len(frames) - 1)])
+                end = start
+                while end < len(strata) and end - start < clip_frames and strata[end] == index:
+                    end += 1
+                clips.append(SampleClip(name, start, end))
+        return clips, frame_counts
+
+    def _clip_timestamps(self, capture_system: FrameCaptureSystem, clip: SampleClip):
+        if self.deduplicate:
+            return compile_frame_plan(self.project, self.settings.fps,
+                                      clip.start_frame, clip.end_frame).timestamps()
+        return capture_system.generate_frame_timestamps(
+            _project_duration(self.project), self.settings.fps)[clip.start_frame:clip.end_frame]
+
+    def _run_clip(self, capture_system: FrameCaptureSystem, clip: SampleClip, temp_dir: str,
+                  encode: bool) -> bool:
+        """Render (and encode) one clip, filling in its timings; False if the encoder failed"""
+        timestamps = self._clip_timestamps(capture_system, clip)
+        timing = {"first_pull": None, "render": 0.0}
+
+        def timed_frames():
+            frames = capture_system.iter_frame_sequence(timestamps)
+            while True:
+                started = time.perf_counter()
+                if timing["first_pull"] is None:
+                    timing["first_pull"] = started
+                try:
+                    frame = next(frames)
+                except StopIteration:
+                    timing["render"] += time.perf_counter() - started
+                    return
+                timing["render"] += time.perf_counter() - started
+                yield frame
+
+        if not encode:
+            started = time.perf_counter()
+            for _ in timed_frames():
+                pass
+            clip.seconds = time.perf_counter() - started
+            clip.render_seconds = timing["render"]
+            return True
+
+        extension = os.path.splitext(self.settings.output_path)[1] or ".mp4"
+        output_path = os.path.join(temp_dir, f"clip_{clip.start_frame}{extension}")
+        clip_settings = replace(self.settings, output_path=output_path,
+                                timestamped_input=self.deduplicate)
+        processor = EnhancedFFmpegProcessor()
+        if not processor.encode_frames(clip_settings, timed_frames(), clip.frames):
+            print(f"Preflight encode failed: {processor.error_message}")
+            return False
+        finished = time.perf_counter()
+
+        # Encoder startup happens before the first frame is pulled and is paid once per export
+        clip.seconds = finished - (timing["first_pull"] or finished)
+        clip.render_seconds = timing["render"]
+        clip.output_bytes = os.path.getsize(output_path) if os.path.exists(output_path) else 0
+        return True
+
+    def estimate(self) -> ExportEstimate:
+        """Render the sample and extrapolate; raises RuntimeError if nothing could be rendered"""
+        preflight_start = time.perf_counter()
+        clips, frame_counts = self.plan_samples()
+        total_frames = sum(frame_counts.values())
+
+        context = create_headless_context(self.backend, self.settings.width, self.settings.height)
+        capture_system = FrameCaptureSystem(context)
+        temp_dir = tempfile.mkdtemp(prefix="karaoke_preflight_")
+        encoded = self.encode
+        try:
+            capture_settings = FrameCaptureSettings(width=self.settings.width, height=self.settings.height,
+                                                    fps=self.settings.fps,
+                                                    deduplicate_frames=self.deduplicate)
+            if not capture_system.initialize(self.project, capture_settings):
+                raise RuntimeError("Failed to initialize frame capture system")
+
+            for clip in clips:
+                if not self._run_clip(capture_system, clip, temp_dir, encoded):
+                    encoded = False
+                    break
+            if not encoded and self.encode:
+                print("Preflight falls back to timing the render alone")
+                for clip in clips:
+                    self._run_clip(capture_system, clip, temp_dir, encoded)
+        finally:
+            capture_system.cleanup()
+            context.cleanup()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        estimate = self._extrapolate(clips, frame_counts, total_frames, encoded)
+        estimate.preflight_seconds = time.perf_counter() - preflight_start
+        return estimate
+
+    def _extrapolate(self, clips: List[SampleClip], frame_counts: Dict[str, int], total_frames: int,
+                     encoded: bool) -> ExportEstimate:
+        clips = [clip for clip in clips if clip.frames > 0]
+        if not clips:
+            raise RuntimeError("No frames to sample")
+
+        degrees_of_freedom = max(1, len(clips) - len([name for name in STRATA if frame_counts[name]]))
+        t = _t_quantile(degrees_of_freedom)
+        seconds, seconds_error = _stratified_total(clips, frame_counts, lambda clip: clip.seconds)
+        render_seconds, _ = _stratified_total(clips, frame_counts, lambda clip: clip.render_seconds)
+
+        history_key = self.history_key(encoded)
+        calibration = self.history.calibration(history_key) if self.history else EstimateCalibration()
+        estimate = ExportEstimate(
+            total_frames=total_frames,
+            sampled_frames=sum(clip.frames for clip in clips),
+            seconds=seconds * calibration.time_ratio,
+            seconds_low=max(0.0, seconds - t * seconds_error) * calibration.time_range[0],
+            seconds_high=(seconds + t * seconds_error) * calibration.time_range[1],
+            render_seconds=render_seconds * calibration.time_ratio,
+            encoded=encoded,
+            raw_seconds=seconds,
+            history_key=history_key,
+            calibration=calibration
+        )
+
+        duration = total_frames / self.timebase.fps
+        has_audio = bool(self.project.audio_file and self.project.audio_file.path)
+        audio_bytes = self.settings.audio_bitrate * 1000 * duration / 8 if has_audio else 0.0
+        if encoded:
+            video_bytes, bytes_error = _stratified_total(clips, frame_counts, lambda clip: clip.output_bytes)
+        elif self.settings.bitrate:
+            video_bytes, bytes_error = self.settings.bitrate * 1000 * duration / 8, 0.0
+        else:
+            video_bytes = None
+
+        if video_bytes is not None:
+            raw_bytes = video_bytes + audio_bytes
+            estimate.raw_output_bytes = int(raw_bytes)
+            estimate.output_bytes = int(raw_bytes * calibration.size_ratio)
+            estimate.output_bytes_low = int(max(0.0, raw_bytes - t * bytes_error) * calibration.size_range[0])
+            estimate.output_bytes_high = int((raw_bytes + t * bytes_error) * calibration.size_range[1])
+
+        for name in STRATA:
+            own = [clip for clip in clips if clip.stratum == name]
+            if not frame_counts[name] or not own:
+                continue
+            sampled = sum(clip.frames for clip in own)
+            stratum = {"name": name, "frames": frame_counts[name], "clips": len(own),
+                       "sampled_frames": sampled,
+                       "seconds_per_frame": sum(clip.seconds for clip in own) / sampled}
+            if encoded:
+                stratum["bytes_per_frame"] = sum(clip.output_bytes or 0 for clip in own) / sampled
+            estimate.strata.append(stratum)
+        return estimate
+
+
+def estimate_export(project: Project, settings: EnhancedExportSettings, backend: str = "opengl",
+                    history_path: Optional[str] = DEFAULT_HISTORY_PATH, **kwargs) -> ExportEstimate:
+    """Run a preflight estimate, calibrated by the history file if one is given"""
+    history = EstimateHistory(history_path) if history_path else None
+    return PreflightEstimator(project, settings, backend=backend, history=history, **kwargs).estimate()
@@ -27,6 +27,11 @@ try:
     from .models import Project
     from .opengl_export_renderer import OpenGLExportRenderer, ExportSettings, ExportProgress
     from .validation import ValidationResult, ValidationLevel
+    from .timebase import Timebase
+    from .export_checkpoint import ExportCheckpoint
+    from .enhanced_ffmpeg_integration import EnhancedExportSettings, VideoCodec
+    from .export_estimator import estimate_export, ExportEstimate, EstimateHistory, DEFAULT_HISTORY_PATH
+    from .export_profiles import MASTER_PROFILE, DRAFT_PROFILE, DRAFT_QUARTER_PROFILE, get_export_profile
 except ImportError:
     import sys
     import os
@@ -34,6 +39,11 @@ except ImportError:
     from models import Project
     from opengl_export_renderer import OpenGLExportRenderer, ExportSettings, ExportProgress
     from validation import ValidationResult, ValidationLevel
+    from timebase import Timebase
+    from export_checkpoint import ExportCheckpoint
+    from enhanced_ffmpeg_integration import EnhancedExportSettings, VideoCodec
+    from export_estimator import estimate_export, ExportEstimate, EstimateHistory, DEFAULT_HISTORY_PATH
+    from export_profiles import MASTER_PROFILE, DRAFT_PROFILE, DRAFT_QUARTER_PROFILE, get_export_profile
 
 
 class ExportStatus(Enum):
@@ -131,9 +141,19 @@ class ExportConfiguration:
     cleanup_temp: bool = True
     overwrite_existing: bool = True
     
+    # Checkpointed segment length; a retry resumes after the last finished segment (0 = single pass)
+    segment_seconds: float = 0.0
+    
     # Quality presets
     quality_preset: str = "Medium (1080p)"
     
+    # Export profile (see export_profiles); draft profiles cap fps and use a fast encoder preset
+    export_profile: str = MASTER_PROFILE
+    
+    # Render and encode a sample of the timeline to estimate time and size before exporting
+    preflight_estimate: bool = False
+    preflight_backend: str = "opengl"
+    
     def to_export_settings(self) -> ExportSettings:
         """Convert to OpenGL export settings."""
         output_path = os.path.join(self.output_dir, self.filename)
@@ -146,7 +166,7 @@ class ExportConfiguration:
         
         format_info = format_map.get(self.format, {"codec": "libx264", "container": "mp4"})
         
-        return ExportSettings(
+        settings = ExportSettings(
             output_path=output_path,
             width=self.width,
             height=self.height,
@@ -154,8 +174,22 @@ class ExportConfiguration:
             bitrate=self.bitrate,
             codec=format_info["codec"],
             container_format=format_info["container"],
-            cleanup_temp=self.cleanup_temp
+            cleanup_temp=self.cleanup_temp,
+            segment_seconds=self.segment_seconds
         )
+        
+        profile = get_export_profile(self.export_profile)
+        settings.fps = profile.output_fps(self.fps)
+        if profile.preset is not None:
+            settings.preset = profile.preset.value
+        if profile.crf is not None:
+            settings.crf = profile.crf
+        if profile.audio_bitrate is not None:
+            settings.audio_bitrate = profile.audio_bitrate
+        settings.effect_quality = profile.effect_quality
+        settings.reuse_cached_rasters = profile.reuse_cached_rasters
+        
+        return settings
 
 
 class ExportManager(QObject):
@@ -175,6 +209,8 @@ class ExportManager(QObject):
     
     # Validation signals
     validation_completed = pyqtSignal(list)  # List of ValidationResult
+    estimate_ready = pyqtSignal(dict)  # ExportEstimate.to_dict() from the preflight
+    _preflight_finished = pyqtSignal()  # Continues start_export on the GUI thread
     
     # Enhanced progress signals
     status_changed = pyqtSignal(str)  # Status updates
@@ -204,6 +240,13 @@ class ExportManager(QObject):
         self.retry_count = 0
         self.max_retries = 3
         
+        # Preflight estimate of the current export, compared with the outcome afterwards
+        self.last_estimate: Optional[ExportEstimate] = None
+        self.estimate_history_path = DEFAULT_HISTORY_PATH
+        self.preflight_thread: Optional[threading.Thread] = None
+        if PYQT_AVAILABLE:
+            self._preflight_finished.connect(self._on_preflight_finished)
+        
         # Initialize OpenGL renderer
         self._initialize_renderer()
     
@@ -296,6 +339,8 @@ class ExportManager(QObject):
         try:
             free_space = shutil.disk_usage(output_dir).free
             estimated_size = self._estimate_output_size(config)
+            if self.last_estimate and self.last_estimate.output_bytes_high:
+                estimated_size = self.last_estimate.output_bytes_high
             
             if free_space < estimated_size * 2:  # 2x safety margin
                 results.append(ValidationResult(
@@ -349,6 +394,50 @@ class ExportManager(QObject):
         
         return int(total_bits / 8)  # Convert to bytes
     
+    def estimate_export(self, config: ExportConfiguration) -> Optional[ExportEstimate]:
+        """
+        Estimate export time and output size by rendering and encoding a sample.
+        
+        The estimate is emitted through estimate_ready and kept in
+        last_estimate; when the export completes, its actual time and size
+        are recorded so later estimates are calibrated.
+        """
+        if not self.current_project:
+            return None
+        
+        codec = VideoCodec.H265 if "H.265" in config.format else VideoCodec.H264
+        settings = EnhancedExportSettings(
+            output_path=os.path.join(config.output_dir, config.filename),
+            width=config.width,
+            height=config.height,
+            fps=config.fps,
+            video_codec=codec,
+            bitrate=config.bitrate
+        )
+        settings = get_export_profile(config.export_profile).apply(settings)
+        
+        try:
+            self.last_estimate = estimate_export(self.current_project, settings,
+                                                 backend=config.preflight_backend,
+                                                 history_path=self.estimate_history_path)
+        except (RuntimeError, ValueError) as e:
+            print(f"Preflight estimate failed: {e}")
+            self.last_estimate = None
+            return None
+        
+        print(self.last_estimate.format())
+        self.estimate_ready.emit(self.last_estimate.to_dict())
+        return self.last_estimate
+    
+    def _record_estimate_outcome(self, output_path: str):
+        """Add the finished export to the estimate history"""
+        if not self.last_estimate or not self.estimate_history_path:
+            return
+        actual_bytes = os.path.getsize(output_path) if os.path.exists(output_path) else None
+        EstimateHistory(self.estimate_history_path).record(
+            self.last_estimate, self.progress_info.elapsed_time, actual_bytes)
+        self.last_estimate = None
+    
     def _check_ffmpeg_available(self) -> bool:
         """Check if FFmpeg is available in system PATH."""
         try:
@@ -504,9 +593,14 @@ class ExportManager(QObject):
         self.export_progress.emit(self.progress_info.to_dict())
         self.detailed_progress.emit(self.progress_info.to_dict())
     
-    def start_export(self, config: ExportConfiguration) -> bool:
-        """Start the export process with the given configuration."""
-        if self.is_exporting:
+    def start_export(self, config: ExportConfiguration, resume: bool = False) -> bool:
+        """
+        Start the export process with the given configuration.
+        
+        With resume, the segments an earlier attempt completed (see
+        export_checkpoint) are kept and only the rest is rendered.
+        """
+        if self.is_exporting or self.preflight_thread:
             print("Export already in progress")
             return False
         
@@ -515,10 +609,46 @@ class ExportManager(QObject):
         self.retry_count = 0
         self.error_history.clear()
         self.progress_info = ExportProgressInfo()
+        self.last_estimate = None
         
         # Store configuration
         self.export_config = config
         
+        # The preflight estimate comes first so validation sees its size bounds.
+        # It renders and encodes sample clips, so it runs on a worker thread and
+        # the export continues in _on_preflight_finished.
+        if config.preflight_estimate and not resume and self.current_project:
+            self._update_status(ExportStatus.PREPARING, "Estimating export", "Rendering sample frames...")
+            if PYQT_AVAILABLE:
+                self.preflight_thread = threading.Thread(target=self._run_preflight, args=(config,), daemon=True)
+                self.preflight_thread.start()
+                return True
+            self.estimate_export(config)
+        
+        return self._start_validated_export(config, resume)
+    
+    def _run_preflight(self, config: ExportConfiguration):
+        """Estimate the export on the preflight thread, then hand back to the GUI thread"""
+        try:
+            self.estimate_export(config)
+        finally:
+            self._preflight_finished.emit()
+    
+    def _on_preflight_finished(self):
+        """Continue start_export once the preflight estimate is done"""
+        if self.preflight_thread:
+            self.preflight_thread.join()
+            self.preflight_thread = None
+        
+        if self.cancel_requested:
+            self._update_status(ExportStatus.CANCELLED, "Export cancelled", "Cancelled during the preflight estimate")
+            self.export_cancelled.emit()
+            return
+        
+        self._start_validated_export(self.export_config, resume=False)
+    
+    def _start_validated_export(self, config: ExportConfiguration, resume: bool) -> bool:
+        """Validate the configuration and start rendering"""
         # Update status
         self._update_status(ExportStatus.VALIDATING, "Validating export requirements", "Checking project and system requirements...")
         
@@ -544,6 +674,8 @@ class ExportManager(QObject):
         
         # Calculate total frames for progress tracking
         self._calculate_total_frames()
+        if resume:
+            self._resume_from_checkpoint()
         
         # Start export process
         try:
@@ -591,7 +723,7 @@ class ExportManager(QObject):
             duration = 60.0  # Default 1 minute
         
         # Calculate total frames
-        self.progress_info.total_frames = int(duration * self.export_config.fps)
+        self.progress_info.total_frames = Timebase.from_fps(self.export_config.fps).frame_count(duration)
         print(f"Calculated total frames: {self.progress_info.total_frames} (duration: {duration}s, fps: {self.export_config.fps})")
     
     def retry_export(self) -> bool:
@@ -609,13 +741,25 @@ class ExportManager(QObject):
         
         # Wait a moment before retrying
         if PYQT_AVAILABLE:
-            QTimer.singleShot(1000, lambda: self.start_export(self.export_config))
+            QTimer.singleShot(1000, lambda: self.start_export(self.export_config, resume=True))
         else:
             time.sleep(1)
-            return self.start_export(self.export_config)
+            return self.start_export(self.export_config, resume=True)
         
         return True
     
+    def _resume_from_checkpoint(self):
+        """Start progress after the frames an earlier attempt already encoded"""
+        output_path = self.export_config.to_export_settings().output_path
+        checkpoint = ExportCheckpoint.load(output_path)
+        if not checkpoint or not checkpoint.completed_frames or \
+                checkpoint.total_frames != self.progress_info.total_frames:
+            return
+        
+        self.progress_info.current_frame = checkpoint.completed_frames
+        self._update_status(ExportStatus.PREPARING, "Resuming export",
+                            f"{checkpoint.completed_frames}/{checkpoint.total_frames} frames already encoded")
+    
     def _setup_export(self) -> bool:
         """Set up export environment and renderer."""
         if not self.current_project or not self.export_config:
@@ -644,6 +788,12 @@ class ExportManager(QObject):
     
     def cancel_export(self):
         """Cancel the ongoing export process."""
+        if self.preflight_thread:
+            # The estimate finishes its current clip; the export is not started
+            print("Cancelling export after the preflight estimate...")
+            self.cancel_requested = True
+            return
+        
         if not self.is_exporting:
             print("No export in progress to cancel")
             return
@@ -841,6 +991,8 @@ class ExportManager(QObject):
         except Exception as e:
             print(f"Error checking output file: {e}")
         
+        self._record_estimate_outcome(output_path)
+        
         # Clean up if requested
         if self.export_config and self.export_config.cleanup_temp:
             self._cleanup_export()
@@ -938,6 +1090,20 @@ class ExportManager(QObject):
                 "height": 2160,
                 "bitrate": 25000,
                 "description": "4K resolution, maximum quality"
+            },
+            "Draft (540p proxy)": {
+                "width": 960,
+                "height": 540,
+                "bitrate": 1500,
+                "profile": DRAFT_PROFILE,
+                "description": "Fast half-resolution preview at up to 15 fps, reduced effects"
+            },
+            "Draft (270p proxy)": {
+                "width": 480,
+                "height": 270,
+                "bitrate": 600,
+                "profile": DRAFT_QUARTER_PROFILE,
+                "description": "Fastest quarter-resolution preview for timing checks"
             }
         }
     
@@ -950,6 +1116,7 @@ class ExportManager(QObject):
             config.width = preset["width"]
             config.height = preset["height"]
             config.bitrate = preset["bitrate"]
+            config.export_profile = preset.get("profile", MASTER_PROFILE)
             config.quality_preset = preset_name
         
         return config
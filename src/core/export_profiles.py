@@ -0,0 +1,157 @@
+"""
+Export Profiles
+
+An ExportProfile bundles the settings that trade quality for export speed,
+so a producer can ask for a "draft" once instead of tuning each stage:
+
+- capture resolution (half or quarter of the project size),
+- frame rate (an integer fraction of the project rate, so every draft frame
+  lands on a source frame),
+- effect quality (outline widths and glow/shadow blur radii are scaled down,
+  which shortens the per-pixel sample loops of the effect shaders),
+- encoder preset, CRF and audio bitrate,
+- raster reuse: decoded backgrounds go to a process-wide cache that outlives
+  a single export, and subtitle textures never expire, so re-exporting a
+  draft after an edit only decodes what changed.
+
+The "master" profile changes nothing. Profiles are immutable; apply them to
+export, capture or pipeline settings with the configure_* methods.
+"""
+
+import math
+from dataclasses import dataclass, replace
+from typing import Optional, Dict, Any, Tuple
+
+try:
+    from .enhanced_ffmpeg_integration import EnhancedExportSettings, FFmpegPreset
+    from .frame_capture_system import FrameCaptureSettings
+    from .effects_manager import scale_effect_parameters  # re-exported for profile users
+except ImportError:
+    from enhanced_ffmpeg_integration import EnhancedExportSettings, FFmpegPreset
+    from frame_capture_system import FrameCaptureSettings
+    from effects_manager import scale_effect_parameters
+
+
+MASTER_PROFILE = "master"
+DRAFT_PROFILE = "draft"
+DRAFT_QUARTER_PROFILE = "draft-quarter"
+
+@dataclass(frozen=True)
+class ExportProfile:
+    """Coordinated speed/quality settings for an export"""
+    name: str
+    description: str = ""
+    resolution_scale: float = 1.0  # Fraction of the project width and height
+    max_fps: Optional[float] = None  # Frame rate cap (None = project rate)
+    preset: Optional[FFmpegPreset] = None  # Encoder preset (None = keep)
+    crf: Optional[int] = None  # Constant Rate Factor (None = keep)
+    audio_bitrate: Optional[int] = None  # kbps (None = keep)
+    effect_quality: float = 1.0  # Scale of effect sample radii (1.0 = full quality)
+    reuse_cached_rasters: bool = False  # Keep decoded backgrounds and textures across exports
+
+    @property
+    def is_draft(self) -> bool:
+        return self.name != MASTER_PROFILE
+
+    def output_size(self, width: int, height: int) -> Tuple[int, int]:
+        """Scaled output size, rounded to even dimensions for yuv420p"""
+        if self.resolution_scale >= 1.0:
+            return width, height
+        scaled_width = max(2, int(round(width * self.resolution_scale / 2.0)) * 2)
+        scaled_height = max(2, int(round(height * self.resolution_scale / 2.0)) * 2)
+        return scaled_width, scaled_height
+
+    def output_fps(self, fps: float) -> float:
+        """Frame rate divided by the smallest integer that brings it under max_fps"""
+        if not self.max_fps or fps <= self.max_fps:
+            return fps
+        divisor = math.ceil(fps / self.max_fps - 1e-9)
+        return fps / divisor
+
+    def configure_encoder(self, settings: EnhancedExportSettings) -> EnhancedExportSettings:
+        """Set the encoder preset, CRF and audio bitrate of export settings in place"""
+        if self.preset is not None:
+            settings.preset = self.preset
+        if self.crf is not None:
+            # Constant quality; a bitrate target would override the CRF
+            settings.crf = self.crf
+            settings.bitrate = None
+            settings.max_bitrate = None
+        if self.audio_bitrate is not None:
+            settings.audio_bitrate = self.audio_bitrate
+        return settings
+
+    def configure_capture(self, settings: FrameCaptureSettings) -> FrameCaptureSettings:
+        """Set effect quality and raster reuse of capture settings in place"""
+        settings.effect_quality = min(settings.effect_quality, self.effect_quality)
+        settings.reuse_cached_rasters = settings.reuse_cached_rasters or self.reuse_cached_rasters
+        return settings
+
+    def apply(self, settings: EnhancedExportSettings) -> EnhancedExportSettings:
+        """Copy of export settings at the profile's size, frame rate and encoder settings"""
+        width, height = self.output_size(settings.width, settings.height)
+        return self.configure_encoder(replace(settings, width=width, height=height,
+                                              fps=self.output_fps(settings.fps)))
+
+    def configure_pipeline(self, config):
+        """Scale a PipelineConfig to the profile in place"""
+        config.width, config.height = self.output_size(config.width, config.height)
+        config.fps = self.output_fps(config.fps)
+        config.effect_quality = self.effect_quality
+        config.reuse_cached_rasters = self.reuse_cached_rasters
+        config.export_profile = self.name
+        if self.is_draft:
+            config.quality_preset = "draft"
+            config.enable_antialiasing = False
+        return config
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "resolution_scale": self.resolution_scale,
+            "max_fps": self.max_fps,
+            "preset": self.preset.value if self.preset else None,
+            "crf": self.crf,
+            "audio_bitrate": self.audio_bitrate,
+            "effect_quality": self.effect_quality,
+            "reuse_cached_rasters": self.reuse_cached_rasters
+        }
+
+
+EXPORT_PROFILES: Dict[str, ExportProfile] = {
+    MASTER_PROFILE: ExportProfile(
+        name=MASTER_PROFILE,
+        description="Full resolution, frame rate and effect quality"
+    ),
+    DRAFT_PROFILE: ExportProfile(
+        name=DRAFT_PROFILE,
+        description="Half resolution proxy at up to 15 fps for client review",
+        resolution_scale=0.5,
+        max_fps=15.0,
+        preset=FFmpegPreset.ULTRAFAST,
+        crf=30,
+        audio_bitrate=96,
+        effect_quality=0.5,
+        reuse_cached_rasters=True
+    ),
+    DRAFT_QUARTER_PROFILE: ExportProfile(
+        name=DRAFT_QUARTER_PROFILE,
+        description="Quarter resolution proxy at up to 15 fps for timing checks",
+        resolution_scale=0.25,
+        max_fps=15.0,
+        preset=FFmpegPreset.ULTRAFAST,
+        crf=32,
+        audio_bitrate=64,
+        effect_quality=0.25,
+        reuse_cached_rasters=True
+    )
+}
+
+
+def get_export_profile(name: str) -> ExportProfile:
+    """Look up an export profile by name; raises ValueError for unknown names"""
+    try:
+        return EXPORT_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown export profile '{name}' "
+                         f"(expected one of: {', '.join(EXPORT_PROFILES)})")
@@ -8,10 +8,13 @@ pixel format conversion for FFmpeg compatibility, and frame rate synchronization
 
 import os
 import time
+import logging
 import threading
 import queue
 import struct
-from typing import Optional, Tuple, List, Dict, Any, Callable, Union
+import subprocess
+from collections import OrderedDict
+from typing import Optional, Tuple, List, Dict, Any, Callable, Union, Iterator, Iterable
 from dataclasses import dataclass
 from enum import Enum
 import numpy as np
@@ -31,6 +34,15 @@ try:
     from .models import Project, SubtitleLine
     from .opengl_subtitle_renderer import OpenGLSubtitleRenderer
     from .effects_rendering_pipeline import EffectsRenderingPipeline
+    from .timebase import Timebase
+    from .pixel_conversion import StripeConversionExecutor
+    from .telemetry import TelemetryBus, TelemetrySnapshot, QtSignalSubscriber, LoggingSubscriber
+    from .render_trace import get_render_tracer
+    from .cache_registry import get_cache_registry, CACHE_PRIORITY_NORMAL
+    from .metrics import (
+        get_metrics_registry, FRAMEBUFFER_READBACK_SECONDS, PIXEL_CONVERSION_SECONDS,
+        BACKGROUND_CACHE_HITS_TOTAL, BACKGROUND_CACHE_MISSES_TOTAL, READBACK_FALLBACKS_TOTAL
+    )
 except ImportError:
     import sys
     sys.path.append(os.path.dirname(__file__))
@@ -38,6 +50,17 @@ except ImportError:
     from models import Project, SubtitleLine
     from opengl_subtitle_renderer import OpenGLSubtitleRenderer
     from effects_rendering_pipeline import EffectsRenderingPipeline
+    from timebase import Timebase
+    from pixel_conversion import StripeConversionExecutor
+    from telemetry import TelemetryBus, TelemetrySnapshot, QtSignalSubscriber, LoggingSubscriber
+    from render_trace import get_render_tracer
+    from cache_registry import get_cache_registry, CACHE_PRIORITY_NORMAL
+    from metrics import (
+        get_metrics_registry, FRAMEBUFFER_READBACK_SECONDS, PIXEL_CONVERSION_SECONDS,
+        BACKGROUND_CACHE_HITS_TOTAL, BACKGROUND_CACHE_MISSES_TOTAL, READBACK_FALLBACKS_TOTAL
+    )
+
+logger = logging.getLogger(__name__)
 
 
 class PixelFormat(Enum):
@@ -57,6 +80,7 @@ class FrameTimestamp:
     timestamp: float
     duration: float
     fps: float
+    repeat: int = 1  # Output frames showing this frame (see frame_plan)
     
     @property
     def next_timestamp(self) -> float:
@@ -80,6 +104,7 @@ class CapturedFrame:
     data: np.ndarray
     capture_time: float
     render_time: float
+    repeat: int = 1  # Consecutive output frames identical to this one
     
     @property
     def size_bytes(self) -> int:
@@ -96,7 +121,8 @@ class CapturedFrame:
             'pixel_format': self.pixel_format.value,
             'size_bytes': self.size_bytes,
             'capture_time': self.capture_time,
-            'render_time': self.render_time
+            'render_time': self.render_time,
+            'repeat': self.repeat
         }
 
 
@@ -108,10 +134,15 @@ class FrameCaptureSettings:
     fps: float = 30.0
     pixel_format: PixelFormat = PixelFormat.RGBA8
     quality: float = 1.0  # Quality factor (0.1 to 1.0)
+    effect_quality: float = 1.0  # Scale of effect sample radii (draft profiles use < 1.0)
+    reuse_cached_rasters: bool = False  # Use the process-wide background cache (kept across exports)
     
     # Performance settings
+    deduplicate_frames: bool = False  # Render runs of identical frames once (see frame_plan)
     use_threading: bool = True
-    buffer_size: int = 10  # Number of frames to buffer
+    buffer_size: int = 10  # Frames buffered between capture and consumer when streaming
+    async_readback: bool = False  # Overlap readback with rendering via PBOs
+    readback_ring_size: int = 2  # PBOs in the ring; frames arrive ring_size - 1 late
     
     # Synchronization settings
     sync_with_audio: bool = True
@@ -120,12 +151,268 @@ class FrameCaptureSettings:
     # Output settings
     flip_vertically: bool = True  # OpenGL framebuffers are flipped
     premultiply_alpha: bool = False
+    
+    @property
+    def timebase(self) -> Timebase:
+        """Exact rational frame rate for these settings"""
+        return Timebase.from_fps(self.fps)
+
+
+# Background cache key: (media identity, source frame index, target size)
+BackgroundCacheKey = Tuple[str, int, Tuple[int, int]]
+
+
+class BackgroundFrameCache:
+    """
+    Decoded background frame cache with LRU eviction under a byte budget.
+    
+    Entries are keyed by media identity, source frame index and target size so
+    repeated timestamps that map to the same source frame share one decode.
+    Pinned entries (static image backgrounds) are never evicted but still count
+    towards the reported byte usage. Caches register with the process-wide
+    cache registry, whose governor may evict entries to respect the global
+    budget.
+    """
+    
+    DEFAULT_BUDGET_MB = 256
+    
+    def __init__(self, max_bytes: int = DEFAULT_BUDGET_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[BackgroundCacheKey, np.ndarray]" = OrderedDict()
+        self.pinned: Dict[BackgroundCacheKey, np.ndarray] = {}
+        self.evictable_bytes = 0
+        self.pinned_bytes = 0
+        self.lock = threading.Lock()
+        
+        # Statistics
+        self.hit_count = 0
+        self.miss_count = 0
+        self.eviction_count = 0
+        self.hit_counter = get_metrics_registry().counter(BACKGROUND_CACHE_HITS_TOTAL)
+        self.miss_counter = get_metrics_registry().counter(BACKGROUND_CACHE_MISSES_TOTAL)
+        get_cache_registry().register(self, "background_frames", CACHE_PRIORITY_NORMAL)
+    
+    @classmethod
+    def from_config(cls, config_manager) -> "BackgroundFrameCache":
+        """Create a cache sized by the ``background_cache_mb`` performance setting"""
+        budget_mb = config_manager.get_performance_setting("background_cache_mb", cls.DEFAULT_BUDGET_MB)
+        return cls(max_bytes=int(float(budget_mb) * 1024 * 1024))
+    
+    @staticmethod
+    def media_identity(path: str) -> str:
+        """Identify media content by path, modification time and size"""
+        try:
+            stat = os.stat(path)
+            return f"{path}:{stat.st_mtime_ns}:{stat.st_size}"
+        except OSError:
+            return path
+    
+    @property
+    def total_bytes(self) -> int:
+        """Bytes held by all cached frames, pinned or not"""
+        return self.evictable_bytes + self.pinned_bytes
+    
+    @property
+    def entry_count(self) -> int:
+        return len(self)
+    
+    def get(self, key: BackgroundCacheKey) -> Optional[np.ndarray]:
+        """Get a cached frame and mark it as most recently used"""
+        with self.lock:
+            if key in self.pinned:
+                self.hit_count += 1
+                self.hit_counter.inc()
+                return self.pinned[key]
+            
+            data = self.entries.get(key)
+            if data is None:
+                self.miss_count += 1
+                self.miss_counter.inc()
+                return None
+            
+            self.entries.move_to_end(key)
+            self.hit_count += 1
+            self.hit_counter.inc()
+            return data
+    
+    def put(self, key: BackgroundCacheKey, data: np.ndarray, pin: bool = False) -> bool:
+        """Store a decoded frame, evicting least recently used frames to stay in budget"""
+        with self.lock:
+            self._remove(key)
+            
+            if pin:
+                self.pinned[key] = data
+                self.pinned_bytes += data.nbytes
+            elif data.nbytes > self.max_bytes - self.pinned_bytes:
+                # A frame larger than the whole budget would flush everything else
+                return False
+            else:
+                self.entries[key] = data
+                self.evictable_bytes += data.nbytes
+            self._evict_to_budget()
+        
+        get_cache_registry().notify_growth(data.nbytes)
+        return True
+    
+    def evict_bytes(self, nbytes: int) -> int:
+        """Evict least recently used frames until nbytes are freed; returns bytes freed"""
+        with self.lock:
+            return self._evict(lambda freed: freed < nbytes)
+    
+    def _evict_to_budget(self):
+        """Drop least recently used entries until the budget is respected"""
+        self._evict(lambda freed: self.total_bytes > self.max_bytes)
+    
+    def _evict(self, should_continue) -> int:
+        """Drop least recently used entries while should_continue(bytes freed so far)"""
+        freed = 0
+        while self.entries and should_continue(freed):
+            _, evicted = self.entries.popitem(last=False)
+            self.evictable_bytes -= evicted.nbytes
+            self.eviction_count += 1
+            freed += evicted.nbytes
+        return freed
+    
+    def _remove(self, key: BackgroundCacheKey):
+        """Remove an entry if present"""
+        if key in self.pinned:
+            self.pinned_bytes -= self.pinned.pop(key).nbytes
+        elif key in self.entries:
+            self.evictable_bytes -= self.entries.pop(key).nbytes
+    
+    def __len__(self) -> int:
+        return len(self.entries) + len(self.pinned)
+    
+    def __contains__(self, key: BackgroundCacheKey) -> bool:
+        return key in self.entries or key in self.pinned
+    
+    def clear(self):
+        """Clear all cached frames, including pinned ones"""
+        with self.lock:
+            self.entries.clear()
+            self.pinned.clear()
+            self.evictable_bytes = 0
+            self.pinned_bytes = 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with self.lock:
+            lookups = self.hit_count + self.miss_count
+            return {
+                'hit_count': self.hit_count,
+                'miss_count': self.miss_count,
+                'hit_rate': self.hit_count / lookups if lookups > 0 else 0.0,
+                'eviction_count': self.eviction_count,
+                'entries': len(self.entries) + len(self.pinned),
+                'pinned_entries': len(self.pinned),
+                'bytes': self.evictable_bytes + self.pinned_bytes,
+                'pinned_bytes': self.pinned_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+# Background cache shared by exports that reuse cached rasters (draft profiles)
+_shared_background_cache: Optional[BackgroundFrameCache] = None
+_shared_background_cache_lock = threading.Lock()
+
+
+def get_shared_background_cache() -> BackgroundFrameCache:
+    """Get the process-wide background cache, kept across exports"""
+    global _shared_background_cache
+    with _shared_background_cache_lock:
+        if _shared_background_cache is None:
+            _shared_background_cache = BackgroundFrameCache()
+        return _shared_background_cache
+
+
+class SequentialVideoDecoder:
+    """
+    Persistent FFmpeg pipe decoding one video source in frame order.
+    
+    Consecutive source frames are read from one process that outputs raw RGBA
+    at the source rate and capture size. A backwards jump, or a forward jump
+    of more than ``MAX_SKIP_FRAMES``, restarts the process with an input seek.
+    When the pipe ends early (end of the source or a decode failure) no frame
+    at or after that point is requested again.
+    """
+    
+    # Forward jumps up to this many frames are read through instead of seeking
+    MAX_SKIP_FRAMES = 120
+    
+    def __init__(self, path: str, width: int, height: int, timebase: Timebase, ffmpeg_path: str = "ffmpeg"):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.timebase = timebase
+        self.ffmpeg_path = ffmpeg_path
+        self.frame_bytes = width * height * 4
+        self.process: Optional[subprocess.Popen] = None
+        self.next_index = 0  # Source frame the pipe delivers next
+        self.end_index: Optional[int] = None  # First frame the source cannot deliver
+        self.spawn_count = 0
+    
+    def _command(self, start_index: int) -> List[str]:
+        return [
+            self.ffmpeg_path, "-hide_banner", "-loglevel", "error",
+            "-ss", f"{self.timebase.frame_time(start_index):.6f}", "-i", self.path,
+            "-an", "-vf", f"fps={self.timebase.ffmpeg_rate},scale={self.width}:{self.height}",
+            "-f", "rawvideo", "-pix_fmt", "rgba", "pipe:1"
+        ]
+    
+    def _start(self, start_index: int) -> bool:
+        self.close()
+        try:
+            self.process = subprocess.Popen(self._command(start_index), stdin=subprocess.DEVNULL,
+                                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            logger.error(f"Video decoder failed to start: {e}")
+            self.end_index = 0
+            return False
+        self.spawn_count += 1
+        self.next_index = start_index
+        return True
+    
+    def _read_next(self) -> Optional[np.ndarray]:
+        data = self.process.stdout.read(self.frame_bytes)
+        if len(data) < self.frame_bytes:
+            if self.end_index is None or self.next_index < self.end_index:
+                self.end_index = self.next_index
+            logger.debug(f"Video decoder for {self.path} ended at frame {self.next_index}")
+            self.close()
+            return None
+        self.next_index += 1
+        return np.frombuffer(data, dtype=np.uint8).reshape((self.height, self.width, 4))
+    
+    def read_frame(self, frame_index: int) -> Optional[np.ndarray]:
+        """Decode a source frame, or None past the end of the source or on failure"""
+        if self.end_index is not None and frame_index >= self.end_index:
+            return None
+        
+        if (self.process is None or frame_index < self.next_index
+                or frame_index - self.next_index > self.MAX_SKIP_FRAMES):
+            if not self._start(frame_index):
+                return None
+        
+        while self.next_index < frame_index:
+            if self._read_next() is None:
+                return None
+        return self._read_next()
+    
+    def close(self):
+        """Stop the decoder process"""
+        process, self.process = self.process, None
+        if process is None:
+            return
+        if process.poll() is None:
+            process.kill()
+        process.stdout.close()
+        process.wait()
 
 
 class FrameRenderingEngine:
     """Core frame rendering engine with OpenGL integration"""
     
-    def __init__(self, opengl_context: OpenGLContext):
+    def __init__(self, opengl_context: OpenGLContext, config_manager: Optional[Any] = None):
         self.opengl_context = opengl_context
         self.framebuffer: Optional[OpenGLFramebuffer] = None
         self.subtitle_renderer: Optional[OpenGLSubtitleRenderer] = None
@@ -138,15 +425,29 @@ class FrameRenderingEngine:
         # Performance tracking
         self.render_times: List[float] = []
         self.last_render_time = 0.0
+        self._stats_lock = threading.Lock()
+        self.metrics = get_metrics_registry()
+        self.tracer = get_render_tracer()
         
-        # Background rendering cache
-        self.background_cache: Dict[float, np.ndarray] = {}
-        self.cache_max_size = 50
+        # Decoded background frame cache (byte budget from performance settings)
+        if config_manager is not None:
+            self.background_cache = BackgroundFrameCache.from_config(config_manager)
+            self.pixel_converter = StripeConversionExecutor.from_config(config_manager)
+            get_cache_registry().governor.configure(config_manager)
+        else:
+            self.background_cache = BackgroundFrameCache()
+            self.pixel_converter = StripeConversionExecutor()
+        self._media_identities: Dict[str, str] = {}
+        self._video_decoders: Dict[str, SequentialVideoDecoder] = {}
+        self._readback_failures_counted = 0
     
     def initialize(self, project: Project, settings: FrameCaptureSettings) -> bool:
         """Initialize the rendering engine with project and settings"""
         self.current_project = project
         self.capture_settings = settings
+        if settings.reuse_cached_rasters:
+            # Entries are keyed by media identity and size, so exports share them safely
+            self.background_cache = get_shared_background_cache()
         
         try:
             # Create framebuffer for rendering
@@ -158,54 +459,73 @@ class FrameRenderingEngine:
             )
             
             self.framebuffer = self.opengl_context.create_framebuffer("frame_capture", config)
+            self._readback_failures_counted = 0
             if not self.framebuffer:
-                print("Failed to create framebuffer for frame capture")
+                logger.error("Failed to create framebuffer for frame capture")
                 return False
             
+            # Set up asynchronous readback (falls back to synchronous reads)
+            if settings.async_readback:
+                if not self.framebuffer.enable_async_readback(settings.readback_ring_size):
+                    logger.info("Asynchronous readback unavailable, using synchronous capture")
+            
+            # A mock framebuffer has no GL context to compile shaders in
+            mock_mode = self.framebuffer.mock_mode is True
+            
             # Initialize subtitle renderer
-            self.subtitle_renderer = OpenGLSubtitleRenderer()
-            if not self.subtitle_renderer.initialize_opengl():
-                print("Failed to initialize subtitle renderer")
+            self.subtitle_renderer = OpenGLSubtitleRenderer(effect_quality=settings.effect_quality)
+            if not mock_mode and not self.subtitle_renderer.initialize_opengl():
+                logger.error("Failed to initialize subtitle renderer")
                 return False
             
             # Initialize effects pipeline
-            self.effects_pipeline = EffectsRenderingPipeline(self.opengl_context)
+            self.effects_pipeline = EffectsRenderingPipeline(self.opengl_context, mock_mode=mock_mode,
+                                                             effect_quality=settings.effect_quality)
             # Effects pipeline initializes itself in constructor, no need to call initialize()
             
-            print(f"Frame rendering engine initialized: {settings.width}x{settings.height} @ {settings.fps}fps")
+            logger.info(f"Frame rendering engine initialized: {settings.width}x{settings.height} @ {settings.fps}fps")
             return True
             
         except Exception as e:
-            print(f"Failed to initialize frame rendering engine: {e}")
+            logger.error(f"Failed to initialize frame rendering engine: {e}")
             return False
     
     def render_frame_at_timestamp(self, timestamp: float) -> Optional[CapturedFrame]:
         """Render a single frame at the specified timestamp"""
+        raw_frame = self.capture_raw_frame(timestamp)
+        if raw_frame is None:
+            return None
+        
+        try:
+            pixel_data, render_time = raw_frame
+            return self._build_captured_frame(pixel_data, timestamp, render_time)
+            
+        except Exception as e:
+            logger.error(f"Frame rendering failed at timestamp {timestamp}: {e}")
+            return None
+    
+    def capture_raw_frame(self, timestamp: float) -> Optional[Tuple[np.ndarray, float]]:
+        """
+        Render a frame and read back its RGBA pixels without format conversion.
+        
+        This is the part of frame rendering that needs the OpenGL context; pass
+        the result to convert_raw_frame(), which may run on another thread.
+        Returns (pixel_data, render_time) or None on failure.
+        """
         if not self.framebuffer or not self.current_project or not self.capture_settings:
             return None
         
         start_time = time.time()
         
         try:
-            # Make OpenGL context current
-            if not self.opengl_context.make_current():
-                print("Failed to make OpenGL context current")
+            if not self._render_to_framebuffer(timestamp):
                 return None
             
-            # Bind framebuffer for rendering
-            self.framebuffer.bind()
-            
-            # Clear framebuffer
-            self.framebuffer.clear((0.0, 0.0, 0.0, 1.0))
-            
-            # Render background (video or image)
-            self._render_background(timestamp)
-            
-            # Render subtitles with effects
-            self._render_subtitles(timestamp)
-            
             # Capture framebuffer to pixel data
+            trace_start = self.tracer.begin()
             pixel_data = self._capture_framebuffer()
+            if trace_start:
+                self.tracer.end("readback", trace_start, self.capture_settings.timebase.frame_at(timestamp))
             
             # Unbind framebuffer
             self.framebuffer.unbind()
@@ -213,35 +533,150 @@ class FrameRenderingEngine:
             if pixel_data is None:
                 return None
             
-            # Convert pixel format if needed
-            converted_data = self._convert_pixel_format(pixel_data, self.capture_settings.pixel_format)
+            return pixel_data, time.time() - start_time
             
-            # Calculate frame number
-            frame_number = int(timestamp * self.capture_settings.fps)
+        except Exception as e:
+            logger.error(f"Frame rendering failed at timestamp {timestamp}: {e}")
+            return None
+    
+    def convert_raw_frame(self, pixel_data: np.ndarray, timestamp: float,
+                          render_time: float) -> Optional[CapturedFrame]:
+        """Convert pixels from capture_raw_frame() into a captured frame (thread-safe)"""
+        if not self.capture_settings:
+            return None
+        return self._build_captured_frame(pixel_data, timestamp, render_time)
+    
+    def submit_frame_at_timestamp(self, timestamp: float) -> Optional[CapturedFrame]:
+        """
+        Render a frame and queue its readback without waiting for the GPU.
+        
+        Returns the oldest frame whose readback has completed, which belongs to an
+        earlier timestamp than the one submitted, or None while the readback ring
+        is filling. Call flush_pending_frames() after the last submission.
+        """
+        if not self.framebuffer or not self.current_project or not self.capture_settings:
+            return None
+        
+        start_time = time.time()
+        
+        try:
+            if not self._render_to_framebuffer(timestamp):
+                return None
             
-            # Record render time
             render_time = time.time() - start_time
+            completed = self.framebuffer.read_pixels_async((timestamp, render_time))
+            self._count_readback_fallbacks()
+            
+            self.framebuffer.unbind()
+            
+            if completed is None:
+                return None
+            
+            return self._build_completed_readback(completed)
+            
+        except Exception as e:
+            logger.error(f"Frame submission failed at timestamp {timestamp}: {e}")
+            return None
+    
+    def flush_pending_frames(self) -> List[CapturedFrame]:
+        """Collect all frames still in flight in the readback ring"""
+        if not self.framebuffer:
+            return []
+        
+        frames = []
+        try:
+            readbacks = self.framebuffer.drain_readbacks()
+            self._count_readback_fallbacks()
+            for completed in readbacks:
+                frame = self._build_completed_readback(completed)
+                if frame:
+                    frames.append(frame)
+        except Exception as e:
+            logger.error(f"Flushing pending frames failed: {e}")
+        
+        return frames
+    
+    def _render_to_framebuffer(self, timestamp: float) -> bool:
+        """Render background and subtitles for a timestamp into the bound framebuffer"""
+        # Make OpenGL context current
+        if not self.opengl_context.make_current():
+            logger.error("Failed to make OpenGL context current")
+            return False
+        
+        # Bind framebuffer for rendering
+        self.framebuffer.bind()
+        
+        # Clear framebuffer
+        self.framebuffer.clear((0.0, 0.0, 0.0, 1.0))
+        
+        # Frame number for trace spans, only worked out while tracing
+        frame = self.capture_settings.timebase.frame_at(timestamp) if self.tracer.enabled else -1
+        
+        # Render background (video or image)
+        trace_start = self.tracer.begin()
+        self._render_background(timestamp)
+        self.tracer.end("background", trace_start, frame)
+        
+        # Render subtitles with effects
+        trace_start = self.tracer.begin()
+        self._render_subtitles(timestamp)
+        self.tracer.end("subtitles", trace_start, frame)
+        
+        return True
+    
+    def _count_readback_fallbacks(self):
+        """Add readbacks the framebuffer could not complete asynchronously to the metrics"""
+        failures = self.framebuffer.readback_failures
+        if failures > self._readback_failures_counted:
+            self.metrics.counter(READBACK_FALLBACKS_TOTAL).inc(failures - self._readback_failures_counted)
+            self._readback_failures_counted = failures
+    
+    def _build_completed_readback(self, completed: Tuple[Any, Optional[np.ndarray]]) -> Optional[CapturedFrame]:
+        """Turn a completed asynchronous readback into a captured frame"""
+        (timestamp, render_time), pixel_data = completed
+        if pixel_data is None:
+            # The pixel buffer could not be read; render the frame again and read it synchronously
+            logger.warning(f"Asynchronous readback failed at timestamp {timestamp}, rendering it again")
+            return self.render_frame_at_timestamp(timestamp)
+        pixel_data = self._process_captured_pixels(pixel_data)
+        if pixel_data is None:
+            return None
+        return self._build_captured_frame(pixel_data, timestamp, render_time)
+    
+    def _build_captured_frame(self, pixel_data: np.ndarray, timestamp: float,
+                              render_time: float) -> CapturedFrame:
+        """Convert captured pixels and wrap them with frame metadata"""
+        trace_start = self.tracer.begin()
+        with self.metrics.time(PIXEL_CONVERSION_SECONDS):
+            if self.capture_settings.premultiply_alpha and pixel_data.ndim == 3 and pixel_data.shape[2] == 4:
+                pixel_data = self.pixel_converter.premultiply_alpha(pixel_data)
+            
+            # Convert pixel format if needed
+            converted_data = self._convert_pixel_format(pixel_data, self.capture_settings.pixel_format)
+        
+        # Calculate frame number
+        frame_number = self.capture_settings.timebase.frame_at(timestamp)
+        self.tracer.end("convert", trace_start, frame_number)
+        
+        # Record render time (frames may be converted on several threads)
+        with self._stats_lock:
             self.render_times.append(render_time)
             self.last_render_time = render_time
             
             # Keep only recent render times for performance tracking
             if len(self.render_times) > 100:
                 self.render_times = self.render_times[-100:]
-            
-            return CapturedFrame(
-                frame_number=frame_number,
-                timestamp=timestamp,
-                width=self.capture_settings.width,
-                height=self.capture_settings.height,
-                pixel_format=self.capture_settings.pixel_format,
-                data=converted_data,
-                capture_time=time.time(),
-                render_time=render_time
-            )
-            
-        except Exception as e:
-            print(f"Frame rendering failed at timestamp {timestamp}: {e}")
-            return None
+        
+        return CapturedFrame(
+            frame_number=frame_number,
+            timestamp=timestamp,
+            width=self.capture_settings.width,
+            height=self.capture_settings.height,
+            pixel_format=self.capture_settings.pixel_format,
+            data=converted_data,
+            capture_time=time.time(),
+            render_time=render_time
+        )
     
     def _render_background(self, timestamp: float):
         """Render background (video frame or static image)"""
@@ -249,12 +684,6 @@ class FrameRenderingEngine:
             return
         
         try:
-            # Check cache first
-            if timestamp in self.background_cache:
-                cached_data = self.background_cache[timestamp]
-                self._render_background_data(cached_data)
-                return
-            
             # Render based on project media
             if self.current_project.video_file:
                 self._render_video_background(timestamp)
@@ -267,7 +696,7 @@ class FrameRenderingEngine:
                     gl.glClear(gl.GL_COLOR_BUFFER_BIT)
             
         except Exception as e:
-            print(f"Background rendering failed: {e}")
+            logger.error(f"Background rendering failed: {e}")
             # Fallback to solid color
             if PYQT_AVAILABLE:
                 gl.glClearColor(0.1, 0.1, 0.2, 1.0)
@@ -279,26 +708,12 @@ class FrameRenderingEngine:
             return
         
         try:
-            # For now, render a time-based gradient as placeholder
-            # In production, this would extract actual video frames
-            progress = (timestamp % 10.0) / 10.0  # 10-second cycle
-            
-            if PYQT_AVAILABLE:
-                # Create time-based color
-                r = 0.2 + 0.3 * progress
-                g = 0.3 + 0.2 * (1.0 - progress)
-                b = 0.4 + 0.1 * progress
-                
-                gl.glClearColor(r, g, b, 1.0)
-                gl.glClear(gl.GL_COLOR_BUFFER_BIT)
-            
-            # Cache this background for performance
-            if len(self.background_cache) < self.cache_max_size:
-                # In a real implementation, we'd cache the actual rendered data
-                self.background_cache[timestamp] = np.array([r, g, b, 1.0], dtype=np.float32)
+            data = self._get_video_background_frame(timestamp)
+            if data is not None:
+                self._render_background_data(data)
             
         except Exception as e:
-            print(f"Video background rendering failed: {e}")
+            logger.error(f"Video background rendering failed: {e}")
     
     def _render_image_background(self):
         """Render static image background"""
@@ -306,20 +721,124 @@ class FrameRenderingEngine:
             return
         
         try:
-            # For now, render a static gradient
-            # In production, this would load and render the actual image
-            if PYQT_AVAILABLE:
-                gl.glClearColor(0.3, 0.5, 0.3, 1.0)  # Green tint
-                gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+            data = self._get_image_background_frame()
+            if data is not None:
+                self._render_background_data(data)
             
         except Exception as e:
-            print(f"Image background rendering failed: {e}")
+            logger.error(f"Image background rendering failed: {e}")
+    
+    def _background_cache_key(self, path: str, frame_index: int) -> BackgroundCacheKey:
+        """Build the cache key for a source frame at the capture size"""
+        identity = self._media_identities.get(path)
+        if identity is None:
+            identity = BackgroundFrameCache.media_identity(path)
+            self._media_identities[path] = identity
+        
+        target_size = (self.capture_settings.width, self.capture_settings.height)
+        return (identity, frame_index, target_size)
+    
+    def _get_video_background_frame(self, timestamp: float) -> Optional[np.ndarray]:
+        """Get the decoded video frame shown at a timestamp, decoding on a cache miss"""
+        video_file = self.current_project.video_file
+        if video_file.frame_rate > 0:
+            source_timebase = Timebase.from_fps(video_file.frame_rate)
+        else:
+            source_timebase = self.capture_settings.timebase
+        
+        # Timestamps that fall on the same source frame share one cache entry
+        frame_index = source_timebase.frame_at(timestamp)
+        key = self._background_cache_key(video_file.path, frame_index)
+        
+        data = self.background_cache.get(key)
+        if data is None:
+            data = self._decode_video_frame(video_file.path, source_timebase, frame_index)
+            if data is None:
+                # Not cached: the source may decode once the file is readable
+                return self._placeholder_background(timestamp)
+            self.background_cache.put(key, data)
+        
+        return data
+    
+    def _get_image_background_frame(self) -> Optional[np.ndarray]:
+        """Get the decoded image background, pinning it after the first decode"""
+        image_file = self.current_project.image_file
+        key = self._background_cache_key(image_file.path, 0)
+        
+        data = self.background_cache.get(key)
+        if data is None:
+            data = self._decode_image(image_file.path)
+            self.background_cache.put(key, data, pin=True)
+        
+        return data
+    
+    def _decode_video_frame(self, path: str, source_timebase: Timebase, frame_index: int) -> Optional[np.ndarray]:
+        """Decode one video frame scaled to the capture size from the source's decoder pipe"""
+        if not os.path.exists(path):
+            return None
+        
+        decoder = self._video_decoders.get(path)
+        if decoder is None:
+            decoder = SequentialVideoDecoder(path, self.capture_settings.width,
+                                             self.capture_settings.height, source_timebase)
+            self._video_decoders[path] = decoder
+        return decoder.read_frame(frame_index)
+    
+    def _placeholder_background(self, timestamp: float) -> np.ndarray:
+        """Placeholder for undecodable video: time-based gradient color (10-second cycle)"""
+        progress = (timestamp % 10.0) / 10.0
+        return self._solid_background(
+            0.2 + 0.3 * progress,
+            0.3 + 0.2 * (1.0 - progress),
+            0.4 + 0.1 * progress
+        )
+    
+    def _decode_image(self, path: str) -> np.ndarray:
+        """Decode an image scaled to the capture size"""
+        width, height = self.capture_settings.width, self.capture_settings.height
+        
+        if PYQT_AVAILABLE and os.path.exists(path):
+            image = QImage(path)
+            if not image.isNull():
+                image = image.scaled(width, height).convertToFormat(QImage.Format.Format_RGBA8888)
+                bits = image.constBits()
+                bits.setsize(image.sizeInBytes())
+                rows = np.frombuffer(bits, dtype=np.uint8).reshape((height, image.bytesPerLine()))
+                return rows[:, :width * 4].reshape((height, width, 4)).copy()
+            
+            logger.error(f"Failed to load image: {path}")
+        
+        # Placeholder: green tint
+        return self._solid_background(0.3, 0.5, 0.3)
+    
+    def _solid_background(self, r: float, g: float, b: float) -> np.ndarray:
+        """Create a solid color background at the capture size"""
+        color = np.round(np.array([r, g, b, 1.0]) * 255.0).astype(np.uint8)
+        # Fill whole RGBA pixels as 32-bit words; broadcasting 4 channels is much slower
+        pixels = np.full(
+            (self.capture_settings.height, self.capture_settings.width),
+            color.view(np.uint32)[0],
+            dtype=np.uint32
+        )
+        return pixels.view(np.uint8).reshape((self.capture_settings.height, self.capture_settings.width, 4))
     
     def _render_background_data(self, data: np.ndarray):
-        """Render cached background data"""
-        if PYQT_AVAILABLE and len(data) >= 3:
-            gl.glClearColor(data[0], data[1], data[2], data[3] if len(data) > 3 else 1.0)
-            gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+        """Upload decoded background pixels into the framebuffer color attachment"""
+        if not PYQT_AVAILABLE or not self.framebuffer or self.framebuffer.mock_mode is not False:
+            return
+        
+        color_texture = self.framebuffer.color_texture
+        if not color_texture:
+            return
+        
+        # Decoded frames are top-down, OpenGL textures are bottom-up
+        pixels = np.ascontiguousarray(np.flipud(data))
+        gl.glBindTexture(gl.GL_TEXTURE_2D, color_texture.texture_id)
+        gl.glTexSubImage2D(
+            gl.GL_TEXTURE_2D, 0, 0, 0, data.shape[1], data.shape[0],
+            gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, pixels
+        )
+        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
     
     def _render_subtitles(self, timestamp: float):
         """Render subtitles with effects at the specified timestamp"""
@@ -335,21 +854,18 @@ class FrameRenderingEngine:
             
             # Set current time for effects
             self.subtitle_renderer.set_current_time(timestamp)
+            if self.effects_pipeline:
+                self.effects_pipeline.update_animation_time(timestamp)
             
             # Render each visible subtitle
             viewport_size = (self.capture_settings.width, self.capture_settings.height)
             
             for subtitle in visible_subtitles:
-                # Apply effects if pipeline is available
-                if self.effects_pipeline:
-                    self.effects_pipeline.set_current_time(timestamp)
-                    # Effects would be applied here in production
-                
                 # Render subtitle (placeholder implementation)
                 self._render_subtitle_placeholder(subtitle, timestamp, viewport_size)
             
         except Exception as e:
-            print(f"Subtitle rendering failed: {e}")
+            logger.error(f"Subtitle rendering failed: {e}")
     
     def _get_visible_subtitles(self, timestamp: float) -> List[SubtitleLine]:
         """Get subtitles visible at the specified timestamp"""
@@ -376,25 +892,33 @@ class FrameRenderingEngine:
         
         try:
             # Read pixels from framebuffer
-            pixel_data = self.framebuffer.read_pixels()
+            with self.metrics.time(FRAMEBUFFER_READBACK_SECONDS):
+                pixel_data = self.framebuffer.read_pixels()
             
             if pixel_data is None:
                 return None
             
-            # Apply quality scaling if needed
-            if self.capture_settings.quality < 1.0:
-                pixel_data = self._apply_quality_scaling(pixel_data)
-            
-            # Flip vertically if needed (OpenGL framebuffers are upside down)
-            if self.capture_settings.flip_vertically:
-                pixel_data = np.flipud(pixel_data)
-            
-            return pixel_data
+            return self._process_captured_pixels(pixel_data)
             
         except Exception as e:
-            print(f"Framebuffer capture failed: {e}")
+            logger.error(f"Framebuffer capture failed: {e}")
             return None
     
+    def _process_captured_pixels(self, pixel_data: np.ndarray) -> Optional[np.ndarray]:
+        """Apply quality scaling and orientation to freshly read pixels"""
+        if pixel_data is None:
+            return None
+        
+        # Apply quality scaling if needed
+        if self.capture_settings.quality < 1.0:
+            pixel_data = self._apply_quality_scaling(pixel_data)
+        
+        # Flip vertically if needed (OpenGL framebuffers are upside down)
+        if self.capture_settings.flip_vertically:
+            pixel_data = np.flipud(pixel_data)
+        
+        return pixel_data
+    
     def _apply_quality_scaling(self, data: np.ndarray) -> np.ndarray:
         """Apply quality scaling to reduce data size"""
         if self.capture_settings.quality >= 1.0:
@@ -411,7 +935,7 @@ class FrameRenderingEngine:
             return data
             
         except Exception as e:
-            print(f"Quality scaling failed: {e}")
+            logger.error(f"Quality scaling failed: {e}")
             return data
     
     def _convert_pixel_format(self, data: np.ndarray, target_format: PixelFormat) -> np.ndarray:
@@ -434,33 +958,29 @@ class FrameRenderingEngine:
             elif target_format == PixelFormat.BGR8:
                 return self._rgba_to_bgr(data)
             else:
-                print(f"Unsupported pixel format: {target_format}")
+                logger.error(f"Unsupported pixel format: {target_format}")
                 return data
                 
         except Exception as e:
-            print(f"Pixel format conversion failed: {e}")
+            logger.error(f"Pixel format conversion failed: {e}")
             return data
     
     def _rgba_to_rgb(self, data: np.ndarray) -> np.ndarray:
         """Convert RGBA to RGB by dropping alpha channel"""
         if data.shape[2] >= 3:
-            return data[:, :, :3].copy()
+            return self.pixel_converter.rgba_to_rgb(data)
         return data
     
     def _rgba_to_bgra(self, data: np.ndarray) -> np.ndarray:
         """Convert RGBA to BGRA by swapping red and blue channels"""
         if data.shape[2] >= 4:
-            result = data.copy()
-            result[:, :, [0, 2]] = result[:, :, [2, 0]]  # Swap R and B
-            return result
+            return self.pixel_converter.rgba_to_bgra(data)
         return data
     
     def _rgba_to_bgr(self, data: np.ndarray) -> np.ndarray:
         """Convert RGBA to BGR by swapping red and blue channels and dropping alpha"""
         if data.shape[2] >= 3:
-            result = data[:, :, :3].copy()
-            result[:, :, [0, 2]] = result[:, :, [2, 0]]  # Swap R and B
-            return result
+            return self.pixel_converter.rgba_to_bgr(data)
         return data
     
     def _rgba_to_yuv420p(self, data: np.ndarray) -> np.ndarray:
@@ -469,57 +989,9 @@ class FrameRenderingEngine:
             return data
         
         try:
-            # Extract RGB channels (ignore alpha)
-            rgb = data[:, :, :3].astype(np.float32) / 255.0
-            
-            # Convert RGB to YUV using ITU-R BT.601 coefficients
-            # Y = 0.299*R + 0.587*G + 0.114*B
-            # U = -0.147*R - 0.289*G + 0.436*B + 0.5
-            # V = 0.615*R - 0.515*G - 0.100*B + 0.5
-            
-            r, g, b = rgb[:, :, 0], rgb[:, :, 1], rgb[:, :, 2]
-            
-            # Calculate Y (luma) - full resolution
-            y = 0.299 * r + 0.587 * g + 0.114 * b
-            
-            # Calculate U and V (chroma) - subsampled to half resolution
-            height, width = data.shape[:2]
-            u_height, u_width = height // 2, width // 2
-            v_height, v_width = height // 2, width // 2
-            
-            # Subsample by taking every other pixel
-            r_sub = r[::2, ::2]
-            g_sub = g[::2, ::2]
-            b_sub = b[::2, ::2]
-            
-            u = -0.147 * r_sub - 0.289 * g_sub + 0.436 * b_sub + 0.5
-            v = 0.615 * r_sub - 0.515 * g_sub - 0.100 * b_sub + 0.5
-            
-            # Convert to 8-bit and clamp
-            y = np.clip(y * 255, 0, 255).astype(np.uint8)
-            u = np.clip(u * 255, 0, 255).astype(np.uint8)
-            v = np.clip(v * 255, 0, 255).astype(np.uint8)
-            
-            # Pack YUV420P format: Y plane, then U plane, then V plane
-            yuv_size = height * width + 2 * u_height * u_width
-            yuv_data = np.zeros(yuv_size, dtype=np.uint8)
-            
-            # Y plane (full resolution)
-            yuv_data[:height * width] = y.flatten()
-            
-            # U plane (quarter resolution)
-            u_start = height * width
-            u_end = u_start + u_height * u_width
-            yuv_data[u_start:u_end] = u.flatten()
-            
-            # V plane (quarter resolution)
-            v_start = u_end
-            yuv_data[v_start:] = v.flatten()
-            
-            return yuv_data.reshape(-1, 1)  # Return as column vector
-            
+            return self.pixel_converter.rgba_to_yuv420p(data)
         except Exception as e:
-            print(f"RGBA to YUV420P conversion failed: {e}")
+            logger.error(f"RGBA to YUV420P conversion failed: {e}")
             return data
     
     def _rgba_to_yuv444p(self, data: np.ndarray) -> np.ndarray:
@@ -528,42 +1000,9 @@ class FrameRenderingEngine:
             return data
         
         try:
-            # Extract RGB channels (ignore alpha)
-            rgb = data[:, :, :3].astype(np.float32) / 255.0
-            
-            r, g, b = rgb[:, :, 0], rgb[:, :, 1], rgb[:, :, 2]
-            
-            # Convert RGB to YUV
-            y = 0.299 * r + 0.587 * g + 0.114 * b
-            u = -0.147 * r - 0.289 * g + 0.436 * b + 0.5
-            v = 0.615 * r - 0.515 * g - 0.100 * b + 0.5
-            
-            # Convert to 8-bit and clamp
-            y = np.clip(y * 255, 0, 255).astype(np.uint8)
-            u = np.clip(u * 255, 0, 255).astype(np.uint8)
-            v = np.clip(v * 255, 0, 255).astype(np.uint8)
-            
-            # Pack YUV444P format: Y plane, then U plane, then V plane
-            height, width = data.shape[:2]
-            yuv_size = 3 * height * width
-            yuv_data = np.zeros(yuv_size, dtype=np.uint8)
-            
-            # Y plane
-            yuv_data[:height * width] = y.flatten()
-            
-            # U plane
-            u_start = height * width
-            u_end = u_start + height * width
-            yuv_data[u_start:u_end] = u.flatten()
-            
-            # V plane
-            v_start = u_end
-            yuv_data[v_start:] = v.flatten()
-            
-            return yuv_data.reshape(-1, 1)  # Return as column vector
-            
+            return self.pixel_converter.rgba_to_yuv444p(data)
         except Exception as e:
-            print(f"RGBA to YUV444P conversion failed: {e}")
+            logger.error(f"RGBA to YUV444P conversion failed: {e}")
             return data
     
     def get_performance_stats(self) -> Dict[str, float]:
@@ -604,10 +1043,92 @@ class FrameRenderingEngine:
             self.effects_pipeline.cleanup()
             self.effects_pipeline = None
         
-        self.background_cache.clear()
+        if not (self.capture_settings and self.capture_settings.reuse_cached_rasters):
+            self.background_cache.clear()
+        self._media_identities.clear()
+        for decoder in self._video_decoders.values():
+            decoder.close()
+        self._video_decoders.clear()
+        self.pixel_converter.shutdown()
         self.render_times.clear()
 
 
+class FrameStream:
+    """
+    Bounded queue of captured frames between a capture thread and a consumer.
+    
+    The producer blocks while the queue is full, so a slow consumer (e.g. the
+    encoder) throttles capture instead of frames being dropped or piling up in
+    memory. At most ``max_frames`` frames wait in the queue at any time.
+    """
+    
+    _END = object()
+    
+    def __init__(self, max_frames: int = 10):
+        self.max_frames = max(1, max_frames)
+        self.queue: queue.Queue = queue.Queue(maxsize=self.max_frames)
+        self.cancelled = threading.Event()
+        self.finished = False
+        self.error: Optional[str] = None
+        self.peak_buffered = 0
+    
+    def put(self, frame: CapturedFrame) -> bool:
+        """Queue a frame, blocking while the consumer lags; False if cancelled"""
+        while not self.cancelled.is_set():
+            try:
+                self.queue.put(frame, timeout=0.1)
+            except queue.Full:
+                continue
+            
+            self.peak_buffered = max(self.peak_buffered, self.queue.qsize())
+            # cancel() drains the queue, which can let a blocked put through
+            return not self.cancelled.is_set()
+        return False
+    
+    def close(self, error: Optional[str] = None):
+        """Mark the end of the stream, recording an error if capture failed"""
+        self.error = error
+        while not self.cancelled.is_set():
+            try:
+                self.queue.put(self._END, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+    
+    def cancel(self):
+        """Stop the stream and release any frames still queued"""
+        self.cancelled.set()
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+    
+    def next_frame(self) -> Optional[CapturedFrame]:
+        """Get the next frame, or None when the stream has ended or was cancelled"""
+        while not self.finished and not self.cancelled.is_set():
+            try:
+                item = self.queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            
+            if item is self._END:
+                self.finished = True
+                break
+            return item
+        
+        return None
+    
+    def __iter__(self) -> Iterator[CapturedFrame]:
+        while True:
+            frame = self.next_frame()
+            if frame is None:
+                if self.error:
+                    raise RuntimeError(self.error)
+                return
+            yield frame
+
+
 class FrameCaptureSystem(QObject):
     """
     High-level frame capture system with threading and synchronization support
@@ -619,19 +1140,23 @@ class FrameCaptureSystem(QObject):
     capture_completed = pyqtSignal()
     capture_failed = pyqtSignal(str)  # Error message
     
-    def __init__(self, opengl_context: OpenGLContext):
+    def __init__(self, opengl_context: OpenGLContext, config_manager: Optional[Any] = None):
         super().__init__()
         
         self.opengl_context = opengl_context
-        self.rendering_engine = FrameRenderingEngine(opengl_context)
+        self.rendering_engine = FrameRenderingEngine(opengl_context, config_manager)
         
         # Capture state
         self.is_capturing = False
         self.should_cancel = False
+        self.use_async_readback = False
+        self.buffer_size = 10
+        self.capture_error: Optional[str] = None
         
         # Threading support
         self.capture_thread: Optional[threading.Thread] = None
         self.frame_queue: Optional[queue.Queue] = None
+        self.frame_stream: Optional[FrameStream] = None
         
         # Synchronization
         self.audio_sync_offset = 0.0
@@ -641,102 +1166,206 @@ class FrameCaptureSystem(QObject):
         self.capture_start_time = 0.0
         self.frames_captured = 0
         self.total_frames = 0
+        
+        # Per-frame progress goes to the telemetry bus; signals and log lines
+        # are driven by its rate-limited snapshots
+        self.telemetry = TelemetryBus()
+        self._frames_total_counter = self.telemetry.counter("frames_captured_total")
+        self._frames_gauge = self.telemetry.gauge("frames_captured")
+        self._total_gauge = self.telemetry.gauge("total_frames")
+        self._progress_gauge = self.telemetry.gauge("progress_percent")
+        self._last_frame: Optional[CapturedFrame] = None
+        if PYQT_AVAILABLE:
+            self.telemetry.subscribe(QtSignalSubscriber(
+                self.capture_progress, lambda snapshot: snapshot.gauges["progress_percent"]))
+            self.telemetry.subscribe(QtSignalSubscriber(self.frame_captured, self._capture_summary))
+        self.telemetry.subscribe(LoggingSubscriber(logger, self._format_capture_progress))
+    
+    def _capture_summary(self, snapshot: TelemetrySnapshot) -> Dict[str, Any]:
+        """Payload of the frame_captured signal
+
+        The CapturedFrame.to_dict() keys of the latest captured frame (as
+        before the telemetry bus), plus the capture progress and rate.
+        """
+        gauges = snapshot.gauges
+        summary = self._last_frame.to_dict() if self._last_frame else {}
+        summary.update({
+            'frames_captured': int(gauges["frames_captured"]),
+            'total_frames': int(gauges["total_frames"]),
+            'progress_percent': gauges["progress_percent"],
+            'fps': snapshot.rates["frames_captured_total"]
+        })
+        return summary
+    
+    @staticmethod
+    def _format_capture_progress(snapshot: TelemetrySnapshot) -> str:
+        gauges = snapshot.gauges
+        return (f"Captured frame {int(gauges['frames_captured'])}/{int(gauges['total_frames'])} "
+                f"({gauges['progress_percent']:.1f}%) - {snapshot.rates['frames_captured_total']:.1f} fps")
     
     def initialize(self, project: Project, settings: FrameCaptureSettings) -> bool:
         """Initialize the capture system"""
+        self.use_async_readback = settings.async_readback
+        self.buffer_size = settings.buffer_size
         return self.rendering_engine.initialize(project, settings)
     
-    def generate_frame_timestamps(self, duration: float, fps: float, start_time: float = 0.0) -> List[FrameTimestamp]:
-        """Generate frame timestamps for the specified duration and frame rate"""
-        timestamps = []
-        frame_duration = 1.0 / fps
+    def generate_frame_timestamps(self, duration: float, fps: Union[float, Timebase],
+                                  start_time: float = 0.0) -> List[FrameTimestamp]:
+        """Generate frame timestamps from start_time up to (excluding) duration"""
+        timebase = Timebase.from_fps(fps)
+        frame_duration = timebase.frame_duration
         
-        current_time = start_time
-        frame_number = 0
+        # Frame times come from frame indices, so error never accumulates
+        count = timebase.frame_count(duration - start_time)
+        times = start_time + timebase.frame_times(count)
         
-        while current_time < duration:
-            timestamps.append(FrameTimestamp(
+        return [
+            FrameTimestamp(
                 frame_number=frame_number,
-                timestamp=current_time,
+                timestamp=float(timestamp),
                 duration=frame_duration,
-                fps=fps
-            ))
-            
-            current_time += frame_duration
-            frame_number += 1
-        
-        return timestamps
+                fps=timebase.fps
+            )
+            for frame_number, timestamp in enumerate(times)
+        ]
     
-    def capture_frame_sequence(self, timestamps: List[FrameTimestamp], 
-                             progress_callback: Optional[Callable[[float], None]] = None) -> List[CapturedFrame]:
-        """Capture a sequence of frames at the specified timestamps"""
+    def iter_frame_sequence(self, timestamps: Iterable[FrameTimestamp],
+                            progress_callback: Optional[Callable[[float], None]] = None,
+                            total_frames: Optional[int] = None) -> Iterator[CapturedFrame]:
+        """Capture frames lazily, yielding each one as soon as it is read back"""
         if self.is_capturing:
-            print("Capture already in progress")
-            return []
+            logger.warning("Capture already in progress")
+            return
+        
+        if total_frames is None:
+            total_frames = sum(t.repeat for t in timestamps) if hasattr(timestamps, '__len__') else 0
         
         self.is_capturing = True
         self.should_cancel = False
+        self.capture_error = None
         self.frames_captured = 0
-        self.total_frames = len(timestamps)
+        self.total_frames = total_frames
         self.capture_start_time = time.time()
+        self._frames_gauge.set(0)
+        self._total_gauge.set(total_frames)
+        self._progress_gauge.set(0.0)
+        
+        # With asynchronous readback each submission returns an earlier frame
+        if self.use_async_readback:
+            render_frame = self.rendering_engine.submit_frame_at_timestamp
+        else:
+            render_frame = self.rendering_engine.render_frame_at_timestamp
         
-        captured_frames = []
+        # Repeat counts of planned frames, matched up by timestamp because
+        # asynchronous readback returns frames late
+        repeats: Dict[float, int] = {}
         
         try:
-            for i, timestamp_info in enumerate(timestamps):
+            for timestamp_info in timestamps:
                 if self.should_cancel:
-                    print("Frame capture cancelled")
+                    logger.info("Frame capture cancelled")
                     break
                 
+                if timestamp_info.repeat > 1:
+                    repeats[timestamp_info.timestamp] = timestamp_info.repeat
+                
                 # Capture frame at timestamp
-                frame = self.rendering_engine.render_frame_at_timestamp(timestamp_info.timestamp)
+                frame = render_frame(timestamp_info.timestamp)
                 
                 if frame:
-                    captured_frames.append(frame)
-                    self.frames_captured += 1
-                    
-                    # Emit frame captured signal
-                    if PYQT_AVAILABLE:
-                        self.frame_captured.emit(frame.to_dict())
-                    
-                    # Update progress
-                    progress = (i + 1) / len(timestamps)
-                    if progress_callback:
-                        progress_callback(progress)
-                    
-                    if PYQT_AVAILABLE:
-                        self.capture_progress.emit(progress * 100.0)
-                    
-                    # Print progress every 10 frames
-                    if (i + 1) % 10 == 0 or i == len(timestamps) - 1:
-                        elapsed = time.time() - self.capture_start_time
-                        fps = self.frames_captured / elapsed if elapsed > 0 else 0
-                        print(f"Captured frame {i + 1}/{len(timestamps)} ({progress*100:.1f}%) - {fps:.1f} fps")
-                
-                else:
-                    print(f"Failed to capture frame at timestamp {timestamp_info.timestamp}")
+                    frame.repeat = repeats.pop(frame.timestamp, 1)
+                    self._report_captured_frame(frame, progress_callback)
+                    yield frame
+                elif not self.use_async_readback:
+                    logger.error(f"Failed to capture frame at timestamp {timestamp_info.timestamp}")
             
+            # Collect frames still in flight in the readback ring
+            if self.use_async_readback:
+                for frame in self.rendering_engine.flush_pending_frames():
+                    if self.should_cancel:
+                        break
+                    frame.repeat = repeats.pop(frame.timestamp, 1)
+                    self._report_captured_frame(frame, progress_callback)
+                    yield frame
+            
+            self.telemetry.publish()
             if not self.should_cancel:
-                print(f"Frame capture completed: {len(captured_frames)} frames")
+                logger.info(f"Frame capture completed: {self.frames_captured} frames")
                 if PYQT_AVAILABLE:
                     self.capture_completed.emit()
             
         except Exception as e:
             error_msg = f"Frame capture failed: {e}"
-            print(error_msg)
+            logger.error(error_msg)
+            self.capture_error = error_msg
             if PYQT_AVAILABLE:
                 self.capture_failed.emit(error_msg)
         
         finally:
             self.is_capturing = False
+    
+    def capture_frame_sequence(self, timestamps: List[FrameTimestamp], 
+                             progress_callback: Optional[Callable[[float], None]] = None) -> List[CapturedFrame]:
+        """Capture a sequence of frames at the specified timestamps
         
-        return captured_frames
+        Every frame stays in memory; use stream_frame_sequence for full exports.
+        """
+        return list(self.iter_frame_sequence(timestamps, progress_callback))
+    
+    def stream_frame_sequence(self, timestamps: Iterable[FrameTimestamp],
+                              progress_callback: Optional[Callable[[float], None]] = None,
+                              max_buffered_frames: Optional[int] = None,
+                              total_frames: Optional[int] = None) -> FrameStream:
+        """Capture frames in a background thread into a bounded FrameStream
+        
+        The capture thread blocks while ``max_buffered_frames`` (default:
+        settings.buffer_size) frames are waiting, so memory use is bounded by
+        the consumer's pace rather than the song length. ``stream.next_frame``
+        can be passed directly as an encoder frame source.
+        """
+        stream = FrameStream(max_buffered_frames or self.buffer_size)
+        
+        if self.is_capturing:
+            logger.warning("Capture already in progress")
+            stream.close("Capture already in progress")
+            return stream
+        
+        def capture_worker():
+            frames = self.iter_frame_sequence(timestamps, progress_callback, total_frames)
+            try:
+                for frame in frames:
+                    if not stream.put(frame):
+                        self.should_cancel = True
+                        break
+            finally:
+                frames.close()
+                stream.close(self.capture_error)
+        
+        self.frame_stream = stream
+        self.frame_queue = stream.queue
+        self.capture_thread = threading.Thread(target=capture_worker, name="frame-capture", daemon=True)
+        self.capture_thread.start()
+        return stream
+    
+    def _report_captured_frame(self, frame: CapturedFrame,
+                               progress_callback: Optional[Callable[[float], None]]):
+        """Count a captured frame and report progress"""
+        self.frames_captured += frame.repeat
+        progress = self.frames_captured / self.total_frames if self.total_frames > 0 else 1.0
+        if progress_callback:
+            progress_callback(progress)
+        
+        self._frames_total_counter.add(frame.repeat)
+        self._frames_gauge.set(self.frames_captured)
+        self._progress_gauge.set(progress * 100.0)
+        self._last_frame = frame
+        self.telemetry.publish_if_due()
     
     def capture_frame_sequence_async(self, timestamps: List[FrameTimestamp],
                                    completion_callback: Optional[Callable[[List[CapturedFrame]], None]] = None):
         """Capture frame sequence asynchronously in a separate thread"""
         if self.is_capturing:
-            print("Capture already in progress")
+            logger.warning("Capture already in progress")
             return
         
         def capture_worker():
@@ -749,8 +1378,12 @@ class FrameCaptureSystem(QObject):
     
     def cancel_capture(self):
         """Cancel ongoing frame capture"""
-        if self.is_capturing:
-            print("Cancelling frame capture...")
+        if self.frame_stream:
+            # Unblock a capture thread waiting on a full stream
+            self.frame_stream.cancel()
+        
+        if self.is_capturing or (self.capture_thread and self.capture_thread.is_alive()):
+            logger.info("Cancelling frame capture...")
             self.should_cancel = True
             
             # Wait for capture thread to finish
@@ -786,6 +1419,12 @@ class FrameCaptureSystem(QObject):
             'audio_sync_offset': self.audio_sync_offset
         }
     
+    def register_resources(self, sampler):
+        """Report the background cache and the capture queue to a ResourceSampler"""
+        sampler.add_cache("background_frames", lambda: self.rendering_engine.background_cache.total_bytes)
+        sampler.add_queue("capture_stream",
+                          lambda: self.frame_stream.queue.qsize() if self.frame_stream else 0)
+    
     def cleanup(self):
         """Clean up capture system resources"""
         self.cancel_capture()
@@ -793,31 +1432,69 @@ class FrameCaptureSystem(QObject):
 
 
 # Convenience functions for common operations
-def create_frame_capture_system(opengl_context: OpenGLContext) -> FrameCaptureSystem:
+def create_frame_capture_system(opengl_context: OpenGLContext,
+                                config_manager: Optional[Any] = None) -> FrameCaptureSystem:
     """Create a frame capture system with the given OpenGL context"""
-    return FrameCaptureSystem(opengl_context)
+    return FrameCaptureSystem(opengl_context, config_manager)
+
+
+def _project_duration(project: Project) -> float:
+    """Get the duration a video export of the project should cover"""
+    if project.audio_file:
+        return project.audio_file.duration
+    elif project.video_file:
+        return project.video_file.duration
+    return 60.0  # Default 1 minute
+
+
+def stream_video_frames(project: Project, settings: FrameCaptureSettings,
+                        opengl_context: OpenGLContext,
+                        resource_sampler: Optional[Any] = None,
+                        config_manager: Optional[Any] = None) -> Iterator[CapturedFrame]:
+    """Capture all frames for a video project one at a time
+    
+    config_manager's performance settings size the caches and conversion threads.
+    """
+    capture_system = create_frame_capture_system(opengl_context, config_manager)
+    
+    if not capture_system.initialize(project, settings):
+        logger.error("Failed to initialize frame capture system")
+        return
+    if resource_sampler is not None:
+        capture_system.register_resources(resource_sampler)
+    
+    if settings.deduplicate_frames:
+        try:
+            from .frame_plan import compile_frame_plan
+        except ImportError:
+            from frame_plan import compile_frame_plan
+        timestamps = compile_frame_plan(project, settings.fps).timestamps()
+    else:
+        timestamps = capture_system.generate_frame_timestamps(_project_duration(project), settings.fps)
+    
+    try:
+        # Rendered on the caller's thread (where the OpenGL context is current)
+        # only as fast as the consumer pulls frames
+        yield from capture_system.iter_frame_sequence(timestamps)
+    finally:
+        # Runs on normal completion and when the consumer stops early
+        capture_system.cleanup()
 
 
 def capture_video_frames(project: Project, settings: FrameCaptureSettings,
                         opengl_context: OpenGLContext) -> List[CapturedFrame]:
-    """Capture all frames for a video project"""
+    """Capture all frames for a video project into a list
+    
+    Every frame stays in memory; use stream_video_frames for full-length songs.
+    """
     capture_system = create_frame_capture_system(opengl_context)
     
     if not capture_system.initialize(project, settings):
-        print("Failed to initialize frame capture system")
+        logger.error("Failed to initialize frame capture system")
         return []
     
-    # Get project duration
-    duration = 0.0
-    if project.audio_file:
-        duration = project.audio_file.duration
-    elif project.video_file:
-        duration = project.video_file.duration
-    else:
-        duration = 60.0  # Default 1 minute
-    
     # Generate frame timestamps
-    timestamps = capture_system.generate_frame_timestamps(duration, settings.fps)
+    timestamps = capture_system.generate_frame_timestamps(_project_duration(project), settings.fps)
     
     # Capture frames
     frames = capture_system.capture_frame_sequence(timestamps)
@@ -0,0 +1,223 @@
+"""
+Frame Plan Compiler
+
+Compiles a project into a per-frame description of what the frame shows:
+the visible subtitle lines, each line's karaoke highlight state, the state of
+animated effects and the background source frame. Consecutive frames with
+identical descriptions render to identical pixels, so a run of them is
+collapsed into one planned frame with a repeat count. Instrumental breaks
+over a still background and lines waiting between sung words are rendered,
+read back and converted once per run instead of once per output frame.
+
+Anything that changes continuously (a word being filled, a fade, a wave) is
+treated as unique per frame, so collapsing never changes the output. Effects
+driven by the shader's time uniform (bounce and wave offsets are
+sin(time * frequency) * amplitude) change for as long as their line is shown.
+"""
+
+from dataclasses import dataclass, field
+from typing import Optional, List, Tuple, Any, Sequence, Hashable
+
+import numpy as np
+
+try:
+    from .models import Project, SubtitleLine, Effect
+    from .timebase import Timebase
+    from .frame_capture_system import FrameTimestamp, _project_duration
+except ImportError:
+    from models import Project, SubtitleLine, Effect
+    from timebase import Timebase
+    from frame_capture_system import FrameTimestamp, _project_duration
+
+
+# Effect types whose appearance depends on the time within the line
+ANIMATED_EFFECT_TYPES = ("fade", "bounce", "color_transition", "typewriter", "wave", "animation")
+
+# Plan state of a frame that cannot be shared with its neighbours
+_UNIQUE = "unique"
+
+
+@dataclass
+class PlannedFrame:
+    """One rendered frame covering `repeat` consecutive output frames"""
+    frame_number: int
+    timestamp: float
+    repeat: int
+    visible_lines: Tuple[int, ...] = ()
+    background_id: Optional[Hashable] = None
+
+
+@dataclass
+class FramePlan:
+    """Rendered frames for the output frame range [start_frame, end_frame)"""
+    timebase: Timebase
+    start_frame: int
+    end_frame: int
+    frames: List[PlannedFrame] = field(default_factory=list)
+
+    @property
+    def total_frames(self) -> int:
+        return self.end_frame - self.start_frame
+
+    @property
+    def rendered_frames(self) -> int:
+        return len(self.frames)
+
+    @property
+    def duplicate_frames(self) -> int:
+        """Output frames that are not rendered"""
+        return self.total_frames - self.rendered_frames
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Output frames per rendered frame"""
+        return self.total_frames / self.rendered_frames if self.frames else 1.0
+
+    def timestamps(self) -> List[FrameTimestamp]:
+        """Capture timestamps for the rendered frames, carrying their repeat counts"""
+        return [
+            FrameTimestamp(
+                frame_number=frame.frame_number,
+                timestamp=frame.timestamp,
+                duration=frame.repeat * self.timebase.frame_duration,
+                fps=self.timebase.fps,
+                repeat=frame.repeat
+            )
+            for frame in self.frames
+        ]
+
+    def get_stats(self) -> dict:
+        return {
+            'total_frames': self.total_frames,
+            'rendered_frames': self.rendered_frames,
+            'duplicate_frames': self.duplicate_frames,
+            'dedup_ratio': self.dedup_ratio
+        }
+
+
+def _karaoke_state(line: SubtitleLine, timestamp: float) -> Hashable:
+    """Highlight state of a visible line: the number of words already sung"""
+    if not line.word_timings:
+        # Highlight progresses linearly over the whole line
+        return _UNIQUE
+
+    completed = 0
+    for word in line.word_timings:
+        if timestamp >= word.end_time:
+            completed += 1
+        elif timestamp >= word.start_time:
+            # Partially filled word
+            return _UNIQUE
+    return completed
+
+
+def _effect_animating(effect: Effect, line: SubtitleLine, timestamp: float) -> bool:
+    """Whether an effect changes the line's appearance at this time"""
+    parameters = effect.parameters
+    elapsed = timestamp - line.start_time
+
+    if effect.type == "fade":
+        return (elapsed < parameters.get('fade_in_duration', 0.5) or
+                line.end_time - timestamp < parameters.get('fade_out_duration', 0.5))
+    if effect.type == "typewriter":
+        speed = parameters.get('speed', 1.0) or 1.0
+        return elapsed < len(line.text) * parameters.get('character_delay', 0.1) / speed
+    # Bounce, wave, animation and color transitions follow the time uniform for the whole line
+    return effect.type in ANIMATED_EFFECT_TYPES
+
+
+class FramePlanCompiler:
+    """
+    Compiles a project into a FramePlan.
+
+    Visibility follows FrameRenderingEngine (a line is shown while
+    start_time <= t <= end_time) and background frames follow its cache keys,
+    so frames with equal plans are rendered from identical inputs.
+    """
+
+    def __init__(self, project: Project, fps: Any):
+        self.project = project
+        self.timebase = Timebase.from_fps(fps)
+        self.lines: Sequence[SubtitleLine] = project.subtitle_file.lines if project.subtitle_file else []
+        self.animated_effects = [effect for effect in project.effects
+                                 if effect.enabled and effect.type in ANIMATED_EFFECT_TYPES]
+
+        self.video_timebase: Optional[Timebase] = None
+        if project.video_file:
+            rate = project.video_file.frame_rate
+            self.video_timebase = Timebase.from_fps(rate) if rate > 0 else self.timebase
+
+    def total_frames(self) -> int:
+        return self.timebase.frame_count(_project_duration(self.project))
+
+    def compile(self, start_frame: int = 0, end_frame: Optional[int] = None) -> FramePlan:
+        """Plan the output frames [start_frame, end_frame)"""
+        if end_frame is None:
+            end_frame = self.total_frames()
+        plan = FramePlan(self.timebase, start_frame, end_frame)
+        count = max(0, end_frame - start_frame)
+        if count == 0:
+            return plan
+
+        # Same frame times as FrameCaptureSystem.generate_frame_timestamps
+        times = self.timebase.frame_times(count, start_frame)
+        visible = self._visible_lines(times)
+
+        current: Optional[PlannedFrame] = None
+        current_key = None
+        for offset, timestamp in enumerate(times.tolist()):
+            lines = visible[offset]
+            background = self._background_id(timestamp)
+            key = self._frame_key(lines, background, timestamp)
+
+            if current is not None and key is not None and key == current_key:
+                current.repeat += 1
+                continue
+
+            current = PlannedFrame(start_frame + offset, timestamp, 1, tuple(lines), background)
+            current_key = key
+            plan.frames.append(current)
+
+        return plan
+
+    def _visible_lines(self, times: np.ndarray) -> List[List[int]]:
+        """Indices of the lines visible at each frame time"""
+        visible: List[List[int]] = [[] for _ in range(len(times))]
+        if not self.lines:
+            return visible
+
+        starts = np.array([line.start_time for line in self.lines], dtype=np.float64)
+        ends = np.array([line.end_time for line in self.lines], dtype=np.float64)
+        first_frames = np.searchsorted(times, starts, side='left')
+        end_frames = np.searchsorted(times, ends, side='right')
+
+        for line_index, (first, end) in enumerate(zip(first_frames.tolist(), end_frames.tolist())):
+            for offset in range(first, end):
+                visible[offset].append(line_index)
+        return visible
+
+    def _background_id(self, timestamp: float) -> Hashable:
+        if self.video_timebase is not None:
+            return ("video", self.video_timebase.frame_at(timestamp))
+        if self.project.image_file:
+            return "image"
+        return None
+
+    def _frame_key(self, lines: List[int], background: Hashable, timestamp: float) -> Optional[Hashable]:
+        """Hashable description of the frame, or None if it cannot be shared"""
+        states = []
+        for line_index in lines:
+            line = self.lines[line_index]
+            karaoke = _karaoke_state(line, timestamp)
+            if karaoke == _UNIQUE:
+                return None
+            if any(_effect_animating(effect, line, timestamp) for effect in self.animated_effects):
+                return None
+            states.append((line_index, karaoke))
+        return (background, tuple(states))
+
+
+def compile_frame_plan(project: Project, fps: Any, start_frame: int = 0,
+                       end_frame: Optional[int] = None) -> FramePlan:
+    """Compile the frame plan for a project (the whole timeline by default)"""
+    return FramePlanCompiler(project, fps).compile(start_frame, end_frame)
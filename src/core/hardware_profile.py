@@ -0,0 +1,286 @@
+"""
+Hardware Profile and Performance Auto-Tuning
+
+Frame queues, pipe chunks, concurrent exports and cache sizes used to have
+the same fixed defaults on an 8-core laptop and a 64-core render server.
+probe_hardware() reads the core count, total memory, free space in the temp
+directory and the H.264/HEVC encoders FFmpeg offers, and
+derive_performance_settings() turns that into performance settings:
+
+- ``frame_buffer_size``: frames queued between the renderer and FFmpeg,
+- ``streaming_chunk_mb``: bytes written to the FFmpeg pipe per flush,
+- ``max_concurrent_jobs``: batch exports run at the same time,
+- ``texture_cache_entries``: subtitle texture cache entries,
+- ``background_cache_mb``: decoded background frame cache,
+- ``cache_budget_mb``: budget of the cache governor.
+
+auto_tune() stores the profile and the derived values per host name in the
+``hardware`` performance setting, so a configuration directory shared by
+several machines keeps one set per machine. Derivation is repeated only when
+the hardware changes. ConfigManager.get_performance_setting() returns, in
+order, a per-host override (``host_overrides``), a value set explicitly by
+the user, the derived value for this host, and the caller's default.
+
+Processes without a ConfigManager (the headless CLI) use get_tuned_settings(),
+which answers get_performance_setting() from this machine's derived values.
+"""
+
+import os
+import re
+import shutil
+import socket
+import logging
+import tempfile
+import subprocess
+from dataclasses import dataclass, field, asdict
+from typing import Optional, Dict, Any, List
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Performance settings derived from the hardware profile
+TUNED_SETTINGS = (
+    "frame_buffer_size",
+    "streaming_chunk_mb",
+    "max_concurrent_jobs",
+    "texture_cache_entries",
+    "background_cache_mb",
+    "cache_budget_mb",
+)
+
+# Values used before auto-tuning, and when nothing can be probed
+STATIC_DEFAULTS = {
+    "frame_buffer_size": 10,
+    "streaming_chunk_mb": 1,
+    "max_concurrent_jobs": 1,
+    "texture_cache_entries": 100,
+    "background_cache_mb": 256,
+    "cache_budget_mb": 1024,
+}
+
+# Encoder name suffixes of hardware video encoders
+HARDWARE_ENCODER_SUFFIXES = ("_nvenc", "_qsv", "_vaapi", "_videotoolbox", "_amf")
+
+# Temp space each concurrent export needs for segments and two-pass logs
+TEMP_MB_PER_JOB = 2048
+# Memory each concurrent export needs (frame queues, caches, FFmpeg)
+MEMORY_MB_PER_JOB = 4096
+
+
+def current_host() -> str:
+    """Name of this machine, the key of per-host settings"""
+    try:
+        return socket.gethostname() or "localhost"
+    except OSError:
+        return "localhost"
+
+
+@dataclass
+class HardwareProfile:
+    """Resources of the machine relevant to rendering throughput"""
+    host: str = "localhost"
+    cpu_count: int = 1
+    memory_mb: int = 0  # Total physical memory (0 = unknown)
+    temp_free_mb: int = 0  # Free space in the temp directory (0 = unknown)
+    ffmpeg_path: Optional[str] = None
+    encoders: List[str] = field(default_factory=list)  # H.264/HEVC encoders FFmpeg offers
+
+    @property
+    def hardware_encoders(self) -> List[str]:
+        """Encoders running on a GPU or media engine"""
+        return [name for name in self.encoders if name.endswith(HARDWARE_ENCODER_SUFFIXES)]
+
+    def fingerprint(self) -> Dict[str, Any]:
+        """Fields that change the derived settings when the machine changes
+
+        Free disk space changes with every export, so it is left out; memory
+        is rounded to whole gigabytes.
+        """
+        return {
+            'cpu_count': self.cpu_count,
+            'memory_gb': round(self.memory_mb / 1024),
+            'ffmpeg_path': self.ffmpeg_path,
+            'encoders': sorted(self.encoders)
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HardwareProfile":
+        known = {key: value for key, value in data.items() if key in cls.__dataclass_fields__}
+        return cls(**known)
+
+
+def _probe_memory_mb() -> int:
+    if PSUTIL_AVAILABLE:
+        try:
+            return int(psutil.virtual_memory().total // MB)
+        except (psutil.Error, OSError):
+            pass
+    try:
+        return int(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // MB)
+    except (ValueError, OSError, AttributeError):
+        return 0
+
+
+def _probe_temp_free_mb(temp_dir: Optional[str]) -> int:
+    try:
+        return int(shutil.disk_usage(temp_dir or tempfile.gettempdir()).free // MB)
+    except OSError:
+        return 0
+
+
+def probe_encoders(ffmpeg_path: str) -> List[str]:
+    """H.264 and HEVC encoders listed by ``ffmpeg -encoders``"""
+    try:
+        result = subprocess.run([ffmpeg_path, "-hide_banner", "-encoders"],
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.warning(f"Could not list FFmpeg encoders: {e}")
+        return []
+    if result.returncode != 0:
+        return []
+
+    encoders = []
+    for line in result.stdout.splitlines():
+        # " V....D libx264              libx264 H.264 / AVC ..."
+        match = re.match(r'\s*V\S*\s+(\S+)', line)
+        if match and re.search(r'264|265|hevc', match.group(1)):
+            encoders.append(match.group(1))
+    return encoders
+
+
+def probe_hardware(temp_dir: Optional[str] = None, probe_ffmpeg: bool = True) -> HardwareProfile:
+    """Probe this machine's cores, memory, free temp space and FFmpeg encoders"""
+    ffmpeg_path = shutil.which("ffmpeg") if probe_ffmpeg else None
+    return HardwareProfile(
+        host=current_host(),
+        cpu_count=os.cpu_count() or 1,
+        memory_mb=_probe_memory_mb(),
+        temp_free_mb=_probe_temp_free_mb(temp_dir),
+        ffmpeg_path=ffmpeg_path,
+        encoders=probe_encoders(ffmpeg_path) if ffmpeg_path else []
+    )
+
+
+def _clamp(value: int, low: int, high: int) -> int:
+    return max(low, min(int(value), high))
+
+
+def derive_performance_settings(profile: HardwareProfile) -> Dict[str, Any]:
+    """Performance settings for a machine; unknown resources keep the static defaults"""
+    settings = dict(STATIC_DEFAULTS)
+    cores = max(1, profile.cpu_count)
+    memory_mb = profile.memory_mb
+
+    # Enough queued frames to keep every encoder thread busy, at 8 MB per
+    # 1080p frame no more than 1/512 of memory
+    buffer_size = _clamp(2 * cores, 4, 32)
+    if memory_mb:
+        buffer_size = min(buffer_size, max(4, memory_mb // 512))
+    settings["frame_buffer_size"] = buffer_size
+
+    if memory_mb:
+        settings["streaming_chunk_mb"] = 1 if memory_mb < 8192 else 2 if memory_mb < 32768 else 4
+        settings["texture_cache_entries"] = _clamp(memory_mb // 128, 50, 400)
+        settings["background_cache_mb"] = _clamp(memory_mb // 32, 128, 2048)
+        settings["cache_budget_mb"] = _clamp(memory_mb // 8, 256, 8192)
+
+    # One export per eight cores (x264 stops scaling there), one more when a
+    # hardware encoder takes the encoding off the CPU; each export needs
+    # memory and temp space of its own
+    jobs = max(1, cores // 8) + (1 if profile.hardware_encoders else 0)
+    if memory_mb:
+        jobs = min(jobs, max(1, memory_mb // MEMORY_MB_PER_JOB))
+    if profile.temp_free_mb:
+        jobs = min(jobs, max(1, profile.temp_free_mb // TEMP_MB_PER_JOB))
+    settings["max_concurrent_jobs"] = _clamp(jobs, 1, 8)
+
+    return settings
+
+
+def auto_tune(config_manager, profile: Optional[HardwareProfile] = None,
+              force: bool = False) -> Dict[str, Any]:
+    """Derive and persist the performance settings for this host
+
+    The profile and derived values are stored under the host name in the
+    ``hardware`` performance setting. Unless force is set, the stored values
+    are kept while the hardware fingerprint is unchanged. Returns the
+    derived settings.
+
+    Without a profile, this machine is probed; the encoder list (which runs
+    ``ffmpeg -encoders``) is taken from the stored profile while the FFmpeg
+    path is unchanged, so an unchanged machine is checked without starting
+    a process.
+    """
+    hardware = dict(config_manager.get_performance_setting("hardware", None) or {})
+    if profile is None:
+        profile = probe_hardware(probe_ffmpeg=False)
+        profile.ffmpeg_path = shutil.which("ffmpeg")
+        stored = hardware.get(profile.host)
+        stored_profile = HardwareProfile.from_dict(stored.get("profile", {})) if stored else None
+        if not force and stored_profile and stored_profile.ffmpeg_path == profile.ffmpeg_path:
+            profile.encoders = list(stored_profile.encoders)
+        elif profile.ffmpeg_path:
+            profile.encoders = probe_encoders(profile.ffmpeg_path)
+    record = hardware.get(profile.host)
+
+    if (not force and record
+            and HardwareProfile.from_dict(record.get("profile", {})).fingerprint() == profile.fingerprint()):
+        return dict(record.get("derived", {}))
+
+    derived = derive_performance_settings(profile)
+    hardware[profile.host] = {"profile": profile.to_dict(), "derived": derived}
+    config_manager.set_performance_setting("hardware", hardware)
+    logger.info(f"Performance settings tuned for {profile.host} ({profile.cpu_count} cores, "
+                f"{profile.memory_mb} MB): {derived}")
+    return derived
+
+
+class TunedSettings:
+    """Derived settings of a hardware profile, read like a ConfigManager's performance settings"""
+
+    def __init__(self, profile: HardwareProfile, overrides: Optional[Dict[str, Any]] = None):
+        self.profile = profile
+        self.settings = derive_performance_settings(profile)
+        self.settings.update(overrides or {})
+
+    def get_performance_setting(self, key: str, default: Any = None) -> Any:
+        return self.settings.get(key, default)
+
+    def set_performance_setting(self, key: str, value: Any):
+        self.settings[key] = value
+
+
+# Profile of this machine, probed on first use
+_default_settings: Optional[TunedSettings] = None
+
+
+def get_tuned_settings() -> TunedSettings:
+    """Get the settings derived from this machine's hardware"""
+    global _default_settings
+    if _default_settings is None:
+        _default_settings = TunedSettings(probe_hardware())
+    return _default_settings
+
+
+def tuned_setting(key: str, config_manager=None) -> Any:
+    """A tuned performance setting from config_manager, or from this machine's hardware"""
+    settings = config_manager if config_manager is not None else get_tuned_settings()
+    return settings.get_performance_setting(key, STATIC_DEFAULTS.get(key))
+
+
+if __name__ == "__main__":
+    profile = probe_hardware()
+    print(f"Hardware profile: {profile.to_dict()}")
+    for key, value in derive_performance_settings(profile).items():
+        print(f"  {key}: {value} (static default {STATIC_DEFAULTS[key]})")
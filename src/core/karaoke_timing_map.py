@@ -0,0 +1,93 @@
+"""
+Karaoke Timing Map
+
+Frame-indexed lookup of the karaoke timing active at each output frame. The
+map is built by locating every subtitle line's frame range with a binary
+search over the frame times and painting line indices into a per-frame array,
+instead of testing every frame against every line.
+"""
+
+from typing import Optional, List, Sequence, Iterator, Any
+
+import numpy as np
+
+try:
+    from .timebase import Timebase
+except ImportError:
+    from timebase import Timebase
+
+
+# Marker for frames without karaoke timing
+NO_TIMING = -1
+
+
+class KaraokeTimingMap:
+    """
+    Karaoke timing keyed by integer frame index.
+
+    A frame maps to the timing of a line whose [start_time, end_time] range
+    contains the frame time; where lines overlap, the line listed last wins.
+    """
+
+    def __init__(self, timebase: Optional[Timebase] = None):
+        self.timebase = timebase or Timebase()
+        self.timings: List[Any] = []
+        self.frame_owner: np.ndarray = np.empty(0, dtype=np.int32)
+
+    def build(self, lines: Sequence[Any], frame_times: np.ndarray, timebase: Optional[Timebase] = None):
+        """Map each frame time to the karaoke timing of the line covering it"""
+        if timebase is not None:
+            self.timebase = timebase
+
+        self.timings = []
+        self.frame_owner = np.full(len(frame_times), NO_TIMING, dtype=np.int32)
+
+        timed_lines = [line for line in lines if getattr(line, 'karaoke_timing', None)]
+        if not timed_lines or len(frame_times) == 0:
+            return
+
+        # Frame ranges of all lines in one vectorized binary search
+        starts = np.array([line.start_time for line in timed_lines], dtype=np.float64)
+        ends = np.array([line.end_time for line in timed_lines], dtype=np.float64)
+        first_frames = np.searchsorted(frame_times, starts, side='left')
+        end_frames = np.searchsorted(frame_times, ends, side='right')
+
+        # Paint in list order so later lines overwrite earlier overlapping ones
+        for line_index, (first, end) in enumerate(zip(first_frames, end_frames)):
+            if first < end:
+                self.frame_owner[first:end] = line_index
+
+        self.timings = [line.karaoke_timing for line in timed_lines]
+
+    def get(self, frame_index: int, default: Any = None) -> Any:
+        """Karaoke timing for a frame index"""
+        if 0 <= frame_index < len(self.frame_owner):
+            owner = self.frame_owner[frame_index]
+            if owner != NO_TIMING:
+                return self.timings[owner]
+        return default
+
+    def timing_at(self, timestamp: float) -> Any:
+        """Karaoke timing for the frame shown at a timestamp"""
+        return self.get(self.timebase.frame_at(timestamp))
+
+    def keys(self) -> Iterator[int]:
+        """Frame indices that have karaoke timing"""
+        return iter(np.flatnonzero(self.frame_owner != NO_TIMING).tolist())
+
+    def clear(self):
+        """Remove all timing information"""
+        self.timings = []
+        self.frame_owner = np.empty(0, dtype=np.int32)
+
+    def __getitem__(self, frame_index: int) -> Any:
+        timing = self.get(frame_index)
+        if timing is None:
+            raise KeyError(frame_index)
+        return timing
+
+    def __contains__(self, frame_index: int) -> bool:
+        return self.get(frame_index) is not None
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.frame_owner != NO_TIMING))
@@ -10,7 +10,7 @@ import numpy as np
 import time
 from typing import Dict, List, Optional, Tuple, Any, Union
 from dataclasses import dataclass, field
-from threading import Lock
+from threading import Lock, get_ident
 import logging
 
 # Configure logging
@@ -20,10 +20,14 @@ try:
     from .libass_integration import LibassContext, LibassImage, LibassIntegration
     from .opengl_context import OpenGLContext, OpenGLTexture
     from .models import SubtitleFile, SubtitleLine, KaraokeTimingInfo
+    from .cache_registry import get_cache_registry, CACHE_PRIORITY_LOW
+    from .hardware_profile import STATIC_DEFAULTS
 except ImportError:
     from libass_integration import LibassContext, LibassImage, LibassIntegration
     from opengl_context import OpenGLContext, OpenGLTexture
     from models import SubtitleFile, SubtitleLine, KaraokeTimingInfo
+    from cache_registry import get_cache_registry, CACHE_PRIORITY_LOW
+    from hardware_profile import STATIC_DEFAULTS
 
 # Try to import OpenGL libraries
 try:
@@ -48,12 +52,19 @@ class TextureStreamFrame:
 @dataclass
 class TextureStreamConfig:
     """Configuration for texture streaming"""
-    max_cache_size: int = 100
+    max_cache_size: int = STATIC_DEFAULTS["texture_cache_entries"]
     preload_frames: int = 5
     cache_timeout: float = 30.0  # seconds
     texture_format: int = gl.GL_RGBA if OPENGL_AVAILABLE else 0x1908
     enable_compression: bool = False
     enable_mipmaps: bool = False
+    
+    @classmethod
+    def from_config(cls, config_manager, **kwargs) -> "TextureStreamConfig":
+        """Create a configuration sized by the ``texture_cache_entries`` performance setting"""
+        kwargs.setdefault("max_cache_size", int(config_manager.get_performance_setting(
+            "texture_cache_entries", STATIC_DEFAULTS["texture_cache_entries"])))
+        return cls(**kwargs)
 
 
 class TextureCache:
@@ -67,6 +78,12 @@ class TextureCache:
         self.lock = Lock()
         self.hit_count = 0
         self.miss_count = 0
+        
+        # Textures are destroyed on the rendering thread; evictions requested
+        # from other threads are applied by the next put()
+        self.owner_thread: Optional[int] = None
+        self.pending_evict_bytes = 0
+        get_cache_registry().register(self, "libass_textures", CACHE_PRIORITY_LOW)
     
     def _generate_cache_key(self, timestamp: float, subtitle_hash: str, 
                           viewport_size: Tuple[int, int]) -> str:
@@ -99,6 +116,12 @@ class TextureCache:
     
     def put(self, cache_key: str, frame: TextureStreamFrame):
         """Store texture frame in cache"""
+        self.owner_thread = get_ident()
+        with self.lock:
+            pending, self.pending_evict_bytes = self.pending_evict_bytes, 0
+        if pending:
+            self.evict_bytes(pending)
+        
         with self.lock:
             # Remove existing entry if present
             if cache_key in self.cache:
@@ -117,6 +140,32 @@ class TextureCache:
             frame.last_access_time = time.time()
             self.cache[cache_key] = frame
             self.access_order.append(cache_key)
+        
+        get_cache_registry().notify_growth(self._frame_bytes(frame))
+    
+    def evict_bytes(self, nbytes: int) -> int:
+        """Evict least recently used frames until nbytes are freed; returns bytes freed"""
+        with self.lock:
+            if self.owner_thread not in (None, get_ident()):
+                self.pending_evict_bytes += nbytes
+                return 0
+            
+            freed = 0
+            while self.access_order and freed < nbytes:
+                oldest_key = self.access_order[0]
+                freed += self._frame_bytes(self.cache[oldest_key]) if oldest_key in self.cache else 0
+                self._remove_frame(oldest_key)
+            return freed
+    
+    @staticmethod
+    def _frame_bytes(frame: TextureStreamFrame) -> int:
+        """Estimated bytes of a frame: RGBA texture storage plus libass bitmaps"""
+        total = sum(len(image.bitmap) for image in frame.libass_images)
+        if frame.texture:
+            width, height = frame.texture.width, frame.texture.height
+            if isinstance(width, int) and isinstance(height, int):  # Unknown sizes count as 0
+                total += width * height * 4
+        return total
     
     def _remove_frame(self, cache_key: str):
         """Remove frame from cache and cleanup texture"""
@@ -141,6 +190,16 @@ class TextureCache:
             self.hit_count = 0
             self.miss_count = 0
     
+    @property
+    def total_bytes(self) -> int:
+        """Estimated bytes held: RGBA texture storage plus libass bitmaps"""
+        with self.lock:
+            return sum(self._frame_bytes(frame) for frame in self.cache.values())
+    
+    @property
+    def entry_count(self) -> int:
+        return len(self.cache)
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
         with self.lock:
@@ -546,13 +605,20 @@ class LibassOpenGLIntegration:
 
 # Convenience functions
 def create_libass_opengl_integration(opengl_context: OpenGLContext,
-                                   cache_size: int = 100,
-                                   preload_frames: int = 5) -> LibassOpenGLIntegration:
-    """Create libass-OpenGL integration with specified configuration"""
-    config = TextureStreamConfig(
-        max_cache_size=cache_size,
-        preload_frames=preload_frames
-    )
+                                   cache_size: Optional[int] = None,
+                                   preload_frames: int = 5,
+                                   config_manager: Optional[Any] = None) -> LibassOpenGLIntegration:
+    """Create libass-OpenGL integration with specified configuration
+    
+    Without a cache_size the cache is sized by config_manager's performance
+    settings, or holds the default number of entries.
+    """
+    if cache_size is not None:
+        config = TextureStreamConfig(max_cache_size=cache_size, preload_frames=preload_frames)
+    elif config_manager is not None:
+        config = TextureStreamConfig.from_config(config_manager, preload_frames=preload_frames)
+    else:
+        config = TextureStreamConfig(preload_frames=preload_frames)
     
     return LibassOpenGLIntegration(opengl_context, config)
 
@@ -0,0 +1,381 @@
+"""
+Render Metrics Registry
+
+This module provides a shared, low-overhead registry of counters, gauges and
+latency histograms for the rendering pipeline. Histograms use HDR-style
+log-linear buckets, so recording a sample is a constant-time list increment
+while percentiles stay within about 1.6% of the true value over a range from
+microseconds to hours. The registry can be exported as JSON or Prometheus
+text format, to a file or over a local HTTP port.
+"""
+
+import os
+import math
+import json
+import time
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, Any, List, Iterator, Tuple
+
+
+# Standard metric names shared by the rendering components
+SUBTITLE_RASTER_SECONDS = "subtitle_raster_seconds"
+EFFECTS_RENDER_SECONDS = "effects_render_seconds"
+FRAMEBUFFER_READBACK_SECONDS = "framebuffer_readback_seconds"
+PIXEL_CONVERSION_SECONDS = "pixel_conversion_seconds"
+PIPE_WRITE_SECONDS = "pipe_write_seconds"
+FFMPEG_SPEED_RATIO = "ffmpeg_speed_ratio"
+
+FRAMES_RENDERED_TOTAL = "frames_rendered_total"
+FRAMES_DROPPED_TOTAL = "frames_dropped_total"
+READBACK_FALLBACKS_TOTAL = "readback_fallbacks_total"
+FRAMES_ENCODED_TOTAL = "frames_encoded_total"
+BACKGROUND_CACHE_HITS_TOTAL = "background_cache_hits_total"
+BACKGROUND_CACHE_MISSES_TOTAL = "background_cache_misses_total"
+CACHE_BYTES = "cache_bytes"
+CACHE_GOVERNOR_EVICTED_BYTES_TOTAL = "cache_governor_evicted_bytes_total"
+
+# Bucket boundaries reported in the Prometheus exposition (seconds)
+PROMETHEUS_LATENCY_BOUNDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                             0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROMETHEUS_RATIO_BOUNDS = (0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+
+REPORTED_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+class Counter:
+    """Monotonically increasing count"""
+
+    def __init__(self, name: str, help_text: str = ""):
+        self.name = name
+        self.help = help_text
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        """Increase the counter"""
+        with self._lock:
+            self.value += amount
+
+    def reset(self):
+        """Reset to zero"""
+        with self._lock:
+            self.value = 0.0
+
+
+class Gauge:
+    """Value that can go up and down"""
+
+    def __init__(self, name: str, help_text: str = ""):
+        self.name = name
+        self.help = help_text
+        self.value = 0.0
+
+    def set(self, value: float):
+        """Set the current value"""
+        self.value = float(value)
+
+    def reset(self):
+        """Reset to zero"""
+        self.value = 0.0
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram with log-linear buckets.
+
+    Values are stored as integer multiples of ``resolution``. Below
+    ``2**sub_bucket_bits`` units every unit has its own bucket; above that each
+    power of two is split into ``2**(sub_bucket_bits - 1)`` equal buckets, so
+    the relative error is bounded by ``2**-(sub_bucket_bits - 1)``.
+    """
+
+    def __init__(self, name: str, help_text: str = "", resolution: float = 1e-6,
+                 sub_bucket_bits: int = 7, max_exponent: int = 40):
+        self.name = name
+        self.help = help_text
+        self.resolution = resolution
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self.half_count = self.sub_bucket_count // 2
+        self.max_exponent = max_exponent
+
+        self.counts: List[int] = [0] * (self.sub_bucket_count + max_exponent * self.half_count)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def _bucket_index(self, units: int) -> int:
+        """Bucket holding an integer value"""
+        if units < self.sub_bucket_count:
+            return units
+        exponent = units.bit_length() - self.sub_bucket_bits
+        if exponent > self.max_exponent:
+            return len(self.counts) - 1
+        mantissa = units >> exponent
+        return self.sub_bucket_count + (exponent - 1) * self.half_count + (mantissa - self.half_count)
+
+    def _bucket_range(self, index: int) -> Tuple[int, int]:
+        """Integer value range [low, high] covered by a bucket"""
+        if index < self.sub_bucket_count:
+            return index, index
+        offset = index - self.sub_bucket_count
+        exponent = offset // self.half_count + 1
+        mantissa = offset % self.half_count + self.half_count
+        return mantissa << exponent, ((mantissa + 1) << exponent) - 1
+
+    def record(self, value: float):
+        """Record one sample (in the histogram's unit, e.g. seconds)"""
+        if value < 0.0:
+            value = 0.0
+        index = self._bucket_index(int(value / self.resolution))
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Record the wall time spent in a ``with`` block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(time.perf_counter() - start)
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Value at or below which ``percent`` of the samples fall"""
+        with self._lock:
+            if self.count == 0:
+                return 0.0
+
+            target = max(1, math.ceil(self.count * percent / 100.0 - 1e-9))
+            cumulative = 0
+            for index, bucket_count in enumerate(self.counts):
+                cumulative += bucket_count
+                if cumulative >= target:
+                    low, high = self._bucket_range(index)
+                    value = (low + high) / 2.0 * self.resolution
+                    return min(max(value, self.min), self.max)
+            return self.max
+
+    def cumulative_counts(self, bounds: Tuple[float, ...]) -> List[int]:
+        """Number of samples at or below each bound (for Prometheus buckets)"""
+        with self._lock:
+            results = []
+            cumulative = 0
+            index = 0
+            for bound in bounds:
+                while index < len(self.counts) and self._bucket_range(index)[1] * self.resolution <= bound:
+                    cumulative += self.counts[index]
+                    index += 1
+                results.append(cumulative)
+            return results
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summary statistics as a dictionary"""
+        summary = {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.mean,
+            'min': self.min if self.count else 0.0,
+            'max': self.max
+        }
+        for percent in REPORTED_PERCENTILES:
+            summary[f"p{percent:g}"] = self.percentile(percent)
+        return summary
+
+    def reset(self):
+        """Discard all samples"""
+        with self._lock:
+            self.counts = [0] * len(self.counts)
+            self.count = 0
+            self.sum = 0.0
+            self.min = float('inf')
+            self.max = 0.0
+
+
+class MetricsRegistry:
+    """
+    Named counters, gauges and histograms shared across components.
+
+    Metrics are created on first use, so components record into the same
+    series without coordinating registration.
+    """
+
+    def __init__(self, prefix: str = "karaoke"):
+        self.prefix = prefix
+        self.counters: Dict[str, Counter] = {}
+        self.gauges: Dict[str, Gauge] = {}
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+        self.http_server: Optional[ThreadingHTTPServer] = None
+        self.http_thread: Optional[threading.Thread] = None
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        """Get or create a counter"""
+        with self._lock:
+            if name not in self.counters:
+                self.counters[name] = Counter(name, help_text)
+            return self.counters[name]
+
+    def gauge(self, name: str, help_text: str = "") -> Gauge:
+        """Get or create a gauge"""
+        with self._lock:
+            if name not in self.gauges:
+                self.gauges[name] = Gauge(name, help_text)
+            return self.gauges[name]
+
+    def histogram(self, name: str, help_text: str = "", resolution: float = 1e-6) -> LatencyHistogram:
+        """Get or create a histogram"""
+        with self._lock:
+            if name not in self.histograms:
+                self.histograms[name] = LatencyHistogram(name, help_text, resolution)
+            return self.histograms[name]
+
+    def time(self, name: str):
+        """Context manager recording elapsed seconds into a histogram"""
+        return self.histogram(name).time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All metrics as a JSON-serializable dictionary"""
+        with self._lock:
+            counters = list(self.counters.values())
+            gauges = list(self.gauges.values())
+            histograms = list(self.histograms.values())
+
+        return {
+            'timestamp': time.time(),
+            'counters': {c.name: c.value for c in counters},
+            'gauges': {g.name: g.value for g in gauges},
+            'histograms': {h.name: h.snapshot() for h in histograms}
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """Export as JSON"""
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self) -> str:
+        """Export in the Prometheus text exposition format"""
+        with self._lock:
+            counters = sorted(self.counters.values(), key=lambda m: m.name)
+            gauges = sorted(self.gauges.values(), key=lambda m: m.name)
+            histograms = sorted(self.histograms.values(), key=lambda m: m.name)
+
+        lines = []
+        for metric, kind in [(c, "counter") for c in counters] + [(g, "gauge") for g in gauges]:
+            name = f"{self.prefix}_{metric.name}"
+            if metric.help:
+                lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {metric.value:g}")
+
+        for histogram in histograms:
+            name = f"{self.prefix}_{histogram.name}"
+            bounds = PROMETHEUS_LATENCY_BOUNDS if name.endswith("_seconds") else PROMETHEUS_RATIO_BOUNDS
+            if histogram.help:
+                lines.append(f"# HELP {name} {histogram.help}")
+            lines.append(f"# TYPE {name} histogram")
+            for bound, cumulative in zip(bounds, histogram.cumulative_counts(bounds)):
+                lines.append(f'{name}_bucket{{le="{bound:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum {histogram.sum:g}")
+            lines.append(f"{name}_count {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_file(self, path: str):
+        """
+        Write metrics to a file, atomically replacing it.
+
+        ``.prom`` and ``.txt`` files get the Prometheus format (suitable for
+        the node exporter textfile collector); anything else gets JSON.
+        """
+        if os.path.splitext(path)[1].lower() in (".prom", ".txt"):
+            content = self.to_prometheus()
+        else:
+            content = self.to_json()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+
+    def start_http_server(self, port: int, host: str = "127.0.0.1") -> int:
+        """
+        Serve ``/metrics`` (Prometheus) and ``/metrics.json`` on a local port.
+
+        Pass port 0 to pick a free port. Returns the bound port.
+        """
+        if self.http_server:
+            return self.http_server.server_address[1]
+
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                if path in ("/", "/metrics"):
+                    body, content_type = registry.to_prometheus(), "text/plain; version=0.0.4"
+                elif path == "/metrics.json":
+                    body, content_type = registry.to_json(), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass  # Keep scrapes out of the console
+
+        self.http_server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self.http_thread = threading.Thread(target=self.http_server.serve_forever,
+                                            name="metrics-http", daemon=True)
+        self.http_thread.start()
+        return self.http_server.server_address[1]
+
+    def stop_http_server(self):
+        """Stop the HTTP endpoint"""
+        if self.http_server:
+            self.http_server.shutdown()
+            self.http_server.server_close()
+            self.http_server = None
+        if self.http_thread:
+            self.http_thread.join(timeout=5.0)
+            self.http_thread = None
+
+    def reset(self):
+        """Reset every metric to zero, keeping registrations"""
+        with self._lock:
+            metrics = list(self.counters.values()) + list(self.gauges.values()) + \
+                list(self.histograms.values())
+        for metric in metrics:
+            metric.reset()
+
+
+# Process-wide registry used by the rendering components
+_default_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the shared metrics registry"""
+    return _default_registry
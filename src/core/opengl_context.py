@@ -6,9 +6,12 @@ for high-performance video rendering without requiring window display.
 Supports both GLFW and PyQt6 backends for maximum compatibility.
 """
 
+import os
 import sys
+import ctypes
+from collections import deque
 import numpy as np
-from typing import Optional, Tuple, Dict, Any, List
+from typing import Optional, Tuple, Dict, Any, List, Deque
 from dataclasses import dataclass
 from enum import Enum
 import logging
@@ -130,6 +133,15 @@ class OpenGLFramebuffer:
         self.is_valid = False
         self.mock_mode = mock_mode
         
+        # Asynchronous readback (pixel buffer object ring)
+        self.async_readback_enabled = False
+        self.readback_ring_size = 0
+        self.pbo_ids: List[int] = []
+        # (slot, tag, pixels); slot -1 holds pixels read synchronously after a failed queue
+        self._pending_readbacks: Deque[Tuple[int, Any, Optional[np.ndarray]]] = deque()
+        self._next_pbo_slot = 0
+        self.readback_failures = 0  # Pixel buffer reads that fell back or must be re-rendered
+        
         if OPENGL_AVAILABLE and not mock_mode:
             self._create_framebuffer()
         elif mock_mode:
@@ -292,9 +304,7 @@ class OpenGLFramebuffer:
         
         if self.mock_mode:
             # Return mock pixel data for testing
-            channels = 4  # RGBA
-            pixel_array = np.zeros((self.config.height, self.config.width, channels), dtype=np.uint8)
-            return pixel_array
+            return self._mock_pixels()
         
         if not OPENGL_AVAILABLE:
             return None
@@ -326,11 +336,169 @@ class OpenGLFramebuffer:
         
         return pixel_array
     
+    def enable_async_readback(self, ring_size: int = 2) -> bool:
+        """
+        Enable asynchronous readback through a ring of pixel buffer objects.
+        
+        Each readback is queued into the next PBO and only mapped once the ring
+        is full, so frames are delivered ``ring_size - 1`` frames late while the
+        GPU copy of frame N overlaps the rendering of frame N+1.
+        
+        Returns False (and keeps synchronous reads) when PBOs are unavailable.
+        """
+        self.disable_async_readback()
+        
+        if not self.is_valid:
+            return False
+        
+        ring_size = max(2, int(ring_size))
+        
+        if self.mock_mode:
+            # Mock PBO handles so the ring logic can be exercised headless
+            self.pbo_ids = list(range(100, 100 + ring_size))
+        elif OPENGL_AVAILABLE:
+            try:
+                if not bool(gl.glGenBuffers) or not bool(gl.glBindBuffer):
+                    raise RuntimeError("glGenBuffers is not supported by this context")
+                
+                buffer_ids = gl.glGenBuffers(ring_size)
+                pbo_ids = [int(buffer_id) for buffer_id in np.atleast_1d(buffer_ids)]
+                buffer_size = self.config.width * self.config.height * 4
+                
+                for pbo_id in pbo_ids:
+                    gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, pbo_id)
+                    gl.glBufferData(gl.GL_PIXEL_PACK_BUFFER, buffer_size, None, gl.GL_STREAM_READ)
+                gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)
+                
+                self.pbo_ids = pbo_ids
+            except Exception as e:
+                logger.warning(f"Pixel buffer objects unavailable, using synchronous readback: {e}")
+                self.pbo_ids = []
+                return False
+        else:
+            return False
+        
+        self.readback_ring_size = ring_size
+        self.async_readback_enabled = True
+        logger.info(f"Asynchronous readback enabled with {ring_size} pixel buffers")
+        return True
+    
+    def disable_async_readback(self):
+        """Release the PBO ring and return to synchronous reads (pending reads are dropped)"""
+        if self.pbo_ids and OPENGL_AVAILABLE and not self.mock_mode:
+            try:
+                gl.glDeleteBuffers(len(self.pbo_ids), self.pbo_ids)
+            except Exception as e:
+                logger.debug(f"Failed to delete pixel buffers: {e}")
+        
+        self.pbo_ids = []
+        self._pending_readbacks.clear()
+        self._next_pbo_slot = 0
+        self.readback_ring_size = 0
+        self.async_readback_enabled = False
+    
+    @property
+    def pending_readback_count(self) -> int:
+        """Number of readbacks queued on the GPU but not yet delivered"""
+        return len(self._pending_readbacks)
+    
+    def read_pixels_async(self, tag: Any = None) -> Optional[Tuple[Any, Optional[np.ndarray]]]:
+        """
+        Queue a readback of the current framebuffer contents.
+        
+        Returns the oldest completed ``(tag, pixels)`` pair once the ring is full,
+        or None while the ring is still filling. Without PBOs the read happens
+        synchronously and the current frame is returned immediately. If the
+        readback cannot be queued, the frame is read synchronously and delivered
+        in its place in the ring; pixels are None for a frame whose buffer could
+        not be read back, which the caller has to render again.
+        """
+        if not self.is_valid:
+            return None
+        
+        if not self.async_readback_enabled:
+            pixels = self.read_pixels()
+            return (tag, pixels) if pixels is not None else None
+        
+        slot = self._next_pbo_slot
+        self._next_pbo_slot = (slot + 1) % self.readback_ring_size
+        
+        if self.mock_mode:
+            self._pending_readbacks.append((slot, tag, None))
+        else:
+            try:
+                self.bind()
+                gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, self.pbo_ids[slot])
+                # With a pack buffer bound the last argument is an offset, so this returns immediately
+                gl.glReadPixels(
+                    0, 0, self.config.width, self.config.height,
+                    gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, ctypes.c_void_p(0)
+                )
+                gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)
+                self._pending_readbacks.append((slot, tag, None))
+            except Exception as e:
+                self.readback_failures += 1
+                logger.warning(f"Pixel buffer readback could not be queued, reading synchronously: {e}")
+                self._unbind_pack_buffer()
+                self._pending_readbacks.append((-1, tag, self.read_pixels()))
+        
+        if len(self._pending_readbacks) >= self.readback_ring_size:
+            return self._resolve_oldest_readback()
+        
+        return None
+    
+    def drain_readbacks(self) -> List[Tuple[Any, Optional[np.ndarray]]]:
+        """Deliver every pending readback in submission order"""
+        completed = []
+        while self._pending_readbacks:
+            completed.append(self._resolve_oldest_readback())
+        return completed
+    
+    def _resolve_oldest_readback(self) -> Tuple[Any, Optional[np.ndarray]]:
+        """Map the oldest pending PBO and copy its contents out"""
+        slot, tag, pixels = self._pending_readbacks.popleft()
+        
+        if slot < 0:
+            return tag, pixels
+        
+        if self.mock_mode:
+            return tag, self._mock_pixels()
+        
+        try:
+            buffer_size = self.config.width * self.config.height * 4
+            gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, self.pbo_ids[slot])
+            data = gl.glGetBufferSubData(gl.GL_PIXEL_PACK_BUFFER, 0, buffer_size)
+            gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)
+        except Exception as e:
+            # The framebuffer already holds a later frame, so this one cannot be re-read
+            self.readback_failures += 1
+            logger.warning(f"Pixel buffer readback failed for {tag}: {e}")
+            self._unbind_pack_buffer()
+            return tag, None
+        
+        pixel_array = np.frombuffer(data, dtype=np.uint8)
+        pixel_array = pixel_array.reshape((self.config.height, self.config.width, 4))
+        
+        # Flip vertically (OpenGL origin is bottom-left)
+        return tag, np.flipud(pixel_array)
+    
+    def _unbind_pack_buffer(self):
+        try:
+            gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)
+        except Exception:
+            pass
+    
+    def _mock_pixels(self) -> np.ndarray:
+        """Mock pixel data for testing"""
+        return np.zeros((self.config.height, self.config.width, 4), dtype=np.uint8)
+    
     def resize(self, width: int, height: int):
         """Resize framebuffer"""
         if width == self.config.width and height == self.config.height:
             return
         
+        ring_size = self.readback_ring_size if self.async_readback_enabled else 0
+        
         # Destroy current framebuffer
         self.destroy()
         
@@ -342,6 +510,10 @@ class OpenGLFramebuffer:
             self._create_framebuffer()
         elif self.mock_mode:
             self._create_mock_framebuffer()
+        
+        # Pixel buffers are sized for the framebuffer, so recreate the ring
+        if ring_size:
+            self.enable_async_readback(ring_size)
     
     def _create_mock_framebuffer(self):
         """Create mock framebuffer for testing"""
@@ -360,6 +532,9 @@ class OpenGLFramebuffer:
     def destroy(self):
         """Destroy framebuffer and free GPU memory"""
         if (OPENGL_AVAILABLE and not self.mock_mode and self.is_valid) or (self.mock_mode and self.is_valid):
+            # Release pixel buffers
+            self.disable_async_readback()
+            
             # Destroy textures
             if self.color_texture:
                 if not self.mock_mode:
@@ -733,6 +908,50 @@ def create_offscreen_context(width: int = 1, height: int = 1,
     return None
 
 
+# Rendering backends selectable without a GUI
+HEADLESS_BACKENDS = ("mock", "software", "opengl")
+
+# Keeps the QGuiApplication for headless OpenGL contexts alive for the process
+_headless_application = None
+
+
+def create_headless_context(backend: str = "opengl", width: int = 1,
+                            height: int = 1) -> OpenGLContext:
+    """
+    Create and initialize a context for rendering without any widgets.
+    
+    ``mock`` renders placeholder frames with no GPU. ``software`` and
+    ``opengl`` use a Qt offscreen surface under a QGuiApplication;
+    ``software`` forces Mesa's CPU rasterizer so it also works on machines
+    without a GPU. Raises RuntimeError if the backend is unavailable.
+    """
+    global _headless_application
+    
+    if backend not in HEADLESS_BACKENDS:
+        raise ValueError(f"Unknown rendering backend: {backend}")
+    
+    if backend == "mock":
+        context = OpenGLContext(ContextBackend.MOCK)
+    else:
+        if backend == "software":
+            os.environ.setdefault("LIBGL_ALWAYS_SOFTWARE", "1")
+            os.environ.setdefault("QT_OPENGL", "software")
+        if not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")):
+            os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        
+        if not PYQT_AVAILABLE:
+            raise RuntimeError(f"Backend '{backend}' requires PyQt6")
+        
+        from PyQt6.QtGui import QGuiApplication
+        if QGuiApplication.instance() is None:
+            _headless_application = QGuiApplication([sys.argv[0] if sys.argv else "karaoke"])
+        context = OpenGLContext(ContextBackend.PYQT6)
+    
+    if not context.initialize(width, height):
+        raise RuntimeError(f"Could not initialize the '{backend}' backend")
+    return context
+
+
 def create_render_framebuffer(context: OpenGLContext, name: str, 
                             width: int, height: int) -> Optional[OpenGLFramebuffer]:
     """Create a framebuffer suitable for rendering"""
@@ -33,10 +33,14 @@ try:
     from .models import Project, SubtitleLine, SubtitleStyle
     from .opengl_subtitle_renderer import OpenGLSubtitleRenderer, RenderedSubtitle
     from .preview_synchronizer import PreviewSynchronizer
+    from .timebase import Timebase
+    from .export_checkpoint import ExportCheckpoint, ExportSegment, project_fingerprint, settings_hash
 except ImportError:
     from models import Project, SubtitleLine, SubtitleStyle
     from opengl_subtitle_renderer import OpenGLSubtitleRenderer, RenderedSubtitle
     from preview_synchronizer import PreviewSynchronizer
+    from timebase import Timebase
+    from export_checkpoint import ExportCheckpoint, ExportSegment, project_fingerprint, settings_hash
 
 
 @dataclass
@@ -69,6 +73,19 @@ class ExportSettings:
     # Quality control
     max_bitrate: Optional[int] = None  # Maximum bitrate for VBR
     buffer_size: Optional[int] = None  # Buffer size for rate control
+    
+    # Checkpointing: encode closed-GOP segments of this length so a retry
+    # resumes after the last completed segment (0 = single-pass export)
+    segment_seconds: float = 0.0
+    
+    # Export profile (see export_profiles)
+    effect_quality: float = 1.0  # Scale of effect sample radii (1.0 = full quality)
+    reuse_cached_rasters: bool = False  # Keep scaled backgrounds across exports
+
+
+# Scaled image backgrounds kept across exports that reuse cached rasters
+# (draft profiles), keyed by (path, modification time, width, height)
+_shared_background_images: Dict[Tuple[str, float, int, int], Any] = {}
 
 
 @dataclass
@@ -115,6 +132,7 @@ class OpenGLExportRenderer(QObject):
         self.offscreen_surface: Optional[QOffscreenSurface] = None
         self.framebuffer: Optional[QOpenGLFramebufferObject] = None
         self.subtitle_renderer: Optional[OpenGLSubtitleRenderer] = None
+        self._background_images: Dict[Tuple[str, float, int, int], Any] = {}
         
         # Export state
         self.current_project: Optional[Project] = None
@@ -128,9 +146,17 @@ class OpenGLExportRenderer(QObject):
         self.frame_queue: Optional[queue.Queue] = None
         self.frame_writer_thread: Optional[threading.Thread] = None
         
+        # Segmented export checkpoint
+        self.checkpoint: Optional[ExportCheckpoint] = None
+        self.active_segment: Optional[ExportSegment] = None
+        self.segment_closer: Optional[threading.Thread] = None
+        self.segment_exit_code: Optional[int] = None
+        self.resumed_frames = 0
+        
         # Progress tracking
         self.progress = ExportProgress()
         self.start_time = 0.0
+        self.timebase = Timebase()
         
         # FFmpeg capabilities
         self._ffmpeg_version: Optional[str] = None
@@ -209,7 +235,8 @@ class OpenGLExportRenderer(QObject):
     def initialize_subtitle_renderer(self) -> bool:
         """Initialize subtitle renderer with same settings as preview."""
         try:
-            self.subtitle_renderer = OpenGLSubtitleRenderer()
+            effect_quality = self.export_settings.effect_quality if self.export_settings else 1.0
+            self.subtitle_renderer = OpenGLSubtitleRenderer(effect_quality=effect_quality)
             
             if not self.subtitle_renderer.initialize_opengl():
                 print("Failed to initialize subtitle renderer")
@@ -228,6 +255,7 @@ class OpenGLExportRenderer(QObject):
         """Set up export with project and settings."""
         self.current_project = project
         self.export_settings = settings
+        self._background_images = _shared_background_images if settings.reuse_cached_rasters else {}
         
         # Initialize OpenGL components
         if not self.initialize_opengl_context():
@@ -241,7 +269,7 @@ class OpenGLExportRenderer(QObject):
         
         # Calculate total frames
         duration = self._get_project_duration()
-        self.progress.total_frames = int(duration * settings.fps)
+        self.progress.total_frames = Timebase.from_fps(settings.fps).frame_count(duration)
         
         print(f"Export setup complete: {self.progress.total_frames} frames at {settings.fps} fps")
         return True
@@ -271,13 +299,19 @@ class OpenGLExportRenderer(QObject):
             self.export_failed.emit("No project or export settings configured")
             return False
         
-        # Start FFmpeg process first
-        if not self.start_ffmpeg_process():
-            self.export_failed.emit("Failed to start FFmpeg process")
-            return False
-        
-        # Start frame writer thread (for FFmpeg communication)
-        self._start_frame_writer()
+        self.resumed_frames = 0
+        if self.export_settings.segment_seconds > 0:
+            if not self._start_segmented_export():
+                return False
+        else:
+            # Start FFmpeg process first
+            if not self.start_ffmpeg_process():
+                self.export_failed.emit("Failed to start FFmpeg process")
+                return False
+            
+            # Start frame writer thread (for FFmpeg communication)
+            self._start_frame_writer()
+            self.current_frame = 0
         
         # Use QTimer to render frames on main thread instead of separate thread
         self.is_exporting = True
@@ -285,10 +319,9 @@ class OpenGLExportRenderer(QObject):
         self.start_time = time.time()
         
         # Initialize frame rendering
-        self.current_frame = 0
         duration = self._get_project_duration()
-        self.progress.total_frames = int(duration * self.export_settings.fps)
-        self.frame_time = 1.0 / self.export_settings.fps
+        self.timebase = Timebase.from_fps(self.export_settings.fps)
+        self.progress.total_frames = self.timebase.frame_count(duration)
         
         # Start frame rendering timer (render frames on main thread)
         if PYQT_AVAILABLE:
@@ -301,6 +334,136 @@ class OpenGLExportRenderer(QObject):
         
         return True
     
+    def _start_segmented_export(self) -> bool:
+        """Load or create the checkpoint and start encoding the first unfinished segment"""
+        total_frames = Timebase.from_fps(self.export_settings.fps).frame_count(self._get_project_duration())
+        segment_frames = max(1, int(round(self.export_settings.segment_seconds * self.export_settings.fps)))
+        
+        try:
+            self.checkpoint = ExportCheckpoint.load_or_create(
+                self.export_settings.output_path,
+                project_fingerprint(self.current_project),
+                settings_hash(self.export_settings),
+                total_frames,
+                segment_frames,
+                self.export_settings.container_format
+            )
+        except OSError as e:
+            self.export_failed.emit(f"Failed to create export checkpoint: {e}")
+            return False
+        
+        pending = self.checkpoint.pending_segments()
+        completed_frames = self.checkpoint.completed_frames
+        if completed_frames:
+            print(f"Resuming export: {completed_frames}/{total_frames} frames already encoded")
+        self.resumed_frames = completed_frames
+        
+        if not pending:
+            # Every segment is done; only the concatenation is left
+            self.active_segment = None
+            self.current_frame = total_frames
+            return True
+        
+        return self._start_segment(pending[0])
+    
+    def _start_segment(self, segment: ExportSegment) -> bool:
+        """Start an encoder for one segment and continue rendering at its first frame"""
+        self.active_segment = segment
+        self.current_frame = segment.start_frame
+        
+        if not self.start_ffmpeg_process():
+            self.export_failed.emit(f"Failed to start FFmpeg for segment {segment.index}")
+            return False
+        
+        self._start_frame_writer()
+        return True
+    
+    def _close_active_segment(self):
+        """
+        Finish the segment's encoder on a worker thread.
+        
+        Draining the frame writer and waiting for FFmpeg can take seconds, so
+        the frame timer keeps the GUI thread free and only polls the closer;
+        _start_next_segment picks up the result.
+        """
+        segment = self.active_segment
+        checkpoint = self.checkpoint
+        frame_queue = self.frame_queue
+        frame_writer = self.frame_writer_thread
+        self.segment_exit_code = None
+        
+        def close_segment():
+            if frame_queue:
+                try:
+                    frame_queue.put(None, timeout=30)  # Sentinel to stop writer
+                except queue.Full:
+                    pass
+            if frame_writer and frame_writer.is_alive():
+                frame_writer.join(timeout=30)
+            
+            return_code = self._close_ffmpeg()
+            if return_code == 0:
+                checkpoint.mark_completed(segment)
+            self.segment_exit_code = return_code
+        
+        self.segment_closer = threading.Thread(target=close_segment, daemon=True)
+        self.segment_closer.start()
+    
+    def _start_next_segment(self) -> bool:
+        """Record the closed segment and start the next one; False if the export failed"""
+        segment = self.active_segment
+        return_code = self.segment_exit_code
+        self.segment_closer = None
+        
+        if return_code != 0:
+            reason = "timed out" if return_code is None else f"exit code {return_code}"
+            self._fail_segmented_export(f"FFmpeg failed on segment {segment.index} ({reason})")
+            return False
+        
+        pending = self.checkpoint.pending_segments()
+        if pending and not self.should_cancel:
+            if not self._start_segment(pending[0]):
+                self._fail_segmented_export(None)
+                return False
+        else:
+            self.active_segment = None
+            self.current_frame = self.progress.total_frames
+        return True
+    
+    def _fail_segmented_export(self, error_message: Optional[str]):
+        """Stop rendering after a segment failed; completed segments stay on disk"""
+        if hasattr(self, 'frame_timer') and self.frame_timer:
+            self.frame_timer.stop()
+            self.frame_timer = None
+        self.active_segment = None
+        self.is_exporting = False
+        if error_message:
+            print(error_message)
+            self.export_failed.emit(error_message)
+    
+    def _concatenate_segments(self) -> Optional[str]:
+        """Join all segments into the output file; returns an error message on failure"""
+        audio_path = None
+        audio_options = None
+        if self.current_project and self.current_project.audio_file:
+            audio_path = self.current_project.audio_file.path
+            audio_options = self._audio_encoding_options()
+        
+        cmd = self.checkpoint.build_concat_command(audio_path, audio_options, self._container_options())
+        print(f"Concatenating {len(self.checkpoint.segments)} segments: {' '.join(cmd)}")
+        
+        try:
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except OSError as e:
+            return f"Failed to start FFmpeg for concatenation: {e}"
+        
+        if result.returncode != 0:
+            return f"Segment concatenation failed: {self._parse_ffmpeg_error(result.stderr)}"
+        
+        if self.export_settings.cleanup_temp:
+            self.checkpoint.discard()
+        return None
+    
     def cancel_export(self):
         """Cancel ongoing export."""
         print("Cancelling export...")
@@ -442,18 +605,9 @@ class OpenGLExportRenderer(QObject):
             # Load the actual image file
             image_path = self.current_project.image_file.path
             if os.path.exists(image_path):
-                # Load image
-                background_image = QImage(image_path)
+                scaled_image = self._load_background_image(image_path)
                 
-                if not background_image.isNull():
-                    # Scale image to export resolution
-                    scaled_image = background_image.scaled(
-                        self.export_settings.width,
-                        self.export_settings.height,
-                        Qt.AspectRatioMode.KeepAspectRatioByExpanding,
-                        Qt.TransformationMode.SmoothTransformation
-                    )
-                    
+                if scaled_image is not None:
                     # Render the actual image
                     self._render_frame_as_background(scaled_image)
                 else:
@@ -473,6 +627,30 @@ class OpenGLExportRenderer(QObject):
             gl.glClearColor(0.3, 0.6, 0.3, 1.0)
             gl.glClear(gl.GL_COLOR_BUFFER_BIT)
     
+    def _load_background_image(self, image_path: str) -> Optional[QImage]:
+        """Image scaled to the export resolution, decoded once per export (or once for all drafts)"""
+        width, height = self.export_settings.width, self.export_settings.height
+        key = (image_path, os.path.getmtime(image_path), width, height)
+        scaled_image = self._background_images.get(key)
+        if scaled_image is not None:
+            return scaled_image
+        
+        background_image = QImage(image_path)
+        if background_image.isNull():
+            return None
+        scaled_image = background_image.scaled(
+            width,
+            height,
+            Qt.AspectRatioMode.KeepAspectRatioByExpanding,
+            Qt.TransformationMode.SmoothTransformation
+        )
+        
+        # An edited image replaces its stale entries
+        for stale_key in [k for k in self._background_images if k[0] == image_path]:
+            del self._background_images[stale_key]
+        self._background_images[key] = scaled_image
+        return scaled_image
+    
     def _extract_video_frame(self, timestamp: float) -> Optional[QImage]:
         """Extract a video frame at the specified timestamp using FFmpeg."""
         if not self.current_project.video_file:
@@ -795,6 +973,13 @@ class OpenGLExportRenderer(QObject):
         
         return errors
     
+    def _input_frame_rate(self) -> str:
+        """Frame rate of the raw input stream, as an exact fraction for NTSC rates"""
+        timebase = Timebase.from_fps(self.export_settings.fps)
+        if timebase.denominator == 1:
+            return str(self.export_settings.fps)
+        return timebase.ffmpeg_rate
+    
     def build_ffmpeg_command(self) -> List[str]:
         """Build FFmpeg command with all settings."""
         if not self.export_settings:
@@ -807,22 +992,18 @@ class OpenGLExportRenderer(QObject):
             "-f", "rawvideo",
             "-pix_fmt", "rgba",
             "-s", f"{self.export_settings.width}x{self.export_settings.height}",
-            "-r", str(self.export_settings.fps),
+            "-r", self._input_frame_rate(),
             "-i", "-"  # Read from stdin
         ])
         
-        # Add audio input if available
+        # Add audio input if available (segments are video-only; audio is
+        # added once when they are concatenated)
         audio_input_index = 1
-        if self.current_project and self.current_project.audio_file:
+        if self.current_project and self.current_project.audio_file and not self.active_segment:
             cmd.extend(["-i", self.current_project.audio_file.path])
             
             # Audio encoding settings
-            cmd.extend([
-                "-c:a", self.export_settings.audio_codec,
-                "-b:a", f"{self.export_settings.audio_bitrate}k",
-                "-ar", str(self.export_settings.audio_sample_rate),
-                "-ac", str(self.export_settings.audio_channels)
-            ])
+            cmd.extend(self._audio_encoding_options())
         else:
             # No audio input
             audio_input_index = -1
@@ -852,25 +1033,45 @@ class OpenGLExportRenderer(QObject):
             "-pix_fmt", self.export_settings.pixel_format
         ])
         
+        if self.active_segment:
+            # Closed GOPs so segments can be joined without re-encoding
+            cmd.extend(["-flags", "+cgop"])
+        
         # Container-specific options
-        if self.export_settings.container_format == "mp4":
-            cmd.extend([
-                "-movflags", "+faststart",  # Enable fast start for web playback
-                "-f", "mp4"
-            ])
-        elif self.export_settings.container_format == "mkv":
-            cmd.extend(["-f", "matroska"])
-        elif self.export_settings.container_format == "avi":
-            cmd.extend(["-f", "avi"])
+        cmd.extend(self._container_options(faststart=not self.active_segment))
         
         # Progress reporting
         cmd.extend(["-progress", "pipe:2"])
         
         # Output file
-        cmd.append(self.export_settings.output_path)
+        if self.active_segment:
+            cmd.append(self.checkpoint.segment_path(self.active_segment))
+        else:
+            cmd.append(self.export_settings.output_path)
         
         return cmd
     
+    def _audio_encoding_options(self) -> List[str]:
+        """FFmpeg audio encoding arguments"""
+        return [
+            "-c:a", self.export_settings.audio_codec,
+            "-b:a", f"{self.export_settings.audio_bitrate}k",
+            "-ar", str(self.export_settings.audio_sample_rate),
+            "-ac", str(self.export_settings.audio_channels)
+        ]
+    
+    def _container_options(self, faststart: bool = True) -> List[str]:
+        """FFmpeg muxer arguments for the configured container"""
+        if self.export_settings.container_format == "mp4":
+            if faststart:
+                return ["-movflags", "+faststart", "-f", "mp4"]  # Enable fast start for web playback
+            return ["-f", "mp4"]
+        elif self.export_settings.container_format == "mkv":
+            return ["-f", "matroska"]
+        elif self.export_settings.container_format == "avi":
+            return ["-f", "avi"]
+        return []
+    
     def start_ffmpeg_process(self) -> bool:
         """Start FFmpeg process for encoding."""
         if not self.export_settings:
@@ -981,13 +1182,23 @@ class OpenGLExportRenderer(QObject):
     
     def _render_next_frame(self):
         """Render the next frame (called by timer on main thread)."""
+        if self.segment_closer:
+            if self.segment_closer.is_alive():
+                return  # The finished segment is still being closed
+            if not self._start_next_segment():
+                return
+        
+        if self.active_segment and not self.should_cancel and self.current_frame >= self.active_segment.end_frame:
+            self._close_active_segment()
+            return
+        
         if self.should_cancel or self.current_frame >= self.progress.total_frames:
             self._finish_export()
             return
         
         try:
             # Calculate timestamp for this frame
-            timestamp = self.current_frame * self.frame_time
+            timestamp = self.timebase.frame_time(self.current_frame)
             
             # Render frame (on main thread - safe for OpenGL)
             frame_image = self.render_frame_at_time(timestamp)
@@ -1017,7 +1228,8 @@ class OpenGLExportRenderer(QObject):
             self.progress.elapsed_time = time.time() - self.start_time
             
             if self.progress.elapsed_time > 0:
-                self.progress.fps = self.progress.current_frame / self.progress.elapsed_time
+                # Frames from completed segments of an earlier attempt do not count towards fps
+                self.progress.fps = (self.progress.current_frame - self.resumed_frames) / self.progress.elapsed_time
                 remaining_frames = self.progress.total_frames - self.progress.current_frame
                 if self.progress.fps > 0:
                     self.progress.estimated_remaining = remaining_frames / self.progress.fps
@@ -1053,8 +1265,26 @@ class OpenGLExportRenderer(QObject):
         if self.frame_writer_thread and self.frame_writer_thread.is_alive():
             self.frame_writer_thread.join(timeout=5)
         
-        # Close FFmpeg
-        self._close_ffmpeg()
+        # Close FFmpeg; an encoder that failed or had to be killed fails the export
+        encoding = self.ffmpeg_process is not None
+        return_code = self._close_ffmpeg()
+        if encoding and return_code != 0 and not self.should_cancel:
+            reason = "timed out" if return_code is None else f"exit code {return_code}"
+            error = f"FFmpeg failed to finish the video ({reason})"
+            print(error)
+            self.export_failed.emit(error)
+            self.is_exporting = False
+            return
+        
+        # Join checkpointed segments into the output file
+        if self.checkpoint and not self.should_cancel:
+            error = self._concatenate_segments()
+            self.checkpoint = None
+            if error:
+                print(error)
+                self.export_failed.emit(error)
+                self.is_exporting = False
+                return
         
         # Emit completion
         if not self.should_cancel:
@@ -1062,8 +1292,14 @@ class OpenGLExportRenderer(QObject):
         
         self.is_exporting = False
     
-    def _close_ffmpeg(self):
-        """Close FFmpeg process and clean up resources."""
+    def _close_ffmpeg(self) -> Optional[int]:
+        """
+        Close FFmpeg process and clean up resources.
+        
+        Returns the exit code, or None when FFmpeg did not finish in time and
+        had to be terminated (callers treat that as a failure).
+        """
+        return_code = None
         try:
             # Close FFmpeg stdin first
             if self.ffmpeg_process and self.ffmpeg_process.stdin:
@@ -1073,7 +1309,7 @@ class OpenGLExportRenderer(QObject):
             if self.ffmpeg_process:
                 try:
                     # Give FFmpeg time to finish encoding
-                    self.ffmpeg_process.wait(timeout=10)
+                    return_code = self.ffmpeg_process.wait(timeout=10)
                     print("FFmpeg process completed successfully")
                 except subprocess.TimeoutExpired:
                     print("FFmpeg process timed out, terminating...")
@@ -1093,6 +1329,8 @@ class OpenGLExportRenderer(QObject):
             
         except Exception as e:
             print(f"Error closing FFmpeg: {e}")
+        
+        return return_code
     
     def export_frames(self):
         """Legacy method - now handled by _render_next_frame timer."""
@@ -1234,6 +1472,12 @@ class OpenGLExportRenderer(QObject):
             except Exception as e:
                 print(f"Error cleaning up subtitle renderer: {e}")
             self.subtitle_renderer = None
+        self._background_images = {}
+        
+        # Completed segments stay on disk for the next attempt
+        self.checkpoint = None
+        self.active_segment = None
+        self.segment_closer = None
         
         # Reset progress
         self.progress = ExportProgress()
@@ -5,6 +5,7 @@ This module provides hardware-accelerated subtitle rendering using OpenGL shader
 with support for .ass format styling, text effects, and texture caching.
 """
 
+import threading
 import numpy as np
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
@@ -12,9 +13,11 @@ from dataclasses import dataclass, field
 try:
     from .models import SubtitleLine, SubtitleStyle
     from .effects_manager import EffectsManager, EffectLayer
+    from .cache_registry import get_cache_registry, CACHE_PRIORITY_LOW
 except ImportError:
     from models import SubtitleLine, SubtitleStyle
     from effects_manager import EffectsManager, EffectLayer
+    from cache_registry import get_cache_registry, CACHE_PRIORITY_LOW
 
 
 @dataclass
@@ -35,6 +38,13 @@ class TextureCache:
     textures: Dict[str, RenderedSubtitle] = field(default_factory=dict)
     max_size: int = 100
     
+    def __post_init__(self):
+        # Textures are destroyed on the rendering thread; evictions requested
+        # from other threads are applied by the next put()
+        self.owner_thread: Optional[int] = None
+        self.pending_evict_bytes = 0
+        get_cache_registry().register(self, "subtitle_textures", CACHE_PRIORITY_LOW)
+    
     def get_cache_key(self, text: str, style: SubtitleStyle, viewport_size: Tuple[int, int]) -> str:
         """Generate cache key for subtitle texture."""
         return f"{text}_{style.name}_{style.font_size}_{viewport_size[0]}x{viewport_size[1]}"
@@ -45,40 +55,49 @@ class TextureCache:
     
     def put(self, key: str, rendered: RenderedSubtitle):
         """Store texture in cache."""
+        self.owner_thread = threading.get_ident()
+        if self.pending_evict_bytes:
+            pending, self.pending_evict_bytes = self.pending_evict_bytes, 0
+            self.evict_bytes(pending)
+        
         if len(self.textures) >= self.max_size:
             # Remove oldest entry
-            oldest_key = next(iter(self.textures))
-            old_texture = self.textures.pop(oldest_key)
-            if old_texture.texture and hasattr(old_texture.texture, 'destroy'):
-                old_texture.texture.destroy()
+            self._evict_oldest()
         
         self.textures[key] = rendered
+        get_cache_registry().notify_growth(self._texture_bytes(rendered))
     
-    def clear(self):
-        """Clear all cached textures."""
-        for rendered in self.textures.values():
-            if rendered.texture and hasattr(rendered.texture, 'destroy'):
-                rendered.texture.destroy()
-        self.textures.clear()
+    def evict_bytes(self, nbytes: int) -> int:
+        """Evict the oldest textures until nbytes are freed; returns bytes freed."""
+        if self.owner_thread not in (None, threading.get_ident()):
+            self.pending_evict_bytes += nbytes
+            return 0
+        
+        freed = 0
+        while self.textures and freed < nbytes:
+            freed += self._evict_oldest()
+        return freed
     
-    def get_cache_key(self, text: str, style: SubtitleStyle, viewport_size: Tuple[int, int]) -> str:
-        """Generate cache key for subtitle texture."""
-        return f"{text}_{style.name}_{style.font_size}_{viewport_size[0]}x{viewport_size[1]}"
+    def _evict_oldest(self) -> int:
+        """Remove the oldest entry and destroy its texture; returns its bytes."""
+        oldest_key = next(iter(self.textures))
+        old_texture = self.textures.pop(oldest_key)
+        if old_texture.texture and hasattr(old_texture.texture, 'destroy'):
+            old_texture.texture.destroy()
+        return self._texture_bytes(old_texture)
     
-    def get(self, key: str) -> Optional[RenderedSubtitle]:
-        """Get cached texture."""
-        return self.textures.get(key)
+    @staticmethod
+    def _texture_bytes(rendered: RenderedSubtitle) -> int:
+        """Estimated RGBA texture storage of a rendered subtitle."""
+        return int(rendered.size[0] * rendered.size[1] * 4)
     
-    def put(self, key: str, rendered: RenderedSubtitle):
-        """Store texture in cache."""
-        if len(self.textures) >= self.max_size:
-            # Remove oldest entry
-            oldest_key = next(iter(self.textures))
-            old_texture = self.textures.pop(oldest_key)
-            if old_texture.texture and hasattr(old_texture.texture, 'destroy'):
-                old_texture.texture.destroy()
-        
-        self.textures[key] = rendered
+    @property
+    def total_bytes(self) -> int:
+        return sum(self._texture_bytes(rendered) for rendered in list(self.textures.values()))
+    
+    @property
+    def entry_count(self) -> int:
+        return len(self.textures)
     
     def clear(self):
         """Clear all cached textures."""
@@ -96,13 +115,13 @@ class OpenGLSubtitleRenderer:
     text effects, and texture caching for optimal performance.
     """
     
-    def __init__(self):
+    def __init__(self, effect_quality: float = 1.0):
         self.texture_cache = TextureCache()
         self.shader_program = None
         self.vertex_buffer = None
         self.index_buffer = None
         self.initialized = False
-        self.effects_manager = EffectsManager()
+        self.effects_manager = EffectsManager(effect_quality=effect_quality)
         self.current_time = 0.0
         
         # Shader source code (will be generated dynamically based on effects)
@@ -0,0 +1,469 @@
+"""
+Time-Segment Parallel Rendering
+
+Splits an export's timeline into segments and renders and encodes each one in
+a separate worker process. Every worker creates its own OpenGL context (or
+software/mock backend), subtitle renderer and FFmpeg encoder, so segments run
+on separate cores without sharing GPU or renderer state.
+
+Segments hold about equal predicted render cost rather than equal length
+(see cost_scheduler), and workers that run out of segments steal from the
+others. Boundaries fall on the encoder's fixed keyframe interval and, where
+possible, in gaps between subtitle lines, so no karaoke line is split across
+two encoders. Segments are encoded video-only with closed GOPs and recorded
+in an ExportCheckpoint manifest; once all are done they are joined with
+FFmpeg's concat demuxer without re-encoding and the audio is muxed once.
+An interrupted export resumes with the segments that are still missing.
+"""
+
+import os
+import sys
+import time
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field, replace
+from typing import Optional, List, Dict, Any, Callable, Sequence
+
+try:
+    from .models import Project, SubtitleLine
+    from .timebase import Timebase
+    from .opengl_context import create_headless_context
+    from .frame_capture_system import FrameCaptureSystem, FrameCaptureSettings, _project_duration
+    from .enhanced_ffmpeg_integration import EnhancedFFmpegProcessor, EnhancedExportSettings
+    from .export_checkpoint import ExportCheckpoint, project_fingerprint, settings_hash
+    from .frame_plan import compile_frame_plan
+    from .cost_scheduler import DEFAULT_CALIBRATION_PATH, FrameCostModel, WorkStealingQueue, CostPredictionReport, cost_balanced_cuts
+    from .render_trace import get_render_tracer
+except ImportError:
+    from models import Project, SubtitleLine
+    from timebase import Timebase
+    from opengl_context import create_headless_context
+    from frame_capture_system import FrameCaptureSystem, FrameCaptureSettings, _project_duration
+    from enhanced_ffmpeg_integration import EnhancedFFmpegProcessor, EnhancedExportSettings
+    from export_checkpoint import ExportCheckpoint, project_fingerprint, settings_hash
+    from frame_plan import compile_frame_plan
+    from cost_scheduler import DEFAULT_CALIBRATION_PATH, FrameCostModel, WorkStealingQueue, CostPredictionReport, cost_balanced_cuts
+    from render_trace import get_render_tracer
+
+
+def _cut_splits_line(frame: int, fps: float, lines: Sequence[SubtitleLine]) -> bool:
+    """Whether a segment boundary at this frame falls inside a subtitle line"""
+    time_point = frame / fps
+    return any(line.start_time < time_point < line.end_time for line in lines)
+
+
+def plan_segment_boundaries(total_frames: int, fps: float, segment_count: int,
+                            lines: Sequence[SubtitleLine] = (), gop_frames: int = 0,
+                            search_fraction: float = 0.25,
+                            targets: Optional[Sequence[int]] = None) -> List[int]:
+    """
+    Frame boundaries splitting [0, total_frames) into about segment_count parts.
+
+    Each cut starts at its ideal position (evenly spaced, or the
+    segment_count - 1 frames given as targets) and moves to the
+    nearest multiple of gop_frames that does not fall inside a subtitle line,
+    searching up to search_fraction of a segment either way. If every
+    candidate splits a line, the nearest keyframe-aligned frame is used.
+    Returns [0, ..., total_frames]; cuts that would produce empty segments
+    are dropped.
+    """
+    if total_frames <= 0:
+        return [0, 0]
+    if segment_count <= 1:
+        return [0, total_frames]
+
+    step = max(1, gop_frames)
+    segment_size = total_frames / segment_count
+    window = max(step, int(segment_size * search_fraction))
+    boundaries = [0]
+
+    for cut in range(1, segment_count):
+        ideal = targets[cut - 1] if targets else int(round(cut * segment_size))
+        first = max(boundaries[-1] + 1, ideal - window)
+        last = min(total_frames - 1, ideal + window)
+        candidates = list(range(-(-first // step) * step, last + 1, step))
+        if not candidates:
+            continue
+
+        free = [frame for frame in candidates if not _cut_splits_line(frame, fps, lines)]
+        boundaries.append(min(free or candidates, key=lambda frame: (abs(frame - ideal), frame)))
+
+    boundaries.append(total_frames)
+    return boundaries
+
+
+@dataclass
+class SegmentRenderTask:
+    """One segment for a worker process; must be picklable"""
+    index: int
+    start_frame: int
+    end_frame: int
+    project: Project
+    settings: EnhancedExportSettings  # output_path is the segment file
+    backend: str = "opengl"
+    encode: bool = True
+    deduplicate: bool = True  # Render runs of identical frames once
+    trace: bool = False  # Return the worker's render trace events
+
+
+def _init_worker():
+    """Send worker diagnostics to stderr so they never mix with the parent's stdout"""
+    sys.stdout = sys.stderr
+
+
+def render_segment(task: SegmentRenderTask) -> Dict[str, Any]:
+    """
+    Render and encode one segment (runs in a worker process).
+
+    Returns a summary dict with the frames rendered, the elapsed time and an
+    error message if the segment failed. With task.trace it also holds the
+    segment's Chrome trace events under "trace_events".
+    """
+    if not task.trace:
+        return _render_segment(task)
+
+    tracer = get_render_tracer()
+    tracer.process_name = "segment worker"
+    tracer.clear()
+    tracer.enable()
+    trace_start = tracer.begin()
+    try:
+        result = _render_segment(task)
+    finally:
+        tracer.end(f"segment {task.index}", trace_start, task.start_frame)
+        tracer.disable()
+    result["trace_events"] = tracer.export_events()
+    return result
+
+
+def _render_segment(task: SegmentRenderTask) -> Dict[str, Any]:
+    start_time = time.time()
+    result = {"index": task.index, "frames": 0, "seconds": 0.0, "error": None}
+    frame_count = task.end_frame - task.start_frame
+
+    try:
+        context = create_headless_context(task.backend, task.settings.width, task.settings.height)
+    except (RuntimeError, ValueError) as e:
+        result["error"] = str(e)
+        return result
+
+    capture_settings = FrameCaptureSettings(width=task.settings.width, height=task.settings.height,
+                                            fps=task.settings.fps)
+    capture_system = FrameCaptureSystem(context)
+
+    def counted(frames):
+        for frame in frames:
+            result["frames"] += frame.repeat
+            yield frame
+
+    try:
+        if not capture_system.initialize(task.project, capture_settings):
+            result["error"] = "Failed to initialize frame capture system"
+            return result
+
+        # Frame times come from the full timeline so they match a single-pass export exactly
+        if task.deduplicate:
+            timestamps = compile_frame_plan(task.project, task.settings.fps,
+                                            task.start_frame, task.end_frame).timestamps()
+        else:
+            timestamps = capture_system.generate_frame_timestamps(
+                _project_duration(task.project), task.settings.fps)[task.start_frame:task.end_frame]
+        frames = counted(capture_system.iter_frame_sequence(timestamps))
+
+        if task.encode:
+            # Repeated frames of a deduplicated segment are sent once with timestamps
+            task.settings.timestamped_input = task.deduplicate
+            processor = EnhancedFFmpegProcessor()
+            if not processor.encode_frames(task.settings, frames, frame_count):
+                result["error"] = processor.error_message or "Segment encoding failed"
+        else:
+            for _ in frames:
+                pass
+            if result["frames"] < frame_count:
+                result["error"] = f"Rendered {result['frames']} of {frame_count} frames"
+
+    except Exception as e:
+        result["error"] = f"Segment {task.index} failed: {e}"
+
+    finally:
+        capture_system.cleanup()
+        context.cleanup()
+        result["seconds"] = time.time() - start_time
+
+    return result
+
+
+@dataclass
+class ParallelRenderResult:
+    """Outcome of a parallel export"""
+    success: bool
+    output_path: Optional[str]
+    total_frames: int
+    frames_rendered: int
+    elapsed: float
+    segments: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+    prediction: Optional[CostPredictionReport] = None
+
+    @property
+    def fps(self) -> float:
+        return self.frames_rendered / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class ParallelSegmentRenderer:
+    """
+    Renders one export as parallel time segments in worker processes.
+
+    With encode=False the segments are rendered and discarded, which measures
+    rendering throughput without FFmpeg. With balance_cost=False segments
+    are cut at equal length. With trace=True the workers record render trace
+    spans, which are merged into this process's render tracer. The cost model
+    calibrated after each export is stored in calibration_path under the
+    backend name (None keeps it in memory only).
+    """
+
+    def __init__(self, project: Project, settings: EnhancedExportSettings,
+                 workers: Optional[int] = None, backend: str = "opengl",
+                 segments_per_worker: int = 1, gop_seconds: float = 2.0, encode: bool = True,
+                 deduplicate: bool = True, balance_cost: bool = True,
+                 cost_model: Optional[FrameCostModel] = None, trace: bool = False,
+                 calibration_path: Optional[str] = DEFAULT_CALIBRATION_PATH):
+        self.project = project
+        self.settings = settings
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.backend = backend
+        self.segments_per_worker = max(1, segments_per_worker)
+        self.gop_frames = max(1, int(round(gop_seconds * settings.fps)))
+        self.encode = encode
+        self.deduplicate = deduplicate
+        self.balance_cost = balance_cost
+        self.trace = trace
+        self.calibration_path = calibration_path
+        self.cost_model = cost_model or FrameCostModel.from_metrics(
+            calibration_key=backend, calibration_path=calibration_path)
+        self._frame_costs = None
+
+        self.checkpoint: Optional[ExportCheckpoint] = None
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.should_cancel = False
+
+    @property
+    def total_frames(self) -> int:
+        return Timebase.from_fps(self.settings.fps).frame_count(_project_duration(self.project))
+
+    def frame_costs(self):
+        """Predicted render seconds of every output frame"""
+        if self._frame_costs is None:
+            plan = compile_frame_plan(self.project, self.settings.fps)
+            self._frame_costs = self.cost_model.frame_costs(self.project, plan, self.deduplicate)
+        return self._frame_costs
+
+    def predicted_seconds(self, task: SegmentRenderTask) -> float:
+        return self.cost_model.unit_seconds(self.frame_costs(), task.start_frame, task.end_frame)
+
+    def plan_boundaries(self) -> List[int]:
+        """Keyframe-aligned segment boundaries that avoid splitting subtitle lines"""
+        lines = self.project.subtitle_file.lines if self.project.subtitle_file else []
+        segment_count = self.workers * self.segments_per_worker
+        targets = cost_balanced_cuts(self.frame_costs(), segment_count) if self.balance_cost else None
+        return plan_segment_boundaries(self.total_frames, self.settings.fps, segment_count,
+                                       lines, self.gop_frames, targets=targets)
+
+    def _segment_settings(self, output_path: Optional[str]) -> EnhancedExportSettings:
+        """Video-only, closed-GOP settings for one segment encoder"""
+        return replace(self.settings, output_path=output_path or "", gop_size=self.gop_frames,
+                       closed_gop=True)
+
+    def _create_tasks(self) -> List[SegmentRenderTask]:
+        if not self.encode:
+            boundaries = self.plan_boundaries()
+            return [SegmentRenderTask(index, start, end, self.project, self._segment_settings(None),
+                                      self.backend, encode=False, deduplicate=self.deduplicate,
+                                      trace=self.trace)
+                    for index, (start, end) in enumerate(zip(boundaries, boundaries[1:]))]
+
+        self.checkpoint = ExportCheckpoint.load_or_create(
+            self.settings.output_path,
+            project_fingerprint(self.project),
+            settings_hash(self.settings),
+            self.total_frames,
+            0,
+            self.settings.container_format.value,
+            boundaries=self.plan_boundaries()
+        )
+        if self.checkpoint.completed_frames:
+            print(f"Resuming parallel export: {self.checkpoint.completed_frames}/"
+                  f"{self.total_frames} frames already encoded")
+
+        return [SegmentRenderTask(segment.index, segment.start_frame, segment.end_frame, self.project,
+                                  self._segment_settings(self.checkpoint.segment_path(segment)),
+                                  self.backend, deduplicate=self.deduplicate, trace=self.trace)
+                for segment in self.checkpoint.pending_segments()]
+
+    def render(self, progress_callback: Optional[Callable[[int, int], None]] = None) -> ParallelRenderResult:
+        """
+        Render all segments and join them into the output file.
+
+        progress_callback receives (frames completed, total frames) as
+        segments finish. Completed segments stay in the checkpoint when the
+        export fails, so the next call only renders the rest.
+        """
+        start_time = time.time()
+        self.should_cancel = False
+        total_frames = self.total_frames
+
+        try:
+            tasks = self._create_tasks()
+        except OSError as e:
+            return ParallelRenderResult(False, None, total_frames, 0, 0.0,
+                                        error=f"Failed to create export checkpoint: {e}")
+
+        frames_done = self.checkpoint.completed_frames if self.checkpoint else 0
+        report = CostPredictionReport()
+        results, error = self._run_tasks(tasks, frames_done, total_frames, progress_callback, report)
+        if report.units:
+            print(f"Render cost prediction:\n{report.format()}")
+            # Later exports, in this process or the next, plan with the measured costs
+            self.cost_model = self.cost_model.calibrated(report)
+            self._frame_costs = None
+            if self.calibration_path:
+                try:
+                    self.cost_model.save_calibration(self.calibration_path, self.backend)
+                except OSError as e:
+                    print(f"Failed to save render cost calibration: {e}")
+        frames_rendered = sum(result["frames"] for result in results)
+
+        output_path = None
+        if error is None and self.encode:
+            error = self._concatenate_segments()
+            output_path = None if error else self.settings.output_path
+
+        return ParallelRenderResult(
+            success=error is None,
+            output_path=output_path,
+            total_frames=total_frames,
+            frames_rendered=frames_rendered,
+            elapsed=time.time() - start_time,
+            segments=sorted(results, key=lambda result: result["index"]),
+            error=error,
+            prediction=report
+        )
+
+    def _run_tasks(self, tasks: List[SegmentRenderTask], frames_done: int, total_frames: int,
+                   progress_callback: Optional[Callable[[int, int], None]],
+                   report: Optional[CostPredictionReport] = None):
+        """Render segments in the process pool; returns (results, first error)"""
+        if not tasks:
+            return [], None
+
+        results = []
+        error = None
+        slots = min(self.workers, len(tasks))
+        # Fresh interpreters: no inherited OpenGL or Qt state from this process
+        self.executor = ProcessPoolExecutor(max_workers=slots,
+                                            mp_context=multiprocessing.get_context("spawn"),
+                                            initializer=_init_worker)
+
+        # One segment in flight per worker slot; idle slots steal from busy ones
+        by_index = {task.index: task for task in tasks}
+        predicted = {task.index: self.predicted_seconds(task) for task in tasks}
+        ordered = sorted(tasks, key=lambda task: task.start_frame)
+        queue = WorkStealingQueue([(task.index, predicted[task.index]) for task in ordered], slots)
+        pending = {}
+
+        def submit(slot: int):
+            if self.should_cancel:
+                return
+            index = queue.next_unit(slot)
+            if index is None:
+                return
+            try:
+                pending[self.executor.submit(render_segment, by_index[index])] = (by_index[index], slot)
+            except RuntimeError:
+                # Executor shut down by cancel()
+                pass
+
+        try:
+            for slot in range(slots):
+                submit(slot)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task, slot = pending.pop(future)
+                    if future.cancelled():
+                        continue
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {"index": task.index, "frames": 0, "seconds": 0.0,
+                                  "error": f"Segment worker failed: {e}"}
+                    trace_events = result.pop("trace_events", None)
+                    if trace_events:
+                        get_render_tracer().add_events(trace_events)
+                    results.append(result)
+
+                    if result["error"]:
+                        error = error or f"Segment {task.index} failed: {result['error']}"
+                        self.cancel()
+                        continue
+
+                    if report is not None:
+                        report.add(task.index, predicted[task.index], result["seconds"], slot,
+                                   task.end_frame - task.start_frame)
+                    if self.checkpoint:
+                        self.checkpoint.mark_completed(self.checkpoint.segments[task.index])
+                    frames_done += task.end_frame - task.start_frame
+                    if progress_callback:
+                        progress_callback(frames_done, total_frames)
+                    submit(slot)
+
+            if report is not None:
+                report.steals = queue.steals
+
+            if self.should_cancel and error is None:
+                error = "Parallel export cancelled"
+
+        finally:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+        return results, error
+
+    def _concatenate_segments(self) -> Optional[str]:
+        """Join the encoded segments and mux the audio; returns an error message on failure"""
+        audio_path = None
+        if self.project.audio_file and self.project.audio_file.path and \
+                os.path.exists(self.project.audio_file.path):
+            audio_path = self.project.audio_file.path
+
+        audio_options = [
+            "-c:a", self.settings.audio_codec.value,
+            "-b:a", f"{self.settings.audio_bitrate}k",
+            "-ar", str(self.settings.audio_sample_rate),
+            "-ac", str(self.settings.audio_channels)
+        ]
+        container = self.settings.container_format.value
+        container_options = ["-movflags", "+faststart", "-f", "mp4"] if container == "mp4" else ["-f", container]
+
+        cmd = self.checkpoint.build_concat_command(audio_path, audio_options, container_options)
+        print(f"Concatenating {len(self.checkpoint.segments)} segments: {' '.join(cmd)}")
+
+        try:
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except OSError as e:
+            return f"Failed to start FFmpeg for concatenation: {e}"
+
+        if result.returncode != 0:
+            stderr = result.stderr.decode('utf-8', errors='replace').strip().splitlines()
+            return f"Segment concatenation failed: {stderr[-1] if stderr else result.returncode}"
+
+        self.checkpoint.discard()
+        return None
+
+    def cancel(self):
+        """Stop scheduling segments; segments already running finish first"""
+        self.should_cancel = True
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
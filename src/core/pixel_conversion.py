@@ -0,0 +1,190 @@
+"""
+Stripe-Parallel Pixel Conversion
+
+This module splits frames into horizontal stripes and converts them on a thread
+pool. NumPy releases the GIL inside its array kernels, so channel swizzles,
+YUV conversion and alpha premultiplication scale across cores while each
+worker writes directly into its own rows of a shared output buffer.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Callable, List, Tuple
+
+import numpy as np
+
+
+# Below this many rows per stripe the scheduling overhead outweighs the gain
+DEFAULT_MIN_STRIPE_ROWS = 64
+
+
+def default_worker_count() -> int:
+    """Default number of conversion threads for this machine"""
+    return max(1, min(os.cpu_count() or 1, 8))
+
+
+class StripeConversionExecutor:
+    """
+    Run pixel conversions over horizontal stripes on a shared thread pool.
+
+    Stripe boundaries are kept on even rows so 4:2:0 chroma rows never straddle
+    two workers. With a single worker every conversion runs inline on the
+    calling thread.
+    """
+
+    def __init__(self, workers: int = 0, min_stripe_rows: int = DEFAULT_MIN_STRIPE_ROWS):
+        self.workers = workers if workers > 0 else default_worker_count()
+        self.min_stripe_rows = max(2, min_stripe_rows)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config_manager) -> "StripeConversionExecutor":
+        """Create an executor sized by the ``conversion_threads`` performance setting (0 = auto)"""
+        workers = config_manager.get_performance_setting("conversion_threads", 0)
+        return cls(workers=int(workers or 0))
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """Create the thread pool on first parallel use"""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix="pixel-convert")
+            return self._pool
+
+    def stripes(self, height: int) -> List[Tuple[int, int]]:
+        """Split rows [0, height) into at most ``workers`` even-aligned stripes"""
+        stripe_count = min(self.workers, max(1, height // self.min_stripe_rows))
+        if stripe_count <= 1:
+            return [(0, height)]
+
+        rows_per_stripe = -(-height // stripe_count)
+        rows_per_stripe += rows_per_stripe % 2
+        return [(start, min(start + rows_per_stripe, height))
+                for start in range(0, height, rows_per_stripe)]
+
+    def map_stripes(self, height: int, convert_stripe: Callable[[int, int], None]):
+        """Call ``convert_stripe(row_start, row_end)`` for every stripe and wait"""
+        stripes = self.stripes(height)
+        if len(stripes) == 1:
+            convert_stripe(*stripes[0])
+            return
+
+        pool = self._get_pool()
+        futures = [pool.submit(convert_stripe, start, end) for start, end in stripes]
+        for future in futures:
+            future.result()  # Re-raises worker exceptions
+
+    # Channel swizzles
+
+    def rgba_to_rgb(self, data: np.ndarray) -> np.ndarray:
+        """Drop the alpha channel"""
+        out = np.empty(data.shape[:2] + (3,), dtype=data.dtype)
+
+        def convert(start, end):
+            out[start:end] = data[start:end, :, :3]
+
+        self.map_stripes(data.shape[0], convert)
+        return out
+
+    def rgba_to_bgra(self, data: np.ndarray) -> np.ndarray:
+        """Swap red and blue channels"""
+        out = np.empty_like(data)
+
+        def convert(start, end):
+            out[start:end] = data[start:end, :, [2, 1, 0, 3]]
+
+        self.map_stripes(data.shape[0], convert)
+        return out
+
+    def rgba_to_bgr(self, data: np.ndarray) -> np.ndarray:
+        """Swap red and blue channels and drop alpha"""
+        out = np.empty(data.shape[:2] + (3,), dtype=data.dtype)
+
+        def convert(start, end):
+            out[start:end] = data[start:end, :, [2, 1, 0]]
+
+        self.map_stripes(data.shape[0], convert)
+        return out
+
+    def premultiply_alpha(self, data: np.ndarray) -> np.ndarray:
+        """Multiply color channels by alpha (straight to premultiplied RGBA)"""
+        out = np.empty_like(data)
+
+        def convert(start, end):
+            stripe = data[start:end].astype(np.uint16)
+            alpha = stripe[:, :, 3:4]
+            # Rounded division by 255 without floating point
+            color = stripe[:, :, :3] * alpha + 128
+            out[start:end, :, :3] = ((color + (color >> 8)) >> 8).astype(np.uint8)
+            out[start:end, :, 3] = data[start:end, :, 3]
+
+        self.map_stripes(data.shape[0], convert)
+        return out
+
+    # YUV conversion (ITU-R BT.601 coefficients)
+
+    @staticmethod
+    def _stripe_yuv(data: np.ndarray, start: int, end: int, step: int = 1):
+        """Compute Y, U and V for rows [start, end), U/V subsampled by ``step``"""
+        rgb = data[start:end, :, :3].astype(np.float32) / 255.0
+        r, g, b = rgb[:, :, 0], rgb[:, :, 1], rgb[:, :, 2]
+
+        y = 0.299 * r + 0.587 * g + 0.114 * b
+
+        r_sub, g_sub, b_sub = r[::step, ::step], g[::step, ::step], b[::step, ::step]
+        u = -0.147 * r_sub - 0.289 * g_sub + 0.436 * b_sub + 0.5
+        v = 0.615 * r_sub - 0.515 * g_sub - 0.100 * b_sub + 0.5
+
+        return (np.clip(y * 255, 0, 255).astype(np.uint8),
+                np.clip(u * 255, 0, 255).astype(np.uint8),
+                np.clip(v * 255, 0, 255).astype(np.uint8))
+
+    def rgba_to_yuv444p(self, data: np.ndarray) -> np.ndarray:
+        """Convert to planar YUV444P packed as a column vector"""
+        height, width = data.shape[:2]
+        out = np.empty(3 * height * width, dtype=np.uint8)
+        planes = out.reshape(3, height, width)
+
+        def convert(start, end):
+            y, u, v = self._stripe_yuv(data, start, end)
+            planes[0, start:end] = y
+            planes[1, start:end] = u
+            planes[2, start:end] = v
+
+        self.map_stripes(height, convert)
+        return out.reshape(-1, 1)
+
+    def rgba_to_yuv420p(self, data: np.ndarray) -> np.ndarray:
+        """Convert to planar YUV420P (chroma from every other pixel) packed as a column vector"""
+        height, width = data.shape[:2]
+        chroma_height, chroma_width = height // 2, width // 2
+        luma_size = height * width
+        chroma_size = chroma_height * chroma_width
+
+        out = np.empty(luma_size + 2 * chroma_size, dtype=np.uint8)
+        y_plane = out[:luma_size].reshape(height, width)
+        u_plane = out[luma_size:luma_size + chroma_size].reshape(chroma_height, chroma_width)
+        v_plane = out[luma_size + chroma_size:].reshape(chroma_height, chroma_width)
+
+        def convert(start, end):
+            y, u, v = self._stripe_yuv(data, start, end, step=2)
+            y_plane[start:end] = y
+
+            # Stripes start on even rows, so chroma row start // 2 belongs to this stripe
+            chroma_start = start // 2
+            chroma_end = min(chroma_start + u.shape[0], chroma_height)
+            rows = chroma_end - chroma_start
+            u_plane[chroma_start:chroma_end] = u[:rows, :chroma_width]
+            v_plane[chroma_start:chroma_end] = v[:rows, :chroma_width]
+
+        self.map_stripes(height, convert)
+        return out.reshape(-1, 1)
+
+    def shutdown(self):
+        """Stop the worker threads"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
@@ -0,0 +1,384 @@
+"""
+Headless End-to-End Render Benchmark
+
+Runs CompleteRenderingPipeline end to end on a headless backend (the mock
+context by default) for synthetic projects and reports the frame rate, the
+time per frame spent in each stage and the peak memory of every scenario.
+
+Scenarios vary the song length, the line density (lines per minute and
+words per line) and the effect stack. Their subtitles are generated from a
+fixed seed and written as a karaoke ASS file, so every run renders the same
+frames. Frames are encoded by FFmpeg into the null muxer when FFmpeg is
+installed and requested, and otherwise written to a Python process that
+drains the pipe; both go through the pipeline's own encoder threads and pipe.
+
+Stage times come from the render tracer's spans (subtitle_raster, effects,
+background, readback, convert, pipe_write, ...). Stages run on several
+threads at once, so their sum can exceed the wall-clock time per frame.
+Peak memory is the highest resident set size sampled during the render.
+
+Results are compared with a stored baseline: a scenario regresses when its
+frame rate drops, or its peak memory grows, by more than a threshold.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import tempfile
+import logging
+from dataclasses import dataclass, field, asdict
+from typing import Optional, List, Dict, Any, Tuple
+
+try:
+    from .models import Project, AudioFile
+    from .subtitle_parser import parse_ass_file
+    from .effects_manager import EffectType
+    from .enhanced_ffmpeg_integration import EnhancedFFmpegProcessor, EnhancedExportSettings
+    from .complete_rendering_pipeline import CompleteRenderingPipeline, PipelineConfig
+    from .render_trace import get_render_tracer
+    from .hardware_profile import probe_hardware
+except ImportError:
+    from models import Project, AudioFile
+    from subtitle_parser import parse_ass_file
+    from effects_manager import EffectType
+    from enhanced_ffmpeg_integration import EnhancedFFmpegProcessor, EnhancedExportSettings
+    from complete_rendering_pipeline import CompleteRenderingPipeline, PipelineConfig
+    from render_trace import get_render_tracer
+    from hardware_profile import probe_hardware
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASELINE_PATH = os.path.join(".kiro", "benchmarks", "render_pipeline_baseline.json")
+BASELINE_VERSION = 1
+
+# Relative change of fps or peak memory that counts as a regression
+DEFAULT_REGRESSION_THRESHOLD = 0.10
+
+SINK_AUTO = "auto"
+SINK_FFMPEG = "ffmpeg"
+SINK_NULL = "null"
+SINKS = (SINK_AUTO, SINK_FFMPEG, SINK_NULL)
+
+# Seconds between resident set size samples during a render
+MEMORY_SAMPLE_INTERVAL = 0.05
+
+# Effect layer parameters of the scenarios' effect stacks
+EFFECT_PARAMETERS = {
+    EffectType.OUTLINE: {'width': 3.0, 'color': [0.0, 0.0, 0.0, 1.0], 'softness': 0.3},
+    EffectType.GLOW: {'radius': 6.0, 'intensity': 0.8, 'color': [1.0, 1.0, 0.0, 1.0]},
+    EffectType.SHADOW: {'offset_x': 3.0, 'offset_y': 3.0, 'blur_radius': 2.0, 'color': [0.0, 0.0, 0.0, 0.6]},
+    EffectType.COLOR_TRANSITION: {'start_color': [0.8, 0.8, 0.8], 'end_color': [1.0, 1.0, 0.0],
+                                  'duration': 2.0},
+    EffectType.WAVE: {'amplitude': 4.0, 'frequency': 2.0, 'speed': 1.0},
+    EffectType.BOUNCE: {'amplitude': 6.0, 'frequency': 2.0},
+}
+
+_SYLLABLES = ("la", "na", "shi", "ro", "ka", "mo", "ne", "ta", "yu", "ki", "so", "ra", "mi", "do")
+
+
+@dataclass(frozen=True)
+class BenchmarkScenario:
+    """A synthetic project: length, line density and effect stack"""
+    name: str
+    duration: float  # Seconds
+    lines_per_minute: float
+    words_per_line: int
+    effects: Tuple[str, ...] = ("outline", "glow", "color_transition")  # EffectType values
+    width: int = 1280
+    height: int = 720
+    fps: float = 30.0
+
+    @property
+    def frame_count(self) -> int:
+        return int(round(self.duration * self.fps))
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['effects'] = list(self.effects)
+        return data
+
+
+SCENARIOS = {
+    scenario.name: scenario for scenario in (
+        BenchmarkScenario("sparse", 20.0, lines_per_minute=6, words_per_line=4, effects=("outline",)),
+        BenchmarkScenario("typical", 30.0, lines_per_minute=15, words_per_line=6),
+        BenchmarkScenario("dense", 30.0, lines_per_minute=40, words_per_line=10),
+        BenchmarkScenario("effects", 20.0, lines_per_minute=15, words_per_line=6,
+                          effects=("outline", "glow", "shadow", "color_transition", "wave", "bounce")),
+        BenchmarkScenario("long", 120.0, lines_per_minute=15, words_per_line=6),
+    )
+}
+
+
+def get_scenario(name: str) -> BenchmarkScenario:
+    """Look up a scenario by name; raises ValueError for unknown names"""
+    if name not in SCENARIOS:
+        raise ValueError(f"Unknown benchmark scenario '{name}' (choose from {', '.join(SCENARIOS)})")
+    return SCENARIOS[name]
+
+
+def _ass_time(seconds: float) -> str:
+    centiseconds = int(round(seconds * 100))
+    hours, centiseconds = divmod(centiseconds, 360000)
+    minutes, centiseconds = divmod(centiseconds, 6000)
+    return f"{hours}:{minutes:02d}:{centiseconds // 100:02d}.{centiseconds % 100:02d}"
+
+
+def synthetic_ass(scenario: BenchmarkScenario, seed: int = 0) -> str:
+    """Karaoke ASS script for a scenario; the same seed gives the same script
+
+    Lines start at even intervals and are sung word by word over 90% of the
+    interval (at most eight seconds), so dense scenarios show more lines and
+    more highlight changes per second.
+    """
+    rng = random.Random(seed)
+    interval = 60.0 / scenario.lines_per_minute
+    line_duration = min(interval * 0.9, 8.0)
+
+    events = []
+    start = 0.5
+    while start + line_duration <= scenario.duration:
+        words = ["".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(1, 3)))
+                 for _ in range(scenario.words_per_line)]
+        # Word lengths in centiseconds, proportional to random weights and summing to the line
+        weights = [rng.uniform(0.5, 1.5) for _ in words]
+        total = int(line_duration * 100)
+        lengths = [max(1, int(total * weight / sum(weights))) for weight in weights]
+        lengths[-1] += total - sum(lengths)
+        text = "".join(f"{{\\k{length}}}{word} " for word, length in zip(words, lengths)).rstrip()
+        events.append(f"Dialogue: 0,{_ass_time(start)},{_ass_time(start + line_duration)},"
+                      f"Default,,0,0,0,,{text}")
+        start += interval
+
+    return "\n".join([
+        "[Script Info]",
+        f"Title: Benchmark {scenario.name}",
+        "ScriptType: v4.00+",
+        f"PlayResX: {scenario.width}",
+        f"PlayResY: {scenario.height}",
+        "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+        "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, "
+        "Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
+        "Style: Default,Arial,48,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,0,0,0,0,100,100,0,0,1,2,0,2,"
+        "10,10,10,1",
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+        *events,
+        ""
+    ])
+
+
+def build_synthetic_project(scenario: BenchmarkScenario, directory: str, seed: int = 0) -> Project:
+    """Write a scenario's subtitles into directory and return its project"""
+    subtitle_path = os.path.join(directory, f"{scenario.name}.ass")
+    with open(subtitle_path, 'w', encoding='utf-8') as f:
+        f.write(synthetic_ass(scenario, seed))
+
+    subtitle_file, errors, _ = parse_ass_file(subtitle_path)
+    if errors:
+        raise ValueError(f"Synthetic subtitles for '{scenario.name}' failed to parse: {errors[0]}")
+    return Project(
+        id=f"benchmark-{scenario.name}",
+        name=f"Benchmark {scenario.name}",
+        audio_file=AudioFile(path="", duration=scenario.duration),
+        subtitle_file=subtitle_file
+    )
+
+
+class NullSinkProcessor(EnhancedFFmpegProcessor):
+    """
+    Encoder whose output is discarded.
+
+    With use_ffmpeg, FFmpeg encodes with the export settings into the null
+    muxer; otherwise a Python process reads and drops the raw frames, which
+    measures rendering and the pipe without an encoder.
+    """
+
+    def __init__(self, use_ffmpeg: bool = False, config_manager: Optional[Any] = None):
+        super().__init__(config_manager)
+        self.use_ffmpeg = use_ffmpeg
+
+    def validate_settings(self, settings: EnhancedExportSettings) -> List[str]:
+        if self.use_ffmpeg:
+            return super().validate_settings(settings)
+        return []
+
+    def build_ffmpeg_command(self, settings: EnhancedExportSettings,
+                             input_audio: Optional[str] = None) -> List[str]:
+        if not self.use_ffmpeg:
+            script = (
+                "import sys\n"
+                "read = sys.stdin.buffer.read\n"
+                "while read(1 << 20):\n"
+                "    pass\n"
+            )
+            return [sys.executable, "-c", script]
+
+        cmd = super().build_ffmpeg_command(settings, input_audio)
+        # Replace the container and output file with the null muxer
+        format_index = len(cmd) - 1 - cmd[::-1].index("-f")
+        cmd[format_index + 1] = "null"
+        cmd[-1] = "-"
+        return cmd
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements of one scenario"""
+    scenario: str
+    frames: int
+    seconds: float
+    peak_rss_mb: float
+    sink: str
+    backend: str
+    stage_ms: Dict[str, float] = field(default_factory=dict)  # Milliseconds per frame by stage
+    error: Optional[str] = None
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['fps'] = round(self.fps, 2)
+        return data
+
+
+def run_scenario(scenario: BenchmarkScenario, backend: str = "mock", sink: str = SINK_AUTO,
+                 seed: int = 0, staged: bool = True, timeout: float = 600.0) -> BenchmarkResult:
+    """Render a scenario end to end through CompleteRenderingPipeline"""
+    if sink not in SINKS:
+        raise ValueError(f"Unknown sink '{sink}' (choose from {', '.join(SINKS)})")
+    use_ffmpeg = sink == SINK_FFMPEG or (sink == SINK_AUTO and shutil.which("ffmpeg") is not None)
+    sink_name = SINK_FFMPEG if use_ffmpeg else SINK_NULL
+
+    tracer = get_render_tracer()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        project = build_synthetic_project(scenario, temp_dir, seed)
+        config = PipelineConfig(
+            width=scenario.width,
+            height=scenario.height,
+            fps=scenario.fps,
+            backend=backend,
+            enable_effects=False,  # No default effects; the scenario's stack is added below
+            staged_rendering=staged,
+            resource_sample_interval=MEMORY_SAMPLE_INTERVAL
+        )
+        pipeline = CompleteRenderingPipeline(config, ffmpeg_processor=NullSinkProcessor(use_ffmpeg))
+        result = BenchmarkResult(scenario.name, 0, 0.0, 0.0, sink_name, backend)
+
+        try:
+            if not pipeline.initialize(project):
+                result.error = pipeline.state.error_message or "Pipeline initialization failed"
+                return result
+            for effect in scenario.effects:
+                effect_type = EffectType(effect)
+                pipeline.effects_pipeline.add_effect_layer(effect_type, dict(EFFECT_PARAMETERS.get(effect_type, {})))
+
+            tracer.clear()
+            tracer.enable()
+            start = time.perf_counter()
+            completed = (pipeline.start_rendering(os.path.join(temp_dir, "output.mp4"))
+                         and pipeline.wait_for_completion(timeout))
+            result.seconds = time.perf_counter() - start
+            tracer.disable()
+
+            result.frames = pipeline.state.frames_rendered
+            if pipeline.resource_report:
+                result.peak_rss_mb = round(pipeline.resource_report.peak_rss_bytes / (1024 * 1024), 1)
+            frames = max(1, result.frames)
+            result.stage_ms = {stage: round(total["seconds"] * 1000.0 / frames, 3)
+                               for stage, total in sorted(tracer.stage_totals().items())}
+            if not completed:
+                result.error = pipeline.state.error_message or "Render did not complete"
+            elif result.frames != scenario.frame_count:
+                result.error = f"Rendered {result.frames} of {scenario.frame_count} frames"
+            return result
+
+        finally:
+            tracer.disable()
+            tracer.clear()
+            pipeline.cleanup()
+
+
+@dataclass
+class Regression:
+    """A metric of a scenario that is worse than its baseline by more than the threshold"""
+    scenario: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change_percent(self) -> float:
+        return (self.current - self.baseline) / self.baseline * 100.0 if self.baseline else 0.0
+
+    def describe(self) -> str:
+        return (f"{self.scenario}: {self.metric} {self.current:g} vs baseline {self.baseline:g} "
+                f"({self.change_percent:+.1f}%)")
+
+
+def compare_to_baseline(results: List[BenchmarkResult], baseline: Dict[str, Any],
+                        threshold: float = DEFAULT_REGRESSION_THRESHOLD,
+                        memory_threshold: Optional[float] = None) -> List[Regression]:
+    """Scenarios whose fps dropped or peak memory grew by more than the thresholds
+
+    Scenarios missing from the baseline, or measured with a different backend
+    or sink, are not compared.
+    """
+    memory_threshold = threshold if memory_threshold is None else memory_threshold
+    scenarios = baseline.get("scenarios", {})
+    regressions = []
+    for result in results:
+        reference = scenarios.get(result.scenario)
+        if (result.error or not reference or reference.get("backend") != result.backend
+                or reference.get("sink") != result.sink):
+            continue
+        if result.fps < reference["fps"] * (1.0 - threshold):
+            regressions.append(Regression(result.scenario, "fps", reference["fps"], round(result.fps, 2)))
+        if reference.get("peak_rss_mb") and result.peak_rss_mb > reference["peak_rss_mb"] * (1.0 + memory_threshold):
+            regressions.append(Regression(result.scenario, "peak_rss_mb", reference["peak_rss_mb"],
+                                          result.peak_rss_mb))
+    return regressions
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    """Read a stored baseline; None if there is none"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        return None
+    if baseline.get("version") != BASELINE_VERSION:
+        logger.warning(f"Ignoring benchmark baseline {path} with version {baseline.get('version')}")
+        return None
+    return baseline
+
+
+def save_baseline(path: str, results: List[BenchmarkResult], baseline: Optional[Dict[str, Any]] = None):
+    """Store the results of successful scenarios, keeping other scenarios of an existing baseline"""
+    baseline = baseline or {"version": BASELINE_VERSION, "scenarios": {}}
+    profile = probe_hardware(probe_ffmpeg=False)
+    baseline["machine"] = {"host": profile.host, "cpu_count": profile.cpu_count, "memory_mb": profile.memory_mb}
+    for result in results:
+        if not result.error:
+            baseline["scenarios"][result.scenario] = {
+                "fps": round(result.fps, 2),
+                "peak_rss_mb": result.peak_rss_mb,
+                "backend": result.backend,
+                "sink": result.sink,
+                "stage_ms": result.stage_ms
+            }
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
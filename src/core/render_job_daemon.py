@@ -0,0 +1,698 @@
+"""
+Render Job Daemon
+
+Long-running render service for unattended batch renders. Jobs live in a
+SQLite table, so queued work survives restarts. A pool of asyncio workers
+claims jobs by priority and runs each one as a headless ``karaoke-render``
+subprocess (see render_cli.py), writing a log per job and retrying failures
+that are not the project's fault. A small HTTP API submits, cancels and
+queries jobs:
+
+    POST   /jobs              submit {"project": ..., "output": ..., "priority": ...}
+    GET    /jobs[?status=]    list jobs
+    GET    /jobs/<id>         job details
+    GET    /jobs/<id>/log     job log (text)
+    POST   /jobs/<id>/cancel  cancel a queued or running job
+    GET    /health            worker status
+
+Renders are started with ``--resume``: encoded segments are recorded in an
+ExportCheckpoint next to the output, so an attempt after a daemon restart or
+a retry continues from the last completed segment, without using up a retry
+when the daemon was stopped. SQLite calls run in worker threads, so a slow
+database never stalls the event loop.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import signal
+import sqlite3
+import asyncio
+import argparse
+import threading
+from dataclasses import dataclass, field, asdict
+from enum import Enum
+from typing import Optional, List, Dict, Any, Callable, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+try:
+    from .export_checkpoint import ExportCheckpoint
+except ImportError:
+    from export_checkpoint import ExportCheckpoint
+
+
+DEFAULT_PORT = 8765
+
+# render_cli exit codes that retrying cannot fix (bad arguments, invalid project)
+NON_RETRYABLE_EXIT_CODES = {2, 3}
+EXIT_CANCELLED = 130
+
+# Submission options passed through to karaoke-render
+JOB_OPTIONS = {"width": int, "height": int, "fps": float, "dry_run": bool}
+
+RENDER_CLI_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                               "render_cli.py")
+
+
+class JobStatus(Enum):
+    """Render job lifecycle states"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+@dataclass
+class RenderJob:
+    """A render job as stored in the job table"""
+    id: str
+    project_path: str
+    output_path: str
+    backend: str = "opengl"
+    priority: int = 0
+    options: Dict[str, Any] = field(default_factory=dict)
+    status: JobStatus = JobStatus.QUEUED
+    attempts: int = 0
+    max_retries: int = 2
+    cancel_requested: bool = False
+    exit_code: Optional[int] = None
+    error: Optional[str] = None
+    progress: float = 0.0
+    worker: Optional[str] = None
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['status'] = self.status.value
+        return data
+
+
+class RenderJobStore:
+    """
+    SQLite-backed job queue.
+
+    All state changes go through this class so the table is the single
+    source of truth; claiming a job is a single transaction, so several
+    workers never pick up the same job.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            project_path TEXT NOT NULL,
+            output_path TEXT NOT NULL,
+            backend TEXT NOT NULL,
+            priority INTEGER NOT NULL DEFAULT 0,
+            options TEXT NOT NULL DEFAULT '{}',
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_retries INTEGER NOT NULL DEFAULT 2,
+            cancel_requested INTEGER NOT NULL DEFAULT 0,
+            exit_code INTEGER,
+            error TEXT,
+            progress REAL NOT NULL DEFAULT 0,
+            worker TEXT,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority DESC, created_at);
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(self.SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def _row_to_job(self, row: sqlite3.Row) -> RenderJob:
+        data = dict(row)
+        data['status'] = JobStatus(data['status'])
+        data['options'] = json.loads(data['options'])
+        data['cancel_requested'] = bool(data['cancel_requested'])
+        return RenderJob(**data)
+
+    def _fetch(self, job_id: str) -> Optional[RenderJob]:
+        row = self.connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def submit(self, project_path: str, output_path: str, backend: str = "opengl",
+               priority: int = 0, max_retries: int = 2,
+               options: Optional[Dict[str, Any]] = None) -> RenderJob:
+        """Add a job to the queue"""
+        job = RenderJob(
+            id=uuid.uuid4().hex[:12],
+            project_path=project_path,
+            output_path=output_path,
+            backend=backend,
+            priority=priority,
+            max_retries=max_retries,
+            options=dict(options or {}),
+            created_at=time.time()
+        )
+        with self.lock:
+            self.connection.execute(
+                "INSERT INTO jobs (id, project_path, output_path, backend, priority, options, "
+                "status, max_retries, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job.id, job.project_path, job.output_path, job.backend, job.priority,
+                 json.dumps(job.options), job.status.value, job.max_retries, job.created_at)
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[RenderJob]:
+        with self.lock:
+            return self._fetch(job_id)
+
+    def list_jobs(self, status: Optional[JobStatus] = None, limit: int = 100) -> List[RenderJob]:
+        """Jobs in queue order (running first, then by priority and age)"""
+        query = "SELECT * FROM jobs"
+        params: Tuple = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status.value,)
+        query += (" ORDER BY CASE status WHEN 'running' THEN 0 WHEN 'queued' THEN 1 ELSE 2 END,"
+                  " priority DESC, created_at LIMIT ?")
+        with self.lock:
+            rows = self.connection.execute(query, params + (limit,)).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def claim_next(self, worker: str) -> Optional[RenderJob]:
+        """Mark the highest-priority queued job as running and return it"""
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.connection.execute(
+                    "SELECT id FROM jobs WHERE status = ? ORDER BY priority DESC, created_at LIMIT 1",
+                    (JobStatus.QUEUED.value,)
+                ).fetchone()
+                if row is None:
+                    self.connection.execute("COMMIT")
+                    return None
+
+                self.connection.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, worker = ?, "
+                    "started_at = ?, progress = 0, error = NULL, exit_code = NULL WHERE id = ?",
+                    (JobStatus.RUNNING.value, worker, time.time(), row['id'])
+                )
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+            return self._fetch(row['id'])
+
+    def update_progress(self, job_id: str, progress: float):
+        with self.lock:
+            self.connection.execute("UPDATE jobs SET progress = ? WHERE id = ?", (progress, job_id))
+
+    def finish(self, job_id: str, exit_code: int, error: Optional[str] = None) -> Optional[RenderJob]:
+        """
+        Record the result of a job attempt.
+
+        Failed attempts go back to the queue while retries remain, unless the
+        exit code shows the project itself is invalid.
+        """
+        with self.lock:
+            job = self._fetch(job_id)
+            if job is None:
+                return None
+
+            # A cancel wins even if the render got to the end before it was stopped
+            if job.cancel_requested or exit_code == EXIT_CANCELLED:
+                status = JobStatus.CANCELLED
+            elif exit_code == 0:
+                status = JobStatus.COMPLETED
+            elif exit_code not in NON_RETRYABLE_EXIT_CODES and job.attempts <= job.max_retries:
+                status = JobStatus.QUEUED
+            else:
+                status = JobStatus.FAILED
+
+            self.connection.execute(
+                "UPDATE jobs SET status = ?, exit_code = ?, error = ?, finished_at = ?, "
+                "progress = CASE WHEN ? THEN 100 ELSE progress END WHERE id = ?",
+                (status.value, exit_code, error,
+                 None if status == JobStatus.QUEUED else time.time(),
+                 status == JobStatus.COMPLETED, job_id)
+            )
+            return self._fetch(job_id)
+
+    def request_cancel(self, job_id: str) -> Optional[RenderJob]:
+        """Cancel a queued job now, or flag a running job for its worker to stop"""
+        with self.lock:
+            job = self._fetch(job_id)
+            if job is None:
+                return None
+
+            if job.status == JobStatus.QUEUED:
+                self.connection.execute(
+                    "UPDATE jobs SET status = ?, cancel_requested = 1, finished_at = ? WHERE id = ?",
+                    (JobStatus.CANCELLED.value, time.time(), job_id)
+                )
+            elif job.status == JobStatus.RUNNING:
+                self.connection.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+            return self._fetch(job_id)
+
+    def requeue(self, job_id: str):
+        """Put an interrupted job back in the queue without using up a retry"""
+        with self.lock:
+            self.connection.execute(
+                "UPDATE jobs SET status = ?, attempts = MAX(attempts - 1, 0), worker = NULL "
+                "WHERE id = ? AND status = ?",
+                (JobStatus.QUEUED.value, job_id, JobStatus.RUNNING.value)
+            )
+
+    def recover_interrupted(self) -> int:
+        """Requeue jobs left running by a daemon that stopped; returns how many"""
+        with self.lock:
+            self.connection.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE status = ? AND cancel_requested = 1",
+                (JobStatus.CANCELLED.value, time.time(), JobStatus.RUNNING.value)
+            )
+            cursor = self.connection.execute(
+                "UPDATE jobs SET status = ?, attempts = MAX(attempts - 1, 0), worker = NULL "
+                "WHERE status = ?",
+                (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+            )
+            return cursor.rowcount
+
+
+def build_render_command(job: RenderJob) -> List[str]:
+    """karaoke-render command line for a job"""
+    cmd = [sys.executable, RENDER_CLI_PATH, job.project_path, "-o", job.output_path,
+           "--backend", job.backend, "--progress-interval", "1"]
+    if not job.options.get("dry_run"):
+        # Later attempts continue from the segments this one completes
+        cmd.append("--resume")
+    for name, value in job.options.items():
+        flag = "--" + name.replace("_", "-")
+        if JOB_OPTIONS.get(name) is bool:
+            if value:
+                cmd.append(flag)
+        else:
+            cmd.extend([flag, str(value)])
+    return cmd
+
+
+class RenderJobDaemon:
+    """
+    Worker pool and HTTP API on top of a RenderJobStore.
+
+    ``command_builder`` turns a job into the subprocess command line; the
+    process must report progress as karaoke-render JSON lines on stdout.
+    """
+
+    def __init__(self, db_path: str, log_dir: Optional[str] = None, workers: int = 1,
+                 host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 command_builder: Callable[[RenderJob], List[str]] = build_render_command,
+                 poll_interval: float = 1.0, stop_timeout: float = 10.0):
+        self.store = RenderJobStore(db_path)
+        self.log_dir = log_dir or os.path.join(os.path.dirname(os.path.abspath(db_path)), "job_logs")
+        self.worker_count = max(1, workers)
+        self.host = host
+        self.port = port
+        self.command_builder = command_builder
+        self.poll_interval = poll_interval
+        self.stop_timeout = stop_timeout
+
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.worker_tasks: List[asyncio.Task] = []
+        self.processes: Dict[str, asyncio.subprocess.Process] = {}
+        self.running_jobs: Dict[str, str] = {}  # worker name -> job id
+        self.wakeup: Optional[asyncio.Event] = None
+        self.stopped: Optional[asyncio.Event] = None
+        self.stop_requested = False
+
+    def log_path(self, job_id: str) -> str:
+        return os.path.join(self.log_dir, f"{job_id}.log")
+
+    async def start(self):
+        """Recover interrupted jobs, start the workers and the HTTP API"""
+        os.makedirs(self.log_dir, exist_ok=True)
+        self.wakeup = asyncio.Event()
+        self.stopped = asyncio.Event()
+        if self.stop_requested:
+            self.stopped.set()
+
+        recovered = await asyncio.to_thread(self.store.recover_interrupted)
+        if recovered:
+            print(f"Requeued {recovered} interrupted render job(s)")
+
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+        self.worker_tasks = [asyncio.create_task(self._supervise(f"worker-{i}"))
+                             for i in range(self.worker_count)]
+        print(f"Render job daemon listening on http://{self.host}:{self.port} "
+              f"with {self.worker_count} worker(s)")
+
+    async def stop(self):
+        """Stop accepting requests and requeue jobs that are still running"""
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+        for task in self.worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self.worker_tasks, return_exceptions=True)
+        self.worker_tasks = []
+        if self.stopped:
+            self.stopped.set()
+
+    def request_stop(self):
+        """Make serve_forever() return; safe to call before it has started, e.g. from a signal handler"""
+        self.stop_requested = True
+        if self.stopped:
+            self.stopped.set()
+
+    async def serve_forever(self):
+        """Run until stop() or request_stop() is called"""
+        try:
+            await self.start()
+            await self.stopped.wait()
+            print("Shutting down render job daemon")
+        finally:
+            await self.stop()
+            self.store.close()
+
+    def notify(self):
+        """Wake idle workers after a submission"""
+        if self.wakeup:
+            self.wakeup.set()
+
+    # Workers
+
+    async def _supervise(self, name: str):
+        """Run a worker, restarting it after an unexpected error (e.g. a locked database)"""
+        while True:
+            try:
+                await self._worker(name)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Render {name} failed, restarting: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _worker(self, name: str):
+        while True:
+            job = await asyncio.to_thread(self.store.claim_next, name)
+            if job is None:
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self.running_jobs[name] = job.id
+            try:
+                await self._run_job(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Don't leave the job running until the next restart
+                await asyncio.to_thread(self.store.finish, job.id, 1, f"Render job failed: {e}")
+                raise
+            finally:
+                self.running_jobs.pop(name, None)
+
+    async def _run_job(self, job: RenderJob):
+        """Run one attempt of a job and record its outcome"""
+        cmd = self.command_builder(job)
+        error = None
+
+        with open(self.log_path(job.id), 'ab') as log:
+            log.write(f"=== Attempt {job.attempts} started "
+                      f"{time.strftime('%Y-%m-%d %H:%M:%S')}: {' '.join(cmd)}\n".encode())
+            log.flush()
+
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd, stdout=asyncio.subprocess.PIPE, stderr=log, stdin=asyncio.subprocess.DEVNULL
+                )
+            except OSError as e:
+                log.write(f"Failed to start render: {e}\n".encode())
+                await asyncio.to_thread(self.store.finish, job.id, 1, f"Failed to start render: {e}")
+                return
+
+            self.processes[job.id] = process
+            try:
+                # A cancel between claiming the job and registering the process had nothing to stop
+                current = await asyncio.to_thread(self.store.get, job.id)
+                if current and current.cancel_requested:
+                    process.terminate()
+
+                async for line in process.stdout:
+                    log.write(line)
+                    log.flush()
+                    error = await self._handle_event(job.id, line) or error
+                exit_code = await process.wait()
+
+            except asyncio.CancelledError:
+                # Daemon shutdown: stop the render and leave the job for the next start
+                await self._terminate(process)
+                log.write(b"=== Interrupted by daemon shutdown\n")
+                await asyncio.to_thread(self.store.requeue, job.id)
+                raise
+
+            except BaseException:
+                # Don't leave a render running that no worker reads, e.g. next to its own retry
+                await self._terminate(process)
+                raise
+
+            finally:
+                self.processes.pop(job.id, None)
+
+            finished = await asyncio.to_thread(self.store.finish, job.id, exit_code,
+                                               error if exit_code else None)
+            if finished and finished.status in (JobStatus.CANCELLED, JobStatus.FAILED):
+                await asyncio.to_thread(self._discard_checkpoint, finished)
+            status = finished.status.value if finished else "unknown"
+            log.write(f"=== Attempt {job.attempts} exited with {exit_code}: {status}\n".encode())
+
+        print(f"Render job {job.id} attempt {job.attempts} exited with {exit_code} ({status})")
+
+    def _discard_checkpoint(self, job: RenderJob):
+        """Remove the segments of a job that will not be resumed"""
+        checkpoint = ExportCheckpoint.load(job.output_path)
+        if checkpoint:
+            checkpoint.discard()
+
+    async def _handle_event(self, job_id: str, line: bytes) -> Optional[str]:
+        """Apply a karaoke-render JSON event; returns the error message, if any"""
+        try:
+            event = json.loads(line)
+        except ValueError:
+            return None
+        if not isinstance(event, dict):
+            return None
+
+        if event.get('event') == "progress" and event.get('percent') is not None:
+            try:
+                await asyncio.to_thread(self.store.update_progress, job_id, float(event['percent']))
+            except sqlite3.Error as e:
+                # Progress is informational; a busy database must not fail the render
+                print(f"Failed to record progress of render job {job_id}: {e}")
+        elif event.get('event') == "error":
+            return event.get('message')
+        return None
+
+    async def _terminate(self, process: asyncio.subprocess.Process):
+        if process.returncode is not None:
+            return
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), self.stop_timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+    async def cancel_job(self, job_id: str) -> Optional[RenderJob]:
+        """Cancel a job, terminating its render if it is running"""
+        job = await asyncio.to_thread(self.store.request_cancel, job_id)
+        process = self.processes.get(job_id)
+        if job and job.status == JobStatus.RUNNING and process and process.returncode is None:
+            process.terminate()
+        return job
+
+    # HTTP API
+
+    def submit_job(self, request: Dict[str, Any]) -> RenderJob:
+        """Validate a submission body and queue the job; raises ValueError"""
+        job = self._queue_job(request)
+        self.notify()
+        return job
+
+    def _queue_job(self, request: Dict[str, Any]) -> RenderJob:
+        """submit_job() without waking the workers; safe to call from any thread"""
+        if not isinstance(request, dict):
+            raise ValueError("Request body must be a JSON object")
+
+        project = request.get('project')
+        output = request.get('output')
+        if not project or not isinstance(project, str):
+            raise ValueError("'project' is required")
+        if not os.path.isfile(project):
+            raise ValueError(f"Project file not found: {project}")
+        if not output or not isinstance(output, str):
+            raise ValueError("'output' is required")
+
+        backend = request.get('backend', "opengl")
+        if backend not in ("mock", "software", "opengl"):
+            raise ValueError(f"Unknown backend: {backend}")
+
+        options = request.get('options') or {}
+        unknown = sorted(set(options) - set(JOB_OPTIONS))
+        if unknown:
+            raise ValueError(f"Unknown options: {', '.join(unknown)}")
+
+        try:
+            options = {name: JOB_OPTIONS[name](value) for name, value in options.items()}
+            priority = int(request.get('priority', 0))
+            max_retries = max(0, int(request.get('max_retries', 2)))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid job parameters: {e}")
+
+        return self.store.submit(os.path.abspath(project), os.path.abspath(output), backend,
+                                 priority, max_retries, options)
+
+    async def handle_request(self, method: str, target: str, body: bytes) -> Tuple[int, Any]:
+        """Route an API request; returns (status code, JSON-serializable body or text)"""
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+
+        if parts == ["health"] and method == "GET":
+            return 200, {"status": "ok", "workers": self.worker_count,
+                         "running": sorted(self.running_jobs.values())}
+
+        if parts == ["jobs"]:
+            if method == "GET":
+                query = parse_qs(url.query)
+                try:
+                    status = JobStatus(query['status'][0]) if 'status' in query else None
+                    limit = int(query.get('limit', ['100'])[0])
+                except ValueError as e:
+                    return 400, {"error": str(e)}
+                jobs = await asyncio.to_thread(self.store.list_jobs, status, limit)
+                return 200, {"jobs": [job.to_dict() for job in jobs]}
+            if method == "POST":
+                try:
+                    job = await asyncio.to_thread(self._queue_job, json.loads(body or b"{}"))
+                except ValueError as e:
+                    return 400, {"error": str(e)}
+                self.notify()
+                return 201, job.to_dict()
+            return 405, {"error": "Method not allowed"}
+
+        if len(parts) >= 2 and parts[0] == "jobs":
+            job_id = parts[1]
+            if len(parts) == 2 and method == "GET":
+                job = await asyncio.to_thread(self.store.get, job_id)
+            elif (len(parts) == 3 and parts[2] == "cancel" and method == "POST") or \
+                    (len(parts) == 2 and method == "DELETE"):
+                job = await self.cancel_job(job_id)
+            elif len(parts) == 3 and parts[2] == "log" and method == "GET":
+                if not await asyncio.to_thread(self.store.get, job_id):
+                    return 404, {"error": f"Unknown job: {job_id}"}
+                return 200, await asyncio.to_thread(self._read_log, job_id)
+            else:
+                return 404, {"error": "Not found"}
+
+            if job is None:
+                return 404, {"error": f"Unknown job: {job_id}"}
+            return 200, job.to_dict()
+
+        return 404, {"error": "Not found"}
+
+    def _read_log(self, job_id: str) -> str:
+        try:
+            with open(self.log_path(job_id), 'r', encoding='utf-8', errors='replace') as f:
+                return f.read()
+        except OSError:
+            return ""
+
+    async def _respond(self, reader: asyncio.StreamReader) -> Tuple[int, Any]:
+        """Read one request and route it; returns (status code, body)"""
+        try:
+            request_line = await reader.readline()
+            method, target, _ = request_line.decode('latin-1').split(" ", 2)
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode('latin-1').partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            length = int(headers.get('content-length', 0))
+            body = await reader.readexactly(length) if length else b""
+        except (ValueError, asyncio.IncompleteReadError):
+            return 400, {"error": "Malformed request"}
+
+        try:
+            return await self.handle_request(method.upper(), target, body)
+        except Exception as e:
+            # e.g. a locked database; the client still gets an answer
+            print(f"Render job API request {method} {target} failed: {e}")
+            return 500, {"error": f"Internal error: {e}"}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Minimal HTTP/1.1 handling: one request per connection"""
+        try:
+            status, payload = await self._respond(reader)
+
+            if isinstance(payload, str):
+                content, content_type = payload.encode('utf-8'), "text/plain; charset=utf-8"
+            else:
+                content, content_type = json.dumps(payload).encode('utf-8'), "application/json"
+
+            reason = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+                      405: "Method Not Allowed", 500: "Internal Server Error"}.get(status, "OK")
+            writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+                         f"Content-Length: {len(content)}\r\nConnection: close\r\n\r\n".encode('latin-1'))
+            writer.write(content)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+def main(argv=None) -> int:
+    """Run the render job daemon until interrupted"""
+    parser = argparse.ArgumentParser(prog="karaoke-render-daemon",
+                                     description="Persistent render job queue with an HTTP API")
+    parser.add_argument("--db", default="render_jobs.sqlite3", help="SQLite job database")
+    parser.add_argument("--log-dir", help="Directory for per-job logs (default: next to the database)")
+    parser.add_argument("--workers", type=int, default=1, help="Concurrent render jobs")
+    parser.add_argument("--host", default="127.0.0.1", help="HTTP API address")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="HTTP API port")
+    args = parser.parse_args(argv)
+
+    daemon = RenderJobDaemon(args.db, args.log_dir, args.workers, args.host, args.port)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, daemon.request_stop)
+        await daemon.serve_forever()
+
+    asyncio.run(run())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+Render Timeline Tracing
+
+Stage histograms in the metrics registry say how long libass rasterization,
+effects, readback, conversion and pipe writes take on average, but not which
+of them held up the export at a given moment. The render tracer records
+individual spans (thread, stage, frame number, start, duration) from the
+render worker, the FFmpeg writer thread, the progress monitor and segment
+worker processes, and writes them as Chrome trace-event JSON that Perfetto
+(https://ui.perfetto.dev) and chrome://tracing open directly.
+
+Tracing is opt-in. While disabled, begin() returns 0 and end() returns at
+once, so instrumented code costs one attribute check per span. While
+enabled, a span is two clock reads and one tuple appended to the calling
+thread's own buffer: no locks, no dictionaries and no JSON until the trace
+is written.
+
+Timestamps come from time.perf_counter_ns(), which reads the system-wide
+monotonic clock, so spans recorded in worker processes on the same machine
+line up with the parent's when their events are merged with add_events().
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Dict, List, Any, Iterable
+
+_now = time.perf_counter_ns
+
+
+class _ThreadBuffer:
+    """Spans recorded by one thread"""
+
+    __slots__ = ("tid", "name", "spans")
+
+    def __init__(self, tid: int, name: str):
+        self.tid = tid
+        self.name = name
+        self.spans: List[tuple] = []
+
+
+class _Span:
+    """Context manager recording one span into a thread buffer"""
+
+    __slots__ = ("_spans", "_stage", "_frame", "_start")
+
+    def __init__(self, spans: List[tuple], stage: str, frame: int):
+        self._spans = spans
+        self._stage = stage
+        self._frame = frame
+
+    def __enter__(self):
+        self._start = _now()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._spans.append((self._stage, self._frame, self._start, _now()))
+        return False
+
+
+class _NullSpan:
+    """Span used while tracing is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class RenderTracer:
+    """
+    Per-thread span buffers exported as Chrome trace events.
+
+    Hot paths use begin()/end() (under a microsecond per span while
+    enabled), which also allows the frame number to be supplied once it is
+    known, e.g. after waiting for the next frame; the span() context manager
+    costs about twice as much and is meant for coarser blocks. Counter samples, such as
+    FFmpeg's reported fps and speed, appear as counter tracks.
+    """
+
+    def __init__(self, process_name: str = "render"):
+        self.enabled = False
+        # begin() returns a span's start time, or 0 while disabled; it is rebound
+        # to the clock itself while enabled, saving a call per span
+        self.begin = self._disabled_begin
+        self.process_name = process_name
+        self._local = threading.local()
+        self._buffers: List[_ThreadBuffer] = []
+        self._counters: List[tuple] = []
+        self._foreign_events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+        self.begin = _now
+
+    def disable(self):
+        self.enabled = False
+        self.begin = self._disabled_begin
+
+    def clear(self):
+        """Drop everything recorded so far, keeping each thread's buffer"""
+        with self._lock:
+            for buffer in self._buffers:
+                buffer.spans.clear()
+            self._counters.clear()
+            self._foreign_events.clear()
+
+    def _thread_spans(self) -> List[tuple]:
+        """The calling thread's span list, created on first use"""
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            thread = threading.current_thread()
+            buffer = _ThreadBuffer(threading.get_native_id(), thread.name)
+            self._local.buffer = buffer
+            self._local.spans = buffer.spans
+            with self._lock:
+                self._buffers.append(buffer)
+        return buffer.spans
+
+    @staticmethod
+    def _disabled_begin() -> int:
+        return 0
+
+    def end(self, stage: str, start: int, frame: int = -1):
+        """Record a span started with begin() (no-op when begin() returned 0)"""
+        if start:
+            try:
+                self._local.spans.append((stage, frame, start, _now()))
+            except AttributeError:
+                self._thread_spans().append((stage, frame, start, _now()))
+
+    def span(self, stage: str, frame: int = -1):
+        """Context manager recording the enclosed block as a span"""
+        if not self.enabled:
+            return _NULL_SPAN
+        try:
+            spans = self._local.spans
+        except AttributeError:
+            spans = self._thread_spans()
+        return _Span(spans, stage, frame)
+
+    def counter(self, name: str, values: Dict[str, float]):
+        """Record a sample of one or more counter series (not for per-frame use)"""
+        if self.enabled:
+            with self._lock:
+                self._counters.append((name, _now(), dict(values)))
+
+    def add_events(self, events: Iterable[Dict[str, Any]]):
+        """Merge events exported by another process (see export_events())"""
+        with self._lock:
+            self._foreign_events.extend(events)
+
+    @property
+    def span_count(self) -> int:
+        with self._lock:
+            return sum(len(buffer.spans) for buffer in self._buffers)
+
+    def stage_totals(self) -> Dict[str, Dict[str, float]]:
+        """Span count and total seconds per stage recorded in this process"""
+        with self._lock:
+            spans = [span for buffer in self._buffers for span in buffer.spans]
+        totals: Dict[str, Dict[str, float]] = {}
+        for stage, _, start, end in spans:
+            total = totals.setdefault(stage, {"count": 0, "seconds": 0.0})
+            total["count"] += 1
+            total["seconds"] += (end - start) / 1e9
+        return totals
+
+    def export_events(self) -> List[Dict[str, Any]]:
+        """
+        This process's spans and counters as Chrome trace events.
+
+        Timestamps are absolute microseconds of the monotonic clock, so the
+        events can be pickled to another process and merged there.
+        """
+        pid = os.getpid()
+        events: List[Dict[str, Any]] = [
+            {"name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+             "args": {"name": self.process_name}}
+        ]
+
+        with self._lock:
+            buffers = [(buffer.tid, buffer.name, list(buffer.spans)) for buffer in self._buffers]
+            counters = list(self._counters)
+
+        for tid, thread_name, spans in buffers:
+            if not spans:
+                continue
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                           "args": {"name": thread_name}})
+            for stage, frame, start, end in spans:
+                event = {"name": stage, "cat": "render", "ph": "X", "pid": pid, "tid": tid,
+                         "ts": start / 1000.0, "dur": (end - start) / 1000.0}
+                if frame >= 0:
+                    event["args"] = {"frame": frame}
+                events.append(event)
+
+        for name, timestamp, values in counters:
+            events.append({"name": name, "cat": "render", "ph": "C", "pid": pid, "tid": 0,
+                           "ts": timestamp / 1000.0, "args": values})
+        return events
+
+    def events(self) -> List[Dict[str, Any]]:
+        """All events, including merged ones, with timestamps starting at zero"""
+        with self._lock:
+            foreign = list(self._foreign_events)
+        events = self.export_events() + foreign
+
+        timed = [event["ts"] for event in events if "ts" in event]
+        origin = min(timed) if timed else 0.0
+        for event in events:
+            if "ts" in event:
+                event["ts"] = event["ts"] - origin
+        return events
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"traceEvents": self.events(), "displayTimeUnit": "ms"}
+
+    def write(self, path: str) -> int:
+        """Write the trace as Chrome trace-event JSON; returns the number of events"""
+        trace = self.to_dict()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f, separators=(',', ':'))
+        return len(trace["traceEvents"])
+
+
+_default_tracer = RenderTracer()
+
+
+def get_render_tracer() -> RenderTracer:
+    """Get the shared render tracer"""
+    return _default_tracer
@@ -0,0 +1,471 @@
+"""
+Export Resource Sampler and Leak Detector
+
+Long batch renders show resident memory creeping up, but RSS alone does not
+say whether a cache, a queue or a genuine leak is responsible. The resource
+sampler records, at a fixed interval during an export:
+
+- process RSS and CPU, CPU per thread and the RSS of child processes (FFmpeg)
+- throughput of byte counters such as the FFmpeg pipe
+- depths of the frame queues between threads
+- bytes held by each cache
+- optionally, tracemalloc snapshot diffs naming the source lines whose
+  allocations grew
+
+Rendering components register their sources with register_resources(sampler).
+stop() returns a ResourceReport that is attached to the export result. In
+soak-test mode the report flags every series that kept growing: per
+checkpoint (e.g. after each repeated render) when at least four were taken,
+otherwise per window of the sample timeline. The first checkpoint or window
+is a warm-up while caches fill and is not compared.
+"""
+
+import time
+import json
+import logging
+import threading
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Any, Callable
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 1.0
+
+# Growth below these is treated as noise when looking for leaks
+MIN_BYTES_GROWTH = 1024 * 1024
+MIN_QUEUE_GROWTH = 1
+
+
+@dataclass
+class ResourceSample:
+    """Resource usage at one moment of an export"""
+    elapsed: float  # Seconds since the sampler started
+    rss_bytes: int = 0
+    cpu_percent: float = 0.0  # 100% is one fully used core
+    child_rss_bytes: int = 0
+    thread_cpu_percent: Dict[str, float] = field(default_factory=dict)
+    throughput: Dict[str, float] = field(default_factory=dict)  # Bytes per second
+    queue_depths: Dict[str, int] = field(default_factory=dict)
+    cache_bytes: Dict[str, int] = field(default_factory=dict)
+    traced_bytes: Optional[int] = None  # Python allocations seen by tracemalloc
+    label: Optional[str] = None  # Set on checkpoint samples
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'elapsed': self.elapsed,
+            'rss_bytes': self.rss_bytes,
+            'cpu_percent': self.cpu_percent,
+            'child_rss_bytes': self.child_rss_bytes,
+            'thread_cpu_percent': dict(self.thread_cpu_percent),
+            'throughput': dict(self.throughput),
+            'queue_depths': dict(self.queue_depths),
+            'cache_bytes': dict(self.cache_bytes),
+            'traced_bytes': self.traced_bytes,
+            'label': self.label
+        }
+
+
+@dataclass
+class GrowthFinding:
+    """A series that grew at every point compared"""
+    series: str
+    start_value: float
+    end_value: float
+    points: int
+    growth_per_hour: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'series': self.series,
+            'start_value': self.start_value,
+            'end_value': self.end_value,
+            'points': self.points,
+            'growth_per_hour': self.growth_per_hour
+        }
+
+
+def find_monotonic_growth(values: List[float], min_growth: float) -> bool:
+    """
+    Whether values rose at every step by min_growth or more in total.
+
+    A cache filling up to its budget and then levelling off is not growth;
+    a leak rises at every point compared.
+    """
+    if len(values) < 3:
+        return False
+    rising = all(later > earlier for earlier, later in zip(values, values[1:]))
+    return rising and values[-1] - values[0] >= min_growth
+
+
+@dataclass
+class ResourceReport:
+    """Resource samples of one export, with soak-test findings"""
+    interval: float
+    samples: List[ResourceSample] = field(default_factory=list)
+    allocation_diffs: List[Dict[str, Any]] = field(default_factory=list)
+    soak: bool = False
+    findings: List[GrowthFinding] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return self.samples[-1].elapsed if self.samples else 0.0
+
+    @property
+    def peak_rss_bytes(self) -> int:
+        return max((sample.rss_bytes for sample in self.samples), default=0)
+
+    @property
+    def checkpoints(self) -> List[ResourceSample]:
+        return [sample for sample in self.samples if sample.label is not None]
+
+    def series(self) -> Dict[str, List[Optional[float]]]:
+        """Memory and queue series by name, one value per sample"""
+        names = ["rss_bytes", "child_rss_bytes"]
+        if any(sample.traced_bytes is not None for sample in self.samples):
+            names.append("traced_bytes")
+        for sample in self.samples:
+            for name in sample.cache_bytes:
+                if f"cache:{name}" not in names:
+                    names.append(f"cache:{name}")
+            for name in sample.queue_depths:
+                if f"queue:{name}" not in names:
+                    names.append(f"queue:{name}")
+
+        return {name: [self._value(sample, name) for sample in self.samples] for name in names}
+
+    def detect_growth(self, windows: int = 5) -> List[GrowthFinding]:
+        """
+        Series that grew monotonically over the export.
+
+        Compares the values at checkpoints when there are at least four,
+        otherwise the minimum of each of ``windows`` equal windows of samples
+        (minima ignore short-lived peaks). The first point is a warm-up.
+        """
+        checkpoints = self.checkpoints
+        if len(checkpoints) >= 4:
+            groups = [[sample] for sample in checkpoints[1:]]
+        else:
+            size = len(self.samples) // windows
+            if size < 2:
+                return []
+            groups = [self.samples[index * size:(index + 1) * size] for index in range(1, windows)]
+
+        findings = []
+        for name in self.series():
+            points = []
+            for group in groups:
+                values = [v for v in (self._value(sample, name) for sample in group) if v is not None]
+                if not values:
+                    break
+                points.append(min(values))
+            if len(points) < len(groups):
+                continue
+
+            min_growth = MIN_QUEUE_GROWTH if name.startswith("queue:") else MIN_BYTES_GROWTH
+            if find_monotonic_growth(points, min_growth):
+                hours = (groups[-1][-1].elapsed - groups[0][0].elapsed) / 3600.0
+                findings.append(GrowthFinding(name, points[0], points[-1], len(points),
+                                              (points[-1] - points[0]) / hours if hours > 0 else 0.0))
+        return findings
+
+    @staticmethod
+    def _value(sample: ResourceSample, name: str) -> Optional[float]:
+        if name.startswith("cache:"):
+            return sample.cache_bytes.get(name[6:])
+        if name.startswith("queue:"):
+            return sample.queue_depths.get(name[6:])
+        return getattr(sample, name)
+
+    def summary(self) -> Dict[str, Any]:
+        """Compact report for attaching to an export result"""
+        last = self.samples[-1] if self.samples else ResourceSample(0.0)
+        throughput: Dict[str, float] = {}
+        for name in {name for sample in self.samples for name in sample.throughput}:
+            rates = [sample.throughput[name] for sample in self.samples if name in sample.throughput]
+            throughput[name] = sum(rates) / len(rates)
+        return {
+            'duration': self.duration,
+            'samples': len(self.samples),
+            'peak_rss_bytes': self.peak_rss_bytes,
+            'final_rss_bytes': last.rss_bytes,
+            'final_cache_bytes': dict(last.cache_bytes),
+            'peak_queue_depths': {name: max(sample.queue_depths.get(name, 0) for sample in self.samples)
+                                  for name in last.queue_depths},
+            'mean_throughput': throughput,
+            'soak': self.soak,
+            'growth': [finding.to_dict() for finding in self.findings]
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'interval': self.interval,
+            'summary': self.summary(),
+            'samples': [sample.to_dict() for sample in self.samples],
+            'allocation_diffs': list(self.allocation_diffs)
+        }
+
+    def write(self, path: str):
+        """Write the full report as JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def format(self) -> str:
+        """Human-readable summary"""
+        lines = [f"{len(self.samples)} samples over {self.duration:.1f}s, "
+                 f"peak RSS {self.peak_rss_bytes / 1048576:.1f} MB"]
+        last = self.samples[-1] if self.samples else None
+        if last:
+            for name, size in sorted(last.cache_bytes.items()):
+                lines.append(f"  cache {name}: {size / 1048576:.1f} MB")
+        if self.soak:
+            if not self.findings:
+                lines.append("No monotonic growth found")
+            for finding in self.findings:
+                lines.append(f"  GROWTH {finding.series}: {finding.start_value:.0f} -> "
+                             f"{finding.end_value:.0f} over {finding.points} points "
+                             f"({finding.growth_per_hour:.0f}/h)")
+        return "\n".join(lines)
+
+
+class ResourceSampler:
+    """
+    Samples process resources and registered sources on a background thread.
+
+    Sources are callables registered by name: cache sizes in bytes, queue
+    depths in items and cumulative byte counters whose rate is reported as
+    throughput. Registering a name again replaces the previous source, so a
+    component can re-register for each export. A failing source is skipped
+    for that sample.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, tracemalloc_interval: float = 0.0,
+                 tracemalloc_top: int = 10, soak: bool = False):
+        self.interval = max(0.01, interval)
+        self.tracemalloc_interval = tracemalloc_interval
+        self.tracemalloc_top = tracemalloc_top
+        self.soak = soak
+
+        self.report = ResourceReport(self.interval, soak=soak)
+        self._caches: Dict[str, Callable[[], int]] = {}
+        self._queues: Dict[str, Callable[[], int]] = {}
+        self._counters: Dict[str, Callable[[], int]] = {}
+        self._lock = threading.Lock()
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._start_time = 0.0
+        self._last_time = 0.0
+        self._last_counters: Dict[str, int] = {}
+        self._last_cpu = 0.0
+        self._last_thread_cpu: Dict[int, float] = {}
+        self._process = psutil.Process() if PSUTIL_AVAILABLE else None
+
+        self._started_tracemalloc = False
+        self._last_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._next_snapshot = 0.0
+
+    def add_cache(self, name: str, size_bytes: Callable[[], int]):
+        with self._lock:
+            self._caches[name] = size_bytes
+
+    def add_queue(self, name: str, depth: Callable[[], int]):
+        with self._lock:
+            self._queues[name] = depth
+
+    def add_throughput(self, name: str, total_bytes: Callable[[], int]):
+        """Register a cumulative byte counter; samples report its rate"""
+        with self._lock:
+            self._counters[name] = total_bytes
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> "ResourceSampler":
+        """Take a first sample and keep sampling every interval until stop()"""
+        if self._thread:
+            return self
+        if not PSUTIL_AVAILABLE:
+            logger.warning("psutil is not installed; RSS and CPU will not be sampled")
+
+        self._start_time = self._last_time = time.monotonic()
+        try:
+            self._last_cpu = self._process_cpu_seconds()
+            self._last_thread_cpu = self._thread_cpu_seconds()
+        except (psutil.Error, OSError) as e:
+            logger.warning(f"Could not sample process resources: {e}")
+        if self.tracemalloc_interval > 0:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            self._last_snapshot = self._take_snapshot()
+            self._next_snapshot = self._start_time + self.tracemalloc_interval
+
+        self.sample()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._sample_worker, name="resource-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> ResourceReport:
+        """Stop sampling and return the report (with findings in soak mode)"""
+        if self._thread:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+            self.sample()
+
+        if self._last_snapshot is not None:
+            self._record_allocation_diff(time.monotonic() - self._start_time)
+            self._last_snapshot = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+        if self.soak:
+            self.report.findings = self.report.detect_growth()
+            for finding in self.report.findings:
+                logger.warning(f"Soak test: {finding.series} grew from {finding.start_value:.0f} "
+                               f"to {finding.end_value:.0f} over {finding.points} points")
+        return self.report
+
+    def __enter__(self) -> "ResourceSampler":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def checkpoint(self, label: str) -> ResourceSample:
+        """Take a labelled sample now, e.g. after each render of a soak test"""
+        return self.sample(label)
+
+    def _sample_worker(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"Resource sampling failed: {e}")
+
+    def _process_cpu_seconds(self) -> float:
+        if not self._process:
+            return 0.0
+        times = self._process.cpu_times()
+        return times.user + times.system
+
+    def _thread_cpu_seconds(self) -> Dict[int, float]:
+        if not self._process:
+            return {}
+        try:
+            return {thread.id: thread.user_time + thread.system_time for thread in self._process.threads()}
+        except (psutil.Error, OSError):
+            return {}
+
+    def _child_rss_bytes(self) -> int:
+        total = 0
+        try:
+            for child in self._process.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    pass
+        except psutil.Error:
+            pass
+        return total
+
+    @staticmethod
+    def _read_sources(sources: Dict[str, Callable[[], int]]) -> Dict[str, int]:
+        values = {}
+        for name, source in sources.items():
+            try:
+                values[name] = int(source())
+            except Exception:
+                continue
+        return values
+
+    def sample(self, label: Optional[str] = None) -> ResourceSample:
+        """Take one sample and add it to the report
+
+        Called from the sampling thread and, through checkpoint() and stop(),
+        from the caller's; the deltas since the previous sample are computed
+        under the lock so each interval is counted once. psutil errors (e.g.
+        a process that exited while being inspected) leave the process
+        fields of the sample empty instead of failing the render.
+        """
+        with self._lock:
+            caches = dict(self._caches)
+            queues = dict(self._queues)
+            counters = dict(self._counters)
+        cache_bytes = self._read_sources(caches)
+        queue_depths = self._read_sources(queues)
+        totals = self._read_sources(counters)
+
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._last_time
+            sample = ResourceSample(elapsed=now - self._start_time, label=label)
+            sample.cache_bytes = cache_bytes
+            sample.queue_depths = queue_depths
+
+            if self._process:
+                try:
+                    sample.rss_bytes = self._process.memory_info().rss
+                    sample.child_rss_bytes = self._child_rss_bytes()
+
+                    cpu = self._process_cpu_seconds()
+                    thread_cpu = self._thread_cpu_seconds()
+                    if elapsed > 0:
+                        sample.cpu_percent = 100.0 * (cpu - self._last_cpu) / elapsed
+                        names = {thread.native_id: thread.name for thread in threading.enumerate()}
+                        for tid, seconds in thread_cpu.items():
+                            used = seconds - self._last_thread_cpu.get(tid, 0.0)
+                            if used > 0:
+                                sample.thread_cpu_percent[names.get(tid, f"tid {tid}")] = 100.0 * used / elapsed
+                    self._last_cpu = cpu
+                    self._last_thread_cpu = thread_cpu
+                except (psutil.Error, OSError) as e:
+                    logger.warning(f"Could not sample process resources: {e}")
+
+            if elapsed > 0:
+                sample.throughput = {name: max(0, total - self._last_counters.get(name, 0)) / elapsed
+                                     for name, total in totals.items()}
+            self._last_counters = totals
+            self._last_time = now
+
+            if tracemalloc.is_tracing():
+                sample.traced_bytes = tracemalloc.get_traced_memory()[0]
+                if self._last_snapshot is not None and now >= self._next_snapshot:
+                    self._record_allocation_diff(sample.elapsed)
+                    self._next_snapshot = now + self.tracemalloc_interval
+
+            self.report.samples.append(sample)
+        return sample
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ])
+
+    def _record_allocation_diff(self, elapsed: float):
+        """Record the source lines whose allocations changed most since the last snapshot"""
+        snapshot = self._take_snapshot()
+        differences = snapshot.compare_to(self._last_snapshot, 'lineno')
+        self._last_snapshot = snapshot
+        self.report.allocation_diffs.append({
+            'elapsed': elapsed,
+            'top': [{'location': str(difference.traceback),
+                     'size_diff': difference.size_diff,
+                     'count_diff': difference.count_diff,
+                     'size': difference.size}
+                    for difference in differences[:self.tracemalloc_top] if difference.size_diff]
+        })
@@ -15,6 +15,11 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 import logging
 
+try:
+    from .cache_registry import get_cache_registry, CACHE_PRIORITY_HIGH
+except ImportError:
+    from cache_registry import get_cache_registry, CACHE_PRIORITY_HIGH
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -388,6 +393,21 @@ class ShaderCache:
         
         # Load cache index
         self._load_cache_index()
+        
+        get_cache_registry().register(self, "shader_index", CACHE_PRIORITY_HIGH)
+    
+    @property
+    def total_bytes(self) -> int:
+        """Approximate bytes of the in-memory index (compiled programs live on the GPU)"""
+        return sum(len(name) + len(str(entry)) for name, entry in list(self.cache_index.items()))
+    
+    @property
+    def entry_count(self) -> int:
+        return len(self.cache_index)
+    
+    def evict_bytes(self, nbytes: int) -> int:
+        """The index is small and mirrors the file on disk, so it is only accounted"""
+        return 0
     
     def _load_cache_index(self):
         """Load cache index from disk"""
@@ -0,0 +1,336 @@
+"""
+Shared-Memory Frame Ring
+
+This module moves rendered frames from the render process to a separate
+encoder-writer process through a ring of fixed-size slots in
+``multiprocessing.shared_memory``. Pixel data is copied once into a slot and
+never pickled; the processes only exchange slot ownership through two
+semaphores. The writer process owns the FFmpeg subprocess, so frame
+conversion and pipe writes no longer compete with rendering for the GIL.
+"""
+
+import os
+import queue
+import signal
+import subprocess
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Optional, List, Dict, Any, Iterator, Tuple
+
+import numpy as np
+
+try:
+    from .pixel_conversion import StripeConversionExecutor
+    from .timestamped_frames import TimestampedFrameStream
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from pixel_conversion import StripeConversionExecutor
+    from timestamped_frames import TimestampedFrameStream
+
+
+# Slot layouts recorded in slot metadata
+LAYOUT_RGBA = 0
+LAYOUT_BGRA = 1
+
+# Frame number marking the end of the stream
+END_OF_STREAM = -1
+
+# Per-slot metadata: frame number, timestamp, layout
+_META_FIELDS = 3
+
+
+class SharedFrameRing:
+    """
+    Single-producer, single-consumer ring of frame slots in shared memory.
+
+    The producer waits on ``free_slots`` and the consumer on ``filled_slots``;
+    both walk the slots in the same order, so each side only tracks its own
+    index.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, slots: int, frame_shape: Tuple[int, ...],
+                 free_slots, filled_slots, owner: bool):
+        self.shm = shm
+        self.slots = slots
+        self.frame_shape = tuple(frame_shape)
+        self.frame_bytes = int(np.prod(self.frame_shape))
+        self.free_slots = free_slots
+        self.filled_slots = filled_slots
+        self.owner = owner
+
+        meta_bytes = slots * _META_FIELDS * 8
+        self.meta = np.ndarray((slots, _META_FIELDS), dtype=np.float64, buffer=shm.buf[:meta_bytes])
+        self.frames = np.ndarray((slots,) + self.frame_shape, dtype=np.uint8, buffer=shm.buf[meta_bytes:])
+
+        self._write_index = 0
+        self._read_index = 0
+
+    @classmethod
+    def create(cls, slots: int, frame_shape: Tuple[int, ...], context=None) -> "SharedFrameRing":
+        """Allocate a new ring (called in the render process)"""
+        context = context or multiprocessing.get_context("spawn")
+        slots = max(2, slots)
+        size = slots * _META_FIELDS * 8 + slots * int(np.prod(frame_shape))
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        return cls(shm, slots, frame_shape, context.Semaphore(slots), context.Semaphore(0), owner=True)
+
+    @classmethod
+    def attach(cls, spec: Dict[str, Any]) -> "SharedFrameRing":
+        """Attach to an existing ring from its spec (called in the writer process)"""
+        shm = shared_memory.SharedMemory(name=spec['name'])
+        return cls(shm, spec['slots'], spec['frame_shape'], spec['free_slots'], spec['filled_slots'], owner=False)
+
+    def spec(self) -> Dict[str, Any]:
+        """Description passed to the writer process when it is started"""
+        return {
+            'name': self.shm.name,
+            'slots': self.slots,
+            'frame_shape': self.frame_shape,
+            'free_slots': self.free_slots,
+            'filled_slots': self.filled_slots
+        }
+
+    def acquire_write(self, timeout: Optional[float] = None) -> Optional[int]:
+        """Wait for a free slot; None on timeout"""
+        if not self.free_slots.acquire(timeout=timeout):
+            return None
+        index = self._write_index
+        self._write_index = (index + 1) % self.slots
+        return index
+
+    def commit(self, index: int, frame_number: int, timestamp: float, layout: int = LAYOUT_RGBA):
+        """Hand a written slot to the consumer"""
+        self.meta[index] = (frame_number, timestamp, layout)
+        self.filled_slots.release()
+
+    def acquire_read(self, timeout: Optional[float] = None) -> Optional[int]:
+        """Wait for a filled slot; None on timeout"""
+        if not self.filled_slots.acquire(timeout=timeout):
+            return None
+        index = self._read_index
+        self._read_index = (index + 1) % self.slots
+        return index
+
+    def release(self, index: int):
+        """Return a consumed slot to the producer"""
+        self.free_slots.release()
+
+    def close(self):
+        """Detach from shared memory, unlinking it if this side created it"""
+        # Views must be dropped before the mapping can be closed
+        self.meta = None
+        self.frames = None
+        try:
+            self.shm.close()
+            if self.owner:
+                self.shm.unlink()
+        except (OSError, BufferError) as e:
+            print(f"Error releasing shared frame ring: {e}")
+
+
+def _writer_process_main(ring_spec: Dict[str, Any], command: List[str], status_queue,
+                         stream_spec: Optional[Dict[str, Any]] = None):
+    """
+    Encoder-writer process: convert ring slots and stream them to the encoder's stdin.
+
+    With a stream_spec, frames are framed as a TimestampedFrameStream and each
+    slot's frame number is the output frame index the frame is shown from.
+    """
+    ring = SharedFrameRing.attach(ring_spec)
+    converter = StripeConversionExecutor()
+    stream = TimestampedFrameStream.from_spec(stream_spec) if stream_spec else None
+    frames_written = 0
+
+    try:
+        # Buffered stdin so large frame writes are never left partial
+        encoder = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.PIPE)
+    except OSError as e:
+        status_queue.put(("error", f"Failed to start encoder: {e}"))
+        status_queue.put(("exit", -1, 0))
+        ring.close()
+        return
+
+    def terminate_encoder(signum, frame):
+        # Cancelling the writer must not leave an orphaned encoder behind
+        encoder.terminate()
+
+    signal.signal(signal.SIGTERM, terminate_encoder)
+
+    def forward_stderr():
+        for line in iter(encoder.stderr.readline, b''):
+            status_queue.put(("line", line.decode('utf-8', errors='replace')))
+
+    stderr_thread = threading.Thread(target=forward_stderr, daemon=True)
+    stderr_thread.start()
+
+    try:
+        while True:
+            index = ring.acquire_read(timeout=0.5)
+            if index is None:
+                if encoder.poll() is not None:
+                    break
+                continue
+
+            frame_number, _, layout = ring.meta[index]
+            if frame_number == END_OF_STREAM:
+                ring.release(index)
+                break
+
+            frame = ring.frames[index]
+            if layout == LAYOUT_BGRA:
+                frame = converter.rgba_to_bgra(frame)  # Same swap in both directions
+
+            try:
+                if stream is not None:
+                    if frames_written == 0:
+                        encoder.stdin.write(stream.header())
+                    encoder.stdin.write(stream.block_header(int(frame_number)))
+                encoder.stdin.write(memoryview(frame).cast('B'))
+            except (BrokenPipeError, OSError):
+                status_queue.put(("error", "Encoder closed its input pipe"))
+                ring.release(index)
+                break
+            finally:
+                frame = None  # Drop the slot view so the mapping can be closed
+
+            ring.release(index)
+            frames_written += 1
+            status_queue.put(("frame", frames_written))
+    finally:
+        try:
+            encoder.stdin.close()
+        except OSError:
+            pass
+
+        return_code = encoder.wait()
+        stderr_thread.join(timeout=5.0)
+        converter.shutdown()
+        ring.close()
+        status_queue.put(("exit", return_code, frames_written))
+
+
+class SharedMemoryFrameWriter:
+    """
+    Render-process side of the shared-memory topology.
+
+    Starts the encoder-writer process, copies frames into free ring slots and
+    relays the encoder's stderr and exit status back to the caller.
+    """
+
+    def __init__(self, command: List[str], width: int, height: int, slots: int = 4,
+                 stream_spec: Optional[Dict[str, Any]] = None):
+        self.command = command
+        self.frame_shape = (height, width, 4)
+        self.slots = slots
+        self.stream_spec = stream_spec  # TimestampedFrameStream.spec() when frames carry timestamps
+
+        self.context = multiprocessing.get_context("spawn")
+        self.ring: Optional[SharedFrameRing] = None
+        self.process = None
+        self.status_queue = None
+
+        self.frames_submitted = 0
+        self.frames_written = 0
+        self.return_code: Optional[int] = None
+        self.error: Optional[str] = None
+        self.input_finished = False
+
+    def start(self) -> bool:
+        """Allocate the ring and start the writer process"""
+        try:
+            self.ring = SharedFrameRing.create(self.slots, self.frame_shape, self.context)
+            self.status_queue = self.context.Queue()
+            self.process = self.context.Process(
+                target=_writer_process_main,
+                args=(self.ring.spec(), self.command, self.status_queue, self.stream_spec),
+                daemon=True
+            )
+            self.process.start()
+            return True
+        except Exception as e:
+            self.error = f"Failed to start writer process: {e}"
+            print(self.error)
+            self.close()
+            return False
+
+    def write_frame(self, data: np.ndarray, frame_number: int, timestamp: float,
+                    layout: int = LAYOUT_RGBA) -> bool:
+        """Copy a frame into the next free slot, blocking while the writer lags"""
+        if data.size != self.ring.frame_bytes:
+            self.error = f"Frame size {data.shape} does not match ring slot {self.frame_shape}"
+            return False
+
+        while True:
+            index = self.ring.acquire_write(timeout=0.1)
+            if index is not None:
+                break
+            if not self.process.is_alive():
+                self.error = self.error or "Writer process exited"
+                return False
+
+        np.copyto(self.ring.frames[index], data.reshape(self.frame_shape), casting='unsafe')
+        self.ring.commit(index, frame_number, timestamp, layout)
+        self.frames_submitted += 1
+        return True
+
+    def finish_input(self):
+        """Signal that no more frames will be written"""
+        if self.input_finished or not self.ring:
+            return
+        self.input_finished = True
+
+        while self.process.is_alive():
+            index = self.ring.acquire_write(timeout=0.1)
+            if index is not None:
+                self.ring.commit(index, END_OF_STREAM, 0.0)
+                return
+
+    def iter_output_lines(self) -> Iterator[str]:
+        """Yield encoder stderr lines until the writer process reports its exit"""
+        while self.return_code is None:
+            try:
+                message = self.status_queue.get(timeout=0.5)
+            except queue.Empty:
+                if not self.process.is_alive():
+                    self.return_code = self.process.exitcode if self.process.exitcode else -1
+                continue
+
+            kind = message[0]
+            if kind == "line":
+                yield message[1]
+            elif kind == "frame":
+                self.frames_written = message[1]
+            elif kind == "error":
+                self.error = message[1]
+            elif kind == "exit":
+                self.return_code, self.frames_written = message[1], message[2]
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        """Wait for the writer process and return the encoder exit code"""
+        for _ in self.iter_output_lines():
+            pass
+        if self.process:
+            self.process.join(timeout=timeout)
+        return self.return_code
+
+    def cancel(self):
+        """Stop the writer process and its encoder"""
+        if self.process and self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=5.0)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join(timeout=2.0)
+        if self.return_code is None:
+            self.return_code = -1
+
+    def close(self):
+        """Release the shared ring"""
+        if self.process and self.process.is_alive():
+            self.cancel()
+        if self.ring:
+            self.ring.close()
+            self.ring = None
@@ -0,0 +1,288 @@
+"""
+Staged Frame Pipeline
+
+This module runs frame production as an explicit graph of stages connected by
+bounded queues (e.g. raster -> composite -> convert), each stage served by its
+own worker threads. Frames may finish out of order when a stage has several
+workers, so they are reassembled by sequence number before being handed to
+the consumer, typically the encoder's writer thread. While the writer is
+blocked on the FFmpeg pipe, the stages keep producing the next frames.
+"""
+
+import time
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Optional, Callable, Iterable, Iterator, List, Dict, Any, Tuple
+
+
+@dataclass
+class FrameStageDefinition:
+    """
+    One stage of the frame pipeline.
+
+    ``func(frame_index, item)`` returns the item passed to the next stage, or
+    None to drop the frame. Stages that touch the OpenGL context must use a
+    single worker.
+    """
+    name: str
+    func: Callable[[int, Any], Any]
+    workers: int = 1
+
+
+@dataclass
+class FrameStageStats:
+    """Counters for a single stage"""
+    name: str
+    workers: int
+    frames_processed: int = 0
+    frames_dropped: int = 0
+    busy_time: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Statistics as a dictionary"""
+        return {
+            'workers': self.workers,
+            'frames_processed': self.frames_processed,
+            'frames_dropped': self.frames_dropped,
+            'busy_time': self.busy_time,
+            'average_time': self.busy_time / self.frames_processed if self.frames_processed else 0.0
+        }
+
+
+class StagedFramePipeline:
+    """
+    Bounded multi-stage frame pipeline with in-order delivery.
+
+    ``source`` yields ``(frame_index, item)`` pairs. At most ``max_in_flight``
+    frames are between the source and the consumer at any time, which bounds
+    both the inter-stage queues and the reorder buffer.
+    """
+
+    _END = object()
+
+    def __init__(self, stages: List[FrameStageDefinition], queue_size: int = 4,
+                 max_in_flight: int = 0):
+        if not stages:
+            raise ValueError("A staged pipeline needs at least one stage")
+
+        self.stages = [FrameStageDefinition(s.name, s.func, max(1, s.workers)) for s in stages]
+        self.queue_size = max(1, queue_size)
+        self.max_in_flight = max_in_flight if max_in_flight > 0 else \
+            self.queue_size * (len(self.stages) + 1) + sum(s.workers for s in self.stages)
+
+        # queues[i] feeds stage i; queues[-1] feeds the reorder buffer
+        self.queues: List[queue.Queue] = [queue.Queue(maxsize=self.queue_size)
+                                          for _ in range(len(self.stages) + 1)]
+        self.in_flight = threading.Semaphore(self.max_in_flight)
+        self.cancelled = threading.Event()
+
+        self.stage_stats = [FrameStageStats(s.name, s.workers) for s in self.stages]
+        self._stats_lock = threading.Lock()
+        self._workers_remaining = [s.workers for s in self.stages]
+
+        self.threads: List[threading.Thread] = []
+        self.error: Optional[str] = None
+        self.finished = False
+        self.frames_delivered = 0
+        self.frames_dropped = 0
+
+        self._pending: Dict[int, Tuple[int, Any]] = {}
+        self._next_sequence = 0
+        self._source_count: Optional[int] = None
+
+    def start(self, source: Iterable[Tuple[int, Any]]):
+        """Start the source thread and all stage workers"""
+        self.threads.append(threading.Thread(target=self._source_worker, args=(source,),
+                                             name="frame-stage-source", daemon=True))
+
+        for stage_index, stage in enumerate(self.stages):
+            for worker_index in range(stage.workers):
+                self.threads.append(threading.Thread(
+                    target=self._stage_worker, args=(stage_index,),
+                    name=f"frame-stage-{stage.name}-{worker_index}", daemon=True
+                ))
+
+        for thread in self.threads:
+            thread.start()
+
+    def _put(self, target: queue.Queue, item: Any) -> bool:
+        """Put into a bounded queue, giving up once cancelled"""
+        while not self.cancelled.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue) -> Any:
+        """Get from a queue; None once cancelled"""
+        while not self.cancelled.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def _fail(self, message: str):
+        """Record the first error and stop every stage"""
+        if self.error is None:
+            self.error = message
+        self.cancelled.set()
+
+    def _source_worker(self, source: Iterable[Tuple[int, Any]]):
+        """Feed frames into the first stage, never exceeding the in-flight window"""
+        sequence = 0
+        try:
+            for frame_index, item in source:
+                while not self.in_flight.acquire(timeout=0.1):
+                    if self.cancelled.is_set():
+                        return
+                if not self._put(self.queues[0], (sequence, frame_index, item)):
+                    return
+                sequence += 1
+        except Exception as e:
+            self._fail(f"Frame source failed: {e}")
+            return
+
+        self._source_count = sequence
+        for _ in range(self.stages[0].workers):
+            if not self._put(self.queues[0], self._END):
+                return
+
+    def _stage_worker(self, stage_index: int):
+        """Process items of one stage and pass them downstream"""
+        stage = self.stages[stage_index]
+        stats = self.stage_stats[stage_index]
+        inbox = self.queues[stage_index]
+        outbox = self.queues[stage_index + 1]
+
+        while True:
+            work = self._get(inbox)
+            if work is None:
+                return
+
+            if work is self._END:
+                # The last worker of a stage forwards the end marker downstream
+                with self._stats_lock:
+                    self._workers_remaining[stage_index] -= 1
+                    last_worker = self._workers_remaining[stage_index] == 0
+                if last_worker:
+                    downstream = self.stages[stage_index + 1].workers \
+                        if stage_index + 1 < len(self.stages) else 1
+                    for _ in range(downstream):
+                        self._put(outbox, self._END)
+                return
+
+            sequence, frame_index, item = work
+            if item is not None:
+                start = time.perf_counter()
+                try:
+                    item = stage.func(frame_index, item)
+                except Exception as e:
+                    self._fail(f"Stage '{stage.name}' failed at frame {frame_index}: {e}")
+                    return
+
+                with self._stats_lock:
+                    stats.busy_time += time.perf_counter() - start
+                    stats.frames_processed += 1
+                    if item is None:
+                        stats.frames_dropped += 1
+
+            # Dropped frames keep their sequence slot so reassembly can skip them
+            if not self._put(outbox, (sequence, frame_index, item)):
+                return
+
+    def next_item(self) -> Optional[Tuple[int, Any]]:
+        """
+        Get the next ``(frame_index, item)`` in source order.
+
+        Frames dropped by a stage are skipped. Returns None at the end of the
+        stream, on cancellation or after a stage error.
+        """
+        output = self.queues[-1]
+
+        while not self.finished and not self.cancelled.is_set():
+            if self._next_sequence in self._pending:
+                frame_index, item = self._pending.pop(self._next_sequence)
+                self._next_sequence += 1
+                self.in_flight.release()
+
+                if item is None:
+                    self.frames_dropped += 1
+                    continue
+                self.frames_delivered += 1
+                return frame_index, item
+
+            if self._source_count is not None and self._next_sequence >= self._source_count:
+                self.finished = True
+                break
+
+            try:
+                work = output.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            if work is self._END:
+                # Every earlier sequence is already in the reorder buffer
+                continue
+
+            sequence, frame_index, item = work
+            self._pending[sequence] = (frame_index, item)
+
+        return None
+
+    def next_frame(self) -> Optional[Any]:
+        """Get the next item in order without its frame index (encoder frame source)"""
+        result = self.next_item()
+        return result[1] if result is not None else None
+
+    def cancel(self):
+        """Stop all stages and release queued frames"""
+        self.cancelled.set()
+        for stage_queue in self.queues:
+            while True:
+                try:
+                    stage_queue.get_nowait()
+                except queue.Empty:
+                    break
+        self._pending.clear()
+
+    def join(self, timeout: Optional[float] = None):
+        """Wait for the source and stage threads to exit"""
+        deadline = None if timeout is None else time.time() + timeout
+        for thread in self.threads:
+            remaining = None if deadline is None else max(0.0, deadline - time.time())
+            thread.join(remaining)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-stage counters and current buffering"""
+        with self._stats_lock:
+            stages = {stats.name: stats.to_dict() for stats in self.stage_stats}
+        for stage_index, stage in enumerate(self.stages):
+            stages[stage.name]['queue_depth'] = self.queues[stage_index].qsize()
+
+        return {
+            'stages': stages,
+            'frames_delivered': self.frames_delivered,
+            'frames_dropped': self.frames_dropped,
+            'reorder_buffered': len(self._pending),
+            'max_in_flight': self.max_in_flight
+        }
+
+    def register_resources(self, sampler):
+        """Report the inter-stage queues and the reorder buffer to a ResourceSampler"""
+        for stage_index, stage in enumerate(self.stages):
+            sampler.add_queue(f"stage_{stage.name}", self.queues[stage_index].qsize)
+        sampler.add_queue("stage_output", self.queues[-1].qsize)
+        sampler.add_queue("stage_reorder", lambda: len(self._pending))
+
+    def __iter__(self) -> Iterator[Tuple[int, Any]]:
+        while True:
+            result = self.next_item()
+            if result is None:
+                if self.error:
+                    raise RuntimeError(self.error)
+                return
+            yield result
@@ -0,0 +1,289 @@
+"""
+Render Telemetry Bus
+
+Hot render loops used to report every frame through a cross-thread Qt signal
+carrying a freshly built dictionary, plus periodic print() calls. The
+telemetry bus replaces that with per-thread counter slots and shared gauges
+that a frame updates with a few list writes: no locks, no dictionaries and
+no signal payloads on the render thread.
+
+Subscribers receive aggregated TelemetrySnapshot objects, published at most
+max_rate_hz times per second (10 Hz by default) when a hot loop calls
+publish_if_due(), and once more when a run ends. Adapters turn snapshots
+into Qt signal emissions, log lines or metrics registry updates.
+"""
+
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Any, Callable
+
+try:
+    from .metrics import MetricsRegistry, get_metrics_registry
+except ImportError:
+    from metrics import MetricsRegistry, get_metrics_registry
+
+
+DEFAULT_MAX_RATE_HZ = 10.0
+
+
+@dataclass
+class TelemetrySnapshot:
+    """Aggregated telemetry at one moment"""
+    timestamp: float
+    elapsed: float  # Seconds since the previous snapshot
+    counters: Dict[str, float] = field(default_factory=dict)
+    rates: Dict[str, float] = field(default_factory=dict)  # Counter increase per second
+    gauges: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'timestamp': self.timestamp,
+            'elapsed': self.elapsed,
+            'counters': dict(self.counters),
+            'rates': dict(self.rates),
+            'gauges': dict(self.gauges)
+        }
+
+
+class TelemetryCounter:
+    """Handle to a bus counter; each thread increments its own slot"""
+
+    __slots__ = ("name", "index", "_bus", "_local")
+
+    def __init__(self, bus: "TelemetryBus", name: str, index: int):
+        self.name = name
+        self.index = index
+        self._bus = bus
+        self._local = bus._local
+
+    def add(self, amount: float = 1):
+        """Increase the counter from the calling thread"""
+        try:
+            self._local.values[self.index] += amount
+        except (AttributeError, IndexError):
+            self._bus._thread_values()[self.index] += amount
+
+
+class TelemetryGauge:
+    """Handle to a bus gauge; the last value set wins"""
+
+    __slots__ = ("name", "index", "_values")
+
+    def __init__(self, bus: "TelemetryBus", name: str, index: int):
+        self.name = name
+        self.index = index
+        self._values = bus._gauge_values
+
+    def set(self, value: float):
+        self._values[self.index] = value
+
+
+class TelemetryBus:
+    """
+    Counters and gauges aggregated into rate-limited snapshots.
+
+    Counter and gauge handles are created up front (under a lock) and then
+    updated without one. Each thread gets its own list of counter values the
+    first time it increments, so increments never contend; snapshots sum the
+    per-thread lists. Subscribers run on the thread that publishes.
+    """
+
+    def __init__(self, max_rate_hz: float = DEFAULT_MAX_RATE_HZ):
+        self.min_interval = 1.0 / max_rate_hz if max_rate_hz > 0 else 0.0
+        self.counter_names: List[str] = []
+        self.gauge_names: List[str] = []
+        self.subscribers: List[Callable[[TelemetrySnapshot], None]] = []
+        self.snapshots_published = 0
+
+        self._local = threading.local()
+        self._thread_slots: List[List[float]] = []
+        self._gauge_values: List[float] = []
+        self._counters: Dict[str, TelemetryCounter] = {}
+        self._gauges: Dict[str, TelemetryGauge] = {}
+        self._lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+
+        self._next_publish = 0.0
+        self._last_time = time.monotonic()
+        self._last_totals: Dict[str, float] = {}
+
+    def counter(self, name: str) -> TelemetryCounter:
+        """Get or create a counter"""
+        with self._lock:
+            if name not in self._counters:
+                self._counters[name] = TelemetryCounter(self, name, len(self.counter_names))
+                self.counter_names.append(name)
+            return self._counters[name]
+
+    def gauge(self, name: str, initial: float = 0.0) -> TelemetryGauge:
+        """Get or create a gauge"""
+        with self._lock:
+            if name not in self._gauges:
+                self._gauges[name] = TelemetryGauge(self, name, len(self.gauge_names))
+                self.gauge_names.append(name)
+                self._gauge_values.append(initial)
+            return self._gauges[name]
+
+    def _thread_values(self) -> List[float]:
+        """The calling thread's counter slots, created or grown on first use"""
+        values = getattr(self._local, 'values', None)
+        with self._lock:
+            if values is None:
+                values = []
+                self._local.values = values
+                self._thread_slots.append(values)
+            # Extending in place keeps the list other threads aggregate from
+            values.extend([0] * (len(self.counter_names) - len(values)))
+        return values
+
+    def subscribe(self, callback: Callable[[TelemetrySnapshot], None]) -> Callable[[TelemetrySnapshot], None]:
+        """Deliver published snapshots to a callback; returns the callback"""
+        with self._lock:
+            self.subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback: Callable[[TelemetrySnapshot], None]):
+        with self._lock:
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+    def totals(self) -> Dict[str, float]:
+        """Current counter totals summed over every thread"""
+        with self._lock:
+            names = list(self.counter_names)
+            slots = list(self._thread_slots)
+
+        totals = [0] * len(names)
+        for values in slots:
+            for index, value in enumerate(values[:len(names)]):
+                totals[index] += value
+        return dict(zip(names, totals))
+
+    def snapshot(self) -> TelemetrySnapshot:
+        """Aggregate the counters and gauges without publishing"""
+        now = time.monotonic()
+        totals = self.totals()
+        elapsed = now - self._last_time
+        rates = {name: (total - self._last_totals.get(name, 0)) / elapsed if elapsed > 0 else 0.0
+                 for name, total in totals.items()}
+        with self._lock:
+            gauges = dict(zip(self.gauge_names, self._gauge_values))
+        return TelemetrySnapshot(time.time(), elapsed, totals, rates, gauges)
+
+    def publish_if_due(self) -> bool:
+        """
+        Publish a snapshot if the rate limit allows one (cheap when it does not).
+
+        Safe to call once per frame from any thread.
+        """
+        if not self.subscribers or time.monotonic() < self._next_publish:
+            return False
+        return self.publish(block=False)
+
+    def publish(self, block: bool = True) -> bool:
+        """
+        Publish a snapshot now (used when a run ends so its final state is seen).
+
+        With block=False nothing is published while another thread is publishing.
+        """
+        if not self._publish_lock.acquire(blocking=block):
+            return False
+        try:
+            snapshot = self.snapshot()
+            self._last_time = time.monotonic()
+            self._last_totals = snapshot.counters
+            self._next_publish = self._last_time + self.min_interval
+            self.snapshots_published += 1
+
+            with self._lock:
+                subscribers = list(self.subscribers)
+            for subscriber in subscribers:
+                try:
+                    subscriber(snapshot)
+                except Exception as e:
+                    logging.getLogger(__name__).warning(f"Telemetry subscriber failed: {e}")
+            return True
+        finally:
+            self._publish_lock.release()
+
+    def reset(self):
+        """Zero every counter and gauge, keeping handles and subscribers"""
+        with self._lock:
+            for values in self._thread_slots:
+                for index in range(len(values)):
+                    values[index] = 0
+            for index in range(len(self._gauge_values)):
+                self._gauge_values[index] = 0.0
+            self._last_totals = {}
+            self._last_time = time.monotonic()
+            self._next_publish = 0.0
+
+
+class QtSignalSubscriber:
+    """Emit a Qt signal with a value derived from each snapshot (None skips the emit)"""
+
+    def __init__(self, signal: Any, transform: Callable[[TelemetrySnapshot], Any]):
+        self.signal = signal
+        self.transform = transform
+
+    def __call__(self, snapshot: TelemetrySnapshot):
+        value = self.transform(snapshot)
+        if value is not None:
+            self.signal.emit(value)
+
+
+class LoggingSubscriber:
+    """Log a line formatted from each snapshot (None skips the line)"""
+
+    def __init__(self, logger: logging.Logger, formatter: Callable[[TelemetrySnapshot], Optional[str]],
+                 level: int = logging.INFO):
+        self.logger = logger
+        self.formatter = formatter
+        self.level = level
+
+    def __call__(self, snapshot: TelemetrySnapshot):
+        if not self.logger.isEnabledFor(self.level):
+            return
+        message = self.formatter(snapshot)
+        if message:
+            self.logger.log(self.level, message)
+
+
+class MetricsSubscriber:
+    """
+    Forward snapshots to a metrics registry.
+
+    Counter increases since the previous snapshot are added to registry
+    counters of the same name (or the mapped name), and gauges are set.
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None,
+                 names: Optional[Dict[str, str]] = None, gauges: bool = False):
+        self.registry = registry or get_metrics_registry()
+        self.names = names
+        self.forward_gauges = gauges
+        self._previous: Dict[str, float] = {}
+
+    def _metric_name(self, name: str) -> Optional[str]:
+        if self.names is None:
+            return name
+        return self.names.get(name)
+
+    def __call__(self, snapshot: TelemetrySnapshot):
+        for name, total in snapshot.counters.items():
+            metric_name = self._metric_name(name)
+            increase = total - self._previous.get(name, 0)
+            # A reset bus starts again from zero
+            if increase < 0:
+                increase = total
+            self._previous[name] = total
+            if metric_name and increase:
+                self.registry.counter(metric_name).inc(increase)
+
+        if self.forward_gauges:
+            for name, value in snapshot.gauges.items():
+                metric_name = self._metric_name(name)
+                if metric_name:
+                    self.registry.gauge(metric_name).set(value)
@@ -0,0 +1,110 @@
+"""
+Frame Timebase
+
+Exact rational frame rates shared by the rendering pipeline, frame capture and
+export renderer. Frame times are always computed from the frame index
+(index * denominator / numerator) instead of by repeatedly adding 1/fps, so
+long exports at NTSC rates such as 30000/1001 neither gain nor lose frames and
+karaoke highlights stay locked to the audio.
+"""
+
+import math
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import Iterator, Union
+
+import numpy as np
+
+
+# Conventional NTSC rates that are usually written as rounded decimals
+NTSC_RATES = {
+    23.976: Fraction(24000, 1001),
+    29.97: Fraction(30000, 1001),
+    47.952: Fraction(48000, 1001),
+    59.94: Fraction(60000, 1001),
+    119.88: Fraction(120000, 1001),
+}
+
+# Tolerance for frame boundary comparisons on float timestamps
+TIME_EPSILON = 1e-9
+
+
+@dataclass(frozen=True)
+class Timebase:
+    """Frame rate expressed as numerator/denominator frames per second"""
+    numerator: int = 30
+    denominator: int = 1
+
+    def __post_init__(self):
+        if self.numerator <= 0 or self.denominator <= 0:
+            raise ValueError(f"Invalid frame rate: {self.numerator}/{self.denominator}")
+
+    @classmethod
+    def from_fps(cls, fps: Union[float, int, str, Fraction, "Timebase"]) -> "Timebase":
+        """Create a timebase from a float, "num/den" string, Fraction or Timebase"""
+        if isinstance(fps, Timebase):
+            return fps
+
+        if isinstance(fps, str):
+            rate = Fraction(fps.strip())
+        elif isinstance(fps, Fraction):
+            rate = fps
+        else:
+            fps = float(fps)
+            if fps <= 0:
+                raise ValueError(f"Invalid frame rate: {fps}")
+
+            rate = NTSC_RATES.get(round(fps, 3))
+            if rate is None:
+                rate = Fraction(fps).limit_denominator(1001)
+
+        return cls(rate.numerator, rate.denominator)
+
+    @property
+    def rate(self) -> Fraction:
+        """Exact frames per second"""
+        return Fraction(self.numerator, self.denominator)
+
+    @property
+    def fps(self) -> float:
+        """Frames per second as a float (for display and legacy APIs)"""
+        return self.numerator / self.denominator
+
+    @property
+    def frame_duration(self) -> float:
+        """Duration of one frame in seconds"""
+        return self.denominator / self.numerator
+
+    @property
+    def ffmpeg_rate(self) -> str:
+        """Rate string accepted by FFmpeg's -r/-framerate options"""
+        if self.denominator == 1:
+            return str(self.numerator)
+        return f"{self.numerator}/{self.denominator}"
+
+    def frame_time(self, frame_index: int) -> float:
+        """Start time of a frame in seconds"""
+        return frame_index * self.denominator / self.numerator
+
+    def frame_at(self, time_seconds: float) -> int:
+        """Index of the frame shown at a time"""
+        return math.floor(time_seconds * self.numerator / self.denominator + TIME_EPSILON)
+
+    def frame_count(self, duration: float) -> int:
+        """Number of frames starting before the end of a duration"""
+        if duration <= 0:
+            return 0
+        return math.ceil(duration * self.numerator / self.denominator - TIME_EPSILON)
+
+    def frame_times(self, count: int, start_frame: int = 0) -> np.ndarray:
+        """Start times of ``count`` consecutive frames as a float64 array"""
+        indices = np.arange(start_frame, start_frame + max(0, count), dtype=np.int64)
+        return indices * self.denominator / self.numerator
+
+    def iter_frame_times(self, count: int, start_frame: int = 0) -> Iterator[float]:
+        """Yield frame start times lazily"""
+        for frame_index in range(start_frame, start_frame + max(0, count)):
+            yield self.frame_time(frame_index)
+
+    def __str__(self) -> str:
+        return self.ffmpeg_rate
@@ -0,0 +1,221 @@
+"""
+Timestamped Raw Frame Stream
+
+A deduplicated export (see frame_plan) renders a run of identical output
+frames once. Raw video on a pipe carries no timestamps, so such a frame used
+to be written to FFmpeg once per output frame it covers. This module wraps
+raw RGBA frames in a minimal live Matroska stream instead: uncompressed video
+(V_UNCOMPRESSED, fourcc RGBA), one cluster per rendered frame, stamped with
+the time of the first output frame it covers. FFmpeg reads the stream with
+``-f matroska`` and its fps filter repeats every frame until the next
+timestamp, so each rendered frame crosses the pipe once.
+
+The stream has no seek head, cues or element sizes on the segment, like any
+live Matroska stream. Frame data is never copied: ``block_header`` returns
+the bytes that precede a frame's pixels. ``read_frames`` and ``expand_frames``
+read such a stream back, e.g. for encoders standing in for FFmpeg in tests.
+"""
+
+from typing import Any, Dict, List, Tuple, Iterator
+
+try:
+    from .timebase import Timebase
+except ImportError:
+    from timebase import Timebase
+
+
+# Element IDs (with their length marker bits) from the Matroska specification
+EBML = 0x1A45DFA3
+EBML_VERSION = 0x4286
+EBML_READ_VERSION = 0x42F7
+EBML_MAX_ID_LENGTH = 0x42F2
+EBML_MAX_SIZE_LENGTH = 0x42F3
+DOC_TYPE = 0x4282
+DOC_TYPE_VERSION = 0x4287
+DOC_TYPE_READ_VERSION = 0x4285
+SEGMENT = 0x18538067
+INFO = 0x1549A966
+TIMECODE_SCALE = 0x2AD7B1
+MUXING_APP = 0x4D80
+WRITING_APP = 0x5741
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+TRACK_NUMBER = 0xD7
+TRACK_UID = 0x73C5
+TRACK_TYPE = 0x83
+DEFAULT_DURATION = 0x23E383
+CODEC_ID = 0x86
+VIDEO = 0xE0
+PIXEL_WIDTH = 0xB0
+PIXEL_HEIGHT = 0xBA
+COLOUR_SPACE = 0x2EB524
+CLUSTER = 0x1F43B675
+TIMECODE = 0xE7
+SIMPLE_BLOCK = 0xA3
+
+# Size of an element streamed without knowing its length
+UNKNOWN_SIZE = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+
+# Timestamps are counted in microseconds
+TICKS_PER_SECOND = 1_000_000
+
+_TRACK_TYPE_VIDEO = 1
+_KEYFRAME = 0x80
+_APP_NAME = b"karaoke-video-creator"
+
+
+def _element_id(element_id: int) -> bytes:
+    return element_id.to_bytes((element_id.bit_length() + 7) // 8, "big")
+
+
+def _size(size: int) -> bytes:
+    """Eight-byte EBML size (0x01 marker followed by seven size bytes)"""
+    return b"\x01" + size.to_bytes(7, "big")
+
+
+def _element(element_id: int, payload: bytes) -> bytes:
+    return _element_id(element_id) + _size(len(payload)) + payload
+
+
+def _uint(element_id: int, value: int) -> bytes:
+    return _element(element_id, value.to_bytes(max(1, (value.bit_length() + 7) // 8), "big"))
+
+
+class TimestampedFrameStream:
+    """Matroska framing for raw RGBA frames at output frame indices"""
+
+    def __init__(self, width: int, height: int, fps: Any):
+        self.width = width
+        self.height = height
+        self.timebase = Timebase.from_fps(fps)
+        self.frame_bytes = width * height * 4
+
+    def spec(self) -> Dict[str, Any]:
+        """Picklable description, e.g. for a writer process"""
+        return {"width": self.width, "height": self.height, "fps": self.timebase.ffmpeg_rate}
+
+    @classmethod
+    def from_spec(cls, spec: Dict[str, Any]) -> "TimestampedFrameStream":
+        return cls(spec["width"], spec["height"], spec["fps"])
+
+    def ticks(self, frame_index: int) -> int:
+        """Timestamp of an output frame in microseconds"""
+        return (frame_index * self.timebase.denominator * TICKS_PER_SECOND
+                + self.timebase.numerator // 2) // self.timebase.numerator
+
+    def header(self) -> bytes:
+        """EBML header, segment start, segment info and the video track"""
+        ebml = _element(EBML, b"".join([
+            _uint(EBML_VERSION, 1),
+            _uint(EBML_READ_VERSION, 1),
+            _uint(EBML_MAX_ID_LENGTH, 4),
+            _uint(EBML_MAX_SIZE_LENGTH, 8),
+            _element(DOC_TYPE, b"matroska"),
+            _uint(DOC_TYPE_VERSION, 4),
+            _uint(DOC_TYPE_READ_VERSION, 2)
+        ]))
+        info = _element(INFO, b"".join([
+            _uint(TIMECODE_SCALE, 1_000_000_000 // TICKS_PER_SECOND),
+            _element(MUXING_APP, _APP_NAME),
+            _element(WRITING_APP, _APP_NAME)
+        ]))
+        frame_ns = (self.timebase.denominator * 1_000_000_000 + self.timebase.numerator // 2) \
+            // self.timebase.numerator
+        track = _element(TRACK_ENTRY, b"".join([
+            _uint(TRACK_NUMBER, 1),
+            _uint(TRACK_UID, 1),
+            _uint(TRACK_TYPE, _TRACK_TYPE_VIDEO),
+            _uint(DEFAULT_DURATION, frame_ns),
+            _element(CODEC_ID, b"V_UNCOMPRESSED"),
+            _element(VIDEO, b"".join([
+                _uint(PIXEL_WIDTH, self.width),
+                _uint(PIXEL_HEIGHT, self.height),
+                _element(COLOUR_SPACE, b"RGBA")
+            ]))
+        ]))
+        return ebml + _element_id(SEGMENT) + UNKNOWN_SIZE + info + _element(TRACKS, track)
+
+    def block_header(self, frame_index: int) -> bytes:
+        """Bytes preceding the pixels of the frame shown from output frame frame_index on"""
+        timecode = _uint(TIMECODE, self.ticks(frame_index))
+        # Track 1 (as a one-byte vint), relative timecode 0, keyframe
+        block_prefix = b"\x81\x00\x00" + bytes([_KEYFRAME])
+        block_size = len(block_prefix) + self.frame_bytes
+        block_head = _element_id(SIMPLE_BLOCK) + _size(block_size) + block_prefix
+        cluster_size = len(timecode) + len(block_head) + self.frame_bytes
+        return _element_id(CLUSTER) + _size(cluster_size) + timecode + block_head
+
+    def fps_filter(self) -> str:
+        """Video filter turning the timestamped frames into constant-rate output"""
+        return f"fps={self.timebase.ffmpeg_rate}"
+
+
+def frame_writes(first_index: int, repeat: int, total_frames: int) -> List[Tuple[int, int]]:
+    """
+    (output frame index, output frames covered) for each write of a frame that
+    covers [first_index, first_index + repeat): one write, plus a second one at
+    the last output frame when the run ends the stream, so FFmpeg repeats the
+    frame up to the end instead of stopping at its timestamp.
+    """
+    repeat = max(1, min(repeat, total_frames - first_index))
+    last_index = first_index + repeat - 1
+    if last_index > first_index and last_index == total_frames - 1:
+        return [(first_index, repeat - 1), (last_index, 1)]
+    return [(first_index, repeat)]
+
+
+def _read_vint(data: bytes, offset: int, keep_marker: bool) -> Tuple[int, int]:
+    """(value, offset after it) of the EBML variable-length integer at offset"""
+    length = 9 - data[offset].bit_length()
+    value = int.from_bytes(data[offset:offset + length], "big")
+    if not keep_marker:
+        value &= (1 << (7 * length)) - 1
+    return value, offset + length
+
+
+def _children(data: bytes, start: int, end: int) -> Iterator[Tuple[int, int, int]]:
+    """(element ID, payload start, payload end) of the elements in data[start:end]"""
+    offset = start
+    while offset < end:
+        element_id, offset = _read_vint(data, offset, keep_marker=True)
+        size_start = offset
+        size, offset = _read_vint(data, offset, keep_marker=False)
+        if data[size_start:offset] == UNKNOWN_SIZE:
+            yield element_id, offset, end
+            return
+        yield element_id, offset, offset + size
+        offset += size
+
+
+def read_frames(data: bytes) -> Tuple[int, List[Tuple[int, bytes]]]:
+    """Frame duration in ticks and the (timestamp in ticks, pixels) of each frame of a stream"""
+    frame_ticks = 0
+    frames: List[Tuple[int, bytes]] = []
+    for element_id, start, end in _children(data, 0, len(data)):
+        if element_id != SEGMENT:
+            continue
+        for child_id, child_start, child_end in _children(data, start, end):
+            if child_id == TRACKS:
+                for _, entry_start, entry_end in _children(data, child_start, child_end):
+                    for field_id, field_start, field_end in _children(data, entry_start, entry_end):
+                        if field_id == DEFAULT_DURATION:
+                            frame_ns = int.from_bytes(data[field_start:field_end], "big")
+                            frame_ticks = frame_ns * TICKS_PER_SECOND // 1_000_000_000
+            elif child_id == CLUSTER:
+                ticks = 0
+                for field_id, field_start, field_end in _children(data, child_start, child_end):
+                    if field_id == TIMECODE:
+                        ticks = int.from_bytes(data[field_start:field_end], "big")
+                    elif field_id == SIMPLE_BLOCK:
+                        frames.append((ticks, data[field_start + 4:field_end]))
+    return frame_ticks, frames
+
+
+def expand_frames(data: bytes) -> bytes:
+    """Raw frames of a stream at its frame rate, each repeated up to the next timestamp"""
+    frame_ticks, frames = read_frames(data)
+    output = bytearray()
+    for index, (ticks, pixels) in enumerate(frames):
+        next_ticks = frames[index + 1][0] if index + 1 < len(frames) else ticks + frame_ticks
+        output.extend(pixels * max(1, round((next_ticks - ticks) / frame_ticks)))
+    return bytes(output)
@@ -0,0 +1,584 @@
+#!/usr/bin/env python3
+"""
+Karaoke Video Creator - Headless Render Entry Point
+
+Renders a project to a video file without creating any Qt widgets, for use
+from scripts, CI jobs and render farms:
+
+    karaoke-render project.json -o out.mp4 --backend opengl
+
+The project file is a JSON object with the ProjectConfig fields (audio_file,
+subtitle_file, background_image, background_video, output_file, width,
+height, fps, duration). Relative paths are resolved against the directory of
+the project file.
+
+Progress is written to stdout as one JSON object per line; all other output
+goes to stderr. The process exit code tells automation what happened.
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import shutil
+import argparse
+import threading
+import contextlib
+import subprocess
+from pathlib import Path
+from typing import Optional, Dict, Any, TextIO
+
+# Add src directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.models import Project, ProjectConfig, AudioFile, VideoFile, ImageFile
+from core.subtitle_parser import parse_ass_file
+from core.opengl_context import OpenGLContext, HEADLESS_BACKENDS, create_headless_context
+from core.frame_capture_system import FrameCaptureSettings, stream_video_frames, _project_duration
+from core.enhanced_ffmpeg_integration import EnhancedFFmpegProcessor, EnhancedExportSettings
+from core.parallel_render import ParallelSegmentRenderer
+from core.distributed_render import (
+    RenderCoordinator, DEFAULT_HOST, DEFAULT_PORT, DEFAULT_SEGMENT_TIMEOUT, TOKEN_ENVIRONMENT_VARIABLE
+)
+from core.render_trace import get_render_tracer
+from core.resource_sampler import ResourceSampler
+from core.export_estimator import PreflightEstimator, EstimateHistory, ExportEstimate, DEFAULT_HISTORY_PATH
+from core.export_profiles import ExportProfile, EXPORT_PROFILES, MASTER_PROFILE, get_export_profile
+from core.cache_registry import get_cache_registry
+from core.hardware_profile import TunedSettings, STATIC_DEFAULTS, get_tuned_settings
+
+
+# Exit codes
+EXIT_OK = 0
+EXIT_RENDER_FAILED = 1
+EXIT_USAGE = 2  # Reported by argparse
+EXIT_INVALID_PROJECT = 3
+EXIT_BACKEND_UNAVAILABLE = 4
+EXIT_ENCODER_FAILED = 5
+EXIT_RESOURCE_GROWTH = 6  # Soak test found memory or queues growing across renders
+EXIT_CANCELLED = 130
+
+
+
+class RenderError(Exception):
+    """Render failure carrying the process exit code"""
+
+    def __init__(self, exit_code: int, message: str):
+        super().__init__(message)
+        self.exit_code = exit_code
+
+
+class ProgressReporter:
+    """Writes render events to a stream as JSON lines"""
+
+    def __init__(self, stream: TextIO, interval: float = 1.0):
+        self.stream = stream
+        self.interval = max(0.0, interval)
+        self.start_time = time.time()
+        self.last_report = 0.0
+
+    def emit(self, event: str, **fields):
+        record = {"event": event, "time": round(time.time() - self.start_time, 3)}
+        record.update(fields)
+        self.stream.write(json.dumps(record) + "\n")
+        self.stream.flush()
+
+    def progress(self, frame: int, total_frames: int, force: bool = False):
+        """Report render progress, at most once per interval unless forced"""
+        now = time.time()
+        if not force and now - self.last_report < self.interval:
+            return
+        self.last_report = now
+
+        elapsed = max(now - self.start_time, 1e-6)
+        fps = frame / elapsed
+        remaining = max(total_frames - frame, 0)
+        self.emit(
+            "progress",
+            frame=frame,
+            total_frames=total_frames,
+            percent=round(100.0 * frame / total_frames, 2) if total_frames else 100.0,
+            fps=round(fps, 2),
+            eta_seconds=round(remaining / fps, 1) if fps > 0 else None
+        )
+
+
+def _resolve(path: str, base_dir: Path) -> str:
+    """Resolve a project path relative to the project file"""
+    if not path:
+        return ""
+    candidate = Path(path).expanduser()
+    if not candidate.is_absolute():
+        candidate = base_dir / candidate
+    return str(candidate)
+
+
+def _probe_duration(path: str) -> float:
+    """Media duration in seconds from ffprobe, or 0.0 if unavailable"""
+    if not shutil.which("ffprobe"):
+        return 0.0
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_format", path],
+            capture_output=True, text=True, check=True, timeout=30
+        )
+        return float(json.loads(result.stdout).get("format", {}).get("duration", 0.0))
+    except (subprocess.SubprocessError, OSError, ValueError):
+        return 0.0
+
+
+def load_project_config(project_path: str) -> ProjectConfig:
+    """Read a JSON project description into a ProjectConfig"""
+    try:
+        with open(project_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except OSError as e:
+        raise RenderError(EXIT_INVALID_PROJECT, f"Cannot read project file: {e}")
+    except ValueError as e:
+        raise RenderError(EXIT_INVALID_PROJECT, f"Project file is not valid JSON: {e}")
+
+    if not isinstance(data, dict):
+        raise RenderError(EXIT_INVALID_PROJECT, "Project file must contain a JSON object")
+
+    known_fields = set(ProjectConfig.__dataclass_fields__)
+    unknown = sorted(set(data) - known_fields)
+    if unknown:
+        raise RenderError(EXIT_INVALID_PROJECT, f"Unknown project fields: {', '.join(unknown)}")
+
+    base_dir = Path(project_path).resolve().parent
+    values = {key: value for key, value in data.items() if key in known_fields}
+    for key in ("audio_file", "subtitle_file", "background_image", "background_video",
+                "config_file", "output_file"):
+        if key in values:
+            values[key] = _resolve(values[key], base_dir)
+
+    try:
+        return ProjectConfig(**values)
+    except (TypeError, ValueError) as e:
+        raise RenderError(EXIT_INVALID_PROJECT, f"Invalid project configuration: {e}")
+
+
+def build_project(config: ProjectConfig, name: str = "Headless Render") -> Project:
+    """Create a Project from a ProjectConfig, parsing subtitles and probing media"""
+    for label, path in (("Subtitle", config.subtitle_file), ("Audio", config.audio_file),
+                        ("Background image", config.background_image),
+                        ("Background video", config.background_video)):
+        if path and not os.path.isfile(path):
+            raise RenderError(EXIT_INVALID_PROJECT, f"{label} file not found: {path}")
+
+    if not config.subtitle_file:
+        raise RenderError(EXIT_INVALID_PROJECT, "Project has no subtitle_file")
+
+    subtitle_file, errors, warnings = parse_ass_file(config.subtitle_file)
+    for warning in warnings:
+        print(f"Subtitle warning: {warning}", file=sys.stderr)
+    if errors:
+        raise RenderError(EXIT_INVALID_PROJECT,
+                          f"Subtitle file has {len(errors)} error(s): {errors[0]}")
+
+    # Explicit duration wins, then the audio, then the last subtitle line
+    duration = config.duration
+    if not duration and config.audio_file:
+        duration = _probe_duration(config.audio_file)
+    if not duration and subtitle_file.lines:
+        duration = max(line.end_time for line in subtitle_file.lines)
+    if duration <= 0:
+        raise RenderError(EXIT_INVALID_PROJECT, "Could not determine the render duration")
+
+    audio_file = AudioFile(path=config.audio_file or "", duration=duration)
+    video_file = None
+    image_file = None
+    if config.background_video:
+        video_file = VideoFile(path=config.background_video,
+                               duration=_probe_duration(config.background_video) or duration)
+    elif config.background_image:
+        image_file = ImageFile(path=config.background_image)
+
+    return Project(
+        id=Path(config.subtitle_file).stem,
+        name=name,
+        video_file=video_file,
+        image_file=image_file,
+        audio_file=audio_file,
+        subtitle_file=subtitle_file
+    )
+
+
+def create_render_context(backend: str, width: int, height: int) -> OpenGLContext:
+    """Create the headless context for a backend, mapping failures to an exit code"""
+    try:
+        return create_headless_context(backend, width, height)
+    except RuntimeError as e:
+        raise RenderError(EXIT_BACKEND_UNAVAILABLE, str(e))
+
+
+def render_project(project: Project, output_path: Optional[str], backend: str, width: int, height: int,
+                   fps: float, reporter: ProgressReporter, dry_run: bool = False,
+                   processor: Optional[EnhancedFFmpegProcessor] = None,
+                   deduplicate: bool = True,
+                   resource_sampler: Optional[ResourceSampler] = None,
+                   profile: Optional[ExportProfile] = None,
+                   config_manager: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Render a project to a video file, reporting progress to the reporter.
+
+    Frames are rendered on the calling thread, where the OpenGL context is
+    current, and handed to the encoder through a bounded queue. With dry_run
+    the frames are rendered and discarded without starting FFmpeg. Caches,
+    queues and pipe throughput are registered with resource_sampler if one
+    is given. width, height and fps are the output values; profile sets the
+    encoder preset, effect quality and raster reuse. Frame queues and caches
+    are sized by config_manager's performance settings (default: derived
+    from this machine's hardware). Returns a summary of the render; raises
+    RenderError on failure.
+    """
+    profile = profile or get_export_profile(MASTER_PROFILE)
+    config_manager = config_manager or get_tuned_settings()
+    context = create_render_context(backend, width, height)
+    buffer_size = int(config_manager.get_performance_setting("frame_buffer_size",
+                                                             STATIC_DEFAULTS["frame_buffer_size"]))
+    capture_settings = profile.configure_capture(FrameCaptureSettings(width=width, height=height, fps=fps,
+                                                                      deduplicate_frames=deduplicate,
+                                                                      buffer_size=buffer_size))
+    total_frames = capture_settings.timebase.frame_count(_project_duration(project))
+    frames = stream_video_frames(project, capture_settings, context, resource_sampler, config_manager)
+
+    def report(frames_rendered: int):
+        reporter.progress(frames_rendered, total_frames)
+
+    try:
+        if dry_run:
+            frames_rendered = 0
+            for frame in frames:
+                frames_rendered += frame.repeat
+                report(frames_rendered)
+            reporter.progress(frames_rendered, total_frames, force=True)
+            if frames_rendered < total_frames:
+                raise RenderError(EXIT_RENDER_FAILED,
+                                  f"Rendered {frames_rendered} of {total_frames} frames")
+            return {"frames": frames_rendered, "output": None}
+
+        processor = processor or EnhancedFFmpegProcessor(config_manager)
+        if resource_sampler:
+            processor.register_resources(resource_sampler)
+        export_settings = profile.configure_encoder(EnhancedExportSettings(output_path=output_path, width=width,
+                                                                           height=height, fps=fps,
+                                                                           timestamped_input=deduplicate))
+        input_audio = project.audio_file.path if project.audio_file and project.audio_file.path else None
+
+        if not processor.encode_frames(export_settings, frames, total_frames, input_audio,
+                                       report, capture_settings.buffer_size):
+            reporter.progress(processor.current_frame, total_frames, force=True)
+            if processor.return_code == 0:
+                # The encoder finished cleanly, so rendering stopped short
+                raise RenderError(EXIT_RENDER_FAILED, processor.error_message or "Rendering failed")
+            raise RenderError(EXIT_ENCODER_FAILED, processor.error_message or "FFmpeg encoding failed")
+
+        reporter.progress(total_frames, total_frames, force=True)
+        return {"frames": total_frames, "output": output_path}
+
+    finally:
+        frames.close()
+        context.cleanup()
+
+
+def render_project_parallel(project: Project, output_path: Optional[str], backend: str, width: int,
+                            height: int, fps: float, reporter: ProgressReporter, workers: int,
+                            dry_run: bool = False, deduplicate: bool = True,
+                            trace: bool = False,
+                            profile: Optional[ExportProfile] = None,
+                            segments_per_worker: int = 4) -> Dict[str, Any]:
+    """
+    Render time segments in worker processes and join them; raises RenderError on failure.
+
+    Encoded segments are recorded in an ExportCheckpoint next to the output,
+    so running the same render again after an interruption only renders the
+    segments that are missing.
+    """
+    settings = EnhancedExportSettings(output_path=output_path or "", width=width, height=height, fps=fps)
+    if profile:
+        profile.configure_encoder(settings)
+    # Several cost-balanced segments per worker give idle workers something to steal
+    renderer = ParallelSegmentRenderer(project, settings, workers=workers, backend=backend,
+                                       segments_per_worker=segments_per_worker, encode=not dry_run,
+                                       deduplicate=deduplicate, trace=trace)
+
+    try:
+        result = renderer.render(lambda done, total: reporter.progress(done, total, force=True))
+    except BaseException:
+        renderer.cancel()
+        raise
+
+    if not result.success:
+        raise RenderError(EXIT_RENDER_FAILED, result.error or "Parallel render failed")
+    return {"frames": result.frames_rendered, "output": result.output_path,
+            "segments": len(result.segments),
+            "prediction_error_percent": round(result.prediction.mean_absolute_percent_error, 1),
+            "steals": result.prediction.steals}
+
+
+def render_project_distributed(project: Project, output_path: Optional[str], width: int, height: int,
+                               fps: float, reporter: ProgressReporter, listen: str,
+                               segments: int, profile: Optional[ExportProfile] = None,
+                               token: Optional[str] = None,
+                               segment_timeout: float = DEFAULT_SEGMENT_TIMEOUT) -> Dict[str, Any]:
+    """Serve segments to karaoke-render-worker agents and join them; raises RenderError on failure"""
+    if not output_path:
+        raise RenderError(EXIT_INVALID_PROJECT, "Distributed rendering needs an output path")
+    host, _, port = listen.rpartition(":") if ":" in listen else (listen, "", "")
+    settings = EnhancedExportSettings(output_path=output_path, width=width, height=height, fps=fps)
+    if profile:
+        profile.configure_encoder(settings)
+
+    try:
+        coordinator = RenderCoordinator(project, settings, host=host or DEFAULT_HOST,
+                                        port=int(port or DEFAULT_PORT), segment_count=segments,
+                                        segment_timeout=segment_timeout, token=token)
+    except ValueError as e:
+        raise RenderError(EXIT_INVALID_PROJECT, str(e))
+    coordinator.listen()
+    reporter.emit("listening", host=coordinator.host, port=coordinator.port)
+
+    try:
+        result = coordinator.render(lambda done, total: reporter.progress(done, total, force=True))
+    finally:
+        coordinator.close()
+
+    if not result.success:
+        raise RenderError(EXIT_RENDER_FAILED, result.error or "Distributed render failed")
+    return {"frames": result.total_frames, "output": result.output_path,
+            "segments": len(result.segments), "reassigned": result.reassigned_segments}
+
+
+def estimate_project(project: Project, output_path: Optional[str], backend: str, width: int, height: int,
+                     fps: float, dry_run: bool = False, deduplicate: bool = True,
+                     sample_seconds: float = 10.0,
+                     history: Optional[EstimateHistory] = None,
+                     profile: Optional[ExportProfile] = None) -> ExportEstimate:
+    """Preflight estimate of render time and output size; raises RenderError on failure"""
+    settings = EnhancedExportSettings(output_path=output_path or "preflight.mp4", width=width,
+                                      height=height, fps=fps)
+    if profile:
+        profile.configure_encoder(settings)
+    estimator = PreflightEstimator(project, settings, backend=backend, deduplicate=deduplicate,
+                                   encode=not dry_run, sample_seconds=sample_seconds, history=history)
+    try:
+        return estimator.estimate()
+    except RuntimeError as e:
+        raise RenderError(EXIT_BACKEND_UNAVAILABLE, f"Preflight estimate failed: {e}")
+
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def build_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="karaoke-render",
+        description="Render a karaoke project to video without the GUI. "
+                    "Progress is printed to stdout as JSON lines."
+    )
+    parser.add_argument("project", help="Project description (JSON with ProjectConfig fields)")
+    parser.add_argument("-o", "--output", help="Output video path (default: project output_file)")
+    parser.add_argument("--backend", choices=HEADLESS_BACKENDS, default="opengl",
+                        help="Rendering backend (default: opengl)")
+    parser.add_argument("--width", type=int, help="Override the project width")
+    parser.add_argument("--height", type=int, help="Override the project height")
+    parser.add_argument("--fps", type=float, help="Override the project frame rate")
+    parser.add_argument("--profile", choices=list(EXPORT_PROFILES), default=MASTER_PROFILE,
+                        help="Export profile: 'draft' renders a half-resolution proxy at up to 15 fps "
+                             "with cheaper effects and the ultrafast preset, 'draft-quarter' a quarter-"
+                             "resolution one (default: master)")
+    parser.add_argument("--progress-interval", type=float, default=1.0,
+                        help="Seconds between progress events (0 reports every frame)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Render every frame but do not encode a video")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Render time segments in this many worker processes")
+    parser.add_argument("--no-dedup", dest="deduplicate", action="store_false",
+                        help="Render every frame, even runs of identical frames")
+    parser.add_argument("--listen", metavar="HOST:PORT",
+                        help="Distribute segments to karaoke-render-worker agents connecting here")
+    parser.add_argument("--segments", type=int, default=16,
+                        help="Number of segments to distribute with --listen, or to checkpoint "
+                             "with --resume (default: 16)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Encode checkpointed segments next to the output, so running the "
+                             "same command again after an interruption only renders what is missing")
+    parser.add_argument("--token", default=os.environ.get(TOKEN_ENVIRONMENT_VARIABLE),
+                        help="Shared token workers must present; required to --listen on a non-loopback "
+                             f"address (default: ${TOKEN_ENVIRONMENT_VARIABLE})")
+    parser.add_argument("--segment-timeout", type=float, default=DEFAULT_SEGMENT_TIMEOUT, metavar="SECONDS",
+                        help="Seconds a worker may take for one segment before it is reassigned "
+                             f"(default: {DEFAULT_SEGMENT_TIMEOUT:.0f})")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Write a Chrome trace-event timeline of the render (open in Perfetto)")
+    parser.add_argument("--resources", metavar="FILE",
+                        help="Sample memory, CPU, queues and caches during the render and write "
+                             "the report here (a summary is added to the complete event)")
+    parser.add_argument("--resource-interval", type=float, default=1.0,
+                        help="Seconds between resource samples (default: 1)")
+    parser.add_argument("--tracemalloc-interval", type=float, default=0.0,
+                        help="Seconds between tracemalloc allocation diffs in the resource report")
+    parser.add_argument("--cache-budget", type=float, metavar="MB",
+                        help="Byte budget shared by all caches in the process (0 = unlimited); "
+                             "peak cache size and evictions are added to the complete event")
+    parser.add_argument("--soak", type=int, default=1, metavar="N",
+                        help="Render N times in this process and fail with exit code 6 if memory "
+                             "or queues grew after every render (use 4 or more)")
+    parser.add_argument("--estimate", action="store_true",
+                        help="Render and encode a sample first and report the estimated time and size")
+    parser.add_argument("--estimate-only", action="store_true",
+                        help="Report the estimate and exit without rendering")
+    parser.add_argument("--estimate-seconds", type=float, default=10.0,
+                        help="Seconds of the timeline sampled by the estimate (default: 10)")
+    parser.add_argument("--estimate-history", metavar="FILE", default=DEFAULT_HISTORY_PATH,
+                        help="Estimates and actual results used to calibrate later estimates "
+                             f"(default: {DEFAULT_HISTORY_PATH})")
+    return parser
+
+
+def write_render_trace(path: str):
+    """Write the spans recorded during the render; a failure here does not fail the render"""
+    tracer = get_render_tracer()
+    tracer.disable()
+    try:
+        events = tracer.write(path)
+        print(f"Render trace with {events} events written to {path}")
+    except OSError as e:
+        print(f"Failed to write render trace: {e}")
+
+
+def main(argv=None) -> int:
+    """Run a headless render; returns the process exit code"""
+    parser = build_argument_parser()
+    args = parser.parse_args(argv)
+    if args.listen and args.dry_run:
+        parser.error("--dry-run cannot be combined with --listen (workers always encode their segments)")
+    if args.segment_timeout <= 0:
+        parser.error("--segment-timeout must be positive")
+    if args.resume and args.dry_run:
+        parser.error("--resume cannot be combined with --dry-run (only encoded segments are checkpointed)")
+
+    reporter = ProgressReporter(sys.stdout, args.progress_interval)
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _raise_interrupt)
+    if args.trace:
+        get_render_tracer().clear()
+        get_render_tracer().enable()
+    sampler = None
+    if args.resources or args.soak > 1:
+        sampler = ResourceSampler(args.resource_interval, args.tracemalloc_interval, soak=args.soak > 1)
+    cache_registry = get_cache_registry()
+    # Queue and cache sizes derived from this machine's hardware
+    overrides = {}
+    if args.cache_budget is not None:
+        overrides["cache_budget_mb"] = args.cache_budget
+        cache_registry.governor.set_budget(int(args.cache_budget * 1024 * 1024))
+    performance_settings = TunedSettings(get_tuned_settings().profile, overrides)
+
+    # Library code prints diagnostics; keep stdout for machine-readable events
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            config = load_project_config(args.project)
+            output_path = args.output or config.output_file or None
+            if output_path:
+                output_path = os.path.abspath(output_path)
+            profile = get_export_profile(args.profile)
+            width, height = profile.output_size(args.width or config.width, args.height or config.height)
+            fps = profile.output_fps(args.fps or config.fps)
+            if not output_path and not args.dry_run:
+                raise RenderError(EXIT_INVALID_PROJECT, "No output path given (use -o or output_file)")
+            if width <= 0 or height <= 0 or fps <= 0:
+                raise RenderError(EXIT_INVALID_PROJECT, "Width, height and fps must be positive")
+
+            project = build_project(config, name=Path(args.project).stem or "Headless Render")
+
+            estimate = None
+            history = None
+            if args.estimate or args.estimate_only:
+                history = EstimateHistory(args.estimate_history) if args.estimate_history else None
+                estimate = estimate_project(project, output_path, args.backend, width, height, fps,
+                                            dry_run=args.dry_run, deduplicate=args.deduplicate,
+                                            sample_seconds=args.estimate_seconds, history=history,
+                                            profile=profile)
+                reporter.emit("estimate", **estimate.to_dict())
+                if args.estimate_only:
+                    reporter.emit("complete", exit_code=EXIT_OK, frames=0, output=None)
+                    return EXIT_OK
+
+            reporter.emit("start", project=os.path.abspath(args.project), output=output_path,
+                          backend=args.backend, width=width, height=height, fps=fps,
+                          profile=profile.name, duration=_project_duration(project), dry_run=args.dry_run)
+
+            if sampler:
+                sampler.start()
+            for iteration in range(max(1, args.soak)):
+                if args.listen:
+                    result = render_project_distributed(project, output_path, width, height, fps,
+                                                        reporter, args.listen, args.segments,
+                                                        profile=profile, token=args.token,
+                                                        segment_timeout=args.segment_timeout)
+                elif args.workers > 1 or args.resume:
+                    workers = max(1, args.workers)
+                    result = render_project_parallel(project, output_path, args.backend, width, height,
+                                                     fps, reporter, workers, dry_run=args.dry_run,
+                                                     deduplicate=args.deduplicate,
+                                                     trace=bool(args.trace), profile=profile,
+                                                     segments_per_worker=max(4, args.segments // workers)
+                                                     if args.resume else 4)
+                else:
+                    render_start = time.time()
+                    result = render_project(project, output_path, args.backend, width, height, fps,
+                                            reporter, dry_run=args.dry_run, deduplicate=args.deduplicate,
+                                            resource_sampler=sampler, profile=profile,
+                                            config_manager=performance_settings)
+                    if estimate and iteration == 0:
+                        # Only single-process renders are comparable with the estimate
+                        actual_seconds = time.time() - render_start
+                        actual_bytes = (os.path.getsize(output_path)
+                                        if not args.dry_run and os.path.exists(output_path) else None)
+                        result["estimate_error_percent"] = round(
+                            (estimate.seconds - actual_seconds) / max(actual_seconds, 1e-6) * 100.0, 1)
+                        if history:
+                            history.record(estimate, actual_seconds, actual_bytes)
+                if sampler:
+                    sampler.checkpoint(f"render {iteration + 1}")
+
+            if args.cache_budget is not None:
+                result["caches"] = cache_registry.governor.get_stats()
+            if sampler:
+                report = sampler.stop()
+                result["resources"] = report.summary()
+                if args.resources:
+                    report.write(args.resources)
+                if report.findings:
+                    reporter.emit("error", exit_code=EXIT_RESOURCE_GROWTH, **result,
+                                  message="Soak test: " + ", ".join(f.series for f in report.findings) +
+                                          " grew after every render")
+                    return EXIT_RESOURCE_GROWTH
+            reporter.emit("complete", exit_code=EXIT_OK, **result)
+            return EXIT_OK
+
+        except RenderError as e:
+            reporter.emit("error", exit_code=e.exit_code, message=str(e))
+            return e.exit_code
+
+        except KeyboardInterrupt:
+            reporter.emit("error", exit_code=EXIT_CANCELLED, message="Render cancelled")
+            return EXIT_CANCELLED
+
+        except Exception as e:
+            reporter.emit("error", exit_code=EXIT_RENDER_FAILED, message=f"Render failed: {e}")
+            return EXIT_RENDER_FAILED
+
+        finally:
+            if sampler and sampler.running:
+                sampler.stop()
+            if args.trace:
+                write_render_trace(args.trace)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
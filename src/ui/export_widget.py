@@ -14,10 +14,12 @@ from typing import Optional
 
 try:
     from src.core.export_manager import ExportManager, ExportConfiguration
+    from src.core.export_profiles import MASTER_PROFILE
     from src.core.models import Project
     from src.core.validation import ValidationLevel
 except ImportError:
     from export_manager import ExportManager, ExportConfiguration
+    from export_profiles import MASTER_PROFILE
     from models import Project
     from validation import ValidationLevel
 
@@ -72,6 +74,7 @@ class ExportWidget(QWidget):
         self.export_manager.export_failed.connect(self._on_export_failed)
         self.export_manager.export_cancelled.connect(self._on_export_cancelled)
         self.export_manager.validation_completed.connect(self._on_validation_completed)
+        self.export_manager.estimate_ready.connect(self._on_estimate_ready)
         
     def _create_export_settings(self, parent_layout):
         """Create export quality and format settings"""
@@ -83,7 +86,8 @@ class ExportWidget(QWidget):
         quality_layout.addWidget(QLabel("Quality Preset:"))
         
         self.quality_combo = QComboBox()
-        self.quality_combo.addItems(["Low (720p)", "Medium (1080p)", "High (1080p HQ)", "Custom"])
+        self.quality_combo.addItems(["Draft (540p proxy)", "Low (720p)", "Medium (1080p)", "High (1080p HQ)",
+                                     "Custom"])
         self.quality_combo.setCurrentText("Medium (1080p)")
         self.quality_combo.currentTextChanged.connect(self._on_quality_changed)
         quality_layout.addWidget(self.quality_combo)
@@ -173,6 +177,10 @@ class ExportWidget(QWidget):
         self.cleanup_checkbox.setChecked(True)
         output_layout.addWidget(self.cleanup_checkbox)
         
+        self.estimate_checkbox = QCheckBox("Estimate time and file size before exporting")
+        self.estimate_checkbox.setChecked(False)
+        output_layout.addWidget(self.estimate_checkbox)
+        
         parent_layout.addWidget(output_group)
         
     def _create_export_controls(self, parent_layout):
@@ -276,7 +284,10 @@ class ExportWidget(QWidget):
             filename=self.filename_edit.text(),
             format=self.format_combo.currentText(),
             cleanup_temp=self.cleanup_checkbox.isChecked(),
-            quality_preset=self.quality_combo.currentText()
+            preflight_estimate=self.estimate_checkbox.isChecked(),
+            quality_preset=self.quality_combo.currentText(),
+            export_profile=self.export_manager.get_quality_presets().get(
+                self.quality_combo.currentText(), {}).get("profile", MASTER_PROFILE)
         )
     
     def load_project(self, project: Project):
@@ -386,6 +397,18 @@ class ExportWidget(QWidget):
             elif result.level == ValidationLevel.INFO:
                 self.status_display.append(f"INFO: {result.message}")
     
+    def _on_estimate_ready(self, estimate: dict):
+        """Show the preflight estimate before rendering starts."""
+        self.status_display.append(
+            f"Estimated time: {estimate['seconds']:.0f}s "
+            f"({estimate['seconds_low']:.0f}-{estimate['seconds_high']:.0f}s) "
+            f"at {estimate['encoder_fps']:.1f} fps")
+        if estimate.get('output_bytes') is not None:
+            mb = 1024 * 1024
+            self.status_display.append(
+                f"Estimated size: {estimate['output_bytes'] / mb:.1f} MB "
+                f"({estimate['output_bytes_low'] / mb:.1f}-{estimate['output_bytes_high'] / mb:.1f} MB)")
+    
     def _export_completed(self):
         """Legacy method - replaced by _on_export_completed"""
         pass
@@ -0,0 +1,55 @@
+"""
+Shared Test Helpers
+
+A command standing in for FFmpeg and a builder for small in-memory projects,
+used by the render, export and scheduling tests.
+"""
+
+import os
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.append(SRC_DIR)
+
+from core.models import Project, AudioFile, SubtitleFile, SubtitleLine
+
+
+def sink_command(output_path, exit_code=0, expand=False, frame_bytes=None):
+    """
+    Command standing in for FFmpeg: write the frames read from stdin to a file.
+
+    With expand the input is a timestamped frame stream (see
+    timestamped_frames) and the raw output frames are written. With
+    frame_bytes the frame count is reported on stderr like FFmpeg's progress.
+    """
+    script = (
+        "import sys\n"
+        f"sys.path.insert(0, {SRC_DIR!r})\n"
+        "from core.timestamped_frames import expand_frames\n"
+        "data = sys.stdin.buffer.read()\n"
+        f"if {bool(expand)}:\n"
+        "    data = expand_frames(data)\n"
+        f"open({output_path!r}, 'wb').write(data)\n"
+        f"if {frame_bytes or 0}:\n"
+        f"    sys.stderr.write('frame=%d\\n' % (len(data) // {frame_bytes or 1}))\n"
+        f"sys.exit({exit_code})\n"
+    )
+    return [sys.executable, "-c", script]
+
+
+def settings_sink_command(settings, exit_code=0):
+    """sink_command for an export's settings, e.g. as a build_ffmpeg_command side effect"""
+    return sink_command(settings.output_path, exit_code, expand=settings.timestamped_input)
+
+
+def make_project(lines=(), duration=4.0, **kwargs):
+    """
+    Project with an audio track of the given duration.
+
+    lines are SubtitleLines or (start, end) pairs sung as "La"; other keyword
+    arguments (effects, image_file, ...) are passed to Project.
+    """
+    lines = [line if isinstance(line, SubtitleLine) else SubtitleLine(line[0], line[1], "La")
+             for line in lines]
+    return Project(id="test", name="Test Project", audio_file=AudioFile(path="", duration=duration),
+                   subtitle_file=SubtitleFile(path="song.ass", lines=lines), **kwargs)
@@ -0,0 +1,232 @@
+"""
+Unit Tests for the Cache Registry and Memory Governor
+
+Tests registration and statistics of the process's caches, cross-cache
+eviction under the global byte budget, the reaction to memory pressure,
+deferred eviction of texture caches owned by another thread, and the cache
+budget of the headless CLI.
+"""
+
+import unittest
+import gc
+import os
+import io
+import sys
+import json
+import tempfile
+import threading
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import render_cli
+from core.cache_registry import (
+    CacheRegistry, get_cache_registry, DEFAULT_BUDGET_MB,
+    CACHE_PRIORITY_LOW, CACHE_PRIORITY_NORMAL, CACHE_PRIORITY_HIGH
+)
+from core.frame_capture_system import BackgroundFrameCache
+from core.libass_opengl_integration import TextureCache as LibassTextureCache, TextureStreamFrame
+from core.libass_integration import LibassImage
+from core.opengl_subtitle_renderer import TextureCache as SubtitleTextureCache, RenderedSubtitle
+from core.shader_system import ShaderCache
+
+
+MB = 1024 * 1024
+
+ASS_CONTENT = """[Script Info]
+Title: Cache Test
+ScriptType: v4.00+
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 0,0:00:00.00,0:00:00.50,Default,,0,0,0,,{\\\\k25}Hel{\\\\k25}lo
+"""
+
+
+def frame(mb=1):
+    return np.zeros(mb * MB, dtype=np.uint8)
+
+
+def libass_frame(nbytes):
+    image = LibassImage(width=nbytes, height=1, stride=nbytes, bitmap=b"\0" * nbytes,
+                        dst_x=0, dst_y=0, color=0)
+    return TextureStreamFrame(timestamp=0.0, texture=None, libass_images=[image], karaoke_data=None)
+
+
+def rendered_subtitle(width, height):
+    return RenderedSubtitle(texture=None, position=(0.0, 0.0), size=(width, height),
+                            start_time=0.0, end_time=1.0, text="la", style_name="Default")
+
+
+class TestCacheRegistry(unittest.TestCase):
+    """Test CacheRegistry"""
+
+    def test_caches_register_themselves(self):
+        background = BackgroundFrameCache()
+        libass = LibassTextureCache()
+        subtitles = SubtitleTextureCache()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            shaders = ShaderCache(temp_dir)
+
+        names = {id(cache): (name, priority) for name, priority, cache in get_cache_registry().live_caches()}
+        self.assertEqual(names[id(background)], ("background_frames", CACHE_PRIORITY_NORMAL))
+        self.assertEqual(names[id(libass)], ("libass_textures", CACHE_PRIORITY_LOW))
+        self.assertEqual(names[id(subtitles)], ("subtitle_textures", CACHE_PRIORITY_LOW))
+        self.assertEqual(names[id(shaders)], ("shader_index", CACHE_PRIORITY_HIGH))
+
+    def test_stats_report_every_cache(self):
+        registry = CacheRegistry()
+        background = registry.register(BackgroundFrameCache(), "background_frames")
+        background.put(("a", 0, (1, 1)), frame(2))
+        subtitles = registry.register(SubtitleTextureCache(), "subtitle_textures", CACHE_PRIORITY_LOW)
+        subtitles.put("line", rendered_subtitle(100, 50))
+
+        stats = registry.get_stats()
+        self.assertEqual([cache['name'] for cache in stats['caches']], ["background_frames", "subtitle_textures"])
+        self.assertEqual(stats['total_bytes'], 2 * MB + 100 * 50 * 4)
+        self.assertEqual(stats['total_entries'], 2)
+        self.assertEqual(stats['caches'][0]['stats']['hit_count'], 0)
+        self.assertEqual(stats['governor']['budget_bytes'], DEFAULT_BUDGET_MB * MB)
+        self.assertEqual(registry.summary(), {"background_frames": 2 * MB, "subtitle_textures": 20000})
+
+    def test_registrations_are_weak(self):
+        registry = CacheRegistry()
+        registry.register(BackgroundFrameCache(), "background_frames")
+        gc.collect()
+        self.assertEqual(registry.live_caches(), [])
+
+
+class TestMemoryGovernor(unittest.TestCase):
+    """Test MemoryGovernor"""
+
+    def setUp(self):
+        self.registry = CacheRegistry()
+        self.low = self.registry.register(BackgroundFrameCache(), "low", CACHE_PRIORITY_LOW)
+        self.normal = self.registry.register(BackgroundFrameCache(), "normal", CACHE_PRIORITY_NORMAL)
+        for index in range(4):
+            self.low.put(("low", index, (1, 1)), frame())
+            self.normal.put(("normal", index, (1, 1)), frame())
+
+    def test_lowest_priority_is_evicted_first(self):
+        self.registry.governor.set_budget(5 * MB)
+
+        self.assertEqual(self.registry.total_bytes(), 5 * MB)
+        self.assertEqual(len(self.low), 1)
+        self.assertEqual(len(self.normal), 4)
+        self.assertNotIn(("low", 0, (1, 1)), self.low)
+        self.assertIn(("low", 3, (1, 1)), self.low)
+        self.assertEqual(self.registry.governor.get_stats()['evicted_bytes'], 3 * MB)
+
+    def test_eviction_spills_into_higher_priorities(self):
+        self.registry.governor.set_budget(2 * MB)
+        self.assertEqual((len(self.low), len(self.normal)), (0, 2))
+
+    def test_pinned_frames_are_never_evicted(self):
+        self.low.put(("image", 0, (1, 1)), frame(), pin=True)
+        self.registry.governor.set_budget(MB)
+        self.assertEqual(list(self.low.pinned), [("image", 0, (1, 1))])
+        self.assertEqual(len(self.normal), 0)
+
+    def test_memory_pressure_shrinks_below_the_budget(self):
+        governor = self.registry.governor
+        with patch.object(governor, 'memory_pressure', return_value=True):
+            governor.enforce()
+
+        self.assertEqual(self.registry.total_bytes(), 4 * MB)
+        self.assertEqual(governor.get_stats()['pressure_events'], 1)
+
+    def test_growth_past_the_budget_is_evicted(self):
+        """Test caches reporting growth to the shared registry stay in the budget"""
+        governor = get_cache_registry().governor
+        cache = BackgroundFrameCache()
+        try:
+            budget = get_cache_registry().total_bytes() + 3 * MB
+            governor.set_budget(budget)
+            for index in range(6):
+                cache.put(("grow", index, (1, 1)), frame())
+            self.assertLessEqual(get_cache_registry().total_bytes(), budget)
+            self.assertIn(("grow", 5, (1, 1)), cache)
+            self.assertGreater(governor.get_stats()['evicted_bytes'], 0)
+        finally:
+            governor.set_budget(DEFAULT_BUDGET_MB * MB)
+
+
+class TestTextureCacheEviction(unittest.TestCase):
+    """Test eviction of the texture caches"""
+
+    def test_libass_cache_evicts_least_recently_used(self):
+        cache = LibassTextureCache()
+        for key in ("a", "b", "c"):
+            cache.put(key, libass_frame(100))
+        cache.get("a")
+
+        self.assertEqual(cache.evict_bytes(150), 200)
+        self.assertEqual(list(cache.cache), ["a"])
+        self.assertEqual((cache.total_bytes, cache.entry_count), (100, 1))
+
+    def test_eviction_from_another_thread_is_deferred_to_the_owner(self):
+        cache = LibassTextureCache()
+        cache.put("a", libass_frame(100))
+        cache.put("b", libass_frame(100))
+
+        freed = []
+        thread = threading.Thread(target=lambda: freed.append(cache.evict_bytes(100)))
+        thread.start()
+        thread.join()
+
+        self.assertEqual(freed, [0])
+        self.assertEqual(cache.entry_count, 2)
+        cache.put("c", libass_frame(100))
+        self.assertEqual(list(cache.cache), ["b", "c"])
+
+    def test_subtitle_cache_evicts_oldest(self):
+        cache = SubtitleTextureCache()
+        cache.put("a", rendered_subtitle(10, 10))
+        cache.put("b", rendered_subtitle(10, 10))
+
+        self.assertEqual(cache.evict_bytes(1), 400)
+        self.assertEqual(list(cache.textures), ["b"])
+
+    def test_shader_index_is_only_accounted(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ShaderCache(temp_dir)
+            cache.cache_index["glow"] = {"hash": "abc"}
+            self.assertGreater(cache.total_bytes, 0)
+            self.assertEqual(cache.evict_bytes(MB), 0)
+            self.assertEqual(cache.entry_count, 1)
+
+
+class TestCliCacheBudget(unittest.TestCase):
+    """Test --cache-budget of the headless CLI"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.temp_dir.name, "song.ass"), 'w', encoding='utf-8') as f:
+            f.write(ASS_CONTENT)
+        self.project_path = os.path.join(self.temp_dir.name, "project.json")
+        with open(self.project_path, 'w', encoding='utf-8') as f:
+            json.dump({"subtitle_file": "song.ass", "width": 16, "height": 8, "fps": 10.0}, f)
+
+    def tearDown(self):
+        get_cache_registry().governor.set_budget(DEFAULT_BUDGET_MB * MB)
+        self.temp_dir.cleanup()
+
+    def test_cache_report_is_added_to_the_result(self):
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            exit_code = render_cli.main([self.project_path, "--backend", "mock", "--dry-run",
+                                         "--cache-budget", "64"])
+        events = [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+        self.assertEqual(exit_code, render_cli.EXIT_OK)
+        caches = events[-1]["caches"]
+        self.assertEqual(caches["budget_bytes"], 64 * MB)
+        self.assertEqual(set(caches), {"budget_bytes", "peak_bytes", "enforce_count", "evicted_bytes",
+                                       "pressure_events"})
+
+
+if __name__ == '__main__':
+    unittest.main()
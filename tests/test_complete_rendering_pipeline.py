@@ -17,7 +17,7 @@ from PyQt6.QtGui import QImage
 from src.core.complete_rendering_pipeline import (
     CompleteRenderingPipeline, PipelineConfig, PipelineState, PipelineStage,
     SynchronizationMode, create_rendering_pipeline, create_preview_pipeline,
-    create_export_pipeline
+    create_export_pipeline, normalize_time_ranges
 )
 from src.core.models import Project, AudioFile, SubtitleFile, SubtitleLine, SubtitleStyle
 
@@ -205,18 +205,57 @@ def test_karaoke_timing_map_building(app, sample_project, pipeline_config):
     pipeline._build_karaoke_timing_map()
     
     # Check that timing map contains entries for subtitle time ranges
-    timing_timestamps = [ts for ts in pipeline.karaoke_timing_map.keys()]
-    assert len(timing_timestamps) > 0
+    timing_frames = list(pipeline.karaoke_timing_map.keys())
+    assert len(timing_frames) > 0
     
-    # Check that timestamps within subtitle ranges have timing info
-    for timestamp in pipeline.frame_timestamps:
+    # Check that frames within subtitle ranges have timing info
+    for frame_index, timestamp in enumerate(pipeline.frame_timestamps):
         if 1.0 <= timestamp <= 15.0:  # Within subtitle time range
-            if timestamp in pipeline.karaoke_timing_map:
-                assert pipeline.karaoke_timing_map[timestamp] is not None
+            assert frame_index in pipeline.karaoke_timing_map
+            assert pipeline.karaoke_timing_map[frame_index] is not None
+        else:
+            assert pipeline.karaoke_timing_map.get(frame_index) is None
+    
+    # Frame 150 (5.0s) lies on a shared boundary; the later line wins
+    lines = sample_project.subtitle_file.lines
+    assert pipeline.karaoke_timing_map.get(150) is lines[1].karaoke_timing
+    assert pipeline.karaoke_timing_map.timing_at(5.0) is lines[1].karaoke_timing
     
     pipeline.cleanup()
 
 
+def test_karaoke_timing_map_matches_frame_scan():
+    """Test the frame-indexed timing map agrees with scanning every frame per line."""
+    from src.core.karaoke_timing_map import KaraokeTimingMap
+    from src.core.timebase import Timebase
+    
+    timebase = Timebase.from_fps(29.97)
+    frame_times = timebase.frame_times(timebase.frame_count(40.0))
+    lines = [
+        SubtitleLine(start_time=0.5, end_time=4.0, text="a"),
+        SubtitleLine(start_time=3.5, end_time=8.0, text="overlaps a"),
+        SubtitleLine(start_time=9.0, end_time=12.0, text="no timing"),
+        SubtitleLine(start_time=10.0, end_time=10.01, text="shorter than a frame"),
+        SubtitleLine(start_time=20.0, end_time=60.0, text="past the end"),
+    ]
+    for index, line in enumerate(lines):
+        line.karaoke_timing = None if index == 2 else Mock()
+    
+    timing_map = KaraokeTimingMap()
+    timing_map.build(lines, frame_times, timebase)
+    
+    expected = {}
+    for line in lines:
+        if line.karaoke_timing:
+            for frame_index, timestamp in enumerate(frame_times):
+                if line.start_time <= timestamp <= line.end_time:
+                    expected[frame_index] = line.karaoke_timing
+    
+    assert sorted(timing_map.keys()) == sorted(expected.keys())
+    for frame_index, timing in expected.items():
+        assert timing_map.get(frame_index) is timing
+
+
 @patch('src.core.complete_rendering_pipeline.PreviewSynchronizer')
 def test_preview_mode(mock_preview_sync, app, sample_project, pipeline_config):
     """Test preview mode functionality."""
@@ -440,6 +479,51 @@ def test_frame_generation_mock(app, sample_project, pipeline_config):
     pipeline.cleanup()
 
 
+def test_staged_frame_generation(app, sample_project, pipeline_config):
+    """Test staged rendering delivers converted frames to the encoder in order."""
+    pipeline_config.convert_workers = 3
+    pipeline = CompleteRenderingPipeline(pipeline_config)
+    pipeline.current_project = sample_project
+    pipeline._generate_frame_timestamps()
+    pipeline.frame_timestamps = pipeline.frame_timestamps[:20]
+    pipeline.pause_event.set()
+    
+    mock_capture_system = Mock()
+    mock_capture_system.rendering_engine.capture_raw_frame.side_effect = \
+        lambda timestamp: (f"pixels@{timestamp}", 0.001)
+    mock_capture_system.rendering_engine.convert_raw_frame.side_effect = \
+        lambda pixels, timestamp, render_time: Mock(
+            timestamp=timestamp, render_time=render_time, pixels=pixels,
+            to_dict=Mock(return_value={'timestamp': timestamp}))
+    pipeline.frame_capture_system = mock_capture_system
+    
+    mock_effects = Mock()
+    mock_effects.render_frame.return_value = True
+    pipeline.effects_pipeline = mock_effects
+    
+    pipeline.staged_pipeline = pipeline._create_staged_pipeline()
+    pipeline.staged_pipeline.start(pipeline._iter_pending_timestamps())
+    
+    frames = []
+    while True:
+        frame = pipeline._next_staged_frame()
+        if frame is None:
+            break
+        frames.append(frame)
+    
+    assert [frame.timestamp for frame in frames] == list(pipeline.frame_timestamps)
+    assert frames[3].pixels == f"pixels@{pipeline.frame_timestamps[3]}"
+    assert pipeline.state.current_frame == 20
+    assert pipeline.state.frames_rendered == 20
+    assert mock_effects.render_frame.call_count == 20
+    stats = pipeline.get_performance_stats()
+    assert stats['staged_pipeline']['stages']['convert']['workers'] == 3
+    assert stats['metrics']['histograms']['effects_render_seconds']['count'] >= 20
+    assert stats['metrics']['counters']['frames_rendered_total'] >= 20
+    
+    pipeline.cleanup()
+
+
 def test_subtitle_texture_rendering(app, sample_project, pipeline_config):
     """Test subtitle texture rendering."""
     pipeline = CompleteRenderingPipeline(pipeline_config)
@@ -459,6 +543,38 @@ def test_subtitle_texture_rendering(app, sample_project, pipeline_config):
     pipeline.cleanup()
 
 
+def test_raster_stage_makes_no_opengl_calls(app, sample_project, pipeline_config):
+    """Test subtitles are rasterized on the CPU and uploaded by the composite stage."""
+    import numpy as np
+    from src.core.libass_integration import LibassImage
+    
+    pipeline = CompleteRenderingPipeline(pipeline_config)
+    pipeline.current_project = sample_project
+    pipeline.libass_integration = Mock()
+    pipeline.libass_integration.render_subtitle_frame.return_value = [
+        LibassImage(width=4, height=2, stride=4, bitmap=b"\xff" * 8, dst_x=0, dst_y=0, color=0xFF00FFFF)
+    ]
+    pipeline.opengl_context = Mock()
+    
+    timestamp, raster = pipeline._raster_stage(0, 2.5)
+    assert raster.shape == (2, 4, 4)
+    pipeline.opengl_context.create_texture_from_data.assert_not_called()
+    
+    pipeline.effects_pipeline = Mock()
+    pipeline.frame_capture_system = Mock()
+    pipeline.frame_capture_system.rendering_engine.capture_raw_frame.return_value = (
+        np.zeros((2, 2, 4), dtype=np.uint8), 0.0)
+    texture = pipeline.opengl_context.create_texture_from_data.return_value
+    
+    assert pipeline._composite_stage(0, (timestamp, raster)) is not None
+    pipeline.opengl_context.create_texture_from_data.assert_called_once_with(raster)
+    pipeline.effects_pipeline.render_frame.assert_called_once_with(2.5, texture)
+    texture.destroy.assert_called_once()
+    
+    pipeline.opengl_context = None
+    pipeline.cleanup()
+
+
 def test_effects_integration(app, sample_project, pipeline_config):
     """Test effects pipeline integration."""
     pipeline = CompleteRenderingPipeline(pipeline_config)
@@ -506,5 +622,121 @@ def test_signal_emissions(app, sample_project, pipeline_config):
     pipeline.cleanup()
 
 
+def test_normalize_time_ranges(sample_project):
+    """Test render ranges are clamped, snapped to enclosing lines and merged."""
+    lines = sample_project.subtitle_file.lines
+    
+    assert normalize_time_ranges((6.0, 7.0), 30.0) == [(6.0, 7.0)]
+    # 6.0 and 7.0 fall inside the 5-10s line
+    assert normalize_time_ranges((6.0, 7.0), 30.0, lines) == [(5.0, 10.0)]
+    # 4.0 is inside the 1-5s line, 12.0 inside the 10-15s line
+    assert normalize_time_ranges((4.0, 12.0), 30.0, lines) == [(1.0, 15.0)]
+    assert normalize_time_ranges([(25.0, 40.0), (2.0, 3.0), (2.5, 4.0)], 30.0) == \
+        [(2.0, 4.0), (25.0, 30.0)]
+    
+    with pytest.raises(ValueError):
+        normalize_time_ranges((7.0, 6.0), 30.0)
+
+
+def test_clip_render_uses_timeline_frames(app, sample_project, pipeline_config):
+    """Test a clip renders only its frames, with their full-timeline indices and times."""
+    pipeline = CompleteRenderingPipeline(pipeline_config)
+    pipeline.current_project = sample_project
+    pipeline._generate_frame_timestamps()
+    
+    ranges = pipeline.set_render_ranges([(20.0, 21.0), (6.0, 7.0)], snap_to_lines=True)
+    
+    assert ranges == [(5.0, 10.0), (20.0, 21.0)]
+    assert pipeline.state.total_frames == 150 + 30
+    assert pipeline.render_frames[0] == 150
+    assert pipeline.render_frames[150] == 600
+    assert pipeline.audio_ranges == [(5.0, 5.0), (20.0, 1.0)]
+    
+    mock_capture_system = Mock()
+    mock_capture_system.rendering_engine.render_frame_at_timestamp.side_effect = \
+        lambda timestamp: Mock(timestamp=timestamp, to_dict=Mock(return_value={}))
+    pipeline.frame_capture_system = mock_capture_system
+    mock_effects = Mock()
+    mock_effects.render_frame.return_value = True
+    pipeline.effects_pipeline = mock_effects
+    
+    frames = []
+    while True:
+        frame = pipeline._generate_next_frame()
+        if frame is None:
+            break
+        frames.append(frame)
+    
+    assert len(frames) == 180
+    assert frames[0].timestamp == pipeline.frame_timestamps[150]
+    assert frames[150].timestamp == 20.0
+    assert pipeline.state.get_progress_percent() == 100.0
+    
+    pipeline.set_render_ranges(None)
+    assert pipeline.state.total_frames == 900
+    with pytest.raises(ValueError):
+        pipeline.set_render_ranges((40.0, 50.0))
+    
+    pipeline.cleanup()
+
+
+def test_staged_clip_render(app, sample_project, pipeline_config):
+    """Test staged rendering of two ranges reports progress within the clip."""
+    pipeline = CompleteRenderingPipeline(pipeline_config)
+    pipeline.current_project = sample_project
+    pipeline._generate_frame_timestamps()
+    pipeline.set_render_ranges([(1.0, 1.2), (3.0, 3.1)])
+    pipeline.pause_event.set()
+    
+    mock_capture_system = Mock()
+    mock_capture_system.rendering_engine.capture_raw_frame.side_effect = \
+        lambda timestamp: (timestamp, 0.001)
+    mock_capture_system.rendering_engine.convert_raw_frame.side_effect = \
+        lambda pixels, timestamp, render_time: Mock(
+            timestamp=timestamp, render_time=render_time, to_dict=Mock(return_value={}))
+    pipeline.frame_capture_system = mock_capture_system
+    pipeline.effects_pipeline = Mock()
+    
+    pipeline.staged_pipeline = pipeline._create_staged_pipeline()
+    pipeline.staged_pipeline.start(pipeline._iter_pending_timestamps())
+    
+    timestamps = []
+    while True:
+        frame = pipeline._next_staged_frame()
+        if frame is None:
+            break
+        timestamps.append(frame.timestamp)
+    
+    assert timestamps == [pipeline.frame_timestamps[i] for i in [30, 31, 32, 33, 34, 35, 90, 91, 92]]
+    assert pipeline.state.current_frame == 9
+    assert pipeline.state.get_progress_percent() == 100.0
+    
+    pipeline.cleanup()
+
+
+def test_start_rendering_trims_audio_to_range(app, sample_project, pipeline_config):
+    """Test a clip export passes the frame count and audio ranges to the encoder."""
+    pipeline = CompleteRenderingPipeline(pipeline_config)
+    pipeline.current_project = sample_project
+    pipeline._generate_frame_timestamps()
+    pipeline.ffmpeg_processor = Mock()
+    pipeline.ffmpeg_processor.start_encoding.return_value = True
+    
+    assert pipeline.start_rendering("clip.mp4", time_range=(6.0, 7.0), snap_to_lines=True)
+    for _ in range(50):
+        if pipeline.ffmpeg_processor.start_encoding.called:
+            break
+        time.sleep(0.05)
+    pipeline.stop_rendering()
+    
+    settings, _, total_frames, audio_path = pipeline.ffmpeg_processor.start_encoding.call_args[0]
+    assert total_frames == 150
+    assert settings.audio_ranges == [(5.0, 5.0)]
+    assert audio_path.endswith("test.mp3")
+    assert pipeline.get_performance_stats()['pipeline_state']['render_ranges'] == [(5.0, 10.0)]
+    
+    pipeline.cleanup()
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
@@ -5,6 +5,7 @@ Tests the integration between ConfigManager and SettingsManager
 for unified configuration management.
 """
 
+import os
 import pytest
 import tempfile
 import shutil
@@ -295,10 +296,16 @@ class TestConfigIntegrationGlobal:
     def setup_method(self):
         """Set up test environment."""
         reset_config_integration()
+        # The default configuration directory is relative to the working directory
+        self.original_cwd = os.getcwd()
+        self.work_dir = tempfile.mkdtemp()
+        os.chdir(self.work_dir)
     
     def teardown_method(self):
         """Clean up test environment."""
         reset_config_integration()
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.work_dir)
     
     def test_global_instance(self):
         """Test global configuration integration instance."""
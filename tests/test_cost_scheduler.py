@@ -0,0 +1,193 @@
+"""
+Unit Tests for Cost-Aware Render Scheduling
+
+Tests per-frame cost prediction, cutting work units at equal predicted cost,
+work stealing between workers and the prediction error report.
+"""
+
+import unittest
+import os
+import sys
+import json
+import tempfile
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+
+from core.cost_scheduler import (
+    CALIBRATION_VERSION, FrameCostModel, WorkStealingQueue, CostPredictionReport, cost_balanced_cuts
+)
+from core.frame_plan import compile_frame_plan
+from core.metrics import MetricsRegistry, SUBTITLE_RASTER_SECONDS, FRAMEBUFFER_READBACK_SECONDS
+from core.models import SubtitleLine, WordTiming, Effect
+from tests.helpers import make_project
+
+
+def dense_chorus():
+    """Three overlapping, continuously sung lines in the first three seconds"""
+    return [SubtitleLine(0.0, 3.0, "la la", word_timings=[WordTiming("la", 0.0, 3.0)])
+            for _ in range(3)]
+
+
+class TestFrameCostModel(unittest.TestCase):
+    """Test FrameCostModel"""
+
+    def setUp(self):
+        self.model = FrameCostModel(frame_seconds=0.004, line_seconds=0.002, effect_seconds=0.003,
+                                    repeat_seconds=0.0005)
+
+    def test_dense_frames_cost_more_than_gaps(self):
+        """Test sung lines with effects cost over 10x an instrumental gap"""
+        project = make_project(dense_chorus(), duration=10.0, effects=[Effect("glow", "Glow", "glow"),
+                                                        Effect("shadow", "Shadow", "shadow")])
+        costs = self.model.frame_costs(project, compile_frame_plan(project, 10.0))
+
+        self.assertEqual(len(costs), 100)
+        # Gap frames collapse to one render plus pipe writes
+        self.assertAlmostEqual(costs[31], 0.0005 + 0.004)
+        self.assertAlmostEqual(costs[50], 0.0005)
+        self.assertAlmostEqual(costs[0], 0.0005 + 0.004 + 3 * (0.002 + 5.0 * 0.003 + 0.5 * 0.002))
+        self.assertGreater(costs[10] / costs[31], 10)
+
+    def test_without_deduplication_every_frame_renders(self):
+        """Test repeats cost a full render each when frames are not deduplicated"""
+        project = make_project(duration=10.0)
+        plan = compile_frame_plan(project, 10.0)
+        self.assertAlmostEqual(self.model.frame_costs(project, plan).sum(), 0.004 + 100 * 0.0005)
+        self.assertAlmostEqual(self.model.frame_costs(project, plan, deduplicate=False).sum(),
+                               100 * 0.0045)
+
+    def test_from_metrics_uses_measured_stage_timings(self):
+        """Test measured stages replace the defaults and unmeasured ones keep them"""
+        registry = MetricsRegistry()
+        registry.histogram(SUBTITLE_RASTER_SECONDS).record(0.01)
+        registry.histogram(FRAMEBUFFER_READBACK_SECONDS).record(0.02)
+
+        model = FrameCostModel.from_metrics(registry)
+        self.assertAlmostEqual(model.line_seconds, 0.01, places=4)
+        self.assertAlmostEqual(model.frame_seconds, 0.02, places=4)
+        self.assertEqual(model.effect_seconds, FrameCostModel().effect_seconds)
+
+    def test_calibration_fits_scale_and_overhead(self):
+        """Test a model refitted to measurements predicts them"""
+        report = CostPredictionReport()
+        report.add(0, 1.0, 2.5)
+        report.add(1, 3.0, 6.5)
+
+        calibrated = self.model.calibrated(report)
+        self.assertAlmostEqual(calibrated.frame_seconds, 0.008)
+        self.assertAlmostEqual(calibrated.unit_overhead_seconds, 0.5)
+        self.assertAlmostEqual(calibrated.repeat_seconds, 0.001)
+        # Frame costs recomputed with the calibrated model include the scale
+        self.assertAlmostEqual(calibrated.unit_seconds(np.full(10, 0.2), 0, 10), 2.0 + 0.5)
+
+    def test_calibration_is_stored_per_key(self):
+        """Test calibrated models survive a restart and keep other backends' models"""
+        report = CostPredictionReport()
+        report.add(0, 1.0, 2.5)
+        report.add(1, 3.0, 6.5)
+        calibrated = self.model.calibrated(report)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "config", "render_cost_model.json")
+            self.assertIsNone(FrameCostModel.load_calibration(path, "mock"))
+            calibrated.save_calibration(path, "mock")
+            self.model.save_calibration(path, "opengl")
+
+            self.assertEqual(FrameCostModel.load_calibration(path, "mock"), calibrated)
+            self.assertEqual(FrameCostModel.load_calibration(path, "opengl"), self.model)
+            self.assertEqual(FrameCostModel.from_metrics(MetricsRegistry(), calibration_key="mock",
+                                                         calibration_path=path), calibrated)
+            # Without a stored model for the key the metrics are used
+            self.assertEqual(FrameCostModel.from_metrics(MetricsRegistry(), calibration_key="software",
+                                                         calibration_path=path), FrameCostModel())
+
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({"version": CALIBRATION_VERSION + 1, "models": {}}, f)
+            self.assertIsNone(FrameCostModel.load_calibration(path, "mock"))
+
+
+class TestCostBalancedCuts(unittest.TestCase):
+    """Test cost_balanced_cuts"""
+
+    def test_uniform_costs_cut_evenly(self):
+        self.assertEqual(cost_balanced_cuts(np.ones(100), 4), [25, 50, 75])
+        self.assertEqual(cost_balanced_cuts(np.ones(100), 1), [])
+
+    def test_dense_region_gets_shorter_units(self):
+        """Test units are short where frames are expensive"""
+        costs = np.concatenate([np.full(20, 10.0), np.full(80, 1.0)])
+        cuts = cost_balanced_cuts(costs, 2)
+        # Total 280: the first unit ends once 140 is reached, at frame 14
+        self.assertEqual(cuts, [14])
+
+
+class TestWorkStealingQueue(unittest.TestCase):
+    """Test WorkStealingQueue"""
+
+    def test_deals_contiguous_runs_of_equal_cost(self):
+        queue = WorkStealingQueue([(i, 1.0) for i in range(8)], 2)
+        self.assertEqual([unit for unit, _ in queue.queues[0]], [0, 1, 2, 3])
+        self.assertEqual([unit for unit, _ in queue.queues[1]], [4, 5, 6, 7])
+
+        queue = WorkStealingQueue([(0, 6.0), (1, 1.0), (2, 1.0), (3, 1.0), (4, 1.0)], 2)
+        self.assertEqual([unit for unit, _ in queue.queues[0]], [0])
+
+    def test_idle_worker_steals_from_the_back_of_the_busiest(self):
+        queue = WorkStealingQueue([(i, 1.0) for i in range(6)], 3)
+        taken = [queue.next_unit(0), queue.next_unit(0), queue.next_unit(0)]
+
+        # Dealt as [0, 1], [2, 3], [4, 5]; worker 0 then takes the last unit of worker 1
+        self.assertEqual(taken, [0, 1, 3])
+        self.assertEqual(queue.steals, 1)
+        self.assertEqual(queue.next_unit(1), 2)
+        self.assertEqual(queue.taken_by[3], 0)
+        self.assertEqual(queue.remaining_cost(2), 2.0)
+
+    def test_every_unit_is_taken_once_under_contention(self):
+        queue = WorkStealingQueue([(i, float(i % 5 + 1)) for i in range(200)], 4)
+        taken = [[] for _ in range(4)]
+
+        def work(worker):
+            while True:
+                unit = queue.next_unit(worker)
+                if unit is None:
+                    return
+                taken[worker].append(unit)
+
+        threads = [threading.Thread(target=work, args=(w,)) for w in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(sum(taken, [])), list(range(200)))
+        self.assertEqual(len(queue), 0)
+
+
+class TestCostPredictionReport(unittest.TestCase):
+    """Test CostPredictionReport"""
+
+    def test_error_and_imbalance(self):
+        report = CostPredictionReport(steals=2)
+        report.add(0, 1.0, 2.0, worker=0, frames=10)
+        report.add(1, 2.0, 4.0, worker=1, frames=10)
+        report.add(2, 1.0, 2.0, worker=1, frames=10)
+
+        self.assertAlmostEqual(report.mean_absolute_percent_error, 50.0)
+        self.assertAlmostEqual(report.scale, 2.0)
+        # Uniformly off by 2x: relative costs were right
+        self.assertAlmostEqual(report.relative_error_spread, 1.0)
+        self.assertEqual(report.worker_seconds(), {0: 2.0, 1: 6.0})
+        self.assertAlmostEqual(report.imbalance, 1.5)
+
+        text = report.format()
+        self.assertIn("-50.0%", text)
+        self.assertIn("2 steal(s)", text)
+        self.assertEqual(report.to_dict()["steals"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
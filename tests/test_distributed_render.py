@@ -0,0 +1,313 @@
+"""
+Unit Tests for Multi-Host Render Distribution
+
+Tests render packages with content-hashed assets and the coordinator/worker
+protocol on localhost, with worker processes standing in for remote hosts,
+including a worker that dies mid-segment.
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import socket
+import threading
+import multiprocessing
+from unittest.mock import patch, MagicMock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.distributed_render import (
+    RenderCoordinator, RenderWorkerAgent, MessageChannel, build_render_package, project_from_package,
+    file_digest, _settings_from_dict, PROTOCOL_VERSION, DEFAULT_HOST
+)
+from core.enhanced_ffmpeg_integration import EnhancedExportSettings, ContainerFormat, VideoCodec
+from core.models import Project, AudioFile, ImageFile
+from core.subtitle_parser import parse_ass_file
+
+
+ASS_CONTENT = """[Script Info]
+Title: Farm Test
+ScriptType: v4.00+
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Default,Arial,20,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,0,0,0,0,100,100,0,0,1,2,0,2,10,10,10,1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 0,0:00:00.20,0:00:01.70,Default,,0,0,0,,{\\k75}Hel{\\k75}lo
+Dialogue: 0,0:00:02.30,0:00:03.50,Default,,0,0,0,,{\\k60}World
+"""
+
+
+def fake_segment_renderer(task):
+    """Segment renderer standing in for render_segment: writes a marker file"""
+    with open(task.settings.output_path, 'wb') as f:
+        f.write(f"seg{task.index}:{task.start_frame}-{task.end_frame}".encode())
+    return {"index": task.index, "frames": task.end_frame - task.start_frame, "seconds": 0.0,
+            "error": None}
+
+
+def crashing_segment_renderer(task):
+    """Segment renderer for a host that dies mid-render"""
+    os._exit(1)
+
+
+def run_worker(port, cache_dir, name, crash=False):
+    """Worker process entry point"""
+    renderer = crashing_segment_renderer if crash else fake_segment_renderer
+    RenderWorkerAgent("127.0.0.1", port, cache_dir, backend="mock", name=name,
+                      segment_renderer=renderer).run()
+
+
+class DistributedTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.subtitle_path = self.write("song.ass", ASS_CONTENT.encode())
+        self.audio_path = self.write("song.wav", b"RIFF-audio")
+        self.output_path = os.path.join(self.temp_dir.name, "out.mp4")
+        self.settings = EnhancedExportSettings(output_path=self.output_path, width=16, height=8, fps=10.0)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def make_project(self, **media):
+        subtitle_file, errors, _ = parse_ass_file(self.subtitle_path)
+        self.assertEqual(errors, [])
+        return Project(id="farm", name="Farm Test", subtitle_file=subtitle_file,
+                       audio_file=AudioFile(path=self.audio_path, duration=4.0), **media)
+
+    def make_coordinator(self, project=None, **kwargs):
+        coordinator = RenderCoordinator(project or self.make_project(), self.settings, host="127.0.0.1",
+                                        port=0, segment_count=4, gop_seconds=0.5, **kwargs)
+        coordinator.listen()
+        return coordinator
+
+    def render(self, coordinator, timeout=60):
+        """Render with FFmpeg's concat step replaced; returns (result, joined segment contents)"""
+        joined = []
+
+        def concat(cmd, **kwargs):
+            for segment in coordinator.checkpoint.segments:
+                with open(coordinator.checkpoint.segment_path(segment), 'rb') as f:
+                    joined.append(f.read().decode())
+            return MagicMock(returncode=0)
+
+        with patch('core.distributed_render.subprocess.run', side_effect=concat):
+            result = coordinator.render(timeout=timeout)
+        return result, joined
+
+
+class TestRenderPackage(DistributedTestCase):
+    """Test building and unpacking render packages"""
+
+    def test_assets_are_deduplicated_by_content(self):
+        """Test two files with the same content become one asset"""
+        image_path = self.write("cover.png", b"RIFF-audio")
+        project = self.make_project(image_file=ImageFile(path=image_path))
+
+        package, assets = build_render_package(project, self.settings, gop_frames=5)
+
+        media = package["project"]["media"]
+        self.assertEqual(media["audio_file"]["asset"], media["image_file"]["asset"])
+        self.assertEqual(set(assets), {file_digest(self.subtitle_path), file_digest(self.audio_path)})
+        self.assertIsNone(media["video_file"])
+        self.assertEqual(package["project"]["duration"], 4.0)
+
+    def test_worker_rebuilds_project_and_settings(self):
+        """Test a package round-trips through JSON-safe values on the worker side"""
+        self.settings.container_format = ContainerFormat.MKV
+        self.settings.video_codec = VideoCodec.H265
+        package, assets = build_render_package(self.make_project(), self.settings, gop_frames=5)
+
+        project = project_from_package(package, assets)
+        settings = _settings_from_dict(package["settings"])
+
+        self.assertEqual(len(project.subtitle_file.lines), 2)
+        self.assertEqual(project.audio_file.duration, 4.0)
+        self.assertEqual(settings.container_format, ContainerFormat.MKV)
+        self.assertEqual(settings.video_codec, VideoCodec.H265)
+        self.assertEqual(settings.fps, 10.0)
+
+    def test_missing_subtitle_file_is_rejected(self):
+        """Test a project without its subtitle file on disk cannot be distributed"""
+        project = self.make_project()
+        project.subtitle_file.path = os.path.join(self.temp_dir.name, "gone.ass")
+        with self.assertRaises(ValueError):
+            build_render_package(project, self.settings, gop_frames=5)
+
+
+class TestRenderCoordinator(DistributedTestCase):
+    """Test the coordinator with local workers"""
+
+    def start_processes(self, port, crash_flags):
+        context = multiprocessing.get_context("spawn")
+        processes = []
+        for number, crash in enumerate(crash_flags):
+            cache_dir = os.path.join(self.temp_dir.name, f"cache{number}")
+            process = context.Process(target=run_worker, args=(port, cache_dir, f"host{number}", crash))
+            process.start()
+            processes.append(process)
+        return processes
+
+    def start_thread(self, coordinator, cache_dir, renderer=fake_segment_renderer):
+        agent = RenderWorkerAgent("127.0.0.1", coordinator.port, cache_dir, backend="mock",
+                                  name="local", segment_renderer=renderer)
+        thread = threading.Thread(target=agent.run, daemon=True)
+        thread.start()
+        return agent, thread
+
+    def test_worker_processes_share_segments(self):
+        """Test segments from several worker processes are joined in timeline order"""
+        coordinator = self.make_coordinator()
+        processes = self.start_processes(coordinator.port, [False, False])
+
+        result, joined = self.render(coordinator)
+        for process in processes:
+            process.join(10)
+
+        self.assertTrue(result.success, result.error)
+        self.assertEqual(result.output_path, self.output_path)
+        self.assertEqual(result.total_frames, 40)
+        self.assertEqual(sum(s['frames'] for s in result.segments), 40)
+        expected = [f"seg{s.index}:{s.start_frame}-{s.end_frame}" for s in coordinator.checkpoint.segments]
+        self.assertEqual(joined, expected)
+        self.assertEqual(len(joined), 4)
+        self.assertEqual([p.exitcode for p in processes], [0, 0])
+
+    def test_failed_worker_segment_is_reassigned(self):
+        """Test a segment held by a worker that dies is rendered by another worker"""
+        coordinator = self.make_coordinator()
+        crashing = self.start_processes(coordinator.port, [True])
+        crashing[0].join(30)
+        healthy = self.start_processes(coordinator.port, [False])
+
+        result, joined = self.render(coordinator)
+        healthy[0].join(10)
+
+        self.assertTrue(result.success, result.error)
+        self.assertEqual(result.reassigned_segments, 1)
+        self.assertEqual(len(joined), 4)
+        self.assertEqual({s['worker'] for s in result.segments}, {"host0"})
+
+    def test_export_fails_after_max_attempts(self):
+        """Test a segment that keeps failing ends the export with an error"""
+        def broken(task):
+            return {"index": task.index, "frames": 0, "seconds": 0.0, "error": "GPU lost"}
+
+        coordinator = self.make_coordinator(max_attempts=2)
+        _, thread = self.start_thread(coordinator, os.path.join(self.temp_dir.name, "cache"), broken)
+
+        with patch('core.distributed_render.subprocess.run') as run:
+            result = coordinator.render(timeout=30)
+        thread.join(10)
+
+        self.assertFalse(result.success)
+        self.assertIn("GPU lost", result.error)
+        self.assertIn("2 times", result.error)
+        run.assert_not_called()
+
+    def test_cached_assets_are_not_sent_again(self):
+        """Test a worker keeps assets between exports and only fetches new ones"""
+        cache_dir = os.path.join(self.temp_dir.name, "cache")
+        received = []
+        original = RenderWorkerAgent._receive_asset
+
+        def record(agent, channel, extensions):
+            received.append(len(received))
+            return original(agent, channel, extensions)
+
+        with patch.object(RenderWorkerAgent, '_receive_asset', record):
+            coordinator = self.make_coordinator()
+            agent, thread = self.start_thread(coordinator, cache_dir)
+            self.assertTrue(self.render(coordinator)[0].success)
+            thread.join(10)
+            self.assertEqual(len(received), 2)
+            self.assertEqual(agent.segments_rendered, 4)
+
+            self.write("song.wav", b"RIFF-new-mix")
+            coordinator = self.make_coordinator()
+            _, thread = self.start_thread(coordinator, cache_dir)
+            self.assertTrue(self.render(coordinator)[0].success)
+            thread.join(10)
+
+        # Only the changed audio travels the second time
+        self.assertEqual(len(received), 3)
+        self.assertIn(file_digest(self.subtitle_path), agent._cached_assets())
+
+
+class TestProtocolSafety(DistributedTestCase):
+    """Test authentication, version checks and asset name validation"""
+
+    def hello(self, coordinator, **fields):
+        """Send a hello to the coordinator and return its reply"""
+        channel = MessageChannel(socket.create_connection(("127.0.0.1", coordinator.port), timeout=10))
+        try:
+            channel.send(dict({"type": "hello", "worker": "probe", "version": PROTOCOL_VERSION,
+                               "assets": []}, **fields))
+            return channel.receive()
+        finally:
+            channel.close()
+
+    def test_defaults_to_localhost_with_finite_timeout(self):
+        coordinator = RenderCoordinator(self.make_project(), self.settings)
+        self.assertEqual(coordinator.host, DEFAULT_HOST)
+        self.assertGreater(coordinator.segment_timeout, 0)
+        with self.assertRaises(ValueError):
+            RenderCoordinator(self.make_project(), self.settings, host="0.0.0.0")
+        with self.assertRaises(ValueError):
+            RenderCoordinator(self.make_project(), self.settings, segment_timeout=None)
+        self.assertEqual(RenderCoordinator(self.make_project(), self.settings, host="0.0.0.0",
+                                           token="secret").token, "secret")
+
+    def test_workers_without_the_token_or_version_are_rejected(self):
+        coordinator = self.make_coordinator(token="secret")
+        try:
+            self.assertEqual(self.hello(coordinator, token="wrong")["type"], "error")
+            self.assertEqual(self.hello(coordinator)["type"], "error")
+            self.assertEqual(self.hello(coordinator, token="secret", version=PROTOCOL_VERSION + 1)["type"],
+                             "error")
+            self.assertEqual(self.hello(coordinator, token="secret")["type"], "package")
+        finally:
+            coordinator.close()
+
+    def test_worker_with_the_token_renders(self):
+        coordinator = self.make_coordinator(token="secret")
+        agent = RenderWorkerAgent("127.0.0.1", coordinator.port, os.path.join(self.temp_dir.name, "cache"),
+                                  backend="mock", segment_renderer=fake_segment_renderer, token="secret")
+        thread = threading.Thread(target=agent.run, daemon=True)
+        thread.start()
+        result, _ = self.render(coordinator)
+        thread.join(10)
+        self.assertTrue(result.success, result.error)
+        self.assertEqual(agent.segments_rendered, 4)
+
+    def test_asset_names_must_be_hashes(self):
+        agent = RenderWorkerAgent("127.0.0.1", cache_dir=self.temp_dir.name)
+        digest = "ab" * 32
+        self.assertEqual(agent.asset_path(digest, ".wav"), os.path.join(self.temp_dir.name, digest + ".wav"))
+        self.assertEqual(agent.asset_path(digest), os.path.join(self.temp_dir.name, digest))
+        for bad_digest, extension in [("../../etc/passwd", ""), ("AB" * 32, ""), (digest + "0", ""),
+                                      (digest, "/../x"), (digest, ".toolongext"), (digest, "wav")]:
+            with self.assertRaises(ValueError):
+                agent.asset_path(bad_digest, extension)
+
+    def test_unrequested_assets_are_refused(self):
+        agent = RenderWorkerAgent("127.0.0.1", cache_dir=self.temp_dir.name)
+        channel = MagicMock()
+        channel.receive.return_value = {"type": "asset", "hash": "../../evil", "size": 4}
+        with self.assertRaises(ConnectionError):
+            agent._receive_asset(channel, {"ab" * 32: ".wav"})
+        channel.receive_payload.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
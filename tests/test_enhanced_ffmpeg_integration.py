@@ -307,7 +307,26 @@ class TestEnhancedFFmpegProcessor(unittest.TestCase):
             self.assertIn("aac", cmd)
             self.assertIn("-b:a", cmd)
             self.assertIn("128k", cmd)
-    
+
+    def test_build_ffmpeg_command_with_audio_ranges(self):
+        """Test clip exports trim the audio input to the rendered ranges"""
+        settings = EnhancedExportSettings(output_path="clip.mp4", audio_ranges=[(5.0, 2.5)])
+
+        with patch('os.path.exists', return_value=True):
+            cmd = self.processor.build_ffmpeg_command(settings, "song.mp3")
+            audio_input = cmd.index("song.mp3")
+            self.assertEqual(cmd[audio_input - 5:audio_input],
+                             ["-ss", "5.000000", "-t", "2.500000", "-i"])
+            self.assertNotIn("-filter_complex", cmd)
+
+            settings.audio_ranges = [(5.0, 2.5), (60.0, 10.0)]
+            cmd = self.processor.build_ffmpeg_command(settings, "song.mp3")
+            self.assertEqual(cmd.count("song.mp3"), 2)
+            self.assertIn("60.000000", cmd)
+            graph = cmd[cmd.index("-filter_complex") + 1]
+            self.assertEqual(graph, "[1:a][2:a]concat=n=2:v=0:a=1[audio]")
+            self.assertIn("[audio]", cmd)
+
     def test_build_ffmpeg_command_with_hardware_acceleration(self):
         """Test building FFmpeg command with hardware acceleration"""
         settings = EnhancedExportSettings(
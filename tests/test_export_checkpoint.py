@@ -0,0 +1,287 @@
+"""
+Unit Tests for Export Checkpointing
+
+Tests the segment manifest (planning, persistence, invalidation), resuming
+a segmented export in OpenGLExportRenderer after a failure, and retries in
+ExportManager.
+"""
+
+import unittest
+import os
+import sys
+import json
+import tempfile
+import threading
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.export_checkpoint import ExportCheckpoint, project_fingerprint, settings_hash
+from core.opengl_export_renderer import OpenGLExportRenderer, ExportSettings
+from core.export_manager import ExportManager, ExportConfiguration
+from core.models import SubtitleLine
+from tests.helpers import make_project, sink_command
+
+
+def one_line_project(text="Hello"):
+    return make_project([SubtitleLine(0.0, 1.0, text)], duration=1.0)
+
+
+class TestExportCheckpoint(unittest.TestCase):
+    """Test ExportCheckpoint manifest handling"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self.temp_dir.name, "out.mp4")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def create(self, fingerprint="project", digest="settings", total_frames=100):
+        return ExportCheckpoint.load_or_create(self.output_path, fingerprint, digest, total_frames, 30)
+
+    def complete(self, checkpoint, segment):
+        with open(checkpoint.segment_path(segment), 'wb') as f:
+            f.write(b"segment")
+        checkpoint.mark_completed(segment)
+
+    def test_plan_covers_all_frames(self):
+        """Test segments are contiguous and cover every frame once"""
+        checkpoint = self.create()
+        ranges = [(s.start_frame, s.end_frame) for s in checkpoint.segments]
+        self.assertEqual(ranges, [(0, 30), (30, 60), (60, 90), (90, 100)])
+        self.assertTrue(os.path.exists(checkpoint.manifest_path))
+
+    def test_resume_skips_completed_segments(self):
+        """Test a reloaded checkpoint only lists unfinished segments"""
+        checkpoint = self.create()
+        self.complete(checkpoint, checkpoint.segments[0])
+        self.complete(checkpoint, checkpoint.segments[1])
+
+        resumed = self.create()
+        self.assertEqual([s.index for s in resumed.pending_segments()], [2, 3])
+        self.assertEqual(resumed.completed_frames, 60)
+
+    def test_missing_segment_file_is_rendered_again(self):
+        """Test a completed segment whose file is gone becomes pending"""
+        checkpoint = self.create()
+        self.complete(checkpoint, checkpoint.segments[0])
+        os.remove(checkpoint.segment_path(checkpoint.segments[0]))
+
+        self.assertEqual(self.create().pending_segments()[0].index, 0)
+
+    def test_changed_inputs_invalidate_checkpoint(self):
+        """Test a different project, settings or length starts over"""
+        checkpoint = self.create()
+        self.complete(checkpoint, checkpoint.segments[0])
+
+        for changed in ({'fingerprint': "other"}, {'digest': "other"}, {'total_frames': 120}):
+            checkpoint = self.create(**changed)
+            self.assertEqual(checkpoint.completed_frames, 0)
+            self.complete(checkpoint, checkpoint.segments[0])
+
+    def test_concat_command(self):
+        """Test segments are stream-copied and audio is encoded once"""
+        checkpoint = self.create()
+        cmd = checkpoint.build_concat_command("song.mp3", ["-c:a", "aac"], ["-f", "mp4"])
+
+        self.assertEqual(cmd[cmd.index("-f") + 1], "concat")
+        self.assertIn("-c:v", cmd)
+        self.assertEqual(cmd[cmd.index("-c:v") + 1], "copy")
+        self.assertIn("song.mp3", cmd)
+        self.assertEqual(cmd[-1], self.output_path)
+
+        with open(os.path.join(checkpoint.segment_dir, "concat.txt")) as f:
+            self.assertEqual(len(f.read().splitlines()), 4)
+
+    def test_fingerprint_and_settings_hash(self):
+        """Test hashes change with rendered content but not with the output path"""
+        self.assertEqual(project_fingerprint(one_line_project()), project_fingerprint(one_line_project()))
+        self.assertNotEqual(project_fingerprint(one_line_project()), project_fingerprint(one_line_project("Bye")))
+
+        self.assertEqual(settings_hash(ExportSettings(output_path="a.mp4")),
+                         settings_hash(ExportSettings(output_path="b.mp4")))
+        self.assertNotEqual(settings_hash(ExportSettings(output_path="a.mp4")),
+                            settings_hash(ExportSettings(output_path="a.mp4", bitrate=4000)))
+
+
+class TestSegmentedExport(unittest.TestCase):
+    """Test resuming a segmented export in OpenGLExportRenderer"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self.temp_dir.name, "out.mp4")
+        self.settings = ExportSettings(output_path=self.output_path, width=4, height=2, fps=10.0,
+                                       segment_seconds=0.3)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_export(self, failing_segment=None):
+        """Drive an export to completion; returns (rendered timestamps, renderer, concat calls)"""
+        renderer = OpenGLExportRenderer()
+        renderer.current_project = one_line_project()
+        renderer.export_settings = self.settings
+        rendered = []
+        concatenated = []
+
+        def command():
+            segment = renderer.active_segment
+            exit_code = 1 if segment.index == failing_segment else 0
+            return sink_command(renderer.checkpoint.segment_path(segment), exit_code)
+
+        def render(timestamp):
+            rendered.append(round(timestamp, 6))
+            return object()
+
+        with patch.object(renderer, 'validate_export_settings', return_value=[]), \
+             patch.object(renderer, 'build_ffmpeg_command', side_effect=command), \
+             patch.object(renderer, 'render_frame_at_time', side_effect=render), \
+             patch.object(renderer, '_convert_frame_to_raw', return_value=b'\x01' * 32), \
+             patch.object(renderer, '_concatenate_segments',
+                          side_effect=lambda: concatenated.append(True)):
+            self.assertTrue(renderer.start_export_async())
+            if getattr(renderer, 'frame_timer', None):
+                renderer.frame_timer.stop()
+
+            while renderer.is_exporting:
+                renderer._render_next_frame()
+
+        return rendered, renderer, concatenated
+
+    def test_retry_renders_only_remaining_segments(self):
+        """Test a failed segmented export resumes after the last completed segment"""
+        rendered, _, concatenated = self.run_export(failing_segment=2)
+        self.assertEqual(len(rendered), 9)  # Segments 0-2 rendered, segment 2 failed
+        self.assertEqual(concatenated, [])
+
+        with open(os.path.join(f"{self.output_path}.segments", "manifest.json")) as f:
+            manifest = json.load(f)
+        self.assertEqual([s['completed'] for s in manifest['segments']], [True, True, False, False])
+
+        rendered, _, concatenated = self.run_export()
+        self.assertEqual(rendered, [round(i / 10.0, 6) for i in range(6, 10)])
+        self.assertEqual(concatenated, [True])
+
+        segment_dir = f"{self.output_path}.segments"
+        self.assertEqual(os.path.getsize(os.path.join(segment_dir, "segment_00003.mp4")), 32)
+
+    def test_segments_close_off_the_gui_thread(self):
+        """Test the frame timer keeps returning while a finished segment's encoder closes"""
+        renderer = OpenGLExportRenderer()
+        renderer.current_project = one_line_project()
+        renderer.export_settings = self.settings
+        release = threading.Event()
+        closing_threads = []
+
+        def close_ffmpeg():
+            closing_threads.append(threading.current_thread())
+            release.wait(10)
+            return 0
+
+        with patch.object(renderer, 'validate_export_settings', return_value=[]), \
+             patch.object(renderer, 'build_ffmpeg_command',
+                          side_effect=lambda: sink_command(renderer.checkpoint.segment_path(renderer.active_segment))), \
+             patch.object(renderer, 'render_frame_at_time', return_value=object()), \
+             patch.object(renderer, '_convert_frame_to_raw', return_value=b'\x01' * 32), \
+             patch.object(renderer, '_close_ffmpeg', side_effect=close_ffmpeg):
+            self.assertTrue(renderer.start_export_async())
+            if getattr(renderer, 'frame_timer', None):
+                renderer.frame_timer.stop()
+
+            for _ in range(6):
+                renderer._render_next_frame()
+            self.assertTrue(renderer.segment_closer.is_alive())
+            self.assertEqual(renderer.current_frame, 3)  # Nothing rendered while closing
+
+            release.set()
+            renderer.segment_closer.join(5)
+            renderer._render_next_frame()
+
+            self.assertEqual(renderer.active_segment.index, 1)
+            self.assertNotIn(threading.main_thread(), closing_threads)
+            self.assertTrue(renderer.checkpoint.segments[0].completed)
+            renderer._cleanup_export()
+
+    def test_encoder_timeout_fails_the_export(self):
+        """Test an encoder that had to be killed is a failure, not a finished segment"""
+        failures = []
+        with patch.object(OpenGLExportRenderer, '_close_ffmpeg', return_value=None):
+            renderer = OpenGLExportRenderer()
+            renderer.export_failed.connect(failures.append)
+            renderer.current_project = one_line_project()
+            renderer.export_settings = self.settings
+            with patch.object(renderer, 'validate_export_settings', return_value=[]), \
+                 patch.object(renderer, 'build_ffmpeg_command', return_value=sink_command(os.devnull)), \
+                 patch.object(renderer, 'render_frame_at_time', return_value=object()), \
+                 patch.object(renderer, '_convert_frame_to_raw', return_value=b'\x01' * 32):
+                self.assertTrue(renderer.start_export_async())
+                if getattr(renderer, 'frame_timer', None):
+                    renderer.frame_timer.stop()
+                while renderer.is_exporting:
+                    renderer._render_next_frame()
+            checkpoint = renderer.checkpoint
+            renderer._cleanup_export()
+
+        self.assertEqual(failures, ["FFmpeg failed on segment 0 (timed out)"])
+        self.assertFalse(any(segment.completed for segment in checkpoint.segments))
+
+    def test_segment_command_is_closed_gop_and_video_only(self):
+        """Test segment encoders write video-only closed-GOP files"""
+        renderer = OpenGLExportRenderer()
+        renderer.current_project = one_line_project()
+        renderer.export_settings = self.settings
+        renderer.checkpoint = ExportCheckpoint.load_or_create(self.output_path, "p", "s", 10, 3)
+        renderer.active_segment = renderer.checkpoint.segments[1]
+
+        cmd = renderer.build_ffmpeg_command()
+
+        self.assertIn("+cgop", cmd)
+        self.assertNotIn("song.mp3", cmd)
+        self.assertNotIn("+faststart", cmd)
+        self.assertEqual(cmd[-1], renderer.checkpoint.segment_path(renderer.checkpoint.segments[1]))
+
+
+class TestExportManagerResume(unittest.TestCase):
+    """Test ExportManager retries resume from the checkpoint"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config = ExportConfiguration(output_dir=self.temp_dir.name, filename="out.mp4",
+                                          fps=10.0, segment_seconds=0.3)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_segments_are_off_by_default(self):
+        self.assertEqual(ExportConfiguration().segment_seconds, 0)
+        self.assertEqual(ExportConfiguration().to_export_settings().segment_seconds, 0)
+
+    def test_retry_resumes_after_completed_segments(self):
+        """Test a retry skips the preflight and starts progress at the encoded frames"""
+        output_path = self.config.to_export_settings().output_path
+        checkpoint = ExportCheckpoint.load_or_create(output_path, "p", "s", 10, 3)
+        for segment in checkpoint.segments[:2]:
+            checkpoint.mark_completed(segment)
+
+        manager = ExportManager()
+        manager.set_project(one_line_project())
+        manager.export_config = self.config
+        self.config.preflight_estimate = True
+        with patch('core.export_manager.time.sleep'), \
+             patch('core.export_manager.PYQT_AVAILABLE', False), \
+             patch.object(manager, 'validate_export_requirements', return_value=[]), \
+             patch.object(manager, 'estimate_export') as estimate, \
+             patch.object(manager, '_setup_export', return_value=True), \
+             patch.object(manager, '_start_mock_export'), \
+             patch.object(manager.opengl_renderer, 'start_export_async', return_value=True):
+            self.assertTrue(manager.retry_export())
+
+        estimate.assert_not_called()
+        self.assertEqual(manager.progress_info.total_frames, 10)
+        self.assertEqual(manager.progress_info.current_frame, 6)
+        manager._stop_progress_monitoring()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,302 @@
+"""
+Unit Tests for Preflight Export Estimation
+
+Tests stratified sample planning, extrapolation with confidence bounds,
+calibration from the estimate history, and the preflight estimate of the
+headless CLI and the export manager.
+"""
+
+import unittest
+import os
+import io
+import sys
+import json
+import time
+import tempfile
+import threading
+import statistics
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import render_cli
+from core.export_estimator import (
+    PreflightEstimator, EstimateHistory, ExportEstimate, SampleClip, _stratified_total,
+    STRATUM_GAP, STRATUM_LINES, STRATUM_HEAVY, SINGLE_CLIP_RELATIVE_ERROR
+)
+from core.export_manager import ExportManager, ExportConfiguration
+from core.validation import ValidationResult, ValidationLevel
+from core.enhanced_ffmpeg_integration import EnhancedFFmpegProcessor, EnhancedExportSettings
+from core.cost_scheduler import FrameCostModel
+from core.models import SubtitleLine, WordTiming
+from tests.helpers import make_project, settings_sink_command
+
+
+ASS_CONTENT = """[Script Info]
+Title: Estimate Test
+ScriptType: v4.00+
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 0,0:00:01.00,0:00:02.00,Default,,0,0,0,,{\\\\k50}Hel{\\\\k50}lo
+"""
+
+
+def sink_encoder():
+    return (patch.object(EnhancedFFmpegProcessor, 'validate_settings', return_value=[]),
+            patch.object(EnhancedFFmpegProcessor, 'build_ffmpeg_command',
+                         side_effect=lambda settings, audio=None: settings_sink_command(settings)))
+
+
+def estimate_lines():
+    """Alternating gaps, single lines and a dense chorus of three sung lines"""
+    lines = [SubtitleLine(2.0 + i * 3, 4.0 + i * 3, "la la") for i in range(3)]
+    return lines + [SubtitleLine(12.0, 16.0, "la la", word_timings=[WordTiming("la", 12.0, 16.0)])
+                     for _ in range(3)]
+
+
+def make_estimator(project=None, history=None, **kwargs):
+    settings = EnhancedExportSettings(output_path="out.mp4", width=32, height=16, fps=10.0)
+    project = project or make_project(estimate_lines(), duration=20.0)
+    return PreflightEstimator(project, settings, backend="mock", sample_seconds=4.0,
+                              cost_model=FrameCostModel(), history=history, **kwargs)
+
+
+class TestSamplePlanning(unittest.TestCase):
+    """Test stratified clip selection"""
+
+    def test_clips_cover_every_stratum_and_stay_inside_it(self):
+        estimator = make_estimator()
+        clips, frame_counts = estimator.plan_samples()
+        strata = estimator._frame_strata()
+
+        self.assertEqual(sum(frame_counts.values()), 200)
+        self.assertIn(frame_counts[STRATUM_HEAVY], (40, 41))  # The chorus, 12-16s
+        self.assertEqual({clip.stratum for clip in clips}, {STRATUM_GAP, STRATUM_LINES, STRATUM_HEAVY})
+        for clip in clips:
+            self.assertGreater(clip.frames, 0)
+            self.assertEqual(len(set(strata[clip.start_frame:clip.end_frame])), 1)
+
+        heavy = [clip for clip in clips if clip.stratum == STRATUM_HEAVY]
+        self.assertEqual(len(heavy), 2)
+        self.assertNotEqual(heavy[0].start_frame, heavy[1].start_frame)
+
+    def test_project_without_lines_is_all_gap(self):
+        project = make_project(duration=5.0)
+        clips, frame_counts = make_estimator(project).plan_samples()
+
+        self.assertEqual(frame_counts[STRATUM_GAP], 50)
+        self.assertEqual({clip.stratum for clip in clips}, {STRATUM_GAP})
+
+
+class TestExtrapolation(unittest.TestCase):
+    """Test stratified totals and their standard error"""
+
+    def test_totals_weight_strata_by_frame_count(self):
+        clips = [SampleClip(STRATUM_GAP, 0, 10, seconds=0.1), SampleClip(STRATUM_GAP, 50, 60, seconds=0.1),
+                 SampleClip(STRATUM_LINES, 20, 30, seconds=1.0), SampleClip(STRATUM_LINES, 70, 80, seconds=1.0)]
+        total, error = _stratified_total(clips, {STRATUM_GAP: 1000, STRATUM_LINES: 100},
+                                         lambda clip: clip.seconds)
+
+        self.assertAlmostEqual(total, 1000 * 0.01 + 100 * 0.1)
+        self.assertAlmostEqual(error, 0.0)
+
+    def test_spread_between_clips_widens_the_error(self):
+        clips = [SampleClip(STRATUM_LINES, 0, 10, seconds=0.5), SampleClip(STRATUM_LINES, 20, 30, seconds=1.5),
+                 SampleClip(STRATUM_HEAVY, 40, 50, seconds=2.0)]
+        total, error = _stratified_total(clips, {STRATUM_LINES: 100, STRATUM_HEAVY: 100},
+                                         lambda clip: clip.seconds)
+
+        self.assertAlmostEqual(total, 100 * 0.1 + 100 * 0.2)
+        lines_std = statistics.stdev([0.05, 0.15])
+        lines_variance = 100 ** 2 * lines_std ** 2 / 2
+        # The single heavy clip borrows the relative spread of the lines stratum
+        heavy_variance = (20.0 * lines_std / 0.1) ** 2
+        self.assertAlmostEqual(error, (lines_variance + heavy_variance) ** 0.5)
+
+    def test_single_clips_use_the_default_spread(self):
+        clips = [SampleClip(STRATUM_GAP, 0, 10, seconds=1.0)]
+        total, error = _stratified_total(clips, {STRATUM_GAP: 100}, lambda clip: clip.seconds)
+
+        self.assertAlmostEqual(total, 10.0)
+        self.assertAlmostEqual(error, 10.0 * SINGLE_CLIP_RELATIVE_ERROR)
+
+
+class TestPreflightEstimator(unittest.TestCase):
+    """Test estimates from sample renders"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.history_path = os.path.join(self.temp_dir.name, "history.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_encoded_sample_extrapolates_time_and_size(self):
+        validate, build = sink_encoder()
+        with validate, build:
+            estimate = make_estimator().estimate()
+
+        self.assertTrue(estimate.encoded)
+        self.assertEqual(estimate.total_frames, 200)
+        self.assertLess(estimate.sampled_frames, estimate.total_frames)
+        self.assertLessEqual(estimate.seconds_low, estimate.seconds)
+        self.assertLessEqual(estimate.seconds, estimate.seconds_high)
+        self.assertGreater(estimate.encoder_fps, 0)
+        # The stand-in encoder stores raw RGBA frames, so every output frame has the same size
+        self.assertEqual(estimate.output_bytes, 200 * 32 * 16 * 4)
+        self.assertEqual([stratum["name"] for stratum in estimate.strata],
+                         [STRATUM_GAP, STRATUM_LINES, STRATUM_HEAVY])
+
+    def test_falls_back_to_render_timing_when_the_encoder_fails(self):
+        with patch.object(EnhancedFFmpegProcessor, 'validate_settings', return_value=["no encoder"]):
+            estimate = make_estimator().estimate()
+
+        self.assertFalse(estimate.encoded)
+        self.assertIsNone(estimate.output_bytes)
+        self.assertGreater(estimate.seconds, 0)
+        self.assertTrue(estimate.history_key.endswith("/render"))
+
+    def test_history_calibrates_later_estimates(self):
+        """Test recorded outcomes scale the estimate by the median actual/estimated ratio"""
+        history = EstimateHistory(self.history_path)
+        raw = make_estimator(encode=False).estimate()
+        for ratio in (1.8, 2.0, 2.2):
+            history.record(raw, raw.raw_seconds * ratio)
+
+        reloaded = EstimateHistory(self.history_path)
+        self.assertEqual(len(reloaded.entries), 3)
+        calibration = reloaded.calibration(raw.history_key)
+        self.assertEqual(calibration.entries, 3)
+        self.assertAlmostEqual(calibration.time_ratio, 2.0)
+
+        estimate = make_estimator(history=reloaded, encode=False).estimate()
+        self.assertAlmostEqual(estimate.seconds, estimate.raw_seconds * 2.0)
+        self.assertGreater(estimate.seconds_high, estimate.seconds)
+
+    def test_history_needs_enough_entries(self):
+        history = EstimateHistory(self.history_path)
+        history.record(ExportEstimate(100, 10, 1.0, 1.0, 1.0, raw_seconds=1.0, history_key="a"), 5.0)
+        self.assertEqual(history.calibration("a").time_ratio, 1.0)
+        self.assertEqual(history.calibration("a").entries, 0)
+
+
+class TestCliEstimate(unittest.TestCase):
+    """Test --estimate of the headless CLI"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.temp_dir.name, "song.ass"), 'w', encoding='utf-8') as f:
+            f.write(ASS_CONTENT)
+        self.project_path = os.path.join(self.temp_dir.name, "project.json")
+        with open(self.project_path, 'w', encoding='utf-8') as f:
+            json.dump({"subtitle_file": "song.ass", "width": 16, "height": 8, "fps": 10.0}, f)
+        self.history_path = os.path.join(self.temp_dir.name, "estimates.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_cli(self, *args):
+        stdout = io.StringIO()
+        validate, build = sink_encoder()
+        with validate, build, redirect_stdout(stdout):
+            exit_code = render_cli.main([self.project_path, "--backend", "mock",
+                                         "--estimate-history", self.history_path] + list(args))
+        return exit_code, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def test_estimate_only_reports_before_rendering(self):
+        exit_code, events = self.run_cli("--dry-run", "--estimate-only")
+
+        self.assertEqual(exit_code, render_cli.EXIT_OK)
+        self.assertEqual([event["event"] for event in events], ["estimate", "complete"])
+        self.assertEqual(events[0]["total_frames"], 20)
+        self.assertFalse(os.path.exists(self.history_path))
+
+    def test_estimated_export_is_recorded(self):
+        output_path = os.path.join(self.temp_dir.name, "out.mp4")
+        exit_code, events = self.run_cli("-o", output_path, "--estimate")
+
+        self.assertEqual(exit_code, render_cli.EXIT_OK)
+        self.assertEqual(events[0]["event"], "estimate")
+        self.assertEqual(events[1]["event"], "start")
+        self.assertEqual(events[0]["output_bytes"], 20 * 16 * 8 * 4)
+        self.assertIn("estimate_error_percent", events[-1])
+
+        with open(self.history_path, encoding='utf-8') as f:
+            entries = json.load(f)
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]["actual_bytes"], os.path.getsize(output_path))
+        self.assertEqual(entries[0]["estimated_bytes"], events[0]["output_bytes"])
+
+
+class TestExportManagerEstimate(unittest.TestCase):
+    """Test the export manager's preflight estimate"""
+
+    def test_estimate_is_emitted_and_recorded(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = ExportManager()
+            manager.estimate_history_path = os.path.join(temp_dir, "estimates.json")
+            manager.set_project(make_project(estimate_lines(), duration=5.0))
+            received = []
+            manager.estimate_ready.connect(received.append)
+
+            config = ExportConfiguration(width=32, height=16, fps=10.0, output_dir=temp_dir,
+                                         preflight_backend="mock")
+            with patch.object(EnhancedFFmpegProcessor, 'validate_settings', return_value=["no encoder"]):
+                estimate = manager.estimate_export(config)
+
+            self.assertIs(manager.last_estimate, estimate)
+            self.assertEqual(received[0]["total_frames"], 50)
+            # Without an encoder the size comes from the configured bitrate
+            self.assertEqual(estimate.output_bytes, 8000 * 1000 * 5 // 8)
+
+            output_path = os.path.join(temp_dir, "karaoke_video.mp4")
+            with open(output_path, 'wb') as f:
+                f.write(b"x" * 1000)
+            manager.progress_info.elapsed_time = 3.0
+            manager._record_estimate_outcome(output_path)
+
+            entries = EstimateHistory(manager.estimate_history_path).entries
+            self.assertEqual((entries[0]["actual_seconds"], entries[0]["actual_bytes"]), (3.0, 1000))
+            self.assertIsNone(manager.last_estimate)
+
+    def test_preflight_runs_before_validation_off_the_gui_thread(self):
+        """Test start_export estimates on a worker thread and validation sees the estimate"""
+        from PyQt6.QtCore import QCoreApplication
+        application = QCoreApplication.instance() or QCoreApplication([])
+        manager = ExportManager()
+        manager.set_project(make_project(estimate_lines(), duration=5.0))
+        estimate = ExportEstimate(total_frames=50, sampled_frames=10, seconds=2.0, seconds_low=1.0,
+                                  seconds_high=3.0, output_bytes=100, output_bytes_low=80, output_bytes_high=123)
+        estimate_threads = []
+        seen_by_validation = []
+
+        def run_estimate(*args, **kwargs):
+            estimate_threads.append(threading.current_thread())
+            return estimate
+
+        def validate(config):
+            seen_by_validation.append((manager.last_estimate, threading.current_thread()))
+            return [ValidationResult(level=ValidationLevel.ERROR, message="stop here", suggestion="")]
+
+        received = []
+        manager.estimate_ready.connect(received.append)
+        config = ExportConfiguration(preflight_estimate=True, preflight_backend="mock")
+        with patch('core.export_manager.estimate_export', side_effect=run_estimate), \
+             patch.object(manager, 'validate_export_requirements', side_effect=validate):
+            self.assertTrue(manager.start_export(config))
+            self.assertFalse(manager.start_export(config))  # Still estimating
+            deadline = time.time() + 10
+            while manager.preflight_thread and time.time() < deadline:
+                application.processEvents()
+                time.sleep(0.01)
+
+        self.assertIsNone(manager.preflight_thread)
+        self.assertNotIn(threading.main_thread(), estimate_threads)
+        self.assertEqual(seen_by_validation, [(estimate, threading.main_thread())])
+        self.assertEqual(received, [estimate.to_dict()])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,253 @@
+"""
+Unit Tests for Export Profiles
+
+Tests the draft proxy profiles (output size and frame rate, encoder and
+effect settings), the process-wide background cache reused by drafts, and
+the draft profile in the export manager presets, the rendering pipeline
+and the headless CLI.
+"""
+
+import unittest
+import os
+import io
+import sys
+import json
+import tempfile
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import render_cli
+from core.export_profiles import (
+    ExportProfile, get_export_profile, scale_effect_parameters,
+    MASTER_PROFILE, DRAFT_PROFILE, DRAFT_QUARTER_PROFILE
+)
+from core.export_manager import ExportManager, ExportConfiguration
+from core.enhanced_ffmpeg_integration import EnhancedExportSettings, FFmpegPreset
+from core.frame_capture_system import (
+    FrameCaptureSettings, FrameRenderingEngine, stream_video_frames, get_shared_background_cache
+)
+from core.effects_manager import EffectType
+from core.opengl_export_renderer import OpenGLExportRenderer
+from core.opengl_subtitle_renderer import OpenGLSubtitleRenderer
+from core.complete_rendering_pipeline import create_draft_pipeline
+from core.opengl_context import create_headless_context
+from core.models import Project, AudioFile, ImageFile
+
+
+ASS_CONTENT = """[Script Info]
+Title: Draft Test
+ScriptType: v4.00+
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 0,0:00:01.00,0:00:02.00,Default,,0,0,0,,{\\\\k50}Hel{\\\\k50}lo
+"""
+
+
+class TestExportProfile(unittest.TestCase):
+    """Test ExportProfile"""
+
+    def test_draft_output_size_is_scaled_and_even(self):
+        self.assertEqual(get_export_profile(DRAFT_PROFILE).output_size(1920, 1080), (960, 540))
+        self.assertEqual(get_export_profile(DRAFT_QUARTER_PROFILE).output_size(1920, 1080), (480, 270))
+        self.assertEqual(get_export_profile(DRAFT_PROFILE).output_size(1278, 718), (640, 360))
+        self.assertEqual(get_export_profile(DRAFT_QUARTER_PROFILE).output_size(4, 4), (2, 2))
+
+    def test_output_fps_is_an_integer_fraction_of_the_source(self):
+        draft = get_export_profile(DRAFT_PROFILE)
+        self.assertEqual(draft.output_fps(30.0), 15.0)
+        self.assertEqual(draft.output_fps(60.0), 15.0)
+        self.assertEqual(draft.output_fps(50.0), 12.5)
+        self.assertAlmostEqual(draft.output_fps(30000 / 1001), 15000 / 1001)
+        self.assertEqual(draft.output_fps(12.0), 12.0)
+
+    def test_master_changes_nothing(self):
+        master = get_export_profile(MASTER_PROFILE)
+        settings = EnhancedExportSettings(width=1920, height=1080, fps=30.0, bitrate=8000)
+        applied = master.apply(settings)
+
+        self.assertEqual(applied, settings)
+        self.assertFalse(master.is_draft)
+
+    def test_draft_apply_configures_encoder_on_a_copy(self):
+        settings = EnhancedExportSettings(width=1920, height=1080, fps=30.0, bitrate=8000)
+        applied = get_export_profile(DRAFT_PROFILE).apply(settings)
+
+        self.assertEqual((applied.width, applied.height, applied.fps), (960, 540, 15.0))
+        self.assertEqual(applied.preset, FFmpegPreset.ULTRAFAST)
+        self.assertEqual(applied.crf, 30)
+        self.assertIsNone(applied.bitrate)
+        self.assertEqual(applied.audio_bitrate, 96)
+        self.assertEqual((settings.width, settings.bitrate), (1920, 8000))
+
+    def test_configure_capture(self):
+        settings = get_export_profile(DRAFT_PROFILE).configure_capture(FrameCaptureSettings())
+        self.assertEqual(settings.effect_quality, 0.5)
+        self.assertEqual(settings.quality, 1.0)  # Captured frames are not downscaled
+        self.assertTrue(settings.reuse_cached_rasters)
+
+    def test_unknown_profile(self):
+        with self.assertRaises(ValueError):
+            get_export_profile("preview")
+
+    def test_scale_effect_parameters(self):
+        params = {'radius': 6.0, 'width': 3.0, 'blur_radius': 0.6, 'intensity': 0.8, 'color': [1.0, 1.0, 0.0]}
+        scaled = scale_effect_parameters(params, 0.5)
+
+        self.assertEqual(scaled, {'radius': 3.0, 'width': 1.5, 'blur_radius': 0.5, 'intensity': 0.8,
+                                  'color': [1.0, 1.0, 0.0]})
+        self.assertEqual(params['radius'], 6.0)
+        self.assertEqual(scale_effect_parameters(params, 1.0), params)
+
+
+class TestDraftEffectQuality(unittest.TestCase):
+    """Test that draft effect quality reaches the rendered effect uniforms"""
+
+    def test_frame_rendering_engine_scales_effect_uniforms(self):
+        settings = get_export_profile(DRAFT_PROFILE).configure_capture(
+            FrameCaptureSettings(width=16, height=8, fps=10.0))
+        context = create_headless_context("mock", 16, 8)
+        engine = FrameRenderingEngine(context)
+        try:
+            self.assertTrue(engine.initialize(Project(id="draft", name="Draft"), settings))
+            engine.effects_pipeline.add_effect_layer(EffectType.GLOW, {'radius': 6.0})
+            engine.effects_pipeline.add_effect_layer(EffectType.OUTLINE, {'width': 3.0})
+            engine.subtitle_renderer.add_effect("shadow", {'blur_radius': 4.0})
+
+            uniforms = engine.effects_pipeline.effects_manager.get_effect_uniforms()
+            self.assertEqual((uniforms['glowRadius'], uniforms['outlineWidth']), (3.0, 1.5))
+            self.assertEqual(engine.subtitle_renderer.effects_manager.get_effect_uniforms()['shadowBlur'], 2.0)
+            # The authored parameters are kept for editing
+            layer = engine.effects_pipeline.effects_manager.get_active_effects()[0]
+            self.assertEqual(layer.effect.parameters['radius'], 6.0)
+        finally:
+            engine.cleanup()
+            context.cleanup()
+
+    def test_export_renderer_scales_effect_uniforms(self):
+        config = ExportManager().apply_quality_preset("Draft (540p proxy)", ExportConfiguration(fps=30.0))
+        settings = config.to_export_settings()
+        self.assertEqual((settings.effect_quality, settings.reuse_cached_rasters), (0.5, True))
+
+        renderer = OpenGLExportRenderer()
+        renderer.export_settings = settings
+        with patch.object(OpenGLSubtitleRenderer, "initialize_opengl", return_value=True):
+            self.assertTrue(renderer.initialize_subtitle_renderer())
+        renderer.subtitle_renderer.add_effect("glow", {'radius': 6.0})
+        self.assertEqual(renderer.subtitle_renderer.effects_manager.get_effect_uniforms()['glowRadius'], 3.0)
+
+        master = ExportConfiguration().to_export_settings()
+        self.assertEqual((master.effect_quality, master.reuse_cached_rasters), (1.0, False))
+
+
+class TestSharedBackgroundCache(unittest.TestCase):
+    """Test raster reuse across exports"""
+
+    def setUp(self):
+        get_shared_background_cache().clear()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project = Project(id="draft", name="Draft",
+                               audio_file=AudioFile(path="", duration=0.5),
+                               image_file=ImageFile(path=os.path.join(self.temp_dir.name, "missing.png")))
+
+    def tearDown(self):
+        get_shared_background_cache().clear()
+        self.temp_dir.cleanup()
+
+    def export(self, reuse):
+        settings = FrameCaptureSettings(width=16, height=8, fps=10.0, reuse_cached_rasters=reuse)
+        context = create_headless_context("mock", 16, 8)
+        frames = stream_video_frames(self.project, settings, context)
+        try:
+            return len(list(frames))
+        finally:
+            frames.close()
+            context.cleanup()
+
+    def test_draft_re_export_reuses_decoded_backgrounds(self):
+        cache = get_shared_background_cache()
+        self.assertEqual(self.export(reuse=True), 5)
+        self.assertEqual(len(cache), 1)
+        misses = cache.miss_count
+
+        self.export(reuse=True)
+        self.assertEqual(cache.miss_count, misses)
+        self.assertEqual(len(cache), 1)
+
+    def test_master_exports_keep_their_own_cache(self):
+        self.export(reuse=False)
+        self.assertEqual(len(get_shared_background_cache()), 0)
+
+
+class TestDraftExportSettings(unittest.TestCase):
+    """Test the draft profile in the export manager and the pipeline"""
+
+    def test_quality_presets_offer_drafts(self):
+        manager = ExportManager()
+        presets = manager.get_quality_presets()
+        self.assertEqual(presets["Draft (540p proxy)"]["profile"], DRAFT_PROFILE)
+        self.assertEqual(presets["Draft (270p proxy)"]["profile"], DRAFT_QUARTER_PROFILE)
+
+        config = manager.apply_quality_preset("Draft (540p proxy)", ExportConfiguration(fps=30.0))
+        self.assertEqual((config.width, config.height, config.export_profile), (960, 540, DRAFT_PROFILE))
+
+        settings = config.to_export_settings()
+        self.assertEqual((settings.fps, settings.preset, settings.crf), (15.0, "ultrafast", 30))
+
+        config = manager.apply_quality_preset("High (1080p HQ)", config)
+        settings = config.to_export_settings()
+        self.assertEqual(config.export_profile, MASTER_PROFILE)
+        self.assertEqual((settings.fps, settings.preset, settings.crf), (30.0, "medium", None))
+
+    def test_draft_pipeline_config(self):
+        pipeline = create_draft_pipeline(1920, 1080, 30.0)
+        config = pipeline.config
+
+        self.assertEqual((config.width, config.height, config.fps), (960, 540, 15.0))
+        self.assertEqual(config.export_profile, DRAFT_PROFILE)
+        self.assertEqual(config.effect_quality, 0.5)
+        self.assertTrue(config.reuse_cached_rasters)
+        self.assertFalse(config.enable_antialiasing)
+
+
+class TestCliDraftProfile(unittest.TestCase):
+    """Test --profile of the headless CLI"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.temp_dir.name, "song.ass"), 'w', encoding='utf-8') as f:
+            f.write(ASS_CONTENT)
+        self.project_path = os.path.join(self.temp_dir.name, "project.json")
+        with open(self.project_path, 'w', encoding='utf-8') as f:
+            json.dump({"subtitle_file": "song.ass", "width": 32, "height": 16, "fps": 30.0}, f)
+
+    def tearDown(self):
+        get_shared_background_cache().clear()
+        self.temp_dir.cleanup()
+
+    def run_cli(self, *args):
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            exit_code = render_cli.main(list(args))
+        return exit_code, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def test_draft_profile_scales_the_render(self):
+        exit_code, events = self.run_cli(self.project_path, "--backend", "mock", "--dry-run",
+                                         "--profile", "draft")
+
+        self.assertEqual(exit_code, render_cli.EXIT_OK)
+        start = events[0]
+        self.assertEqual((start["width"], start["height"], start["fps"]), (16, 8, 15.0))
+        self.assertEqual(start["profile"], DRAFT_PROFILE)
+        self.assertEqual(events[-1]["frames"], 30)
+
+    def test_unknown_profile_is_a_usage_error(self):
+        with self.assertRaises(SystemExit) as raised:
+            self.run_cli(self.project_path, "--profile", "preview")
+        self.assertEqual(raised.exception.code, render_cli.EXIT_USAGE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,7 @@ and frame rate synchronization functionality.
 """
 
 import unittest
+import io
 import time
 import numpy as np
 from unittest.mock import Mock, patch, MagicMock
@@ -18,10 +19,11 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from core.frame_capture_system import (
     FrameCaptureSystem, FrameRenderingEngine, FrameCaptureSettings,
-    PixelFormat, FrameTimestamp, CapturedFrame, create_frame_capture_system,
-    capture_video_frames
+    PixelFormat, FrameTimestamp, CapturedFrame, BackgroundFrameCache, FrameStream, SequentialVideoDecoder,
+    create_frame_capture_system, capture_video_frames
 )
 from core.opengl_context import OpenGLContext, ContextBackend
+from core.timebase import Timebase
 from core.models import Project, AudioFile, VideoFile, ImageFile, SubtitleFile
 
 
@@ -370,21 +372,49 @@ class TestFrameRenderingEngine(unittest.TestCase):
         self.assertGreater(stats['fps_estimate'], 0)
     
     def test_background_cache(self):
-        """Test background rendering cache"""
-        # Test cache functionality
-        test_data = np.array([0.5, 0.6, 0.7, 1.0], dtype=np.float32)
-        self.engine.background_cache[1.5] = test_data
-        
-        # Verify cache entry
-        self.assertIn(1.5, self.engine.background_cache)
-        np.testing.assert_array_equal(self.engine.background_cache[1.5], test_data)
+        """Test background frames are cached per source frame"""
+        self.engine.current_project = self.test_project
+        self.engine.capture_settings = self.test_settings
+        
+        decoded = np.zeros((100, 100, 4), dtype=np.uint8)
+        
+        # Timestamps within one source frame share a single decode
+        with patch.object(self.engine, '_decode_video_frame', return_value=decoded) as decode:
+            first = self.engine._get_video_background_frame(1.5)
+            second = self.engine._get_video_background_frame(1.51)
+        
+        decode.assert_called_once()
+        self.assertIs(first, second)
+        self.assertEqual(first.shape, (100, 100, 4))
+        self.assertEqual(len(self.engine.background_cache), 1)
+        
+        stats = self.engine.background_cache.get_stats()
+        self.assertEqual(stats['hit_count'], 1)
+        self.assertEqual(stats['miss_count'], 1)
+        self.assertEqual(stats['bytes'], first.nbytes)
+    
+    def test_undecodable_video_is_not_cached(self):
+        """Test the placeholder for a missing video is returned but never cached"""
+        self.engine.current_project = self.test_project
+        self.engine.capture_settings = self.test_settings
+        
+        first = self.engine._get_video_background_frame(1.5)
+        second = self.engine._get_video_background_frame(1.51)
+        
+        self.assertEqual(first.shape, (100, 100, 4))
+        self.assertEqual(second.shape, (100, 100, 4))
+        self.assertEqual(len(self.engine.background_cache), 0)
+        self.assertEqual(self.engine._video_decoders, {})
+    
+    def test_background_cache_budget_from_config(self):
+        """Test background cache budget comes from performance settings"""
+        config_manager = Mock()
+        config_manager.get_performance_setting.return_value = 8
         
-        # Test cache size limit
-        for i in range(60):  # Exceed cache_max_size (50)
-            self.engine.background_cache[float(i)] = test_data
+        engine = FrameRenderingEngine(self.mock_context, config_manager)
         
-        # Cache should not exceed max size significantly
-        self.assertLessEqual(len(self.engine.background_cache), 60)
+        config_manager.get_performance_setting.assert_any_call("background_cache_mb", 256)
+        self.assertEqual(engine.background_cache.max_bytes, 8 * 1024 * 1024)
     
     def test_cleanup(self):
         """Test engine cleanup"""
@@ -418,6 +448,157 @@ class TestFrameRenderingEngine(unittest.TestCase):
             self.assertEqual(len(self.engine.render_times), 0)
 
 
+class FakeDecoderProcess:
+    """Stand-in for an FFmpeg decoder: frame N is filled with N, up to frame_count"""
+    
+    def __init__(self, command, frame_count, width, height, fps, **kwargs):
+        self.command = command
+        start_index = round(float(command[command.index("-ss") + 1]) * fps)
+        frames = [np.full((height, width, 4), index, dtype=np.uint8).tobytes()
+                  for index in range(start_index, frame_count)]
+        self.stdout = io.BytesIO(b"".join(frames))
+        self.killed = False
+    
+    def poll(self):
+        return None if not self.killed else -9
+    
+    def kill(self):
+        self.killed = True
+    
+    def wait(self, timeout=None):
+        return -9
+
+
+class TestSequentialVideoDecoder(unittest.TestCase):
+    """Test SequentialVideoDecoder functionality"""
+    
+    def setUp(self):
+        self.processes = []
+        
+        def popen(command, **kwargs):
+            process = FakeDecoderProcess(command, 20, 4, 2, 10, **kwargs)
+            self.processes.append(process)
+            return process
+        
+        patcher = patch('core.frame_capture_system.subprocess.Popen', side_effect=popen)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.decoder = SequentialVideoDecoder("video.mp4", 4, 2, Timebase.from_fps(10))
+        self.addCleanup(self.decoder.close)
+    
+    def test_sequential_frames_share_one_process(self):
+        """Test consecutive and nearby frames are read from one pipe"""
+        for index in [0, 1, 2, 5, 6]:
+            frame = self.decoder.read_frame(index)
+            self.assertEqual(frame.shape, (2, 4, 4))
+            self.assertEqual(frame[0, 0, 0], index)
+        
+        self.assertEqual(self.decoder.spawn_count, 1)
+        self.assertIn("fps=10,scale=4:2", self.processes[0].command)
+    
+    def test_timeline_jumps_seek(self):
+        """Test backwards and far forward jumps restart the pipe at the target frame"""
+        self.decoder.MAX_SKIP_FRAMES = 3
+        self.assertEqual(self.decoder.read_frame(5)[0, 0, 0], 5)
+        self.assertEqual(self.decoder.read_frame(2)[0, 0, 0], 2)
+        self.assertEqual(self.decoder.read_frame(15)[0, 0, 0], 15)
+        
+        self.assertEqual(self.decoder.spawn_count, 3)
+        self.assertTrue(self.processes[0].killed)
+        self.assertEqual(self.processes[2].command[self.processes[2].command.index("-ss") + 1], "1.500000")
+    
+    def test_end_of_source(self):
+        """Test frames past the end return None without restarting the pipe"""
+        self.assertEqual(self.decoder.read_frame(19)[0, 0, 0], 19)
+        self.assertIsNone(self.decoder.read_frame(20))
+        self.assertIsNone(self.decoder.read_frame(21))
+        
+        self.assertEqual(self.decoder.spawn_count, 1)
+        self.assertEqual(self.decoder.end_index, 20)
+        self.assertEqual(self.decoder.read_frame(3)[0, 0, 0], 3)
+    
+    def test_missing_ffmpeg(self):
+        """Test a decoder that cannot start reports no frames and is not retried"""
+        with patch('core.frame_capture_system.subprocess.Popen', side_effect=FileNotFoundError("ffmpeg")) as popen:
+            decoder = SequentialVideoDecoder("video.mp4", 4, 2, Timebase.from_fps(10))
+            self.assertIsNone(decoder.read_frame(0))
+            self.assertIsNone(decoder.read_frame(1))
+        self.assertEqual(popen.call_count, 1)
+
+
+class TestBackgroundFrameCache(unittest.TestCase):
+    """Test BackgroundFrameCache functionality"""
+    
+    def _frame(self, value=0):
+        """Create a 1 KiB test frame"""
+        return np.full((16, 16, 4), value, dtype=np.uint8)
+    
+    def test_lru_eviction_by_bytes(self):
+        """Test least recently used frames are evicted to stay within budget"""
+        cache = BackgroundFrameCache(max_bytes=3 * 1024)
+        for index in range(3):
+            cache.put(("video", index, (16, 16)), self._frame(index))
+        
+        # Touch frame 0 so frame 1 becomes least recently used
+        self.assertIsNotNone(cache.get(("video", 0, (16, 16))))
+        cache.put(("video", 3, (16, 16)), self._frame(3))
+        
+        self.assertIn(("video", 0, (16, 16)), cache)
+        self.assertNotIn(("video", 1, (16, 16)), cache)
+        self.assertEqual(cache.total_bytes, 3 * 1024)
+        self.assertEqual(cache.get_stats()['eviction_count'], 1)
+    
+    def test_pinned_entries_survive_eviction(self):
+        """Test pinned frames are kept and reduce the evictable budget"""
+        cache = BackgroundFrameCache(max_bytes=2 * 1024)
+        cache.put(("image", 0, (16, 16)), self._frame(), pin=True)
+        cache.put(("video", 0, (16, 16)), self._frame())
+        cache.put(("video", 1, (16, 16)), self._frame())
+        
+        self.assertIn(("image", 0, (16, 16)), cache)
+        self.assertNotIn(("video", 0, (16, 16)), cache)
+        self.assertEqual(cache.get_stats()['pinned_bytes'], 1024)
+        
+        # Frames larger than the remaining budget are rejected
+        self.assertFalse(cache.put(("video", 2, (32, 32)), np.zeros((32, 32, 4), dtype=np.uint8)))
+        
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.total_bytes, 0)
+
+
+class TestFrameStream(unittest.TestCase):
+    """Test FrameStream functionality"""
+    
+    def test_stream_end_and_error(self):
+        """Test closing a stream ends iteration and surfaces capture errors"""
+        stream = FrameStream(max_frames=2)
+        stream.put("frame")
+        stream.close()
+        self.assertEqual(list(stream), ["frame"])
+        
+        failed = FrameStream(max_frames=2)
+        failed.close("Frame capture failed: boom")
+        with self.assertRaises(RuntimeError):
+            list(failed)
+    
+    def test_put_unblocks_on_cancel(self):
+        """Test a producer blocked on a full stream returns when cancelled"""
+        import threading
+        stream = FrameStream(max_frames=1)
+        self.assertTrue(stream.put("first"))
+        
+        results = []
+        producer = threading.Thread(target=lambda: results.append(stream.put("second")))
+        producer.start()
+        time.sleep(0.2)
+        self.assertTrue(producer.is_alive())
+        
+        stream.cancel()
+        producer.join(timeout=1.0)
+        self.assertEqual(results, [False])
+
+
 class TestFrameCaptureSystem(unittest.TestCase):
     """Test FrameCaptureSystem functionality"""
     
@@ -578,6 +759,137 @@ class TestFrameCaptureSystem(unittest.TestCase):
             self.assertEqual(frame.frame_number, timestamps[i].frame_number)
             self.assertAlmostEqual(frame.timestamp, timestamps[i].timestamp, places=3)
     
+    def test_capture_frame_sequence_async_readback(self):
+        """Test that asynchronous readback delivers every frame with its own timestamp"""
+        context = OpenGLContext(ContextBackend.MOCK)
+        context.initialize()
+        capture_system = FrameCaptureSystem(context)
+        
+        settings = FrameCaptureSettings(width=32, height=16, fps=30.0,
+                                        async_readback=True, readback_ring_size=3)
+        project = Project(id="async_project", name="Async Project")
+        
+        with patch('core.frame_capture_system.OpenGLSubtitleRenderer') as mock_subtitle_renderer, \
+             patch('core.frame_capture_system.EffectsRenderingPipeline'):
+            mock_subtitle_renderer.return_value.initialize_opengl.return_value = True
+            self.assertTrue(capture_system.initialize(project, settings))
+        
+        self.assertTrue(capture_system.rendering_engine.framebuffer.async_readback_enabled)
+        
+        timestamps = [FrameTimestamp(i, i / 30.0, 1 / 30.0, 30.0) for i in range(7)]
+        frames = capture_system.capture_frame_sequence(timestamps)
+        
+        self.assertEqual(len(frames), len(timestamps))
+        for frame, timestamp_info in zip(frames, timestamps):
+            self.assertAlmostEqual(frame.timestamp, timestamp_info.timestamp)
+            self.assertEqual(frame.data.shape, (16, 32, 4))
+        
+        capture_system.cleanup()
+        context.cleanup()
+    
+    def test_failed_async_readback_is_rendered_again(self):
+        """Test a frame whose pixel buffer cannot be read is re-rendered synchronously"""
+        from core.metrics import get_metrics_registry, READBACK_FALLBACKS_TOTAL
+        
+        context = OpenGLContext(ContextBackend.MOCK)
+        context.initialize()
+        capture_system = FrameCaptureSystem(context)
+        settings = FrameCaptureSettings(width=32, height=16, fps=30.0,
+                                        async_readback=True, readback_ring_size=2)
+        
+        with patch('core.frame_capture_system.OpenGLSubtitleRenderer') as mock_subtitle_renderer, \
+             patch('core.frame_capture_system.EffectsRenderingPipeline'):
+            mock_subtitle_renderer.return_value.initialize_opengl.return_value = True
+            self.assertTrue(capture_system.initialize(Project(id="p", name="P"), settings))
+        
+        framebuffer = capture_system.rendering_engine.framebuffer
+        resolve = framebuffer._resolve_oldest_readback
+        timestamps = [FrameTimestamp(i, i / 30.0, 1 / 30.0, 30.0) for i in range(5)]
+        
+        def failing_resolve():
+            tag, pixels = resolve()
+            if tag[0] == timestamps[2].timestamp:
+                framebuffer.readback_failures += 1
+                return tag, None
+            return tag, pixels
+        
+        fallbacks = get_metrics_registry().counter(READBACK_FALLBACKS_TOTAL)
+        before = fallbacks.value
+        with patch.object(framebuffer, '_resolve_oldest_readback', side_effect=failing_resolve):
+            frames = capture_system.capture_frame_sequence(timestamps)
+        
+        self.assertEqual([frame.timestamp for frame in frames], [t.timestamp for t in timestamps])
+        self.assertEqual(frames[2].data.shape, (16, 32, 4))
+        self.assertEqual(fallbacks.value - before, 1)
+        
+        capture_system.cleanup()
+        context.cleanup()
+    
+    def _mock_render(self, timestamp):
+        """Render a small fake frame"""
+        return CapturedFrame(
+            frame_number=int(timestamp * 30),
+            timestamp=timestamp,
+            data=np.zeros((4, 4, 4), dtype=np.uint8),
+            width=4,
+            height=4,
+            pixel_format=PixelFormat.RGBA8,
+            capture_time=0.0,
+            render_time=0.001
+        )
+    
+    def test_iter_frame_sequence_is_lazy(self):
+        """Test frames are rendered only as the consumer pulls them"""
+        mock_engine = Mock()
+        mock_engine.render_frame_at_timestamp.side_effect = self._mock_render
+        self.capture_system.rendering_engine = mock_engine
+        
+        timestamps = [FrameTimestamp(i, i / 30.0, 1 / 30.0, 30.0) for i in range(10)]
+        frames = self.capture_system.iter_frame_sequence(timestamps)
+        
+        first = next(frames)
+        self.assertEqual(first.frame_number, 0)
+        self.assertEqual(mock_engine.render_frame_at_timestamp.call_count, 1)
+        self.assertTrue(self.capture_system.is_capturing)
+        
+        frames.close()
+        self.assertFalse(self.capture_system.is_capturing)
+    
+    def test_stream_frame_sequence_backpressure(self):
+        """Test the capture thread blocks instead of buffering past the limit"""
+        mock_engine = Mock()
+        mock_engine.render_frame_at_timestamp.side_effect = self._mock_render
+        self.capture_system.rendering_engine = mock_engine
+        
+        timestamps = [FrameTimestamp(i, i / 30.0, 1 / 30.0, 30.0) for i in range(20)]
+        stream = self.capture_system.stream_frame_sequence(timestamps, max_buffered_frames=3)
+        
+        # With no consumer, capture stalls once the queue is full
+        time.sleep(0.3)
+        self.assertLessEqual(mock_engine.render_frame_at_timestamp.call_count, 4)
+        
+        frames = list(stream)
+        self.assertEqual([frame.frame_number for frame in frames], list(range(20)))
+        self.assertLessEqual(stream.peak_buffered, 3)
+        self.capture_system.capture_thread.join(timeout=1.0)
+        self.assertFalse(self.capture_system.is_capturing)
+    
+    def test_stream_frame_sequence_cancellation(self):
+        """Test cancelling a stream stops capture mid-sequence"""
+        mock_engine = Mock()
+        mock_engine.render_frame_at_timestamp.side_effect = self._mock_render
+        self.capture_system.rendering_engine = mock_engine
+        
+        timestamps = [FrameTimestamp(i, i / 30.0, 1 / 30.0, 30.0) for i in range(100)]
+        stream = self.capture_system.stream_frame_sequence(timestamps, max_buffered_frames=2)
+        
+        self.assertIsNotNone(stream.next_frame())
+        self.capture_system.cancel_capture()
+        
+        self.assertFalse(self.capture_system.capture_thread.is_alive())
+        self.assertIsNone(stream.next_frame())
+        self.assertLess(mock_engine.render_frame_at_timestamp.call_count, 100)
+    
     def test_capture_cancellation(self):
         """Test cancelling frame capture"""
         # Start a mock capture
@@ -0,0 +1,224 @@
+"""
+Unit Tests for the Frame Plan Compiler
+
+Tests collapsing runs of identical frames, the conditions that keep frames
+unique, and that planned repeats reach the encoder as whole output frames.
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.frame_plan import compile_frame_plan, FramePlanCompiler
+from core.frame_capture_system import (
+    CapturedFrame, PixelFormat, FrameCaptureSystem, FrameCaptureSettings, stream_video_frames
+)
+from core.enhanced_ffmpeg_integration import EnhancedFFmpegProcessor, EnhancedExportSettings
+from core.effects_manager import EffectsManager, EffectType
+from core.opengl_context import create_headless_context
+from core.timestamped_frames import TimestampedFrameStream, frame_writes, read_frames
+from core.models import (
+    VideoFile, ImageFile, SubtitleLine, WordTiming, Effect
+)
+from tests.helpers import make_project
+
+
+def make_line(start, end, words):
+    """Line whose words are (start, end) pairs"""
+    return SubtitleLine(start, end, "la " * len(words),
+                        word_timings=[WordTiming("la", s, e) for s, e in words])
+
+
+class TestFramePlanCompiler(unittest.TestCase):
+    """Test FramePlanCompiler"""
+
+    def test_static_timeline_collapses_to_one_frame(self):
+        """Test an instrumental track over a still image renders a single frame"""
+        plan = compile_frame_plan(make_project(image_file=ImageFile(path="cover.png")), 10.0)
+
+        self.assertEqual(plan.total_frames, 40)
+        self.assertEqual(plan.rendered_frames, 1)
+        self.assertEqual(plan.frames[0].repeat, 40)
+        self.assertEqual(plan.dedup_ratio, 40.0)
+
+    def test_sung_words_are_unique_and_waits_collapse(self):
+        """Test frames inside a word are unique while waits between words are shared"""
+        line = make_line(1.0, 3.0, [(1.5, 2.0), (2.0, 2.5)])
+        plan = compile_frame_plan(make_project([line]), 10.0)
+
+        repeats = [(f.frame_number, f.repeat, f.visible_lines) for f in plan.frames]
+        # 0-9 empty, 10-14 line waiting for its first word, 15-24 words, 25-30 sung, 31-39 empty
+        self.assertEqual(repeats[0], (0, 10, ()))
+        self.assertEqual(repeats[1], (10, 5, (0,)))
+        self.assertEqual([r[1] for r in repeats[2:12]], [1] * 10)
+        self.assertEqual(repeats[12], (25, 6, (0,)))
+        self.assertEqual(repeats[13], (31, 9, ()))
+        self.assertEqual(sum(f.repeat for f in plan.frames), 40)
+
+    def test_animated_effects_keep_frames_unique(self):
+        """Test fades are unique only while fading and waves for the whole line"""
+        line = make_line(1.0, 3.0, [(1.0, 1.2)])
+        fade = Effect("fade", "Fade", "fade", {"fade_in_duration": 0.5, "fade_out_duration": 0.5})
+        plan = compile_frame_plan(make_project([line], effects=[fade]), 10.0)
+        unique = [f.frame_number for f in plan.frames if f.repeat == 1 and f.visible_lines]
+        self.assertEqual(unique, list(range(10, 15)) + list(range(26, 31)))
+
+        wave = Effect("wave", "Wave", "wave", {})
+        plan = compile_frame_plan(make_project([line], effects=[wave]), 10.0)
+        self.assertEqual(plan.rendered_frames, 1 + 21 + 1)
+
+        wave.enabled = False
+        self.assertEqual(compile_frame_plan(make_project([line], effects=[wave]), 10.0).rendered_frames, 5)
+
+    def test_bounce_animates_for_the_whole_line(self):
+        """Test a bouncing line is rendered at t=0.5 and t=1.5 and the two frames differ"""
+        line = make_line(0.0, 3.0, [(0.0, 0.1)])
+        bounce = Effect("bounce", "Bounce", "bounce", {"amplitude": 10.0, "frequency": 2.0, "duration": 1.0})
+        project = make_project([line], effects=[bounce], duration=3.0)
+
+        plan = compile_frame_plan(project, 10.0)
+        self.assertEqual(plan.rendered_frames, 30)
+
+        context = create_headless_context("mock", 16, 8)
+        frames = stream_video_frames(project, FrameCaptureSettings(width=16, height=8, fps=10.0,
+                                                                   deduplicate_frames=True), context)
+        try:
+            rendered = {round(frame.timestamp, 3): frame.repeat for frame in frames}
+        finally:
+            frames.close()
+            context.cleanup()
+        self.assertEqual((rendered[0.5], rendered[1.5]), (1, 1))
+
+        # The mock backend draws no text, so compare the bounce offset the vertex shader
+        # computes from the frames' uniforms: sin(time * bounceFrequency) * bounceAmplitude
+        manager = EffectsManager()
+        manager.add_effect_layer(manager.create_effect(EffectType.BOUNCE, bounce.parameters))
+        uniforms = manager.get_effect_uniforms()
+        offsets = [np.sin(t * uniforms['bounceFrequency']) * uniforms['bounceAmplitude'] for t in (0.5, 1.5)]
+        self.assertGreater(abs(offsets[0] - offsets[1]), 1.0)
+
+    def test_video_background_changes_with_source_frames(self):
+        """Test a 5 fps background video yields one rendered frame per source frame"""
+        video = VideoFile(path="bg.mp4", duration=4.0, frame_rate=5.0)
+        plan = compile_frame_plan(make_project(video_file=video), 10.0)
+
+        self.assertEqual(plan.rendered_frames, 20)
+        self.assertTrue(all(f.repeat == 2 for f in plan.frames))
+        self.assertEqual(plan.frames[3].background_id, ("video", 3))
+
+    def test_range_matches_full_timeline(self):
+        """Test a segment plan uses the same frame times and never crosses its bounds"""
+        line = make_line(1.0, 3.0, [(1.5, 2.0)])
+        compiler = FramePlanCompiler(make_project([line]), 10.0)
+        full = compiler.compile()
+        segment = compiler.compile(12, 30)
+
+        self.assertEqual(segment.total_frames, 18)
+        self.assertEqual(segment.frames[0].frame_number, 12)
+        self.assertEqual(sum(f.repeat for f in segment.frames), 18)
+        full_times = {f.frame_number: f.timestamp for f in full.frames}
+        for frame in segment.frames:
+            if frame.frame_number in full_times:
+                self.assertEqual(frame.timestamp, full_times[frame.frame_number])
+
+        timestamps = segment.timestamps()
+        self.assertEqual([t.repeat for t in timestamps], [f.repeat for f in segment.frames])
+        self.assertAlmostEqual(timestamps[0].duration, 3 * 0.1)
+
+
+class TestPlannedCapture(unittest.TestCase):
+    """Test repeats through frame capture and encoding"""
+
+    def make_frame(self, number, repeat, value):
+        return CapturedFrame(frame_number=number, timestamp=number / 10.0, width=4, height=2,
+                             pixel_format=PixelFormat.RGBA8,
+                             data=np.full((2, 4, 4), value, dtype=np.uint8),
+                             capture_time=0.0, render_time=0.0, repeat=repeat)
+
+    def test_capture_carries_repeat_counts(self):
+        """Test captured frames carry their plan repeat and progress counts output frames"""
+        plan = compile_frame_plan(make_project(image_file=ImageFile(path="cover.png"), duration=1.0), 10.0)
+
+        with patch('core.frame_capture_system.FrameRenderingEngine') as engine_class:
+            capture_system = FrameCaptureSystem(None)
+            engine_class.return_value.render_frame_at_timestamp.side_effect = \
+                lambda t: self.make_frame(int(t * 10), 1, 0)
+            progress = []
+            frames = capture_system.capture_frame_sequence(plan.timestamps(), progress.append)
+
+        self.assertEqual([f.repeat for f in frames], [10])
+        self.assertEqual(progress, [1.0])
+        self.assertEqual(capture_system.frames_captured, 10)
+
+    def test_encoder_expands_repeats(self):
+        """Test a repeated frame is written once per output frame it covers"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "out.raw")
+            script = f"import sys\nopen({output_path!r}, 'wb').write(sys.stdin.buffer.read())\n"
+            settings = EnhancedExportSettings(output_path=output_path, width=4, height=2, fps=10.0)
+            frames = [self.make_frame(0, 3, 1), self.make_frame(3, 1, 2), self.make_frame(4, 2, 3)]
+
+            processor = EnhancedFFmpegProcessor()
+            with patch.object(EnhancedFFmpegProcessor, 'validate_settings', return_value=[]), \
+                 patch.object(EnhancedFFmpegProcessor, 'build_ffmpeg_command',
+                              return_value=[sys.executable, "-c", script]):
+                sent = []
+                self.assertTrue(processor.encode_frames(settings, frames, 6, progress_callback=sent.append))
+
+            with open(output_path, 'rb') as f:
+                written = np.frombuffer(f.read(), dtype=np.uint8).reshape(6, -1)
+
+        self.assertEqual(written[:, 0].tolist(), [1, 1, 1, 2, 3, 3])
+        self.assertEqual(sent, [3, 4, 6])
+        self.assertEqual(processor.current_frame, 6)
+
+    def test_timestamped_input_sends_repeats_once(self):
+        """Test repeated frames cross the pipe once, stamped with their first output frame"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "out.mkv")
+            script = f"import sys\nopen({output_path!r}, 'wb').write(sys.stdin.buffer.read())\n"
+            settings = EnhancedExportSettings(output_path=output_path, width=4, height=2, fps=10.0,
+                                              timestamped_input=True)
+            frames = [self.make_frame(0, 3, 1), self.make_frame(3, 1, 2), self.make_frame(4, 2, 3)]
+
+            processor = EnhancedFFmpegProcessor()
+            with patch.object(EnhancedFFmpegProcessor, 'validate_settings', return_value=[]), \
+                 patch.object(EnhancedFFmpegProcessor, 'build_ffmpeg_command',
+                              return_value=[sys.executable, "-c", script]):
+                self.assertTrue(processor.encode_frames(settings, frames, 6))
+
+            with open(output_path, 'rb') as f:
+                data = f.read()
+
+        # The last run is written again at the final output frame so FFmpeg repeats it to the end
+        frame_ticks, written = read_frames(data)
+        self.assertEqual(frame_ticks, 100000)
+        self.assertEqual([(ticks, pixels[0]) for ticks, pixels in written],
+                         [(0, 1), (300000, 2), (400000, 3), (500000, 3)])
+        self.assertEqual(processor.current_frame, 6)
+        self.assertLess(len(data), 5 * 4 * 2 * 4 + 1024)
+
+    def test_timestamped_input_command(self):
+        """Test FFmpeg reads timestamped frames and repeats them at the output rate"""
+        settings = EnhancedExportSettings(output_path="out.mp4", width=4, height=2, fps=30000 / 1001,
+                                          timestamped_input=True, custom_filters=["hflip"])
+        command = EnhancedFFmpegProcessor().build_ffmpeg_command(settings)
+
+        input_index = command.index("-i")
+        self.assertEqual(command[input_index - 2:input_index], ["-f", "matroska"])
+        self.assertEqual(command[command.index("-vf") + 1], "fps=30000/1001,hflip")
+
+        stream = TimestampedFrameStream(4, 2, 30000 / 1001)
+        self.assertEqual(stream.ticks(30), 1001000)
+        self.assertEqual(frame_writes(0, 3, 10), [(0, 3)])
+        self.assertEqual(frame_writes(7, 3, 10), [(7, 2), (9, 1)])
+        self.assertEqual(frame_writes(9, 1, 10), [(9, 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
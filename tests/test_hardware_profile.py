@@ -0,0 +1,216 @@
+"""
+Unit Tests for the Hardware Profile and Performance Auto-Tuning
+
+Tests the hardware probe, the settings derived for small and large machines,
+their persistence per host in the ConfigManager, the precedence of explicit
+and per-host settings, and the components sized by the tuned settings.
+"""
+
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.core.config_manager import ConfigManager
+from src.core.hardware_profile import current_host as config_host
+from core.hardware_profile import (
+    HardwareProfile, TunedSettings, STATIC_DEFAULTS, TUNED_SETTINGS,
+    probe_hardware, probe_encoders, derive_performance_settings, auto_tune, current_host
+)
+from core.enhanced_ffmpeg_integration import EnhancedFFmpegProcessor, BatchFFmpegProcessor
+from core.libass_opengl_integration import TextureStreamConfig
+from core.complete_rendering_pipeline import PipelineConfig, CompleteRenderingPipeline
+
+
+LAPTOP = HardwareProfile(host="laptop", cpu_count=8, memory_mb=16384, temp_free_mb=100000,
+                         ffmpeg_path="/usr/bin/ffmpeg", encoders=["libx264", "libx265"])
+SERVER = HardwareProfile(host="server", cpu_count=64, memory_mb=262144, temp_free_mb=2000000,
+                         ffmpeg_path="/usr/bin/ffmpeg", encoders=["libx264", "h264_nvenc", "hevc_nvenc"])
+
+ENCODERS_OUTPUT = """Encoders:
+ V..... = Video
+ ------
+ V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC (codec h264)
+ V....D h264_nvenc           NVIDIA NVENC H.264 encoder (codec h264)
+ V....D hevc_vaapi           H.265/HEVC (VAAPI) (codec hevc)
+ V....D mjpeg                MJPEG (Motion JPEG)
+ A....D aac                  AAC (Advanced Audio Coding)
+"""
+
+
+class TestHardwareProbe(unittest.TestCase):
+    """Test probe_hardware"""
+
+    def test_probe_reports_this_machine(self):
+        profile = probe_hardware(probe_ffmpeg=False)
+        self.assertEqual(profile.host, current_host())
+        self.assertEqual(profile.cpu_count, os.cpu_count() or 1)
+        self.assertGreater(profile.memory_mb, 0)
+        self.assertGreater(profile.temp_free_mb, 0)
+        self.assertEqual(profile.encoders, [])
+
+    def test_encoders_are_parsed_from_ffmpeg(self):
+        result = subprocess.CompletedProcess([], 0, stdout=ENCODERS_OUTPUT, stderr="")
+        with patch("core.hardware_profile.subprocess.run", return_value=result):
+            encoders = probe_encoders("ffmpeg")
+        self.assertEqual(encoders, ["libx264", "h264_nvenc", "hevc_vaapi"])
+
+        profile = HardwareProfile(encoders=encoders)
+        self.assertEqual(profile.hardware_encoders, ["h264_nvenc", "hevc_vaapi"])
+
+    def test_missing_ffmpeg_lists_no_encoders(self):
+        with patch("core.hardware_profile.subprocess.run", side_effect=FileNotFoundError("ffmpeg")):
+            self.assertEqual(probe_encoders("ffmpeg"), [])
+
+
+class TestDerivedSettings(unittest.TestCase):
+    """Test derive_performance_settings"""
+
+    def test_laptop(self):
+        self.assertEqual(derive_performance_settings(LAPTOP), {
+            "frame_buffer_size": 16,
+            "streaming_chunk_mb": 2,
+            "max_concurrent_jobs": 1,
+            "texture_cache_entries": 128,
+            "background_cache_mb": 512,
+            "cache_budget_mb": 2048,
+        })
+
+    def test_server(self):
+        self.assertEqual(derive_performance_settings(SERVER), {
+            "frame_buffer_size": 32,
+            "streaming_chunk_mb": 4,
+            "max_concurrent_jobs": 8,
+            "texture_cache_entries": 400,
+            "background_cache_mb": 2048,
+            "cache_budget_mb": 8192,
+        })
+
+    def test_jobs_are_limited_by_memory_and_temp_space(self):
+        settings = derive_performance_settings(HardwareProfile(cpu_count=64, memory_mb=8192, temp_free_mb=100000))
+        self.assertEqual(settings["max_concurrent_jobs"], 2)
+
+        settings = derive_performance_settings(HardwareProfile(cpu_count=64, memory_mb=262144, temp_free_mb=5000))
+        self.assertEqual(settings["max_concurrent_jobs"], 2)
+
+    def test_hardware_encoder_allows_another_job(self):
+        profile = HardwareProfile(cpu_count=8, memory_mb=16384, encoders=["h264_qsv"])
+        self.assertEqual(derive_performance_settings(profile)["max_concurrent_jobs"], 2)
+
+    def test_unknown_memory_keeps_the_static_cache_sizes(self):
+        settings = derive_performance_settings(HardwareProfile(cpu_count=1))
+        for key in ("streaming_chunk_mb", "texture_cache_entries", "background_cache_mb", "cache_budget_mb"):
+            self.assertEqual(settings[key], STATIC_DEFAULTS[key])
+        self.assertEqual(settings["frame_buffer_size"], 4)
+        self.assertEqual(set(settings), set(TUNED_SETTINGS))
+
+
+class TestAutoTune(unittest.TestCase):
+    """Test auto_tune with a ConfigManager"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_manager = ConfigManager(config_dir=Path(self.temp_dir))
+        self.host = config_host()
+        self.profile = HardwareProfile(**dict(LAPTOP.to_dict(), host=self.host))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_derived_settings_are_persisted_per_host(self):
+        derived = auto_tune(self.config_manager, self.profile)
+
+        self.assertEqual(self.config_manager.get_performance_setting("frame_buffer_size"), 16)
+        reloaded = ConfigManager(config_dir=Path(self.temp_dir))
+        self.assertEqual(reloaded.get_performance_setting("cache_budget_mb"), 2048)
+        record = reloaded.get_performance_setting("hardware")[self.host]
+        self.assertEqual(record["derived"], derived)
+        self.assertEqual(record["profile"]["cpu_count"], 8)
+
+    def test_unchanged_hardware_keeps_stored_values(self):
+        auto_tune(self.config_manager, self.profile)
+        with patch.object(self.config_manager, 'set_performance_setting') as save:
+            auto_tune(self.config_manager, HardwareProfile(**dict(self.profile.to_dict(), temp_free_mb=1)))
+        save.assert_not_called()
+
+        upgraded = HardwareProfile(**dict(self.profile.to_dict(), cpu_count=64, memory_mb=262144))
+        auto_tune(self.config_manager, upgraded)
+        self.assertEqual(self.config_manager.get_performance_setting("frame_buffer_size"), 32)
+
+    def test_unchanged_ffmpeg_is_not_probed_again(self):
+        with patch("core.hardware_profile.shutil.which", return_value="/usr/bin/ffmpeg"), \
+                patch("core.hardware_profile.probe_encoders", return_value=["libx264"]) as probe:
+            auto_tune(self.config_manager)
+            auto_tune(self.config_manager)
+            self.assertEqual(probe.call_count, 1)
+
+            auto_tune(self.config_manager, force=True)
+            self.assertEqual(probe.call_count, 2)
+
+        record = self.config_manager.get_performance_setting("hardware")[self.host]
+        self.assertEqual(record["profile"]["encoders"], ["libx264"])
+
+    def test_other_hosts_keep_their_own_values(self):
+        auto_tune(self.config_manager, SERVER)
+        self.assertEqual(self.config_manager.get_performance_setting("frame_buffer_size", 10), 10)
+        self.assertIn("server", self.config_manager.get_performance_setting("hardware"))
+
+    def test_explicit_and_per_host_settings_take_precedence(self):
+        auto_tune(self.config_manager, self.profile)
+
+        self.config_manager.set_performance_setting("cache_budget_mb", 512)
+        self.assertEqual(self.config_manager.get_performance_setting("cache_budget_mb"), 512)
+
+        self.config_manager.set_host_performance_setting("cache_budget_mb", 4096)
+        self.config_manager.set_host_performance_setting("cache_budget_mb", 64, host="elsewhere")
+        self.assertEqual(self.config_manager.get_performance_setting("cache_budget_mb"), 4096)
+
+        auto_tune(self.config_manager, self.profile, force=True)
+        self.assertEqual(self.config_manager.get_performance_setting("cache_budget_mb"), 4096)
+
+
+class TestTunedComponents(unittest.TestCase):
+    """Test components sized by tuned performance settings"""
+
+    def setUp(self):
+        self.settings = TunedSettings(SERVER)
+
+    def test_ffmpeg_processor(self):
+        processor = EnhancedFFmpegProcessor(self.settings)
+        self.assertEqual(processor.frame_buffer_size, 32)
+        self.assertEqual(processor.streaming_chunk_size, 4 * 1024 * 1024)
+
+        processor = EnhancedFFmpegProcessor()
+        self.assertEqual(processor.frame_buffer_size, STATIC_DEFAULTS["frame_buffer_size"])
+
+    def test_batch_processor(self):
+        self.assertEqual(BatchFFmpegProcessor(config_manager=self.settings).max_concurrent_jobs, 8)
+        self.assertEqual(BatchFFmpegProcessor(2, self.settings).max_concurrent_jobs, 2)
+        self.assertEqual(BatchFFmpegProcessor().max_concurrent_jobs, 1)
+
+    def test_texture_stream_config(self):
+        self.assertEqual(TextureStreamConfig.from_config(self.settings).max_cache_size, 400)
+        self.assertEqual(TextureStreamConfig.from_config(self.settings, max_cache_size=5).max_cache_size, 5)
+
+    def test_pipeline_config(self):
+        pipeline = CompleteRenderingPipeline(PipelineConfig(buffer_size=3), self.settings)
+        self.assertEqual((pipeline.config.buffer_size, pipeline.config.max_texture_cache_size), (3, 400))
+
+        config = PipelineConfig().apply_performance_settings()
+        self.assertEqual((config.buffer_size, config.max_texture_cache_size), (10, 100))
+
+    def test_overrides(self):
+        settings = TunedSettings(SERVER, {"cache_budget_mb": 64})
+        self.assertEqual(settings.get_performance_setting("cache_budget_mb"), 64)
+        self.assertEqual(settings.get_performance_setting("conversion_threads", 0), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
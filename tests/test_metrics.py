@@ -0,0 +1,133 @@
+"""
+Unit Tests for the Render Metrics Registry
+
+Tests histogram accuracy, counter and gauge registration, and the JSON,
+Prometheus, file and HTTP exports.
+"""
+
+import unittest
+import os
+import sys
+import json
+import random
+import tempfile
+import urllib.request
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.metrics import (
+    LatencyHistogram, MetricsRegistry, get_metrics_registry, PIPE_WRITE_SECONDS
+)
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Test LatencyHistogram"""
+
+    def test_percentiles_within_relative_error(self):
+        """Test percentiles match exact values within the bucket precision"""
+        rng = random.Random(3)
+        samples = [rng.lognormvariate(-4.0, 1.5) for _ in range(20000)]
+        histogram = LatencyHistogram("render_seconds")
+        for sample in samples:
+            histogram.record(sample)
+
+        ordered = sorted(samples)
+        for percent in (50.0, 90.0, 99.0, 99.9):
+            exact = ordered[int(len(ordered) * percent / 100.0) - 1]
+            self.assertAlmostEqual(histogram.percentile(percent) / exact, 1.0, delta=0.02)
+
+        self.assertEqual(histogram.count, 20000)
+        self.assertAlmostEqual(histogram.mean, sum(samples) / len(samples))
+        self.assertEqual(histogram.max, max(samples))
+
+    def test_bucket_ranges_cover_values(self):
+        """Test every recorded value falls inside its bucket's range"""
+        histogram = LatencyHistogram("values")
+        for units in [0, 1, 127, 128, 129, 1000, 65535, 10 ** 9]:
+            low, high = histogram._bucket_range(histogram._bucket_index(units))
+            self.assertLessEqual(low, units)
+            self.assertGreaterEqual(high, units)
+
+    def test_empty_histogram(self):
+        """Test an empty histogram reports zeros"""
+        snapshot = LatencyHistogram("empty").snapshot()
+        self.assertEqual(snapshot['count'], 0)
+        self.assertEqual(snapshot['p99'], 0.0)
+        self.assertEqual(snapshot['min'], 0.0)
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test MetricsRegistry exports"""
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.registry.counter("frames_dropped_total", "Frames dropped").inc(3)
+        self.registry.gauge("queue_depth").set(2)
+        for value in (0.0004, 0.002, 0.02, 0.2):
+            self.registry.histogram(PIPE_WRITE_SECONDS, "Pipe write latency").record(value)
+
+    def tearDown(self):
+        self.registry.stop_http_server()
+
+    def test_metrics_created_once(self):
+        """Test repeated lookups return the same metric"""
+        self.assertIs(self.registry.counter("frames_dropped_total"),
+                      self.registry.counter("frames_dropped_total"))
+        self.assertIs(self.registry.histogram(PIPE_WRITE_SECONDS),
+                      self.registry.histogram(PIPE_WRITE_SECONDS))
+
+    def test_json_export(self):
+        """Test the JSON export contains counters, gauges and histogram summaries"""
+        data = json.loads(self.registry.to_json())
+        self.assertEqual(data['counters']['frames_dropped_total'], 3)
+        self.assertEqual(data['gauges']['queue_depth'], 2)
+        self.assertEqual(data['histograms'][PIPE_WRITE_SECONDS]['count'], 4)
+        self.assertIn('p99.9', data['histograms'][PIPE_WRITE_SECONDS])
+
+    def test_prometheus_export(self):
+        """Test the Prometheus export has cumulative histogram buckets"""
+        text = self.registry.to_prometheus()
+        self.assertIn("# TYPE karaoke_frames_dropped_total counter", text)
+        self.assertIn("karaoke_frames_dropped_total 3", text)
+        self.assertIn("# TYPE karaoke_pipe_write_seconds histogram", text)
+        self.assertIn('karaoke_pipe_write_seconds_bucket{le="0.0005"} 1', text)
+        self.assertIn('karaoke_pipe_write_seconds_bucket{le="0.025"} 3', text)
+        self.assertIn('karaoke_pipe_write_seconds_bucket{le="+Inf"} 4', text)
+        self.assertIn("karaoke_pipe_write_seconds_count 4", text)
+
+    def test_write_file_format_by_extension(self):
+        """Test .prom files get Prometheus text and other files get JSON"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            prom_path = os.path.join(temp_dir, "render.prom")
+            json_path = os.path.join(temp_dir, "metrics", "render.json")
+            self.registry.write_file(prom_path)
+            self.registry.write_file(json_path)
+
+            with open(prom_path) as f:
+                self.assertIn("# TYPE", f.read())
+            with open(json_path) as f:
+                self.assertEqual(json.load(f)['counters']['frames_dropped_total'], 3)
+
+    def test_http_endpoint(self):
+        """Test metrics are served over a local HTTP port"""
+        port = self.registry.start_http_server(0)
+
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            self.assertIn("karaoke_frames_dropped_total 3", response.read().decode())
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics.json", timeout=5) as response:
+            self.assertEqual(json.loads(response.read())['gauges']['queue_depth'], 2)
+
+    def test_reset(self):
+        """Test reset clears values but keeps registrations"""
+        self.registry.reset()
+        snapshot = self.registry.snapshot()
+        self.assertEqual(snapshot['counters']['frames_dropped_total'], 0)
+        self.assertEqual(snapshot['histograms'][PIPE_WRITE_SECONDS]['count'], 0)
+
+    def test_shared_registry(self):
+        """Test components share one process-wide registry"""
+        self.assertIs(get_metrics_registry(), get_metrics_registry())
+
+
+if __name__ == '__main__':
+    unittest.main()
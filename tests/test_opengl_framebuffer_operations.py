@@ -359,5 +359,159 @@ class TestFramebufferIntegrationWithRendering:
         context.cleanup()
 
 
+class TestAsyncReadback:
+    """Test pixel buffer object readback ring"""
+    
+    def test_ring_delivers_frames_one_late_in_mock_mode(self):
+        """Frames come back in order, one submission behind"""
+        context = create_offscreen_context(backend=ContextBackend.MOCK)
+        framebuffer = create_render_framebuffer(context, "async", 64, 32)
+        
+        assert framebuffer.enable_async_readback(2)
+        assert framebuffer.async_readback_enabled
+        
+        assert framebuffer.read_pixels_async(0.0) is None
+        assert framebuffer.pending_readback_count == 1
+        
+        tag, pixels = framebuffer.read_pixels_async(1.0)
+        assert tag == 0.0
+        assert pixels.shape == (32, 64, 4)
+        
+        tag, _ = framebuffer.read_pixels_async(2.0)
+        assert tag == 1.0
+        
+        remaining = framebuffer.drain_readbacks()
+        assert [tag for tag, _ in remaining] == [2.0]
+        assert framebuffer.pending_readback_count == 0
+        
+        context.cleanup()
+    
+    def test_larger_ring_increases_latency(self):
+        """A ring of three buffers delivers frames two submissions late"""
+        context = create_offscreen_context(backend=ContextBackend.MOCK)
+        framebuffer = create_render_framebuffer(context, "async", 16, 16)
+        framebuffer.enable_async_readback(3)
+        
+        results = [framebuffer.read_pixels_async(i) for i in range(5)]
+        delivered = [result[0] for result in results if result is not None]
+        delivered += [tag for tag, _ in framebuffer.drain_readbacks()]
+        
+        assert results[0] is None and results[1] is None
+        assert delivered == [0, 1, 2, 3, 4]
+        
+        context.cleanup()
+    
+    def test_resize_recreates_ring(self):
+        """Resizing keeps asynchronous readback with the new dimensions"""
+        context = create_offscreen_context(backend=ContextBackend.MOCK)
+        framebuffer = create_render_framebuffer(context, "async", 16, 16)
+        framebuffer.enable_async_readback(2)
+        framebuffer.read_pixels_async("stale")
+        
+        framebuffer.resize(32, 8)
+        
+        assert framebuffer.async_readback_enabled
+        assert framebuffer.pending_readback_count == 0
+        framebuffer.read_pixels_async("a")
+        tag, pixels = framebuffer.read_pixels_async("b")
+        assert tag == "a"
+        assert pixels.shape == (8, 32, 4)
+        
+        context.cleanup()
+    
+    def test_fallback_to_synchronous_reads(self):
+        """Without PBO support reads complete immediately"""
+        config = FramebufferConfig(width=10, height=10)
+        
+        with patch('src.core.opengl_context.OPENGL_AVAILABLE', True):
+            with patch('src.core.opengl_context.gl') as mock_gl:
+                mock_gl.glGenFramebuffers.return_value = 1
+                mock_gl.glGenTextures.return_value = 2
+                mock_gl.glCheckFramebufferStatus.return_value = mock_gl.GL_FRAMEBUFFER_COMPLETE
+                mock_gl.glGenBuffers.side_effect = RuntimeError("no PBO support")
+                mock_gl.glReadPixels.return_value = np.zeros((10, 10, 4), dtype=np.uint8).tobytes()
+                
+                from src.core.opengl_context import OpenGLFramebuffer
+                framebuffer = OpenGLFramebuffer(config)
+                
+                assert not framebuffer.enable_async_readback(2)
+                assert not framebuffer.async_readback_enabled
+                
+                tag, pixels = framebuffer.read_pixels_async(0.5)
+                assert tag == 0.5
+                assert pixels.shape == (10, 10, 4)
+                assert framebuffer.pending_readback_count == 0
+    
+    def test_pixel_buffer_readback_calls(self):
+        """Readback goes through pack buffers and is flipped like read_pixels"""
+        config = FramebufferConfig(width=4, height=2)
+        
+        with patch('src.core.opengl_context.OPENGL_AVAILABLE', True):
+            with patch('src.core.opengl_context.gl') as mock_gl:
+                mock_gl.glGenFramebuffers.return_value = 1
+                mock_gl.glGenTextures.return_value = 2
+                mock_gl.glCheckFramebufferStatus.return_value = mock_gl.GL_FRAMEBUFFER_COMPLETE
+                mock_gl.glGenBuffers.return_value = np.array([7, 8])
+                
+                rows = np.zeros((2, 4, 4), dtype=np.uint8)
+                rows[0] = 1  # bottom row in OpenGL order
+                mock_gl.glGetBufferSubData.return_value = rows.tobytes()
+                
+                from src.core.opengl_context import OpenGLFramebuffer
+                framebuffer = OpenGLFramebuffer(config)
+                
+                assert framebuffer.enable_async_readback(2)
+                assert framebuffer.pbo_ids == [7, 8]
+                
+                assert framebuffer.read_pixels_async("first") is None
+                mock_gl.glBindBuffer.assert_any_call(mock_gl.GL_PIXEL_PACK_BUFFER, 7)
+                
+                tag, pixels = framebuffer.read_pixels_async("second")
+                assert tag == "first"
+                assert pixels[1, 0, 0] == 1 and pixels[0, 0, 0] == 0
+                
+                framebuffer.destroy()
+                mock_gl.glDeleteBuffers.assert_called_with(2, [7, 8])
+
+    
+    def test_failed_pixel_buffer_reads_fall_back(self):
+        """A readback that cannot be queued is read synchronously; a failed map yields no pixels"""
+        config = FramebufferConfig(width=4, height=2)
+        
+        with patch('src.core.opengl_context.OPENGL_AVAILABLE', True):
+            with patch('src.core.opengl_context.gl') as mock_gl:
+                mock_gl.glGenFramebuffers.return_value = 1
+                mock_gl.glGenTextures.return_value = 2
+                mock_gl.glCheckFramebufferStatus.return_value = mock_gl.GL_FRAMEBUFFER_COMPLETE
+                mock_gl.glGenBuffers.return_value = np.array([7, 8])
+                frame = np.zeros((2, 4, 4), dtype=np.uint8).tobytes()
+                
+                def read_pixels(*args):
+                    if len(args) == 7:
+                        raise RuntimeError("GL_INVALID_OPERATION")
+                    return frame
+                
+                mock_gl.glReadPixels.side_effect = read_pixels
+                mock_gl.glGetBufferSubData.side_effect = RuntimeError("map failed")
+                
+                from src.core.opengl_context import OpenGLFramebuffer
+                framebuffer = OpenGLFramebuffer(config)
+                assert framebuffer.enable_async_readback(2)
+                
+                assert framebuffer.read_pixels_async("first") is None
+                tag, pixels = framebuffer.read_pixels_async("second")
+                assert tag == "first"
+                assert pixels.shape == (2, 4, 4)
+                assert framebuffer.readback_failures == 2
+                
+                mock_gl.glReadPixels.side_effect = None
+                mock_gl.glReadPixels.return_value = frame
+                tag, pixels = framebuffer.read_pixels_async("third")
+                assert tag == "second" and pixels is not None
+                
+                assert framebuffer.drain_readbacks() == [("third", None)]
+                assert framebuffer.readback_failures == 3
+                framebuffer.disable_async_readback()
+
 if __name__ == '__main__':
     pytest.main([__file__])
\ No newline at end of file
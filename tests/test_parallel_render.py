@@ -0,0 +1,135 @@
+"""
+Unit Tests for Time-Segment Parallel Rendering
+
+Tests segment boundary planning, rendering segments in worker processes and
+resuming and concatenating checkpointed segments.
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import patch, MagicMock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.parallel_render import plan_segment_boundaries, ParallelSegmentRenderer
+from core.enhanced_ffmpeg_integration import EnhancedExportSettings, EnhancedFFmpegProcessor
+from core.cost_scheduler import FrameCostModel
+from core.models import SubtitleLine
+from tests.helpers import make_project
+
+
+class TestSegmentBoundaries(unittest.TestCase):
+    """Test plan_segment_boundaries"""
+
+    def test_even_split_without_lines(self):
+        """Test cuts land on the ideal positions when nothing is in the way"""
+        self.assertEqual(plan_segment_boundaries(300, 30.0, 3), [0, 100, 200, 300])
+        self.assertEqual(plan_segment_boundaries(300, 30.0, 1), [0, 300])
+
+    def test_cuts_are_keyframe_aligned(self):
+        """Test every cut is a multiple of the GOP size"""
+        boundaries = plan_segment_boundaries(1000, 30.0, 7, gop_frames=48)
+        self.assertEqual(boundaries[0], 0)
+        self.assertEqual(boundaries[-1], 1000)
+        self.assertTrue(all(b % 48 == 0 for b in boundaries[1:-1]))
+        self.assertEqual(boundaries, sorted(set(boundaries)))
+
+    def test_cuts_avoid_karaoke_lines(self):
+        """Test a cut moves into the nearest gap between lines"""
+        lines = [SubtitleLine(0.5, 4.6, "one"), SubtitleLine(4.9, 9.0, "two")]
+        boundaries = plan_segment_boundaries(300, 30.0, 2, lines, gop_frames=3)
+        cut = boundaries[1]
+        self.assertTrue(4.6 <= cut / 30.0 <= 4.9)
+        self.assertEqual(cut % 3, 0)
+
+    def test_falls_back_when_every_cut_splits_a_line(self):
+        """Test a long line that covers the search window still allows a cut"""
+        lines = [SubtitleLine(0.0, 10.0, "long")]
+        self.assertEqual(plan_segment_boundaries(300, 30.0, 2, lines, gop_frames=30), [0, 150, 300])
+
+    def test_short_export_drops_empty_segments(self):
+        """Test a timeline shorter than the GOP is not cut"""
+        self.assertEqual(plan_segment_boundaries(5, 10.0, 4, gop_frames=20), [0, 5])
+
+
+class TestParallelSegmentRenderer(unittest.TestCase):
+    """Test ParallelSegmentRenderer"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self.temp_dir.name, "out.mp4")
+        self.settings = EnhancedExportSettings(output_path=self.output_path, width=16, height=8, fps=10.0)
+        self.calibration_path = os.path.join(self.temp_dir.name, "render_cost_model.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_render_segments_in_worker_processes(self):
+        """Test every frame is rendered exactly once across worker processes"""
+        renderer = ParallelSegmentRenderer(make_project(lines=[(0.2, 1.7), (2.3, 3.5)]), self.settings,
+                                           workers=2, backend="mock", gop_seconds=0.5, encode=False,
+                                           calibration_path=self.calibration_path)
+        progress = []
+
+        result = renderer.render(lambda done, total: progress.append((done, total)))
+
+        self.assertTrue(result.success, result.error)
+        self.assertEqual(result.total_frames, 40)
+        self.assertEqual(result.frames_rendered, 40)
+        self.assertEqual([s['index'] for s in result.segments], [0, 1])
+        self.assertEqual(progress[-1], (40, 40))
+        self.assertEqual(renderer.plan_boundaries(), [0, 20, 40])
+        self.assertEqual(sorted(u['unit'] for u in result.prediction.units), [0, 1])
+        self.assertEqual(sum(u['frames'] for u in result.prediction.units), 40)
+
+        # The next renderer, e.g. in a new process, starts from the calibrated model
+        stored = FrameCostModel.load_calibration(self.calibration_path, "mock")
+        self.assertEqual(stored, renderer.cost_model)
+        reloaded = ParallelSegmentRenderer(make_project(), self.settings, backend="mock",
+                                           calibration_path=self.calibration_path)
+        self.assertEqual(reloaded.cost_model, renderer.cost_model)
+
+    def test_segment_encoders_use_closed_fixed_gops(self):
+        """Test segment settings produce aligned, closed GOPs without audio"""
+        renderer = ParallelSegmentRenderer(make_project(), self.settings, workers=2, gop_seconds=2.0,
+                                           calibration_path=self.calibration_path)
+        settings = renderer._segment_settings("segment.mp4")
+        self.assertEqual(settings.gop_size, 20)
+        self.assertTrue(settings.closed_gop)
+
+        processor = EnhancedFFmpegProcessor.__new__(EnhancedFFmpegProcessor)
+        cmd = processor.build_ffmpeg_command(settings)
+        self.assertEqual(cmd[cmd.index("-g") + 1], "20")
+        self.assertIn("+cgop", cmd)
+        self.assertIn("-an", cmd)
+        self.assertEqual(cmd[-1], "segment.mp4")
+
+    def test_resume_only_concatenates_completed_segments(self):
+        """Test a fully checkpointed export skips rendering and concatenates once"""
+        renderer = ParallelSegmentRenderer(make_project(), self.settings, workers=2, gop_seconds=0.5,
+                                           calibration_path=self.calibration_path)
+        renderer._create_tasks()
+        checkpoint = renderer.checkpoint
+        for segment in checkpoint.segments:
+            with open(checkpoint.segment_path(segment), 'wb') as f:
+                f.write(b"segment")
+            checkpoint.mark_completed(segment)
+
+        with patch('core.parallel_render.subprocess.run', return_value=MagicMock(returncode=0)) as run, \
+             patch('core.parallel_render.ProcessPoolExecutor') as executor:
+            result = ParallelSegmentRenderer(make_project(), self.settings, workers=2, gop_seconds=0.5,
+                                             calibration_path=self.calibration_path).render()
+
+        self.assertTrue(result.success, result.error)
+        self.assertEqual(result.output_path, self.output_path)
+        executor.assert_not_called()
+        cmd = run.call_args[0][0]
+        self.assertEqual(cmd[cmd.index("-c:v") + 1], "copy")
+        self.assertEqual(cmd[-1], self.output_path)
+        self.assertFalse(os.path.exists(checkpoint.segment_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
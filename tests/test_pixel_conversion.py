@@ -0,0 +1,83 @@
+"""
+Unit Tests for Stripe-Parallel Pixel Conversion
+
+Tests that striped, multi-threaded conversions produce exactly the same output
+as single-threaded conversion.
+"""
+
+import unittest
+import os
+import sys
+from unittest.mock import Mock
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.pixel_conversion import StripeConversionExecutor
+
+
+class TestStripeConversionExecutor(unittest.TestCase):
+    """Test StripeConversionExecutor functionality"""
+
+    def setUp(self):
+        rng = np.random.default_rng(1234)
+        self.frame = rng.integers(0, 256, size=(270, 482, 4), dtype=np.uint8)
+        self.serial = StripeConversionExecutor(workers=1)
+        self.parallel = StripeConversionExecutor(workers=4, min_stripe_rows=16)
+
+    def tearDown(self):
+        self.parallel.shutdown()
+
+    def test_stripes_cover_rows_on_even_boundaries(self):
+        """Test stripes partition all rows and start on even rows"""
+        stripes = self.parallel.stripes(270)
+
+        self.assertEqual(len(stripes), 4)
+        self.assertEqual(stripes[0][0], 0)
+        self.assertEqual(stripes[-1][1], 270)
+        for (_, end), (start, _) in zip(stripes, stripes[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(start % 2, 0)
+
+        # Small frames are converted inline as a single stripe
+        self.assertEqual(StripeConversionExecutor(workers=4).stripes(100), [(0, 100)])
+
+    def test_channel_swizzles(self):
+        """Test swizzles match direct channel indexing"""
+        np.testing.assert_array_equal(self.parallel.rgba_to_rgb(self.frame), self.frame[:, :, :3])
+        np.testing.assert_array_equal(self.parallel.rgba_to_bgra(self.frame), self.frame[:, :, [2, 1, 0, 3]])
+        np.testing.assert_array_equal(self.parallel.rgba_to_bgr(self.frame), self.frame[:, :, [2, 1, 0]])
+
+    def test_yuv_parallel_matches_serial(self):
+        """Test striped YUV conversion is identical to single-stripe conversion"""
+        np.testing.assert_array_equal(self.parallel.rgba_to_yuv420p(self.frame),
+                                      self.serial.rgba_to_yuv420p(self.frame))
+        np.testing.assert_array_equal(self.parallel.rgba_to_yuv444p(self.frame),
+                                      self.serial.rgba_to_yuv444p(self.frame))
+
+        yuv = self.parallel.rgba_to_yuv420p(self.frame)
+        self.assertEqual(yuv.size, 270 * 482 + 2 * 135 * 241)
+
+    def test_premultiply_alpha(self):
+        """Test premultiplication rounds like the float formula"""
+        result = self.parallel.premultiply_alpha(self.frame)
+
+        expected = np.round(self.frame[:, :, :3].astype(np.float64) * self.frame[:, :, 3:4] / 255.0)
+        np.testing.assert_array_equal(result[:, :, :3], expected.astype(np.uint8))
+        np.testing.assert_array_equal(result[:, :, 3], self.frame[:, :, 3])
+
+    def test_worker_count_from_config(self):
+        """Test worker count comes from performance settings"""
+        config_manager = Mock()
+        config_manager.get_performance_setting.return_value = 3
+
+        executor = StripeConversionExecutor.from_config(config_manager)
+
+        config_manager.get_performance_setting.assert_called_with("conversion_threads", 0)
+        self.assertEqual(executor.workers, 3)
+        self.assertGreaterEqual(StripeConversionExecutor(workers=0).workers, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+"""
+Unit Tests for the Headless End-to-End Render Benchmark
+
+Tests the synthetic projects, an end-to-end mock render through
+CompleteRenderingPipeline into the discarding sink, the reported stage
+times and peak memory, and the comparison with a stored baseline.
+"""
+
+import unittest
+import os
+import sys
+import json
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.render_benchmark import (
+    BenchmarkScenario, BenchmarkResult, NullSinkProcessor, SCENARIOS, BASELINE_VERSION,
+    synthetic_ass, build_synthetic_project, run_scenario, get_scenario,
+    load_baseline, save_baseline, compare_to_baseline
+)
+from core.render_benchmark import EFFECT_PARAMETERS
+from core.effects_manager import EffectsManager
+from core.enhanced_ffmpeg_integration import EnhancedExportSettings
+from core.complete_rendering_pipeline import CompleteRenderingPipeline, PipelineConfig
+
+
+SMALL = BenchmarkScenario("small", 2.0, lines_per_minute=60, words_per_line=4,
+                          effects=("outline", "glow"), width=64, height=36, fps=15.0)
+
+
+def result(scenario="typical", fps=100.0, peak_rss_mb=200.0, **kwargs):
+    seconds = 10.0
+    return BenchmarkResult(scenario=scenario, frames=int(fps * seconds), seconds=seconds,
+                           peak_rss_mb=peak_rss_mb, sink=kwargs.pop("sink", "null"),
+                           backend=kwargs.pop("backend", "mock"), **kwargs)
+
+
+class TestSyntheticProjects(unittest.TestCase):
+    """Test the synthetic benchmark projects"""
+
+    def test_lyrics_are_deterministic(self):
+        scenario = get_scenario("typical")
+        self.assertEqual(synthetic_ass(scenario, seed=1), synthetic_ass(scenario, seed=1))
+        self.assertNotEqual(synthetic_ass(scenario, seed=1), synthetic_ass(scenario, seed=2))
+
+    def test_density_scales_lines_and_words(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            typical = build_synthetic_project(SCENARIOS["typical"], temp_dir)
+            dense = build_synthetic_project(SCENARIOS["dense"], temp_dir)
+
+        self.assertGreater(len(dense.subtitle_file.lines), 2 * len(typical.subtitle_file.lines))
+        self.assertEqual(len(dense.subtitle_file.lines[0].word_timings), 10)
+        self.assertEqual(typical.audio_file.duration, 30.0)
+        last = dense.subtitle_file.lines[-1]
+        self.assertLessEqual(last.end_time, 30.0)
+
+    def test_effect_parameters_are_read_by_the_effects(self):
+        defaults = EffectsManager().default_effects
+        for effect_type, parameters in EFFECT_PARAMETERS.items():
+            self.assertLessEqual(set(parameters), set(defaults[effect_type]['parameters']), effect_type)
+
+    def test_unknown_scenario(self):
+        with self.assertRaises(ValueError):
+            get_scenario("nope")
+
+
+class TestNullSink(unittest.TestCase):
+    """Test NullSinkProcessor"""
+
+    def setUp(self):
+        self.settings = EnhancedExportSettings(output_path="out.mp4", width=64, height=36, fps=15.0)
+
+    def test_drain_process_needs_no_ffmpeg(self):
+        processor = NullSinkProcessor()
+        self.assertEqual(processor.validate_settings(self.settings), [])
+        self.assertEqual(processor.build_ffmpeg_command(self.settings)[0], sys.executable)
+
+    def test_ffmpeg_writes_to_the_null_muxer(self):
+        command = NullSinkProcessor(use_ffmpeg=True).build_ffmpeg_command(self.settings)
+        formats = [command[index + 1] for index, arg in enumerate(command) if arg == "-f"]
+        self.assertEqual(formats[-1], "null")
+        self.assertEqual(command[-1], "-")
+        self.assertNotIn("out.mp4", command)
+
+
+class TestEndToEnd(unittest.TestCase):
+    """Test mock renders through CompleteRenderingPipeline"""
+
+    def test_scenario_renders_every_frame(self):
+        measured = run_scenario(SMALL, sink="null")
+
+        self.assertIsNone(measured.error)
+        self.assertEqual(measured.frames, SMALL.frame_count)
+        self.assertGreater(measured.fps, 0)
+        self.assertGreater(measured.peak_rss_mb, 0)
+        for stage in ("subtitle_raster", "effects", "readback", "convert", "pipe_write"):
+            self.assertIn(stage, measured.stage_ms)
+        self.assertEqual(measured.to_dict()["fps"], round(measured.fps, 2))
+
+    def test_pipeline_completes_without_an_event_loop(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            project = build_synthetic_project(SMALL, temp_dir)
+            pipeline = CompleteRenderingPipeline(
+                PipelineConfig(width=64, height=36, fps=15.0, backend="mock"),
+                ffmpeg_processor=NullSinkProcessor())
+            try:
+                self.assertTrue(pipeline.initialize(project))
+                self.assertTrue(pipeline.start_rendering(os.path.join(temp_dir, "out.mp4")))
+                self.assertTrue(pipeline.wait_for_completion(60))
+                self.assertEqual(pipeline.state.frames_rendered, 30)
+            finally:
+                pipeline.cleanup()
+
+    def test_failed_encoder_is_reported(self):
+        class FailingSink(NullSinkProcessor):
+            def build_ffmpeg_command(self, settings, input_audio=None):
+                return [sys.executable, "-c", "import sys; sys.stdin.buffer.read(); sys.exit(3)"]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pipeline = CompleteRenderingPipeline(
+                PipelineConfig(width=64, height=36, fps=15.0, backend="mock"), ffmpeg_processor=FailingSink())
+            try:
+                self.assertTrue(pipeline.initialize(build_synthetic_project(SMALL, temp_dir)))
+                self.assertTrue(pipeline.start_rendering(os.path.join(temp_dir, "out.mp4")))
+                self.assertFalse(pipeline.wait_for_completion(60))
+                self.assertIsNotNone(pipeline.state.error_message)
+            finally:
+                pipeline.cleanup()
+
+
+class TestBaseline(unittest.TestCase):
+    """Test the baseline comparison"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "benchmarks", "baseline.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip_keeps_other_scenarios(self):
+        self.assertIsNone(load_baseline(self.path))
+        save_baseline(self.path, [result("typical"), result("dense", error="failed")])
+        save_baseline(self.path, [result("sparse", fps=300.0)], load_baseline(self.path))
+
+        baseline = load_baseline(self.path)
+        self.assertEqual(baseline["version"], BASELINE_VERSION)
+        self.assertEqual(set(baseline["scenarios"]), {"typical", "sparse"})
+        self.assertEqual(baseline["scenarios"]["sparse"]["fps"], 300.0)
+
+    def test_other_versions_are_ignored(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({"version": BASELINE_VERSION + 1, "scenarios": {}}, f)
+        self.assertIsNone(load_baseline(self.path))
+
+    def test_regressions_beyond_the_threshold(self):
+        save_baseline(self.path, [result("typical", fps=100.0, peak_rss_mb=200.0)])
+        baseline = load_baseline(self.path)
+
+        self.assertEqual(compare_to_baseline([result("typical", fps=92.0, peak_rss_mb=215.0)], baseline), [])
+
+        regressions = compare_to_baseline([result("typical", fps=85.0, peak_rss_mb=240.0)], baseline)
+        self.assertEqual([regression.metric for regression in regressions], ["fps", "peak_rss_mb"])
+        self.assertAlmostEqual(regressions[0].change_percent, -15.0)
+
+        regressions = compare_to_baseline([result("typical", fps=85.0, peak_rss_mb=240.0)], baseline,
+                                          threshold=0.2, memory_threshold=0.5)
+        self.assertEqual(regressions, [])
+
+    def test_different_sink_or_backend_is_not_compared(self):
+        save_baseline(self.path, [result("typical", fps=100.0)])
+        baseline = load_baseline(self.path)
+        slower = [result("typical", fps=10.0, sink="ffmpeg"), result("typical", fps=10.0, backend="software")]
+        self.assertEqual(compare_to_baseline(slower, baseline), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
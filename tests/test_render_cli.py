@@ -0,0 +1,150 @@
+"""
+Unit Tests for the Headless Render CLI
+
+Tests project loading, JSON progress events and exit codes of render_cli,
+including a full encode with FFmpeg replaced by a pipe sink.
+"""
+
+import unittest
+import os
+import io
+import sys
+import json
+import tempfile
+from contextlib import redirect_stdout, redirect_stderr
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import render_cli
+from core.enhanced_ffmpeg_integration import EnhancedFFmpegProcessor
+from tests.helpers import settings_sink_command
+
+
+ASS_CONTENT = """[Script Info]
+Title: CLI Test
+ScriptType: v4.00+
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Default,Arial,20,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,0,0,0,0,100,100,0,0,1,2,0,2,10,10,10,1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 0,0:00:00.00,0:00:00.50,Default,,0,0,0,,{\\k25}Hel{\\k25}lo
+"""
+
+
+class TestRenderCli(unittest.TestCase):
+    """Test the karaoke-render command line entry point"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.temp_dir.name, "song.ass"), 'w', encoding='utf-8') as f:
+            f.write(ASS_CONTENT)
+        self.output_path = os.path.join(self.temp_dir.name, "out.mp4")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_project(self, **overrides):
+        project = {"subtitle_file": "song.ass", "width": 16, "height": 8, "fps": 10.0}
+        project.update(overrides)
+        path = os.path.join(self.temp_dir.name, "project.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(project, f)
+        return path
+
+    def run_cli(self, *args):
+        """Run main() and return (exit code, parsed stdout events)"""
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            exit_code = render_cli.main(list(args))
+        events = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        return exit_code, events
+
+    def test_mock_dry_run_reports_progress(self):
+        """Test a dry run emits only JSON events and exits successfully"""
+        exit_code, events = self.run_cli(self.write_project(), "--backend", "mock",
+                                         "--dry-run", "--progress-interval", "0")
+
+        self.assertEqual(exit_code, render_cli.EXIT_OK)
+        self.assertEqual(events[0]['event'], "start")
+        self.assertEqual(events[0]['duration'], 0.5)
+        self.assertEqual(events[-1]['event'], "complete")
+        self.assertEqual(events[-1]['frames'], 5)
+
+        progress = [event for event in events if event['event'] == "progress"]
+        self.assertEqual(progress[-1]['frame'], 5)
+        self.assertEqual(progress[-1]['percent'], 100.0)
+
+    def test_encodes_through_ffmpeg_processor(self):
+        """Test rendered frames are streamed to the encoder and its exit status is reported"""
+        with patch.object(EnhancedFFmpegProcessor, 'validate_settings', return_value=[]), \
+             patch.object(EnhancedFFmpegProcessor, 'build_ffmpeg_command',
+                          side_effect=lambda settings, audio=None: settings_sink_command(settings)):
+            exit_code, events = self.run_cli(self.write_project(), "-o", self.output_path,
+                                             "--backend", "mock")
+
+        self.assertEqual(exit_code, render_cli.EXIT_OK, events)
+        self.assertEqual(events[-1]['output'], self.output_path)
+        self.assertEqual(os.path.getsize(self.output_path), 5 * 16 * 8 * 4)
+
+    def test_encoder_failure_exit_code(self):
+        """Test a failing encoder maps to the encoder exit code"""
+        with patch.object(EnhancedFFmpegProcessor, 'validate_settings', return_value=[]), \
+             patch.object(EnhancedFFmpegProcessor, 'build_ffmpeg_command',
+                          side_effect=lambda settings, audio=None: settings_sink_command(settings, 1)):
+            exit_code, events = self.run_cli(self.write_project(), "-o", self.output_path,
+                                             "--backend", "mock")
+
+        self.assertEqual(exit_code, render_cli.EXIT_ENCODER_FAILED)
+        self.assertEqual(events[-1]['event'], "error")
+
+    def test_invalid_project_exit_code(self):
+        """Test missing files and bad fields are reported as invalid projects"""
+        for overrides in ({"subtitle_file": "missing.ass"}, {"fps": 0}, {"colour": "red"}):
+            exit_code, events = self.run_cli(self.write_project(**overrides), "--backend", "mock",
+                                             "--dry-run")
+            self.assertEqual(exit_code, render_cli.EXIT_INVALID_PROJECT)
+            self.assertEqual(events[-1]['exit_code'], render_cli.EXIT_INVALID_PROJECT)
+
+    def test_listen_rejects_dry_run_and_open_hosts_without_token(self):
+        """Test --dry-run is refused with --listen and a public --listen needs a token"""
+        with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit) as raised:
+            render_cli.main([self.write_project(), "-o", self.output_path, "--listen", "127.0.0.1:0",
+                             "--dry-run"])
+        self.assertEqual(raised.exception.code, render_cli.EXIT_USAGE)
+
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop(render_cli.TOKEN_ENVIRONMENT_VARIABLE, None)
+            exit_code, events = self.run_cli(self.write_project(), "-o", self.output_path,
+                                             "--listen", "0.0.0.0:0", "--token", "")
+        self.assertEqual(exit_code, render_cli.EXIT_INVALID_PROJECT)
+        self.assertIn("token", events[-1]['message'])
+
+    def test_resume_renders_checkpointed_segments(self):
+        """Test --resume renders through the segment checkpoint, even with one worker"""
+        with patch.object(render_cli, 'render_project_parallel',
+                          return_value={"frames": 5, "output": self.output_path}) as parallel:
+            exit_code, events = self.run_cli(self.write_project(), "-o", self.output_path,
+                                             "--backend", "mock", "--resume", "--segments", "8")
+
+        self.assertEqual(exit_code, render_cli.EXIT_OK, events)
+        args, kwargs = parallel.call_args
+        self.assertEqual(args[7], 1)
+        self.assertEqual(kwargs['segments_per_worker'], 8)
+
+        with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit) as raised:
+            render_cli.main([self.write_project(), "-o", self.output_path, "--resume", "--dry-run"])
+        self.assertEqual(raised.exception.code, render_cli.EXIT_USAGE)
+
+    def test_relative_paths_resolved_against_project(self):
+        """Test project paths are relative to the project file, not the working directory"""
+        config = render_cli.load_project_config(self.write_project(output_file="renders/out.mp4"))
+        self.assertEqual(config.subtitle_file, os.path.join(self.temp_dir.name, "song.ass"))
+        self.assertEqual(config.output_file, os.path.join(self.temp_dir.name, "renders", "out.mp4"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,357 @@
+"""
+Unit Tests for the Render Job Daemon
+
+Tests the SQLite job queue (priorities, retries, cancellation, recovery after
+a restart) and the worker pool and HTTP API with a stand-in render command.
+"""
+
+import unittest
+import os
+import sys
+import json
+import asyncio
+import sqlite3
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.render_job_daemon import (
+    RenderJobStore, RenderJobDaemon, JobStatus, build_render_command
+)
+from core.export_checkpoint import ExportCheckpoint
+
+
+def fake_render_command(exit_code=0, delay=0.0):
+    """Command builder standing in for karaoke-render: prints JSON events, then exits"""
+    def build(job):
+        script = (
+            "import json, sys, time\n"
+            "print(json.dumps({'event': 'progress', 'percent': 50.0}), flush=True)\n"
+            "print('rendering', file=sys.stderr, flush=True)\n"
+            f"time.sleep({delay})\n"
+            f"if {exit_code}:\n"
+            f"    print(json.dumps({{'event': 'error', 'message': 'render broke'}}), flush=True)\n"
+            f"sys.exit({exit_code})\n"
+        )
+        return [sys.executable, "-c", script]
+    return build
+
+
+class TestRenderJobStore(unittest.TestCase):
+    """Test RenderJobStore"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "jobs.sqlite3")
+        self.store = RenderJobStore(self.db_path)
+
+    def tearDown(self):
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def test_claims_by_priority_then_age(self):
+        """Test higher priority jobs run first and equal priorities run in order"""
+        low = self.store.submit("a.json", "a.mp4", priority=0)
+        high = self.store.submit("b.json", "b.mp4", priority=5)
+        low_later = self.store.submit("c.json", "c.mp4", priority=0)
+
+        claimed = [self.store.claim_next("w").id for _ in range(3)]
+        self.assertEqual(claimed, [high.id, low.id, low_later.id])
+        self.assertIsNone(self.store.claim_next("w"))
+        self.assertEqual(self.store.get(high.id).status, JobStatus.RUNNING)
+
+    def test_retries_until_exhausted(self):
+        """Test failed attempts are requeued until max_retries is used up"""
+        job = self.store.submit("a.json", "a.mp4", max_retries=1)
+
+        self.store.claim_next("w")
+        self.assertEqual(self.store.finish(job.id, 5, "encoder").status, JobStatus.QUEUED)
+        self.store.claim_next("w")
+        finished = self.store.finish(job.id, 5, "encoder")
+        self.assertEqual(finished.status, JobStatus.FAILED)
+        self.assertEqual(finished.attempts, 2)
+        self.assertEqual(finished.error, "encoder")
+
+    def test_invalid_project_is_not_retried(self):
+        """Test an invalid project fails without a retry"""
+        job = self.store.submit("a.json", "a.mp4", max_retries=3)
+        self.store.claim_next("w")
+        self.assertEqual(self.store.finish(job.id, 3).status, JobStatus.FAILED)
+
+    def test_cancel(self):
+        """Test queued jobs cancel immediately and running jobs are flagged"""
+        queued = self.store.submit("a.json", "a.mp4")
+        running = self.store.submit("b.json", "b.mp4", priority=1)
+        self.store.claim_next("w")
+
+        self.assertEqual(self.store.request_cancel(queued.id).status, JobStatus.CANCELLED)
+        self.assertTrue(self.store.request_cancel(running.id).cancel_requested)
+        self.assertEqual(self.store.finish(running.id, 1).status, JobStatus.CANCELLED)
+
+    def test_cancel_wins_over_a_clean_exit(self):
+        """Test a render that exits cleanly after a cancel request is recorded as cancelled"""
+        job = self.store.submit("a.json", "a.mp4")
+        self.store.claim_next("w")
+        self.store.request_cancel(job.id)
+        self.assertEqual(self.store.finish(job.id, 0).status, JobStatus.CANCELLED)
+
+    def test_restart_recovers_running_jobs(self):
+        """Test jobs left running by a stopped daemon are queued again on restart"""
+        job = self.store.submit("a.json", "a.mp4", options={"fps": 24.0})
+        self.store.claim_next("w")
+        self.store.close()
+
+        self.store = RenderJobStore(self.db_path)
+        self.assertEqual(self.store.recover_interrupted(), 1)
+        recovered = self.store.get(job.id)
+        self.assertEqual(recovered.status, JobStatus.QUEUED)
+        self.assertEqual(recovered.attempts, 0)
+        self.assertEqual(recovered.options, {"fps": 24.0})
+
+    def test_render_command(self):
+        """Test job options become karaoke-render arguments"""
+        job = self.store.submit("a.json", "a.mp4", backend="mock",
+                                options={"fps": 24.0, "dry_run": True})
+        cmd = build_render_command(job)
+        self.assertEqual(cmd[cmd.index("--backend") + 1], "mock")
+        self.assertEqual(cmd[cmd.index("--fps") + 1], "24.0")
+        self.assertIn("--dry-run", cmd)
+        self.assertNotIn("--resume", cmd)
+
+    def test_renders_resume_from_checkpoints(self):
+        """Test encoded renders are started with --resume so retries continue from their segments"""
+        job = self.store.submit("a.json", "a.mp4")
+        self.assertIn("--resume", build_render_command(job))
+
+
+class TestRenderJobDaemon(unittest.TestCase):
+    """Test the worker pool and HTTP API"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "jobs.sqlite3")
+        self.project_path = os.path.join(self.temp_dir.name, "project.json")
+        with open(self.project_path, 'w') as f:
+            f.write("{}")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    async def request(self, daemon, method, path, body=None):
+        reader, writer = await asyncio.open_connection("127.0.0.1", daemon.port)
+        content = json.dumps(body).encode() if body is not None else b""
+        writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                     f"Content-Length: {len(content)}\r\n\r\n".encode() + content)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+
+        head, _, payload = response.partition(b"\r\n\r\n")
+        status = int(head.split()[1])
+        if b"application/json" in head:
+            return status, json.loads(payload)
+        return status, payload.decode()
+
+    async def wait_for_status(self, daemon, job_id, statuses, timeout=10.0):
+        deadline = asyncio.get_running_loop().time() + timeout
+        while asyncio.get_running_loop().time() < deadline:
+            job = daemon.store.get(job_id)
+            if job.status in statuses:
+                return job
+            await asyncio.sleep(0.05)
+        self.fail(f"Job {job_id} did not reach {statuses}")
+
+    def run_daemon(self, scenario, **kwargs):
+        async def main():
+            daemon = RenderJobDaemon(self.db_path, port=0, poll_interval=0.1, **kwargs)
+            await daemon.start()
+            try:
+                return await scenario(daemon)
+            finally:
+                await daemon.stop()
+                daemon.store.close()
+        return asyncio.run(main())
+
+    def test_submit_and_complete_over_http(self):
+        """Test a job submitted over HTTP runs to completion with a log"""
+        async def scenario(daemon):
+            status, job = await self.request(daemon, "POST", "/jobs",
+                                             {"project": self.project_path, "output": "out.mp4",
+                                              "backend": "mock", "options": {"fps": 24}})
+            self.assertEqual(status, 201)
+
+            await self.wait_for_status(daemon, job['id'], {JobStatus.COMPLETED})
+            status, details = await self.request(daemon, "GET", f"/jobs/{job['id']}")
+            self.assertEqual(details['status'], "completed")
+            self.assertEqual(details['progress'], 100)
+            self.assertEqual(details['options'], {"fps": 24.0})
+
+            status, log = await self.request(daemon, "GET", f"/jobs/{job['id']}/log")
+            self.assertIn("rendering", log)
+            self.assertIn('"percent": 50.0', log)
+
+            status, listing = await self.request(daemon, "GET", "/jobs?status=completed")
+            self.assertEqual([j['id'] for j in listing['jobs']], [job['id']])
+
+        self.run_daemon(scenario, command_builder=fake_render_command())
+
+    def test_rejects_invalid_submissions(self):
+        """Test bad submissions get 400 and unknown jobs 404"""
+        async def scenario(daemon):
+            status, body = await self.request(daemon, "POST", "/jobs", {"project": "missing.json",
+                                                                         "output": "out.mp4"})
+            self.assertEqual(status, 400)
+            self.assertIn("not found", body['error'])
+
+            status, _ = await self.request(daemon, "POST", "/jobs",
+                                           {"project": self.project_path, "output": "o.mp4",
+                                            "options": {"bitrate": 1}})
+            self.assertEqual(status, 400)
+
+            status, _ = await self.request(daemon, "GET", "/jobs/unknown")
+            self.assertEqual(status, 404)
+
+        self.run_daemon(scenario, command_builder=fake_render_command())
+
+    def test_failed_job_is_retried(self):
+        """Test a failing render is retried and its error recorded"""
+        async def scenario(daemon):
+            job = daemon.submit_job({"project": self.project_path, "output": "out.mp4",
+                                     "max_retries": 1})
+            finished = await self.wait_for_status(daemon, job.id, {JobStatus.FAILED})
+            self.assertEqual(finished.attempts, 2)
+            self.assertEqual(finished.exit_code, 5)
+            self.assertEqual(finished.error, "render broke")
+
+        self.run_daemon(scenario, command_builder=fake_render_command(exit_code=5))
+
+    def test_cancel_running_job(self):
+        """Test cancelling a running job terminates its render"""
+        async def scenario(daemon):
+            job = daemon.submit_job({"project": self.project_path, "output": "out.mp4"})
+            await self.wait_for_status(daemon, job.id, {JobStatus.RUNNING})
+            while job.id not in daemon.processes:
+                await asyncio.sleep(0.02)
+
+            status, body = await self.request(daemon, "POST", f"/jobs/{job.id}/cancel")
+            self.assertEqual(status, 200)
+            cancelled = await self.wait_for_status(daemon, job.id, {JobStatus.CANCELLED})
+            self.assertEqual(cancelled.attempts, 1)
+
+        self.run_daemon(scenario, command_builder=fake_render_command(delay=30))
+
+    def test_cancel_before_the_render_starts(self):
+        """Test a cancel between claiming a job and starting its render stops the render"""
+        output_path = os.path.join(self.temp_dir.name, "out.mp4")
+        ExportCheckpoint(output_path, "fingerprint", "settings", 10, []).save()
+        render = fake_render_command(delay=30)
+
+        async def scenario(daemon):
+            def build(job):
+                # The cancel request arrives while the worker is still preparing the render
+                daemon.store.request_cancel(job.id)
+                return render(job)
+            daemon.command_builder = build
+
+            job = daemon.submit_job({"project": self.project_path, "output": output_path})
+            cancelled = await self.wait_for_status(daemon, job.id, {JobStatus.CANCELLED})
+            self.assertEqual(cancelled.attempts, 1)
+            self.assertIsNone(ExportCheckpoint.load(output_path))
+
+        self.run_daemon(scenario)
+
+    def test_worker_survives_database_errors(self):
+        """Test a worker whose claim fails is restarted and keeps taking jobs"""
+        async def scenario(daemon):
+            claim_next = daemon.store.claim_next
+            failures = []
+
+            def flaky_claim(worker):
+                if not failures:
+                    failures.append(worker)
+                    raise sqlite3.OperationalError("database is locked")
+                return claim_next(worker)
+            daemon.store.claim_next = flaky_claim
+
+            job = daemon.submit_job({"project": self.project_path, "output": "out.mp4"})
+            await self.wait_for_status(daemon, job.id, {JobStatus.COMPLETED})
+            self.assertEqual(len(failures), 1)
+
+        self.run_daemon(scenario, command_builder=fake_render_command())
+
+    def test_progress_database_errors_do_not_fail_the_render(self):
+        """Test a locked database while recording progress is logged and the render completes"""
+        async def scenario(daemon):
+            def locked(job_id, progress):
+                raise sqlite3.OperationalError("database is locked")
+            daemon.store.update_progress = locked
+
+            job = daemon.submit_job({"project": self.project_path, "output": "out.mp4"})
+            finished = await self.wait_for_status(daemon, job.id, {JobStatus.COMPLETED})
+            self.assertEqual(finished.attempts, 1)
+
+        self.run_daemon(scenario, command_builder=fake_render_command())
+
+    def test_failed_attempt_terminates_its_render(self):
+        """Test an unexpected error while reading a render stops its process"""
+        processes = []
+
+        async def scenario(daemon):
+            async def broken_event(job_id, line):
+                processes.append(daemon.processes[job_id])
+                raise RuntimeError("event handling broke")
+            daemon._handle_event = broken_event
+
+            job = daemon.submit_job({"project": self.project_path, "output": "out.mp4",
+                                     "max_retries": 0})
+            failed = await self.wait_for_status(daemon, job.id, {JobStatus.FAILED})
+            self.assertIn("event handling broke", failed.error)
+            self.assertIsNotNone(processes[0].returncode)
+
+        self.run_daemon(scenario, command_builder=fake_render_command(delay=30))
+
+    def test_api_errors_get_a_response(self):
+        """Test a request failing inside the daemon is answered with 500"""
+        async def scenario(daemon):
+            def locked(*args):
+                raise sqlite3.OperationalError("database is locked")
+            daemon.store.list_jobs = locked
+
+            status, body = await asyncio.wait_for(self.request(daemon, "GET", "/jobs"), 10)
+            self.assertEqual(status, 500)
+            self.assertIn("database is locked", body['error'])
+
+        self.run_daemon(scenario, command_builder=fake_render_command())
+
+    def test_stop_requested_before_serving(self):
+        """Test a stop requested before serve_forever() starts, e.g. by an early signal, is kept"""
+        daemon = RenderJobDaemon(self.db_path, port=0, poll_interval=0.1)
+        daemon.request_stop()
+        asyncio.run(asyncio.wait_for(daemon.serve_forever(), 10))
+        self.assertEqual(daemon.worker_tasks, [])
+
+    def test_shutdown_requeues_running_job(self):
+        """Test stopping the daemon mid-render leaves the job queued for the next start"""
+        job_ids = []
+
+        async def interrupt(daemon):
+            job = daemon.submit_job({"project": self.project_path, "output": "out.mp4"})
+            job_ids.append(job.id)
+            await self.wait_for_status(daemon, job.id, {JobStatus.RUNNING})
+
+        self.run_daemon(interrupt, command_builder=fake_render_command(delay=30))
+
+        store = RenderJobStore(self.db_path)
+        job = store.get(job_ids[0])
+        store.close()
+        self.assertEqual(job.status, JobStatus.QUEUED)
+        self.assertEqual(job.attempts, 0)
+
+        async def resume(daemon):
+            await self.wait_for_status(daemon, job_ids[0], {JobStatus.COMPLETED})
+
+        self.run_daemon(resume, command_builder=fake_render_command())
+
+
+if __name__ == '__main__':
+    unittest.main()
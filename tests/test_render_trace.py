@@ -0,0 +1,228 @@
+"""
+Unit Tests for Render Timeline Tracing
+
+Tests per-thread span buffers, the disabled fast path, Chrome trace-event
+export, merging events from worker processes and the instrumented render
+paths of the headless CLI and segment workers.
+"""
+
+import unittest
+import os
+import io
+import sys
+import json
+import time
+import tempfile
+import threading
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import render_cli
+from core.render_trace import RenderTracer, get_render_tracer
+from core.parallel_render import SegmentRenderTask, render_segment
+from core.enhanced_ffmpeg_integration import EnhancedFFmpegProcessor, EnhancedExportSettings
+from core.models import SubtitleLine
+from tests.helpers import make_project, sink_command
+
+
+ASS_CONTENT = """[Script Info]
+Title: Trace Test
+ScriptType: v4.00+
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 0,0:00:00.00,0:00:00.50,Default,,0,0,0,,{\\k25}Hel{\\k25}lo
+"""
+
+
+def spans_named(events, name):
+    return [event for event in events if event.get("ph") == "X" and event["name"] == name]
+
+
+class TestRenderTracer(unittest.TestCase):
+    """Test RenderTracer"""
+
+    def test_disabled_tracer_records_nothing(self):
+        tracer = RenderTracer()
+        start = tracer.begin()
+        tracer.end("readback", start, 3)
+        with tracer.span("convert", 3):
+            pass
+        tracer.counter("ffmpeg", {"fps": 30.0})
+
+        self.assertEqual(start, 0)
+        self.assertEqual(tracer.span_count, 0)
+        self.assertEqual([event["ph"] for event in tracer.events()], ["M"])
+
+    def test_spans_become_complete_events(self):
+        """Test spans export as ph=X events in microseconds with the frame number"""
+        tracer = RenderTracer()
+        tracer.enable()
+        start = tracer.begin()
+        time.sleep(0.002)
+        tracer.end("readback", start, 7)
+        with tracer.span("encode"):
+            pass
+        tracer.counter("ffmpeg", {"fps": 30.0, "speed": 1.5})
+
+        events = tracer.events()
+        readback = spans_named(events, "readback")[0]
+        self.assertEqual(readback["args"], {"frame": 7})
+        self.assertEqual(readback["ts"], 0.0)
+        self.assertGreaterEqual(readback["dur"], 2000.0)
+        self.assertEqual(readback["tid"], threading.get_native_id())
+        self.assertNotIn("args", spans_named(events, "encode")[0])
+
+        counters = [event for event in events if event["ph"] == "C"]
+        self.assertEqual(counters[0]["args"], {"fps": 30.0, "speed": 1.5})
+        thread_names = [event["args"]["name"] for event in events if event["name"] == "thread_name"]
+        self.assertEqual(thread_names, [threading.current_thread().name])
+
+    def test_threads_record_into_their_own_buffers(self):
+        tracer = RenderTracer()
+        tracer.enable()
+
+        def work(frames):
+            for frame in frames:
+                tracer.end("stage", tracer.begin(), frame)
+
+        threads = [threading.Thread(target=work, args=(range(i * 100, i * 100 + 100),), name=f"worker-{i}")
+                   for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(tracer._buffers), 3)
+        self.assertEqual(tracer.span_count, 300)
+        events = tracer.events()
+        for i in range(3):
+            tid = next(event["tid"] for event in events
+                       if event["name"] == "thread_name" and event["args"]["name"] == f"worker-{i}")
+            frames = [event["args"]["frame"] for event in spans_named(events, "stage") if event["tid"] == tid]
+            self.assertEqual(frames, list(range(i * 100, i * 100 + 100)))
+
+        tracer.clear()
+        self.assertEqual(tracer.span_count, 0)
+
+    def test_merged_worker_events_share_the_time_origin(self):
+        """Test events from another process line up on the same timeline"""
+        worker = RenderTracer(process_name="segment worker")
+        worker.enable()
+        worker.end("segment 0", worker.begin(), 0)
+
+        parent = RenderTracer()
+        parent.enable()
+        parent.end("concat", parent.begin())
+        parent.add_events(json.loads(json.dumps(worker.export_events())))
+
+        events = parent.events()
+        segment = spans_named(events, "segment 0")[0]
+        concat = spans_named(events, "concat")[0]
+        self.assertEqual(segment["ts"], 0.0)
+        self.assertGreater(concat["ts"], segment["ts"])
+        process_names = [event["args"]["name"] for event in events if event["name"] == "process_name"]
+        self.assertEqual(process_names, ["render", "segment worker"])
+
+    def test_write_chrome_trace_json(self):
+        tracer = RenderTracer()
+        tracer.enable()
+        tracer.end("pipe_write", tracer.begin(), 1)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "trace.json")
+            self.assertEqual(tracer.write(path), 3)
+            with open(path, encoding='utf-8') as f:
+                trace = json.load(f)
+
+        self.assertEqual(trace["displayTimeUnit"], "ms")
+        self.assertEqual(len(spans_named(trace["traceEvents"], "pipe_write")), 1)
+
+    def test_span_overhead(self):
+        """Test begin()/end() stay in the microsecond range enabled and below it disabled"""
+        tracer = RenderTracer()
+        count = 20000
+
+        def measure():
+            started = time.perf_counter()
+            for frame in range(count):
+                tracer.end("stage", tracer.begin(), frame)
+            return (time.perf_counter() - started) / count
+
+        disabled = min(measure() for _ in range(3))
+        tracer.enable()
+        enabled = min(measure() for _ in range(3))
+
+        # Generous bounds: shared test machines are slow and noisy
+        self.assertLess(disabled, 2e-6)
+        self.assertLess(enabled, 5e-6)
+
+
+class TestInstrumentedRenders(unittest.TestCase):
+    """Test traces recorded by the headless render paths"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.trace_path = os.path.join(self.temp_dir.name, "trace.json")
+        get_render_tracer().clear()
+
+    def tearDown(self):
+        get_render_tracer().disable()
+        get_render_tracer().clear()
+        self.temp_dir.cleanup()
+
+    def load_trace(self):
+        with open(self.trace_path, encoding='utf-8') as f:
+            return json.load(f)["traceEvents"]
+
+    def test_cli_trace_covers_render_and_writer_threads(self):
+        with open(os.path.join(self.temp_dir.name, "song.ass"), 'w', encoding='utf-8') as f:
+            f.write(ASS_CONTENT)
+        project_path = os.path.join(self.temp_dir.name, "project.json")
+        with open(project_path, 'w', encoding='utf-8') as f:
+            json.dump({"subtitle_file": "song.ass", "width": 16, "height": 8, "fps": 10.0}, f)
+        output_path = os.path.join(self.temp_dir.name, "out.mp4")
+
+        with patch.object(EnhancedFFmpegProcessor, 'validate_settings', return_value=[]), \
+             patch.object(EnhancedFFmpegProcessor, 'build_ffmpeg_command',
+                          side_effect=lambda settings, audio=None: sink_command(settings.output_path)), \
+             redirect_stdout(io.StringIO()):
+            exit_code = render_cli.main([project_path, "-o", output_path, "--backend", "mock",
+                                         "--no-dedup", "--trace", self.trace_path])
+
+        self.assertEqual(exit_code, render_cli.EXIT_OK)
+        self.assertFalse(get_render_tracer().enabled)
+        events = self.load_trace()
+        readback = spans_named(events, "readback")
+        self.assertEqual(sorted(event["args"]["frame"] for event in readback), [0, 1, 2, 3, 4])
+        self.assertEqual(len(spans_named(events, "prepare")), 5)
+        self.assertTrue(spans_named(events, "pipe_write"))
+
+        writer_tid = spans_named(events, "prepare")[0]["tid"]
+        self.assertNotEqual(writer_tid, readback[0]["tid"])
+        self.assertIn({"name": "ffmpeg-frame-writer"},
+                      [event["args"] for event in events
+                       if event["name"] == "thread_name" and event["tid"] == writer_tid])
+
+    def test_segment_worker_returns_its_trace_events(self):
+        project = make_project([SubtitleLine(0.0, 0.5, "la")], duration=1.0)
+        settings = EnhancedExportSettings(output_path="", width=16, height=8, fps=10.0)
+        task = SegmentRenderTask(0, 0, 10, project, settings, backend="mock", encode=False, trace=True)
+
+        result = render_segment(task)
+
+        self.assertIsNone(result["error"])
+        events = result["trace_events"]
+        self.assertEqual(len(spans_named(events, "segment 0")), 1)
+        self.assertTrue(spans_named(events, "readback"))
+        self.assertFalse(get_render_tracer().enabled)
+
+        untraced = render_segment(SegmentRenderTask(0, 0, 10, project, settings, backend="mock",
+                                                    encode=False))
+        self.assertNotIn("trace_events", untraced)
+
+
+if __name__ == '__main__':
+    unittest.main()
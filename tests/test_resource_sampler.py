@@ -0,0 +1,259 @@
+"""
+Unit Tests for the Export Resource Sampler
+
+Tests sampling of registered caches, queues and byte counters, per-thread
+CPU, tracemalloc allocation diffs, soak-test growth detection and the
+resource report of the headless CLI.
+"""
+
+import unittest
+import os
+import io
+import sys
+import json
+import time
+import queue
+import tempfile
+import threading
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+import psutil
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import render_cli
+from core.resource_sampler import (
+    ResourceSampler, ResourceReport, ResourceSample, find_monotonic_growth, MIN_BYTES_GROWTH
+)
+from core.staged_pipeline import StagedFramePipeline, FrameStageDefinition
+
+
+MB = 1024 * 1024
+
+ASS_CONTENT = """[Script Info]
+Title: Soak Test
+ScriptType: v4.00+
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 0,0:00:00.00,0:00:00.50,Default,,0,0,0,,{\\\\k25}Hel{\\\\k25}lo
+"""
+
+
+def checkpoint_report(rss_values, cache_values=None):
+    report = ResourceReport(interval=1.0, soak=True)
+    for index, rss in enumerate(rss_values):
+        sample = ResourceSample(elapsed=index * 60.0, rss_bytes=rss, label=f"render {index + 1}")
+        if cache_values is not None:
+            sample.cache_bytes = {"background_frames": cache_values[index]}
+        report.samples.append(sample)
+    return report
+
+
+class TestResourceSampler(unittest.TestCase):
+    """Test ResourceSampler"""
+
+    def test_samples_registered_sources(self):
+        """Test caches, queues and byte counters are read at every sample"""
+        frames = queue.Queue()
+        written = [0]
+        sampler = ResourceSampler(interval=0.02)
+        sampler.add_cache("frames", lambda: 3 * MB)
+        sampler.add_queue("encoder_input", frames.qsize)
+        sampler.add_throughput("ffmpeg_input", lambda: written[0])
+        sampler.add_cache("broken", lambda: 1 / 0)
+
+        with sampler:
+            for _ in range(3):
+                frames.put(object())
+            for _ in range(10):
+                written[0] += MB
+                time.sleep(0.01)
+
+        report = sampler.report
+        self.assertFalse(sampler.running)
+        self.assertGreaterEqual(len(report.samples), 3)
+        last = report.samples[-1]
+        self.assertEqual(last.cache_bytes, {"frames": 3 * MB})
+        self.assertEqual(last.queue_depths, {"encoder_input": 3})
+        self.assertGreater(last.rss_bytes, 0)
+
+        summary = report.summary()
+        self.assertGreater(summary["mean_throughput"]["ffmpeg_input"], 0)
+        self.assertEqual(summary["peak_queue_depths"], {"encoder_input": 3})
+        self.assertEqual(summary["final_cache_bytes"], {"frames": 3 * MB})
+
+    def test_thread_cpu_is_reported_by_name(self):
+        sampler = ResourceSampler(interval=10.0)
+        sampler.start()
+        stop = threading.Event()
+
+        def spin():
+            while not stop.is_set():
+                sum(range(1000))
+
+        thread = threading.Thread(target=spin, name="busy-worker")
+        thread.start()
+        time.sleep(0.2)
+        sample = sampler.sample()
+        stop.set()
+        thread.join()
+        sampler.stop()
+
+        self.assertGreater(sample.thread_cpu_percent.get("busy-worker", 0.0), 10.0)
+        self.assertGreater(sample.cpu_percent, 10.0)
+
+    def test_tracemalloc_diffs_name_growing_lines(self):
+        sampler = ResourceSampler(interval=10.0, tracemalloc_interval=0.001)
+        sampler.start()
+        retained = [bytearray(1024) for _ in range(2000)]
+        time.sleep(0.01)
+        sampler.sample()
+        report = sampler.stop()
+
+        self.assertEqual(len(retained), 2000)
+        self.assertTrue(report.allocation_diffs)
+        top = report.allocation_diffs[0]["top"]
+        self.assertIn("test_resource_sampler.py", top[0]["location"])
+        self.assertGreaterEqual(top[0]["size_diff"], 2000 * 1024)
+        self.assertIsNotNone(report.samples[-1].traced_bytes)
+
+    def test_concurrent_checkpoints_keep_deltas_non_negative(self):
+        written = [0]
+        sampler = ResourceSampler(interval=0.001)
+        sampler.add_throughput("ffmpeg_input", lambda: written[0])
+        sampler.start()
+        for index in range(200):
+            written[0] += MB
+            sampler.checkpoint(f"step {index}")
+        report = sampler.stop()
+
+        for sample in report.samples:
+            self.assertGreaterEqual(sample.cpu_percent, 0.0)
+            self.assertGreaterEqual(sample.throughput.get("ffmpeg_input", 0.0), 0.0)
+        elapsed = [sample.elapsed for sample in report.samples]
+        self.assertEqual(elapsed, sorted(elapsed))
+
+    def test_psutil_errors_do_not_fail_a_checkpoint(self):
+        sampler = ResourceSampler(interval=10.0)
+        sampler.start()
+        with patch.object(sampler._process, 'memory_info', side_effect=psutil.NoSuchProcess(0)):
+            sample = sampler.checkpoint("render 1")
+            report = sampler.stop()
+
+        self.assertEqual(sample.label, "render 1")
+        self.assertEqual(sample.rss_bytes, 0)
+        self.assertFalse(sampler.running)
+        self.assertIs(report, sampler.report)
+
+    def test_staged_pipeline_queues_are_registered(self):
+        pipeline = StagedFramePipeline([FrameStageDefinition("raster", lambda index, item: item),
+                                        FrameStageDefinition("convert", lambda index, item: item)])
+        sampler = ResourceSampler()
+        pipeline.register_resources(sampler)
+
+        sample = sampler.sample()
+        self.assertEqual(sample.queue_depths, {"stage_raster": 0, "stage_convert": 0,
+                                               "stage_output": 0, "stage_reorder": 0})
+
+
+class TestGrowthDetection(unittest.TestCase):
+    """Test soak-test growth detection"""
+
+    def test_monotonic_growth(self):
+        self.assertTrue(find_monotonic_growth([1, 2, 3], 2))
+        self.assertFalse(find_monotonic_growth([1, 2, 2], 1))
+        self.assertFalse(find_monotonic_growth([1, 2, 3], 5))
+        self.assertFalse(find_monotonic_growth([1, 5], 1))
+
+    def test_rss_growing_after_every_render_is_flagged(self):
+        """Test checkpoints after the warm-up render are compared"""
+        report = checkpoint_report([100 * MB, 150 * MB, 152 * MB, 154 * MB, 156 * MB])
+        findings = report.detect_growth()
+
+        self.assertEqual([finding.series for finding in findings], ["rss_bytes"])
+        self.assertEqual(findings[0].start_value, 150 * MB)
+        self.assertEqual(findings[0].points, 4)
+        self.assertAlmostEqual(findings[0].growth_per_hour, 6 * MB / (3 / 60.0))
+
+    def test_cache_filling_to_its_budget_is_not_flagged(self):
+        report = checkpoint_report([100 * MB] * 5, [64 * MB, 200 * MB, 256 * MB, 256 * MB, 256 * MB])
+        self.assertEqual(report.detect_growth(), [])
+
+    def test_small_or_noisy_growth_is_not_flagged(self):
+        report = checkpoint_report([100 * MB, 100 * MB + 10, 100 * MB + 20, 100 * MB + 30])
+        self.assertEqual(report.detect_growth(), [])
+        report = checkpoint_report([100 * MB, 110 * MB, 105 * MB, 120 * MB])
+        self.assertEqual(report.detect_growth(), [])
+
+    def test_windows_use_minima_without_checkpoints(self):
+        """Test a leak under sawtooth noise is found from window minima"""
+        report = ResourceReport(interval=1.0, soak=True)
+        for index in range(50):
+            noise = 20 * MB if index % 2 else 0
+            report.samples.append(ResourceSample(elapsed=float(index), rss_bytes=100 * MB + index * MB + noise,
+                                                 queue_depths={"encoder_input": index % 3}))
+
+        self.assertEqual([finding.series for finding in report.detect_growth()], ["rss_bytes"])
+        self.assertGreaterEqual(MIN_BYTES_GROWTH, MB)
+
+
+class TestCliResourceReport(unittest.TestCase):
+    """Test --resources and --soak of the headless CLI"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.temp_dir.name, "song.ass"), 'w', encoding='utf-8') as f:
+            f.write(ASS_CONTENT)
+        self.project_path = os.path.join(self.temp_dir.name, "project.json")
+        with open(self.project_path, 'w', encoding='utf-8') as f:
+            json.dump({"subtitle_file": "song.ass", "width": 16, "height": 8, "fps": 10.0}, f)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_cli(self, *args):
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            exit_code = render_cli.main(list(args))
+        return exit_code, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def test_resource_report_is_attached_to_the_result(self):
+        report_path = os.path.join(self.temp_dir.name, "resources.json")
+        exit_code, events = self.run_cli(self.project_path, "--backend", "mock", "--dry-run",
+                                         "--resources", report_path, "--resource-interval", "0.05")
+
+        self.assertEqual(exit_code, render_cli.EXIT_OK)
+        resources = events[-1]["resources"]
+        self.assertGreater(resources["peak_rss_bytes"], 0)
+        self.assertIn("background_frames", resources["final_cache_bytes"])
+        self.assertFalse(resources["soak"])
+        with open(report_path, encoding='utf-8') as f:
+            report = json.load(f)
+        self.assertEqual([sample["label"] for sample in report["samples"] if sample["label"]], ["render 1"])
+
+    def test_soak_growth_fails_the_run(self):
+        """Test a soak test exits with the growth code when memory keeps growing"""
+        leaked = []
+        original = render_cli.render_project
+
+        def leaking_render(*args, **kwargs):
+            leaked.append(bytearray(8 * MB))
+            leaked[-1][::4096] = b"x" * len(leaked[-1][::4096])  # Touch every page
+            return original(*args, **kwargs)
+
+        render_cli.render_project = leaking_render
+        try:
+            exit_code, events = self.run_cli(self.project_path, "--backend", "mock", "--dry-run",
+                                             "--soak", "5", "--resource-interval", "10")
+        finally:
+            render_cli.render_project = original
+
+        self.assertEqual(exit_code, render_cli.EXIT_RESOURCE_GROWTH)
+        self.assertEqual(events[-1]["event"], "error")
+        self.assertIn("rss_bytes", [finding["series"] for finding in events[-1]["resources"]["growth"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+"""
+Unit Tests for Shared-Memory Frame Ring
+
+Tests slot handoff in the shared-memory ring and end-to-end frame delivery
+through the separate encoder-writer process.
+"""
+
+import unittest
+import os
+import sys
+import time
+import tempfile
+from unittest.mock import patch
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.shared_frame_ring import (
+    SharedFrameRing, SharedMemoryFrameWriter, LAYOUT_RGBA, LAYOUT_BGRA, END_OF_STREAM
+)
+from core.enhanced_ffmpeg_integration import EnhancedFFmpegProcessor, EnhancedExportSettings
+from core.frame_capture_system import CapturedFrame, PixelFormat
+from core.timestamped_frames import TimestampedFrameStream
+from tests.helpers import sink_command
+
+
+# Bytes of one 8x6 RGBA test frame, for the encoder stand-in's progress
+FRAME_BYTES = 8 * 6 * 4
+
+
+def make_frame(value, width=8, height=6):
+    """Create a frame with distinct channel values"""
+    frame = np.zeros((height, width, 4), dtype=np.uint8)
+    frame[:, :, 0] = value
+    frame[:, :, 1] = value + 1
+    frame[:, :, 2] = value + 2
+    frame[:, :, 3] = 255
+    return frame
+
+
+class TestSharedFrameRing(unittest.TestCase):
+    """Test SharedFrameRing slot handoff"""
+
+    def setUp(self):
+        self.ring = SharedFrameRing.create(2, (6, 8, 4))
+
+    def tearDown(self):
+        self.ring.close()
+
+    def test_slot_handoff_in_order(self):
+        """Test frames come out in the order they were committed"""
+        for frame_number in range(2):
+            index = self.ring.acquire_write(timeout=0.1)
+            self.ring.frames[index] = make_frame(frame_number * 10)
+            self.ring.commit(index, frame_number, frame_number / 30.0)
+
+        for frame_number in range(2):
+            index = self.ring.acquire_read(timeout=0.1)
+            self.assertEqual(self.ring.meta[index][0], frame_number)
+            np.testing.assert_array_equal(self.ring.frames[index], make_frame(frame_number * 10))
+            self.ring.release(index)
+
+    def test_producer_blocks_when_full(self):
+        """Test no slot is handed out until the consumer releases one"""
+        for frame_number in range(2):
+            self.ring.commit(self.ring.acquire_write(timeout=0.1), frame_number, 0.0)
+
+        self.assertIsNone(self.ring.acquire_write(timeout=0.05))
+
+        self.ring.release(self.ring.acquire_read(timeout=0.1))
+        self.assertIsNotNone(self.ring.acquire_write(timeout=0.1))
+
+
+class TestSharedMemoryFrameWriter(unittest.TestCase):
+    """Test frame delivery through the writer process"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self.temp_dir.name, "frames.raw")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_frames_reach_encoder_stdin(self):
+        """Test frames are written in order and BGRA slots are converted to RGBA"""
+        writer = SharedMemoryFrameWriter(sink_command(self.output_path, frame_bytes=FRAME_BYTES), 8, 6,
+                                         slots=2)
+        self.assertTrue(writer.start())
+
+        frames = [make_frame(i * 10) for i in range(5)]
+        for frame_number, frame in enumerate(frames[:4]):
+            self.assertTrue(writer.write_frame(frame, frame_number, frame_number / 30.0))
+        self.assertTrue(writer.write_frame(frames[4][:, :, [2, 1, 0, 3]], 4, 4 / 30.0, LAYOUT_BGRA))
+        writer.finish_input()
+
+        lines = list(writer.iter_output_lines())
+        self.assertEqual(writer.wait(timeout=10), 0)
+        writer.close()
+
+        self.assertEqual(writer.frames_written, 5)
+        self.assertIn("frame=5", "".join(lines))
+        with open(self.output_path, 'rb') as f:
+            written = np.frombuffer(f.read(), dtype=np.uint8).reshape(5, 6, 8, 4)
+        np.testing.assert_array_equal(written, np.stack(frames))
+
+    def test_frame_size_mismatch(self):
+        """Test frames that do not fit a slot are rejected"""
+        writer = SharedMemoryFrameWriter(sink_command(self.output_path, frame_bytes=FRAME_BYTES), 8, 6,
+                                         slots=2)
+        self.assertTrue(writer.start())
+
+        self.assertFalse(writer.write_frame(np.zeros((4, 4, 4), dtype=np.uint8), 0, 0.0))
+        self.assertIsNotNone(writer.error)
+
+        writer.finish_input()
+        writer.wait(timeout=10)
+        writer.close()
+
+
+class TestProcessWriterEncoding(unittest.TestCase):
+    """Test EnhancedFFmpegProcessor in multiprocess writer mode"""
+
+    def test_encoding_through_writer_process(self):
+        """Test start_encoding streams every frame through the writer process"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "frames.raw")
+            processor = EnhancedFFmpegProcessor()
+            settings = EnhancedExportSettings(width=8, height=6, fps=30.0,
+                                              multiprocess_writer=True, writer_ring_slots=2)
+
+            frames = [
+                CapturedFrame(frame_number=i, timestamp=i / 30.0, data=make_frame(i),
+                              width=8, height=6, pixel_format=PixelFormat.RGBA8,
+                              capture_time=0.0, render_time=0.0)
+                for i in range(6)
+            ]
+            frame_iter = iter(frames)
+
+            with patch.object(processor, 'validate_settings', return_value=[]), \
+                 patch.object(processor, 'build_ffmpeg_command',
+                              return_value=sink_command(output_path, frame_bytes=FRAME_BYTES)):
+                self.assertTrue(processor.start_encoding(settings, lambda: next(frame_iter, None), len(frames)))
+
+            processor.progress_monitor_thread.join(timeout=15)
+            self.assertFalse(processor.is_encoding)
+            self.assertEqual(processor.current_frame, 6)
+            self.assertEqual(processor.progress_info.frame, 6)
+
+            with open(output_path, 'rb') as f:
+                self.assertEqual(len(f.read()), 6 * 8 * 6 * 4)
+
+            processor.cleanup()
+
+    def test_timestamped_frames_through_writer_process(self):
+        """Test a repeated frame goes through the ring once, framed with its timestamp"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "frames.mkv")
+            processor = EnhancedFFmpegProcessor()
+            settings = EnhancedExportSettings(width=8, height=6, fps=30.0, multiprocess_writer=True,
+                                              writer_ring_slots=2, timestamped_input=True)
+            frames = iter([
+                CapturedFrame(frame_number=0, timestamp=0.0, data=make_frame(1), width=8, height=6,
+                              pixel_format=PixelFormat.RGBA8, capture_time=0.0, render_time=0.0, repeat=4),
+                CapturedFrame(frame_number=4, timestamp=4 / 30.0, data=make_frame(2), width=8, height=6,
+                              pixel_format=PixelFormat.RGBA8, capture_time=0.0, render_time=0.0)
+            ])
+
+            with patch.object(processor, 'validate_settings', return_value=[]), \
+                 patch.object(processor, 'build_ffmpeg_command',
+                              return_value=sink_command(output_path, frame_bytes=FRAME_BYTES)):
+                self.assertTrue(processor.start_encoding(settings, lambda: next(frames, None), 5))
+
+            processor.progress_monitor_thread.join(timeout=15)
+            self.assertEqual(processor.current_frame, 5)
+
+            stream = TimestampedFrameStream(8, 6, 30.0)
+            expected = (stream.header() + stream.block_header(0) + make_frame(1).tobytes()
+                        + stream.block_header(4) + make_frame(2).tobytes())
+            with open(output_path, 'rb') as f:
+                self.assertEqual(f.read(), expected)
+
+            processor.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
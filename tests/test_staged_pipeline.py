@@ -0,0 +1,136 @@
+"""
+Unit Tests for Staged Frame Pipeline
+
+Tests in-order reassembly, bounded buffering, dropped frames, error
+propagation and cancellation of the multi-stage frame pipeline.
+"""
+
+import unittest
+import os
+import sys
+import time
+import random
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.staged_pipeline import StagedFramePipeline, FrameStageDefinition
+
+
+def source(count):
+    """Frame source yielding (frame_index, timestamp) pairs"""
+    return ((i, i / 30.0) for i in range(count))
+
+
+class TestStagedFramePipeline(unittest.TestCase):
+    """Test StagedFramePipeline"""
+
+    def test_frames_delivered_in_order(self):
+        """Test out-of-order completion in a multi-worker stage is reassembled"""
+        rng = random.Random(7)
+        delays = [rng.uniform(0.0, 0.005) for _ in range(60)]
+
+        def slow_convert(frame_index, item):
+            time.sleep(delays[frame_index])
+            return (frame_index, item)
+
+        pipeline = StagedFramePipeline([
+            FrameStageDefinition("raster", lambda i, t: t, workers=2),
+            FrameStageDefinition("composite", lambda i, t: t * 2, workers=1),
+            FrameStageDefinition("convert", slow_convert, workers=4)
+        ], queue_size=2)
+        pipeline.start(source(60))
+
+        results = list(pipeline)
+        pipeline.join(timeout=5)
+
+        self.assertEqual([index for index, _ in results], list(range(60)))
+        self.assertEqual([item for _, item in results], [(i, 2 * i / 30.0) for i in range(60)])
+        self.assertEqual(pipeline.frames_delivered, 60)
+        self.assertEqual(pipeline.get_stats()['stages']['convert']['frames_processed'], 60)
+
+    def test_in_flight_frames_bounded(self):
+        """Test the source never runs more than max_in_flight frames ahead of the consumer"""
+        produced = []
+
+        def counting_source():
+            for i in range(50):
+                produced.append(i)
+                yield i, i
+
+        pipeline = StagedFramePipeline([FrameStageDefinition("copy", lambda i, x: x, workers=2)],
+                                       queue_size=2, max_in_flight=5)
+        pipeline.start(counting_source())
+
+        time.sleep(0.3)
+        self.assertLessEqual(len(produced), 5 + 1)
+
+        consumed = [pipeline.next_frame() for _ in range(10)]
+        time.sleep(0.3)
+        self.assertEqual(consumed, list(range(10)))
+        self.assertLessEqual(len(produced), 15 + 1)
+
+        pipeline.cancel()
+        pipeline.join(timeout=5)
+
+    def test_dropped_frames_are_skipped(self):
+        """Test frames a stage drops do not stall reassembly"""
+        pipeline = StagedFramePipeline([
+            FrameStageDefinition("filter", lambda i, x: None if i % 3 == 0 else x, workers=3)
+        ])
+        pipeline.start(source(12))
+
+        indices = [index for index, _ in pipeline]
+        pipeline.join(timeout=5)
+
+        self.assertEqual(indices, [i for i in range(12) if i % 3 != 0])
+        self.assertEqual(pipeline.frames_dropped, 4)
+
+    def test_stage_error_propagates(self):
+        """Test a stage exception stops the pipeline and is raised to the consumer"""
+        def failing(frame_index, item):
+            if frame_index == 5:
+                raise ValueError("boom")
+            return item
+
+        pipeline = StagedFramePipeline([FrameStageDefinition("convert", failing, workers=2)])
+        pipeline.start(source(100))
+
+        with self.assertRaises(RuntimeError) as context:
+            list(pipeline)
+        pipeline.join(timeout=5)
+
+        self.assertIn("convert", str(context.exception))
+        self.assertIn("boom", str(context.exception))
+
+    def test_cancel_releases_workers(self):
+        """Test cancelling unblocks all stage threads"""
+        release = threading.Event()
+
+        def blocking(frame_index, item):
+            release.wait(0.05)
+            return item
+
+        pipeline = StagedFramePipeline([FrameStageDefinition("slow", blocking, workers=2)],
+                                       queue_size=1)
+        pipeline.start(source(1000))
+        self.assertIsNotNone(pipeline.next_frame())
+
+        pipeline.cancel()
+        pipeline.join(timeout=5)
+
+        self.assertTrue(all(not thread.is_alive() for thread in pipeline.threads))
+        self.assertIsNone(pipeline.next_frame())
+
+    def test_empty_source(self):
+        """Test an empty source ends the stream immediately"""
+        pipeline = StagedFramePipeline([FrameStageDefinition("copy", lambda i, x: x, workers=2)])
+        pipeline.start(source(0))
+
+        self.assertIsNone(pipeline.next_frame())
+        pipeline.join(timeout=5)
+        self.assertTrue(pipeline.finished)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+"""
+Unit Tests for the Render Telemetry Bus
+
+Tests per-thread counter aggregation, rate-limited snapshot publishing and
+the Qt signal, logging and metrics registry subscriber adapters.
+"""
+
+import unittest
+import os
+import sys
+import logging
+import threading
+from unittest.mock import Mock, patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+
+from core.telemetry import (
+    TelemetryBus, QtSignalSubscriber, LoggingSubscriber, MetricsSubscriber
+)
+from core.metrics import MetricsRegistry
+from core.frame_capture_system import FrameCaptureSystem, FrameTimestamp, CapturedFrame, PixelFormat
+
+
+class TestTelemetryBus(unittest.TestCase):
+    """Test TelemetryBus"""
+
+    def test_counters_are_summed_over_threads(self):
+        """Test each thread increments its own slots and totals add up"""
+        bus = TelemetryBus()
+        frames = bus.counter("frames")
+
+        def work():
+            for _ in range(1000):
+                frames.add()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        frames.add(5)
+
+        self.assertEqual(bus.totals(), {"frames": 4005})
+        self.assertEqual(len(bus._thread_slots), 5)
+
+    def test_counters_created_after_a_thread_started_counting(self):
+        """Test a thread's slots grow when new counters are registered"""
+        bus = TelemetryBus()
+        bus.counter("a").add(2)
+        bus.counter("b").add(3)
+        self.assertIs(bus.counter("a"), bus.counter("a"))
+        self.assertEqual(bus.totals(), {"a": 2, "b": 3})
+
+    def test_publishing_is_rate_limited(self):
+        """Test publish_if_due delivers at most max_rate_hz snapshots per second"""
+        bus = TelemetryBus(max_rate_hz=10.0)
+        snapshots = []
+        bus.subscribe(snapshots.append)
+        frames = bus.counter("frames")
+        progress = bus.gauge("progress")
+
+        clock = [100.0]
+        with patch('core.telemetry.time.monotonic', side_effect=lambda: clock[0]):
+            bus.reset()
+            for frame in range(100):
+                frames.add()
+                progress.set(frame)
+                bus.publish_if_due()
+                clock[0] += 0.01  # 100 fps for one second
+            bus.publish()
+
+        # One snapshot per 0.1s of rendering plus the final one
+        self.assertEqual(len(snapshots), 11)
+        self.assertEqual(snapshots[-1].counters["frames"], 100)
+        self.assertEqual(snapshots[-1].gauges["progress"], 99)
+        self.assertAlmostEqual(snapshots[1].rates["frames"], 100.0)
+
+    def test_nothing_is_aggregated_without_subscribers(self):
+        bus = TelemetryBus()
+        bus.counter("frames").add()
+        self.assertFalse(bus.publish_if_due())
+        self.assertEqual(bus.snapshots_published, 0)
+
+    def test_failing_subscriber_does_not_stop_others(self):
+        bus = TelemetryBus()
+        bus.subscribe(Mock(side_effect=RuntimeError("broken")))
+        received = bus.subscribe(Mock())
+        self.assertTrue(bus.publish())
+        received.assert_called_once()
+
+        bus.unsubscribe(received)
+        bus.publish()
+        received.assert_called_once()
+
+
+class TestSubscriberAdapters(unittest.TestCase):
+    """Test the Qt, logging and metrics adapters"""
+
+    def setUp(self):
+        self.bus = TelemetryBus()
+        self.frames = self.bus.counter("frames")
+        self.progress = self.bus.gauge("progress")
+
+    def test_qt_signal_subscriber(self):
+        signal = Mock()
+        self.bus.subscribe(QtSignalSubscriber(signal, lambda s: s.gauges["progress"] or None))
+
+        self.bus.publish()
+        signal.emit.assert_not_called()
+        self.progress.set(50.0)
+        self.bus.publish()
+        signal.emit.assert_called_once_with(50.0)
+
+    def test_logging_subscriber(self):
+        logger = logging.getLogger("telemetry_test")
+        self.bus.subscribe(LoggingSubscriber(logger, lambda s: f"{s.counters['frames']} frames"))
+        self.frames.add(3)
+
+        with self.assertLogs(logger, logging.INFO) as logs:
+            self.bus.publish()
+        self.assertEqual(logs.output, ["INFO:telemetry_test:3 frames"])
+
+    def test_metrics_subscriber_adds_increases(self):
+        """Test registry counters grow by the increase since the last snapshot"""
+        registry = MetricsRegistry()
+        self.bus.subscribe(MetricsSubscriber(registry, {"frames": "frames_total"}, gauges=True))
+
+        self.frames.add(3)
+        self.bus.publish()
+        self.frames.add(2)
+        self.progress.set(40.0)
+        self.bus.publish()
+        self.bus.reset()
+        self.frames.add(1)
+        self.bus.publish()
+
+        self.assertEqual(registry.counters["frames_total"].value, 6)
+        self.assertNotIn("progress", registry.gauges)
+
+
+class TestCaptureTelemetry(unittest.TestCase):
+    """Test frame capture reports through the telemetry bus"""
+
+    def test_capture_publishes_throttled_progress(self):
+        """Test a fast capture emits a few progress signals ending at 100%"""
+        with patch('core.frame_capture_system.FrameRenderingEngine') as engine_class:
+            capture_system = FrameCaptureSystem(None)
+            engine_class.return_value.render_frame_at_timestamp.side_effect = \
+                lambda t: CapturedFrame(frame_number=int(round(t * 100)), timestamp=t, width=2, height=2,
+                                        pixel_format=PixelFormat.RGBA8,
+                                        data=np.zeros((2, 2, 4), dtype=np.uint8),
+                                        capture_time=0.0, render_time=0.0)
+            progress, summaries = [], []
+            capture_system.capture_progress.connect(progress.append)
+            capture_system.frame_captured.connect(summaries.append)
+
+            timestamps = [FrameTimestamp(i, i / 100.0, 0.01, 100.0) for i in range(200)]
+            frames = capture_system.capture_frame_sequence(timestamps)
+
+        self.assertEqual(len(frames), 200)
+        self.assertLess(len(progress), 20)
+        self.assertEqual(progress[-1], 100.0)
+        self.assertEqual(summaries[-1]["frame_number"], 199)
+        self.assertEqual(summaries[-1]["width"], 2)
+        self.assertEqual(summaries[-1]["pixel_format"], PixelFormat.RGBA8.value)
+        self.assertEqual(summaries[-1]["frames_captured"], 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
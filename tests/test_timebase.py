@@ -0,0 +1,69 @@
+"""
+Unit Tests for Frame Timebase
+
+Tests rational frame rate parsing and drift-free frame time generation.
+"""
+
+import unittest
+import os
+import sys
+from fractions import Fraction
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.timebase import Timebase
+
+
+class TestTimebase(unittest.TestCase):
+    """Test Timebase functionality"""
+
+    def test_from_fps_snaps_ntsc_rates(self):
+        """Test rounded NTSC rates map to their exact fractions"""
+        self.assertEqual(Timebase.from_fps(29.97), Timebase(30000, 1001))
+        self.assertEqual(Timebase.from_fps(23.976), Timebase(24000, 1001))
+        self.assertEqual(Timebase.from_fps(59.94).rate, Fraction(60000, 1001))
+        self.assertEqual(Timebase.from_fps(30.0), Timebase(30, 1))
+        self.assertEqual(Timebase.from_fps("30000/1001"), Timebase(30000, 1001))
+        self.assertEqual(Timebase.from_fps(25).ffmpeg_rate, "25")
+        self.assertEqual(Timebase.from_fps(29.97).ffmpeg_rate, "30000/1001")
+
+    def test_invalid_rate(self):
+        """Test non-positive rates are rejected"""
+        with self.assertRaises(ValueError):
+            Timebase.from_fps(0)
+        with self.assertRaises(ValueError):
+            Timebase(30, 0)
+
+    def test_frame_count_matches_duration(self):
+        """Test frame counts for long NTSC exports do not drift"""
+        timebase = Timebase.from_fps(29.97)
+
+        # One hour of 30000/1001 is exactly 107892.107... frames
+        self.assertEqual(timebase.frame_count(3600.0), 107893)
+        self.assertEqual(Timebase(30, 1).frame_count(2.0), 60)
+        self.assertEqual(Timebase(30, 1).frame_count(0.1), 3)
+        self.assertEqual(Timebase(30, 1).frame_count(0.0), 0)
+
+    def test_frame_times_are_index_based(self):
+        """Test vectorized frame times equal per-index computation"""
+        timebase = Timebase(30000, 1001)
+        times = timebase.frame_times(200000)
+
+        self.assertEqual(times.dtype, np.float64)
+        self.assertEqual(times[0], 0.0)
+        self.assertEqual(times[-1], 199999 * 1001 / 30000)
+        self.assertEqual(times[12345], timebase.frame_time(12345))
+        self.assertEqual(list(timebase.iter_frame_times(3, start_frame=10)), list(timebase.frame_times(3, 10)))
+
+    def test_frame_at_round_trips(self):
+        """Test every frame time maps back to its own frame index"""
+        for timebase in (Timebase(30, 1), Timebase(30000, 1001), Timebase(24000, 1001)):
+            times = timebase.frame_times(10000)
+            indices = [timebase.frame_at(t) for t in times]
+            self.assertEqual(indices, list(range(10000)))
+
+
+if __name__ == '__main__':
+    unittest.main()